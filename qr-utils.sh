@@ -18,10 +18,8 @@ if [ ! -d "$VENV_DIR" ]; then
     exit 1
 fi
 
-# Activate virtual environment and run src/main.py
-source "$VENV_DIR/bin/activate"
-python "$SCRIPT_DIR/src/main.py" "$@"
-exit_code=$?
-
-# Deactivate is not needed as the script will exit
-exit $exit_code
+# Run src/main.py with the virtual environment's interpreter. Activation isn't
+# needed for that, and running it as a module reuses its cached bytecode; both
+# matter when a daemon answers the call (see "qr-utils daemon").
+PYTHONPATH="$SCRIPT_DIR${PYTHONPATH:+:$PYTHONPATH}" "$VENV_DIR/bin/python" -m src.main "$@"
+exit $?
@@ -0,0 +1,13 @@
+"""Batch QR code generation for QR Code Utils."""
+
+from .checkpoint import Checkpoint
+from .jobs import BatchJob, load_jobs, safe_filename
+from .pipe import JobPipe
+from .runner import BatchReport, BatchResult, BatchRunner
+from .spool import SpoolWorker
+from .watch import JobWatcher
+
+__all__ = [
+    'BatchJob', 'BatchReport', 'BatchResult', 'BatchRunner', 'Checkpoint', 'JobPipe',
+    'JobWatcher', 'SpoolWorker', 'load_jobs', 'safe_filename'
+]
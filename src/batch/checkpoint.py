@@ -0,0 +1,192 @@
+"""Resumable batch progress.
+
+A checkpoint is an append-only file of 8-byte records, one per finished
+job: a BLAKE2b digest of everything that determines the job's image (job
+ID, type, fields, settings, logo, output path and the configured QR
+settings) together with the size of the file that was written. On resume
+the records are loaded into a sorted NumPy array (8 bytes per job, so two
+million finished rows take 16 MB and load in well under a second) and
+looked up a block of jobs at a time. A job is skipped only if its image
+exists and the digest of its current definition and the image's size is
+in the array, so rows that changed and outputs that are missing or were
+cut short are generated again.
+
+Records are buffered and written in blocks; a crash loses at most the
+records since the last flush, and those jobs are simply redone.
+"""
+
+from __future__ import annotations
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+from .jobs import BatchJob
+
+if TYPE_CHECKING:
+    from .runner import BatchResult, BatchRunner
+
+RECORD_SIZE = 8
+DEFAULT_FLUSH_EVERY = 1000
+DEFAULT_FLUSH_INTERVAL = 5.0
+LOOKUP_BLOCK = 1024
+
+
+class Checkpoint:
+    """Records finished jobs and filters them out of a resumed batch.
+
+    Use as a context manager (or call close()) to write the last records.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        *,
+        resume: bool = False,
+        flush_every: int = DEFAULT_FLUSH_EVERY,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL
+    ):
+        """Open a checkpoint.
+
+        Args:
+            path: Checkpoint file
+            resume: Load the jobs finished by earlier runs and keep
+                appending; otherwise start a new checkpoint
+            flush_every: Write buffered records after this many jobs
+            flush_interval: ... or after this many seconds
+        """
+        self.path = Path(path)
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.skipped = 0
+        self._done = self._load() if resume else np.empty(0, dtype='<u8')
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # pylint: disable-next=consider-using-with  # Closed in close()
+        self._file = open(self.path, 'ab' if resume else 'wb')
+        self._buffer = bytearray()
+        self._last_flush = time.monotonic()
+        self._in_flight: Dict[str, bytes] = {}
+
+    def __enter__(self) -> Checkpoint:
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self) -> int:
+        """Number of jobs finished by earlier runs."""
+        return len(self._done)
+
+    def pending(self, jobs: Iterable[BatchJob], runner: BatchRunner) -> Iterator[BatchJob]:
+        """Yield the jobs that still need to run, counting the others in ``skipped``.
+
+        Args:
+            jobs: All jobs of the batch
+            runner: Runner that will run the jobs
+
+        Yields:
+            BatchJob objects without a valid finished output
+        """
+        settings = json.dumps(dict(runner.generators.settings), sort_keys=True, default=str)
+        salt = hashlib.blake2b(settings.encode('utf-8'), digest_size=16)
+        if not self._done.size:
+            for job in jobs:
+                self._in_flight[job.job_id] = _definition(salt, job, runner)
+                yield job
+            return
+
+        # Look finished jobs up a block at a time: one vectorized search per block
+        block: List[Tuple[BatchJob, bytes, int]] = []
+        for job in jobs:
+            path = runner.get_output_path(job)
+            try:
+                size = os.stat(path).st_size
+            except OSError:
+                size = -1
+            block.append((job, _definition(salt, job, runner, path), size))
+            if len(block) >= LOOKUP_BLOCK:
+                yield from self._pending_block(block)
+                block = []
+        yield from self._pending_block(block)
+
+    def _pending_block(self, block: List[Tuple[BatchJob, bytes, int]]) -> Iterator[BatchJob]:
+        records = np.fromiter(
+            (_record(definition, size) if size >= 0 else 0 for _, definition, size in block),
+            dtype='<u8', count=len(block)
+        )
+        index = np.minimum(np.searchsorted(self._done, records), len(self._done) - 1)
+        finished = (self._done[index] == records).tolist()
+        for (job, definition, size), done in zip(block, finished):
+            if done and size >= 0:
+                self.skipped += 1
+                continue
+            self._in_flight[job.job_id] = definition
+            yield job
+
+    def record(self, result: BatchResult):
+        """Record a job returned by the runner; failed jobs are not recorded."""
+        definition = self._in_flight.pop(result.job_id, None)
+        if definition is None or not result.ok or result.path is None:
+            return
+        try:
+            size = os.stat(result.path).st_size
+        except OSError:
+            return
+        self._buffer += _record(definition, size).to_bytes(RECORD_SIZE, 'little')
+        if (len(self._buffer) >= self.flush_every * RECORD_SIZE
+                or time.monotonic() - self._last_flush >= self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        """Write buffered records to disk."""
+        if self._buffer:
+            self._file.write(self._buffer)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._buffer.clear()
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        """Write buffered records and close the file."""
+        if self._file.closed:
+            return
+        self.flush()
+        self._file.close()
+
+    def _load(self) -> np.ndarray:
+        """Read finished jobs, dropping a record cut short by a crash."""
+        try:
+            data = self.path.read_bytes()
+        except FileNotFoundError:
+            return np.empty(0, dtype='<u8')
+        complete = len(data) - len(data) % RECORD_SIZE
+        if complete != len(data):
+            with open(self.path, 'r+b') as f:
+                f.truncate(complete)
+        return np.unique(np.frombuffer(data[:complete], dtype='<u8'))
+
+
+def _definition(
+    salt: hashlib.blake2b,
+    job: BatchJob,
+    runner: BatchRunner,
+    path: Optional[Path] = None
+) -> bytes:
+    """Return a digest of everything that determines a job's image."""
+    digest = salt.copy()
+    digest.update(json.dumps(
+        [job.job_id, job.qr_type, job.fields, job.settings, job.logo or runner.default_logo,
+         str(path or runner.get_output_path(job))],
+        sort_keys=True, default=str
+    ).encode('utf-8'))
+    return digest.digest()
+
+
+def _record(definition: bytes, size: int) -> int:
+    """Combine a job definition digest and its output size into one record."""
+    digest = hashlib.blake2b(definition + size.to_bytes(8, 'little'), digest_size=RECORD_SIZE)
+    return int.from_bytes(digest.digest(), 'little')
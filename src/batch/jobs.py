@@ -0,0 +1,205 @@
+"""Batch job loading."""
+
+from __future__ import annotations
+import csv
+import json
+import re
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Union
+
+# Columns that describe the job rather than the QR payload
+RESERVED_FIELDS = ('id', 'type', 'logo', 'output', 'settings')
+SETTINGS_PREFIX = 'settings.'
+
+# CLI option names accepted as aliases for prepare_data arguments
+FIELD_ALIASES = {
+    'sms': {'phone': 'phone_number'},
+    'phone': {'phone': 'phone_number'},
+    'whatsapp': {'phone': 'phone_number'},
+    'event': {'start': 'start_time', 'end': 'end_time'},
+}
+
+INTEGER_SETTINGS = ('version', 'box_size', 'border', 'stream_threshold')
+FLOAT_SETTINGS = ('logo_scale', 'logo_max_damage')
+BOOLEAN_SETTINGS = ('logo_clear', 'palette')
+
+_UNSAFE_FILENAME_CHARS = re.compile(r'[^A-Za-z0-9._-]')
+
+
+class BatchJob:
+    """A single QR code to generate as part of a batch."""
+
+    __slots__ = ('job_id', 'qr_type', 'fields', 'settings', 'logo', 'output', 'row', 'error',
+                 'payload')
+
+    def __init__(
+        self,
+        job_id: str,
+        qr_type: str,
+        fields: Dict[str, Any],
+        *,
+        settings: Optional[Dict[str, Any]] = None,
+        logo: Optional[str] = None,
+        output: Optional[str] = None,
+        row: int = 0,
+        error: Optional[str] = None
+    ):
+        """Initialize a batch job.
+
+        Args:
+            job_id: Unique job identifier
+            qr_type: Generator type name (url, wifi, vcard, ...)
+            fields: Keyword arguments for the generator's prepare_data
+            settings: Optional custom QR settings for this job
+            logo: Optional logo path
+            output: Optional explicit output path
+            row: 1-based position of the job in its input file
+            error: Why the input row couldn't be read; the job fails when run
+        """
+        self.job_id = job_id
+        self.qr_type = qr_type
+        self.fields = fields
+        self.settings = settings or {}
+        self.logo = logo
+        self.output = output
+        self.row = row
+        self.error = error
+        self.payload: Optional[str] = None  # Set by BatchRunner.prepare_payload()
+
+    def __repr__(self) -> str:
+        return f"BatchJob(job_id={self.job_id!r}, qr_type={self.qr_type!r})"
+
+    @classmethod
+    def from_record(cls, record: Dict[str, Any], row: int) -> BatchJob:
+        """Build a job from a CSV row or JSON object.
+
+        Args:
+            record: Input record
+            row: 1-based row number (used as the job ID if none is given)
+
+        Returns:
+            BatchJob
+
+        Raises:
+            ValueError: If the record has no type
+        """
+        record = {key: value for key, value in record.items()
+                  if key is not None and value not in (None, '')}
+
+        qr_type = str(record.get('type', '')).strip().lower()
+        if not qr_type:
+            raise ValueError(f"Row {row}: missing 'type'")
+
+        settings = dict(record.get('settings') or {})
+        fields = {}
+        for key, value in record.items():
+            if key.startswith(SETTINGS_PREFIX):
+                settings[key[len(SETTINGS_PREFIX):]] = value
+            elif key not in RESERVED_FIELDS:
+                fields[key] = value
+
+        return cls(
+            job_id=str(record.get('id', row)),
+            qr_type=qr_type,
+            fields=coerce_fields(qr_type, fields),
+            settings=coerce_settings(settings),
+            logo=record.get('logo'),
+            output=record.get('output'),
+            row=row
+        )
+
+
+def coerce_fields(qr_type: str, fields: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert text input values to the types prepare_data expects.
+
+    Args:
+        qr_type: Generator type name
+        fields: Raw field values
+
+    Returns:
+        Keyword arguments for prepare_data
+    """
+    aliases = FIELD_ALIASES.get(qr_type, {})
+    fields = {aliases.get(key, key): value for key, value in fields.items()}
+
+    if qr_type == 'event':
+        for key in ('start_time', 'end_time'):
+            if isinstance(fields.get(key), str):
+                fields[key] = datetime.fromisoformat(fields[key])
+    elif qr_type == 'location':
+        for key in ('latitude', 'longitude'):
+            if key in fields:
+                fields[key] = float(fields[key])
+    elif qr_type == 'payment':
+        if 'amount' in fields:
+            fields['amount'] = Decimal(str(fields['amount']))
+    elif qr_type == 'wifi':
+        if isinstance(fields.get('hidden'), str):
+            fields['hidden'] = fields['hidden'].strip().lower() in ('1', 'true', 'yes')
+
+    return fields
+
+
+def coerce_settings(settings: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert text QR settings (e.g. from CSV columns) to their types."""
+    for key in INTEGER_SETTINGS:
+        if isinstance(settings.get(key), str):
+            settings[key] = int(settings[key])
+    for key in FLOAT_SETTINGS:
+        if isinstance(settings.get(key), str):
+            settings[key] = float(settings[key])
+    for key in BOOLEAN_SETTINGS:
+        if isinstance(settings.get(key), str):
+            settings[key] = settings[key].strip().lower() in ('1', 'true', 'yes')
+    if isinstance(settings.get('error_correction'), str):
+        settings['error_correction'] = settings['error_correction'].upper()
+    return settings
+
+
+def safe_filename(job_id: str) -> str:
+    """Return a job ID with characters that are unsafe in file names replaced."""
+    return _UNSAFE_FILENAME_CHARS.sub('_', job_id)
+
+
+def load_jobs(path: Union[str, Path]) -> Iterator[BatchJob]:
+    """Stream jobs from a CSV or JSON Lines file.
+
+    CSV files need a header row. Any other extension is read as JSON Lines
+    (one object per line; blank lines are skipped).
+
+    Args:
+        path: Input file path
+
+    Yields:
+        BatchJob objects in input order. Rows that can't be read (malformed
+        JSON, no type, invalid values) become jobs carrying an ``error``,
+        which fail when run without stopping the batch.
+    """
+    path = Path(path)
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        if path.suffix.lower() == '.csv':
+            for row, record in enumerate(csv.DictReader(f), start=1):
+                yield _read_job(record, row)
+        else:
+            row = 0
+            for line in f:
+                if not line.strip():
+                    continue
+                row += 1
+                yield _read_job(line, row)
+
+
+def _read_job(record: Union[str, Dict[str, Any]], row: int) -> BatchJob:
+    """Build a job from a CSV record or JSON line; return a failing job if it can't be."""
+    try:
+        if isinstance(record, str):
+            record = json.loads(record)
+        if not isinstance(record, dict):
+            raise ValueError("expected a JSON object")
+        return BatchJob.from_record(record, row)
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        message = str(e) if str(e).startswith(f"Row {row}:") else f"Row {row}: {e}"
+        job_id = record.get('id') if isinstance(record, dict) else None
+        return BatchJob(str(job_id or row), '', {}, row=row, error=message)
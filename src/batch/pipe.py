@@ -0,0 +1,153 @@
+"""JSON Lines coprocess mode.
+
+Jobs arrive one JSON object per line (the same fields as a JSONL job file)
+and results leave one JSON object per line, so any program can keep a
+single warm process generating codes instead of starting the CLI per code.
+Each result is written as soon as it is available, which lets a client
+send a job and wait for its answer before sending the next one.
+"""
+
+from __future__ import annotations
+import base64
+import json
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Dict, Iterable, TextIO, Tuple
+
+from ..output.paths import with_parent
+from .jobs import BatchJob
+from .runner import BatchReport, BatchResult, BatchRunner
+
+RETURN_MODES = ('path', 'base64', 'data-uri')
+DEFAULT_IN_FLIGHT = 8
+
+
+class JobPipe:
+    """Serve jobs from a line stream, writing JSONL results.
+
+    Every result carries the job ``id`` (null if the line couldn't be
+    parsed), ``ok``, ``duration`` in seconds, and either ``error`` or the
+    image as ``path``, ``base64`` or ``data_uri`` depending on the return
+    mode.
+    """
+
+    def __init__(
+        self,
+        runner: BatchRunner,
+        *,
+        return_mode: str = 'path',
+        ordered: bool = True,
+        in_flight: int = DEFAULT_IN_FLIGHT
+    ):
+        """Initialize the pipe.
+
+        Args:
+            runner: Batch runner providing warm generators and output paths
+            return_mode: 'path' writes files; 'base64' and 'data-uri'
+                return the PNG inline and write nothing
+            ordered: Write results in input order (otherwise as they finish)
+            in_flight: Maximum number of jobs read but not yet answered
+
+        Raises:
+            ValueError: If the return mode is unknown or in_flight < 1
+        """
+        if return_mode not in RETURN_MODES:
+            raise ValueError(
+                f"Unknown return mode: {return_mode} (expected one of {RETURN_MODES})"
+            )
+        if in_flight < 1:
+            raise ValueError("in_flight must be at least 1")
+        self.runner = runner
+        self.return_mode = return_mode
+        self.ordered = ordered
+        self.in_flight = in_flight
+        self._slots = threading.BoundedSemaphore(in_flight)
+        self._lock = threading.Lock()
+        self._finished: Dict[int, Tuple[BatchResult, Dict[str, Any]]] = {}
+        self._next = 0
+
+    def serve(self, lines: Iterable[str], out: TextIO) -> BatchReport:
+        """Process jobs until the input ends.
+
+        Args:
+            lines: Input lines, e.g. sys.stdin (blank lines are skipped)
+            out: Text stream receiving one JSON result per line
+
+        Returns:
+            BatchReport over all jobs served
+        """
+        report = BatchReport(self.runner.output)
+        started = time.perf_counter()
+        self._finished = {}
+        self._next = 0
+        with ThreadPoolExecutor(max_workers=self.in_flight) as executor:
+            sequence = 0
+            for line in lines:
+                if not line.strip():
+                    continue
+                self._slots.acquire()  # pylint: disable=consider-using-with
+                future = executor.submit(self._process, line, sequence + 1)
+                future.add_done_callback(partial(self._done, sequence, out, report))
+                sequence += 1
+        report.duration = time.perf_counter() - started
+        return report
+
+    def _process(self, line: str, row: int) -> Tuple[BatchResult, Dict[str, Any]]:
+        started = time.perf_counter()
+        result = BatchResult(None)
+        record: Dict[str, Any] = {}
+        try:
+            job = BatchJob.from_record(json.loads(line), row)
+            result.job_id = job.job_id
+            record.update(self._generate(job))
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            result.error = str(e)
+        result.duration = time.perf_counter() - started
+        return result, record
+
+    def _generate(self, job: BatchJob) -> Dict[str, Any]:
+        """Generate one code; return the result fields carrying the image."""
+        generator = self.runner.get_generator(job.qr_type)
+        handle = generator.prepare(job.logo or self.runner.default_logo, job.settings,
+                                   **job.fields)
+        if self.return_mode == 'path':
+            path = with_parent(self.runner.get_output_path(job), handle.save)
+            return {'path': str(path)}
+
+        encoded = base64.b64encode(handle.encode('PNG')).decode('ascii')
+        if self.return_mode == 'base64':
+            return {'base64': encoded}
+        return {'data_uri': f"data:image/png;base64,{encoded}"}
+
+    def _done(self, sequence: int, out: TextIO, report: BatchReport, future: Future):
+        """Write a finished job, holding it back in ordered mode until its turn."""
+        if future.exception() is not None:
+            result = BatchResult(None, error=str(future.exception()))
+            finished = result, {}
+        else:
+            finished = future.result()
+
+        with self._lock:
+            if not self.ordered:
+                self._write(out, report, finished)
+                return
+            self._finished[sequence] = finished
+            while self._next in self._finished:
+                self._write(out, report, self._finished.pop(self._next))
+                self._next += 1
+
+    def _write(self, out: TextIO, report: BatchReport, finished: Tuple[BatchResult, Dict]):
+        result, fields = finished
+        record = {'id': result.job_id, 'ok': result.ok, 'duration': round(result.duration, 6)}
+        if result.ok:
+            record.update(fields)
+        else:
+            self.runner.logger.error("Job %s failed: %s", result.job_id, result.error)
+            record['error'] = result.error
+        out.write(json.dumps(record) + '\n')
+        out.flush()
+        report.add(result)
+        self.runner.check_memory()
+        self._slots.release()
@@ -0,0 +1,263 @@
+"""Memory limits and recycling for long-running workers.
+
+Workers that generate millions of codes grow over time: Pillow buffers,
+caches and allocator fragmentation keep memory that is never handed back.
+A MemoryWatch counts the tasks of one process and checks its resident
+size after each task. Above the ceiling it first clears the module caches;
+if that doesn't bring the process back under it, or after a set number of
+tasks, it asks for the process to be recycled.
+
+A RecyclingPool is a process pool that honours those requests. Each of
+its workers is a single-process executor, so only the worker that asked
+is retired: its queued tasks finish on the old process while a fresh one
+takes its place, and the other workers keep running. Task limits use
+ProcessPoolExecutor's own max_tasks_per_child where it exists (Python
+3.11+), which replaces a process after its last task; it needs the
+'spawn' start method, so replacements import the package anew. On older
+versions the MemoryWatch asks for those recycles instead.
+"""
+
+from __future__ import annotations
+import gc
+import logging
+import os
+import sys
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..core import columns, layout, render, style
+from ..decoder import reader
+
+# Memoized helpers whose results pile up over a long run
+CACHES = (
+    columns.quote, layout.finder_mask, layout.function_mask, layout.data_positions,
+    layout.codeword_map, layout.block_layout,
+    render._load_logo, style._sprites,  # pylint: disable=protected-access
+    reader._format_positions, reader._mask_bits,  # pylint: disable=protected-access
+)
+
+# Caches whose hit rate batches report: loaded logos and module sprites,
+# the render state that job order decides whether to reuse
+REPORTED_CACHES = (render._load_logo, style._sprites)  # pylint: disable=protected-access
+
+# Hits and misses of the reported caches before they were last cleared
+# (cache_clear() resets the counts)
+_cleared = [0, 0]
+
+# ProcessPoolExecutor replaces workers after max_tasks_per_child tasks itself
+NATIVE_TASK_LIMIT = sys.version_info >= (3, 11)
+
+# Share of the ceiling a process must grow past its size after a cache
+# clear before the caches are cleared again
+REGROWTH = 0.1
+
+
+def rss_bytes() -> Optional[int]:
+    """Return the resident set size of this process in bytes, None if unknown.
+
+    Uses /proc where available. Elsewhere falls back to the peak resident
+    size, which never shrinks.
+    """
+    try:
+        with open('/proc/self/statm', 'rb') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def cache_stats() -> Tuple[int, int]:
+    """Return the hits and misses of the reported caches in this process so far."""
+    hits, misses = _cleared
+    for cache in REPORTED_CACHES:
+        info = cache.cache_info()  # pylint: disable=no-value-for-parameter
+        hits += info.hits
+        misses += info.misses
+    return hits, misses
+
+
+def clear_caches():
+    """Empty the module caches and collect garbage."""
+    _cleared[:] = cache_stats()
+    for cache in CACHES:
+        cache.cache_clear()
+    gc.collect()
+
+
+class MemoryWatch:
+    """Count the tasks of this process and enforce its memory ceiling."""
+
+    __slots__ = ('max_tasks', 'max_rss', 'tasks', 'evictions', '_evict_above')
+
+    def __init__(self, max_tasks: Optional[int] = None, max_rss: Optional[int] = None):
+        """Initialize the watch.
+
+        Args:
+            max_tasks: Tasks after which the process is recycled (default: no limit)
+            max_rss: Resident size in bytes above which caches are cleared
+                and, if that isn't enough, the process is recycled
+                (default: no limit)
+
+        Raises:
+            ValueError: If a limit isn't positive
+        """
+        if max_tasks is not None and max_tasks < 1:
+            raise ValueError("max_tasks must be at least 1")
+        if max_rss is not None and max_rss <= 0:
+            raise ValueError("max_rss must be positive")
+        self.max_tasks = max_tasks
+        self.max_rss = max_rss
+        self.tasks = 0
+        self.evictions = 0
+        self._evict_above = max_rss
+
+    def check(self) -> bool:
+        """Record a finished task.
+
+        Returns:
+            True if the process should be recycled
+        """
+        self.tasks += 1
+        if self.max_tasks is not None and self.tasks >= self.max_tasks:
+            return True
+        if self.max_rss is None:
+            return False
+        rss = rss_bytes()
+        if rss is None or rss <= self._evict_above:
+            return False
+
+        clear_caches()
+        self.evictions += 1
+        rss = rss_bytes() or 0
+        # Memory freed by Python often stays with the process; don't clear
+        # the caches again on every task while it does
+        self._evict_above = max(self.max_rss, rss + int(self.max_rss * REGROWTH))
+        logging.getLogger('batch').info(
+            "Process %d at %d MiB after clearing caches (ceiling %d MiB)",
+            os.getpid(), rss >> 20, self.max_rss >> 20
+        )
+        return rss > self.max_rss
+
+
+class RecyclingPool:
+    """Process pool that replaces a worker when it asks to be recycled.
+
+    Tasks return ``(value, recycle)``; the futures returned by submit()
+    resolve to the value. Use as a context manager.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        initializer: Optional[Callable[..., None]] = None,
+        initargs: Tuple = (),
+        max_tasks: Optional[int] = None
+    ):
+        """Initialize the pool; workers start with their first task.
+
+        Args:
+            workers: Number of worker processes
+            initializer: Called in every new worker process
+            initargs: Arguments for the initializer
+            max_tasks: Tasks after which a worker process is replaced by
+                the executor (Python 3.11+; ignored on older versions,
+                where tasks ask for it)
+        """
+        self.workers = workers
+        self.initializer = initializer
+        self.initargs = initargs
+        self.max_tasks = max_tasks if NATIVE_TASK_LIMIT else None
+        self.recycled = 0
+        self._lock = threading.Lock()
+        self._slots: List[Optional[ProcessPoolExecutor]] = [None] * workers
+        # Tasks in flight and finished per executor
+        self._load: Dict[ProcessPoolExecutor, int] = {}
+        self._done: Dict[ProcessPoolExecutor, int] = {}
+        self._retiring: List[ProcessPoolExecutor] = []
+
+    def __enter__(self) -> RecyclingPool:
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+
+    def submit(self, fn: Callable[..., Tuple[Any, bool]], *args) -> Future:
+        """Run a task on the least busy worker.
+
+        Returns:
+            Future resolving to the task's value
+        """
+        with self._lock:
+            for pool in self._retiring:
+                # The old process exits once its tasks are done
+                pool.shutdown(wait=False)
+            self._retiring = []
+            slot = min(range(self.workers), key=lambda slot: self._load.get(self._slots[slot], 0))
+            pool = self._slots[slot]
+            if pool is None:
+                pool = self._slots[slot] = self._executor()
+            self._load[pool] = self._load.get(pool, 0) + 1
+            task = pool.submit(fn, *args)
+        future: Future = Future()
+        task.add_done_callback(partial(self._finished, pool, future))
+        return future
+
+    def recycle(self, pool: ProcessPoolExecutor):
+        """Retire a worker; its slot starts a new one with the next task.
+
+        Args:
+            pool: The worker's executor (several of its tasks may ask)
+        """
+        with self._lock:
+            if pool not in self._slots:
+                return
+            self._slots[self._slots.index(pool)] = None
+            self._retiring.append(pool)
+            self.recycled += 1
+            self._done.pop(pool, None)
+            if not self._load.get(pool):
+                self._load.pop(pool, None)
+
+    def shutdown(self):
+        """Wait for the tasks of all workers and stop them."""
+        with self._lock:
+            pools = self._retiring + [pool for pool in self._slots if pool is not None]
+            self._slots = [None] * self.workers
+            self._retiring = []
+            self._load.clear()
+            self._done.clear()
+        for pool in pools:
+            pool.shutdown(wait=True)
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self.max_tasks is None:
+            return ProcessPoolExecutor(max_workers=1, initializer=self.initializer,
+                                       initargs=self.initargs)
+        return ProcessPoolExecutor(max_workers=1, initializer=self.initializer,
+                                   initargs=self.initargs, max_tasks_per_child=self.max_tasks)
+
+    def _finished(self, pool: ProcessPoolExecutor, future: Future, task: Future):
+        with self._lock:
+            load = self._load.pop(pool, 1) - 1
+            if pool in self._slots:
+                self._load[pool] = load
+                self._done[pool] = self._done.get(pool, 0) + 1
+                if self.max_tasks is not None and self._done[pool] % self.max_tasks == 0:
+                    self.recycled += 1  # Replaced by the executor
+            elif load:
+                self._load[pool] = load
+        if task.exception() is not None:
+            future.set_exception(task.exception())
+            return
+        value, recycle = task.result()
+        if recycle:
+            self.recycle(pool)
+        future.set_result(value)
@@ -0,0 +1,721 @@
+"""Batch QR code generation."""
+
+from __future__ import annotations
+import json
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import ExitStack
+from functools import partial
+from pathlib import Path
+from typing import (
+    Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+)
+
+from ..common.config import Config
+from ..common.logger import setup_logger
+from ..core import BaseQRGenerator, GeneratorFactory, QRHandle
+from ..core.logo import LogoPlan
+from ..core.render import encode_image, image_format
+from ..core.verify import DEFAULT_MAX_DAMAGE, ReadbackError, verify_image
+from ..output.archive import STDOUT, ArchiveWriter, open_archive
+from ..output.manifest import Manifest
+from ..output.paths import OutputLayout, content_key, with_parent
+from ..output.qrm import QRMWriter, payload_hash
+from ..output.sinks import LocalSink, OutputSink, SQLiteSink, open_sink
+from ..output.writer import FSYNC_POLICIES, BackgroundWriter
+from .recycle import NATIVE_TASK_LIMIT, MemoryWatch, RecyclingPool, cache_stats
+from .schedule import estimate_version, run_scheduled
+from .checkpoint import Checkpoint
+from .jobs import BatchJob, safe_filename
+
+MANIFEST_NAME = 'manifest.sqlite'
+EXECUTORS = ('thread', 'process')
+
+# State of a process-pool worker: its own runner and memory watch, created by _init_worker
+_worker: Dict[str, Any] = {}
+
+
+class BatchResult:
+    """Outcome of a single batch job."""
+
+    __slots__ = ('job_id', 'path', 'error', 'duration', 'damage', 'flagged', 'write')
+
+    def __init__(
+        self,
+        job_id: str,
+        path: Optional[Path] = None,
+        error: Optional[str] = None,
+        duration: float = 0.0
+    ):
+        self.job_id = job_id
+        self.path = path
+        self.error = error
+        self.duration = duration
+        self.damage: Optional[float] = None
+        self.flagged = False
+        self.write: Optional[Future] = None  # Queued write, see BatchRunner(writers=...)
+
+    @property
+    def ok(self) -> bool:
+        """Whether the job succeeded."""
+        return self.error is None
+
+
+class BatchReport:
+    """Summary of a batch run."""
+
+    def __init__(self, output: Union[Path, str]):
+        self.output = output
+        self.succeeded = 0
+        self.failed: List[BatchResult] = []
+        self.flagged: List[BatchResult] = []
+        self.skipped = 0
+        self.recycled = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.duration = 0.0
+
+    @property
+    def total(self) -> int:
+        """Number of jobs processed (not counting skipped ones)."""
+        return self.succeeded + len(self.failed)
+
+    @property
+    def cache_hit_rate(self) -> Optional[float]:
+        """Share of cache lookups that hit (None without lookups)."""
+        lookups = self.cache_hits + self.cache_misses
+        return self.cache_hits / lookups if lookups else None
+
+    def add_usage(self, before: Tuple[int, int, int], after: Tuple[int, int, int]):
+        """Record recycles and cache use between two BatchRunner.usage() snapshots."""
+        self.recycled, self.cache_hits, self.cache_misses = (
+            end - start for start, end in zip(before, after)
+        )
+
+    def add(self, result: BatchResult):
+        """Record a job result."""
+        if result.ok:
+            self.succeeded += 1
+        else:
+            self.failed.append(result)
+        if result.flagged:
+            self.flagged.append(result)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the report as JSON-serializable data."""
+        return {
+            'output': str(self.output),
+            'total': self.total,
+            'succeeded': self.succeeded,
+            'skipped': self.skipped,
+            'failed': [{'id': result.job_id, 'error': result.error} for result in self.failed],
+            'flagged': [{'id': result.job_id, 'damage': result.damage}
+                        for result in self.flagged],
+            'recycled': self.recycled,
+            'cache': {'hits': self.cache_hits, 'misses': self.cache_misses,
+                      'hit_rate': self.cache_hit_rate},
+            'duration': self.duration,
+        }
+
+
+class BatchRunner:
+    """Generate many QR codes from a stream of jobs.
+
+    Generators come from the shared GeneratorFactory for the configuration,
+    so they are created once per type and reused. Failing jobs are recorded
+    and do not stop the batch.
+
+    Jobs can run concurrently with generate_many(). Generators are safe to
+    share between threads, and writes to the .qrm container, archive and
+    manifest are serialized. Runners pickle as their options, so each worker
+    process rebuilds its own.
+    """
+
+    def __init__(
+        self,
+        config: Optional[Config] = None,
+        output_dir: Optional[Path] = None,
+        *,
+        encode_only: bool = False,
+        qrm_path: Optional[Path] = None,
+        default_logo: Optional[str] = None,
+        verify: Optional[str] = None,
+        max_damage: float = DEFAULT_MAX_DAMAGE,
+        layout: Optional[str] = None,
+        manifest_path: Optional[Path] = None,
+        archive: Optional[Union[str, Path, BinaryIO]] = None,
+        archive_format: Optional[str] = None,
+        sink: Optional[Union[str, OutputSink]] = None,
+        writers: int = 0,
+        fsync: str = 'none',
+        drop_cache: bool = False,
+        max_tasks_per_worker: Optional[int] = None,
+        max_worker_rss: Optional[int] = None,
+        schedule_window: int = 0,
+        ordered: bool = True
+    ):
+        """Initialize the batch runner.
+
+        Args:
+            config: Configuration object
+            output_dir: Directory for rendered images (default: config output dir)
+            encode_only: Write matrices to a single .qrm file instead of images
+            qrm_path: Container path for encode-only runs
+            default_logo: Logo for jobs that don't specify one
+            verify: Read every rendered image back and 'flag' or 'fail' jobs
+                whose damage exceeds max_damage (default: no verification)
+            max_damage: Share of the worst RS block's correction capacity
+                that damage (e.g. from a logo) may use
+            layout: 'flat' or 'sharded' output directory (default: config)
+            manifest_path: SQLite manifest recording every generated code
+                (default: manifest.sqlite in the output directory for
+                sharded layouts, none for flat ones)
+            archive: Stream images into one ZIP/TAR archive instead of
+                writing files: a path, '-' for stdout, or a binary file object.
+                Entry names follow the output layout.
+            archive_format: 'zip', 'tar' or 'tgz' (default: from the suffix)
+            sink: Output sink or sink location (see output.sinks.open_sink)
+                for the images. A directory sink sets the output directory;
+                other sinks receive each image under its name in the output
+                layout, without writing local files.
+            writers: Hand encoded images to this many background writer
+                threads (see output.writer), so encoding overlaps with slow
+                storage; 0 writes each image in the job's own thread. Large
+                streamed codes are always written directly.
+            fsync: 'none', 'file' or 'batch' sync of written files (uses
+                at least one writer thread)
+            drop_cache: Drop written files from the page cache (uses at
+                least one writer thread)
+            max_tasks_per_worker: Recycle worker processes after this many
+                jobs (see batch.recycle; default: never)
+            max_worker_rss: Resident size in bytes above which a process
+                clears its caches; worker processes still above it are
+                recycled (default: no limit)
+            schedule_window: Sort each window of this many jobs by
+                schedule_key() before running them, so jobs sharing cached
+                state run together (see batch.schedule; default: input order)
+            ordered: Yield results in input order when jobs are reordered
+                (otherwise in the order they ran)
+
+        Raises:
+            ValueError: If the layout is unknown or options conflict
+        """
+        if archive is not None and encode_only:
+            raise ValueError("An archive can't be combined with encode-only output")
+        if archive is not None and manifest_path is not None:
+            raise ValueError("Archives carry their own index; a manifest can't be combined")
+        if sink is not None and (encode_only or archive is not None):
+            raise ValueError("A sink can't be combined with encode-only or archive output")
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy: {fsync} (expected one of {FSYNC_POLICIES})")
+        if schedule_window < 0:
+            raise ValueError("schedule_window can't be negative")
+        if max_tasks_per_worker is not None and max_tasks_per_worker < 1:
+            raise ValueError("max_tasks_per_worker must be at least 1")
+        if fsync != 'none' or drop_cache:
+            writers = max(writers, 1)
+        if writers and (encode_only or archive is not None):
+            raise ValueError("Writer threads write image files; they can't be combined with "
+                             "encode-only or archive output")
+        self.sink = open_sink(sink) if sink is not None else None
+        if self.sink is not None and not self.sink.is_local and manifest_path is not None:
+            raise ValueError("Manifests record local files; they can't be combined with a "
+                             "remote sink")
+        if isinstance(self.sink, LocalSink):
+            output_dir = self.sink.root
+
+        self.config = config or Config()
+        self._options = {
+            'output_dir': output_dir, 'encode_only': encode_only, 'qrm_path': qrm_path,
+            'default_logo': default_logo, 'verify': verify, 'max_damage': max_damage,
+            'layout': layout, 'manifest_path': manifest_path, 'archive_format': archive_format,
+            'archive': archive if isinstance(archive, (str, Path)) else None, 'sink': sink,
+            'writers': writers, 'fsync': fsync, 'drop_cache': drop_cache,
+            'max_tasks_per_worker': max_tasks_per_worker, 'max_worker_rss': max_worker_rss,
+            'schedule_window': schedule_window, 'ordered': ordered,
+        }
+        self.logger = setup_logger('batch', log_dir=self.config.logs_dir)
+        self.output_dir = Path(output_dir) if output_dir else self.config.output_dir
+        self.encode_only = encode_only
+        self.qrm_path = Path(qrm_path) if qrm_path else self.config.get_output_path(
+            f"batch_{time.strftime('%Y%m%d_%H%M%S')}.qrm"
+        )
+        self.default_logo = default_logo
+        self.verify = verify
+        self.max_damage = max_damage
+        self.layout = OutputLayout(self.output_dir, layout or self.config.get_output_layout())
+        if self.sink is None:
+            self.sink = LocalSink(self.output_dir)
+        if (manifest_path is None and self.layout.sharded and archive is None
+                and self.sink.is_local):
+            manifest_path = self.output_dir / MANIFEST_NAME
+        self.manifest_path = Path(manifest_path) if manifest_path else None
+        self.archive = archive
+        self.archive_format = archive_format
+        self._manifest: Optional[Manifest] = None
+        self._archive: Optional[ArchiveWriter] = None
+        self.writers = writers
+        self.fsync = fsync
+        self.drop_cache = drop_cache
+        self._writer: Optional[BackgroundWriter] = None
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self.max_worker_rss = max_worker_rss
+        self._watch = MemoryWatch(max_rss=max_worker_rss)
+        self.recycled = 0
+        self.schedule_window = schedule_window
+        self.ordered = ordered
+        self._worker_hits = 0
+        self._worker_misses = 0
+        self._sink_lock = threading.Lock()
+        self.generators = GeneratorFactory.shared(self.config)
+
+    def __getstate__(self) -> tuple:
+        return self.config.config_dir, self._options
+
+    def __setstate__(self, state: tuple):
+        config_dir, options = state
+        BatchRunner.__init__(self, Config(config_dir), **options)
+
+    def run(
+        self,
+        jobs: Iterable[BatchJob],
+        *,
+        executor: Optional[str] = None,
+        workers: Optional[int] = None,
+        checkpoint: Optional[Checkpoint] = None
+    ) -> BatchReport:
+        """Run all jobs and return a summary.
+
+        Args:
+            jobs: Jobs to run
+            executor: 'thread' or 'process' to run jobs concurrently
+                (default: one at a time in this thread)
+            workers: Number of concurrent workers (default: CPU count)
+            checkpoint: Record finished jobs here and skip those an earlier
+                run already finished
+
+        Returns:
+            BatchReport
+
+        Raises:
+            ValueError: If a checkpoint is combined with encode-only,
+                archive or remote sink output
+        """
+        if checkpoint is not None:
+            if self.encode_only or self.archive is not None or not self.sink.is_local:
+                raise ValueError("Checkpoints need image files; they can't be combined with "
+                                 "encode-only, archive or remote sink output")
+            jobs = checkpoint.pending(jobs, self)
+
+        report = BatchReport(self.output)
+        started = time.perf_counter()
+        usage = self.usage()
+        results = (self.generate_many(jobs, executor, workers) if executor
+                   else self.iter_results(jobs))
+        for result in results:
+            report.add(result)
+            if checkpoint is not None:
+                checkpoint.record(result)
+        report.duration = time.perf_counter() - started
+        report.add_usage(usage, self.usage())
+        if checkpoint is not None:
+            checkpoint.flush()
+            report.skipped = checkpoint.skipped
+
+        self.logger.info(
+            "Batch finished: %d succeeded, %d failed in %.2fs",
+            report.succeeded, len(report.failed), report.duration
+        )
+        if report.recycled:
+            self.logger.info("Worker processes recycled %d times", report.recycled)
+        return report
+
+    @property
+    def output(self) -> Union[Path, str]:
+        """Where the batch is written: directory, container, archive ('-' for stdout) or sink."""
+        if self.encode_only:
+            return self.qrm_path
+        if self.archive is not None:
+            return Path(self.archive) if isinstance(self.archive, (str, Path)) else Path(STDOUT)
+        if not self.sink.is_local:
+            return self.sink.location('')
+        return self.output_dir
+
+    def iter_results(self, jobs: Iterable[BatchJob]) -> Iterator[BatchResult]:
+        """Run jobs lazily, yielding one result per job in input order.
+
+        With a schedule window, jobs run reordered; their results are put
+        back into input order unless the runner isn't ordered.
+
+        Args:
+            jobs: Jobs to run
+
+        Yields:
+            BatchResult objects
+        """
+        with ExitStack() as stack:
+            writer = self._open_sinks(stack)
+            yield from self._scheduled(
+                jobs, lambda jobs: self._settled(self._run_job(job, writer) for job in jobs)
+            )
+
+    def generate_many(
+        self,
+        jobs: Iterable[BatchJob],
+        executor: str = 'thread',
+        workers: Optional[int] = None
+    ) -> Iterator[BatchResult]:
+        """Run jobs concurrently, yielding one result per job in input order.
+
+        Jobs are read lazily and at most two per worker are in flight.
+        Threads are cheap to start and share the generators; Pillow releases
+        the GIL while compressing and resizing, so they overlap well when
+        images are large or writes are slow. Processes sidestep the GIL for
+        encode-bound batches of small codes; each worker rebuilds the runner
+        and writes its images (and manifest entries) itself. A worker is
+        replaced on its own once it reaches max_tasks_per_worker or
+        max_worker_rss.
+        Jobs are reordered as in iter_results().
+
+        Args:
+            jobs: Jobs to run
+            executor: 'thread' or 'process'
+            workers: Number of workers (default: CPU count)
+
+        Yields:
+            BatchResult objects
+
+        Raises:
+            ValueError: If the executor is unknown, or 'process' is combined
+                with encode-only output, an archive or writer threads
+        """
+        if executor not in EXECUTORS:
+            raise ValueError(f"Unknown executor: {executor} (expected one of {EXECUTORS})")
+        if executor == 'process' and (self.encode_only or self.archive is not None
+                                      or self.writers):
+            raise ValueError("Encode-only and archive output and writer threads need "
+                             "executor='thread'")
+        workers = max(workers or os.cpu_count() or 1, 1)
+
+        with ExitStack() as stack:
+            if executor == 'thread':
+                writer = self._open_sinks(stack)
+                pool = stack.enter_context(ThreadPoolExecutor(max_workers=workers))
+
+                def submit(job: BatchJob) -> Future:
+                    return pool.submit(self._run_job, job, writer)
+
+                collect = Future.result
+            else:
+                pool = stack.enter_context(RecyclingPool(workers, _init_worker, (self,),
+                                                         max_tasks=self.max_tasks_per_worker))
+
+                def submit(job: BatchJob) -> Future:
+                    return pool.submit(_run_in_worker, job)
+
+                collect = self._collect
+
+            def in_order(jobs: Iterable[BatchJob]) -> Iterator[BatchResult]:
+                pending: deque = deque()
+                for job in jobs:
+                    pending.append(submit(job))
+                    if len(pending) >= 2 * workers:
+                        yield collect(pending.popleft())
+                while pending:
+                    yield collect(pending.popleft())
+
+            yield from self._scheduled(jobs, lambda jobs: self._settled(in_order(jobs)))
+            if executor == 'process':
+                self.recycled += pool.recycled
+
+    def schedule_key(self, job: BatchJob) -> Tuple[str, str, str, int]:
+        """Return the key a schedule window sorts jobs by.
+
+        Jobs with equal keys share a generator, settings, logo and
+        (estimated) version, and with them most cached state.
+        """
+        logo = str(job.logo or self.default_logo or '')
+        try:
+            settings = self.get_generator(job.qr_type).get_settings(job.settings)
+            size = len(self.prepare_payload(job).encode('utf-8'))
+        except Exception:  # pylint: disable=broad-exception-caught
+            return job.qr_type, '', logo, 0  # Fails when it runs
+        return (job.qr_type, json.dumps(settings, sort_keys=True, default=str), logo,
+                estimate_version(size, settings))
+
+    def usage(self) -> Tuple[int, int, int]:
+        """Return worker recycles, cache hits and cache misses so far.
+
+        Cache counts cover this process and the jobs of its worker processes.
+        """
+        hits, misses = cache_stats()
+        return self.recycled, hits + self._worker_hits, misses + self._worker_misses
+
+    def _scheduled(
+        self,
+        jobs: Iterable[BatchJob],
+        run: Callable[[Iterable[BatchJob]], Iterator[BatchResult]]
+    ) -> Iterator[BatchResult]:
+        """Run jobs through run(), reordered within the schedule window if there is one."""
+        if self.schedule_window < 2:
+            return run(jobs)
+        return run_scheduled(jobs, run, self.schedule_key, self.schedule_window,
+                             ordered=self.ordered)
+
+    def _collect(self, future: Future) -> BatchResult:
+        """Unpack a worker process's result and count its cache use."""
+        result, hits, misses = future.result()
+        self._worker_hits += hits
+        self._worker_misses += misses
+        return result
+
+    def _open_sinks(self, stack: ExitStack) -> Optional[QRMWriter]:
+        """Open the container, archive, manifest and writer threads; they close with the stack.
+
+        The writer threads close first, so queued images are written (and
+        recorded in the manifest) before anything else is closed.
+        """
+        stack.callback(self._clear_sinks)
+        writer = stack.enter_context(QRMWriter(self.qrm_path)) if self.encode_only else None
+        if self.archive is not None:
+            self._archive = stack.enter_context(open_archive(self.archive, self.archive_format))
+        if self.manifest_path:
+            self._manifest = stack.enter_context(Manifest(self.manifest_path))
+        stack.callback(self.sink.flush)
+        if self.writers:
+            self._writer = stack.enter_context(BackgroundWriter(
+                self.sink, self.writers, fsync=self.fsync, drop_cache=self.drop_cache
+            ))
+        return writer
+
+    def _clear_sinks(self):
+        self._archive = None
+        self._manifest = None
+        self._writer = None
+
+    def _settled(self, results: Iterable[BatchResult]) -> Iterator[BatchResult]:
+        """Yield results in order once their queued writes have finished.
+
+        Results are held back only while their write is queued; the
+        writer's bounded queue limits how many that can be.
+        """
+        waiting: deque = deque()
+        for result in results:
+            self.check_memory()
+            waiting.append(result)
+            while waiting and (waiting[0].write is None or waiting[0].write.done()):
+                yield self._settle(waiting.popleft())
+        while waiting:
+            yield self._settle(waiting.popleft())
+
+    def check_memory(self):
+        """Clear the caches if this process has outgrown max_worker_rss.
+
+        Called after every job; not safe to call from several threads at once.
+        """
+        self._watch.check()
+
+    def _settle(self, result: BatchResult) -> BatchResult:
+        """Wait for a result's queued write and record its outcome."""
+        if result.write is not None:
+            try:
+                result.write.result()
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                self.logger.error("Job %s failed: %s", result.job_id, e)
+                result.error = str(e)
+            result.write = None
+        return result
+
+    def get_generator(self, qr_type: str) -> BaseQRGenerator:
+        """Return the shared generator for a QR type.
+
+        Raises:
+            ValueError: If the type is unknown
+        """
+        return self.generators.get(qr_type)
+
+    def prepare_payload(self, job: BatchJob) -> str:
+        """Return the encoded text a job produces.
+
+        The text is kept on the job, so scheduling and running it prepare
+        it once.
+
+        Raises:
+            ValueError: If the row couldn't be read, the type is unknown or
+                the fields are invalid
+        """
+        if job.error is not None:
+            raise ValueError(job.error)
+        if job.payload is None:
+            job.payload = self.get_generator(job.qr_type).prepare_data(**job.fields)
+        return job.payload
+
+    def expected_payloads(self, jobs: Iterable[BatchJob]) -> Dict[Path, str]:
+        """Map each job's image path (resolved) to the payload it should decode to.
+
+        Jobs that can't be prepared are skipped; they produce no image.
+        """
+        expected = {}
+        for job in jobs:
+            try:
+                expected[self.get_output_path(job).resolve()] = self.prepare_payload(job)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                self.logger.warning("Job %s skipped: %s", job.job_id, e)
+        return expected
+
+    def get_output_path(self, job: BatchJob) -> Path:
+        """Return the image path for a job.
+
+        Images are named after the job ID. IDs that had to be sanitized get a
+        short hash suffix so distinct IDs never share a file; in sharded
+        layouts the shard is taken from the hash of the job ID.
+        """
+        if job.output:
+            return Path(job.output)
+        key = content_key(job.job_id)
+        name = safe_filename(job.job_id)
+        if name != job.job_id:
+            name = f"{name}_{key[:8]}"
+        return self.layout.path_for(f"{name}.png", key)
+
+    def _run_job(self, job: BatchJob, writer: Optional[QRMWriter] = None) -> BatchResult:
+        started = time.perf_counter()
+        result = BatchResult(job.job_id)
+        try:
+            if job.error is not None:
+                raise ValueError(job.error)
+            generator = self.get_generator(job.qr_type)
+            data = self.prepare_payload(job)
+            settings = generator.get_settings(job.settings)
+            # The handle plans the EC level around the logo if error_correction is 'auto'
+            handle = QRHandle(data, settings, job.logo or self.default_logo)
+            matrix = handle.matrix
+
+            if writer is not None:
+                with self._sink_lock:
+                    writer.add(matrix, data, job.job_id)
+                result.path = writer.path
+            else:
+                result.path = self.get_output_path(job)
+                if handle.logo_plan is not None and not self.verify:
+                    result.damage = self._check_logo(job, handle.logo_plan)
+                self._write_image(job, generator, handle, result)
+
+            if self._manifest is not None:
+                def record(path=result.path):
+                    self._manifest.add(job.job_id, data, path, qr_type=job.qr_type,
+                                       settings=settings, duration=time.perf_counter() - started)
+
+                if result.write is None:
+                    record()
+                else:
+                    # Recorded once the file exists
+                    result.write.add_done_callback(
+                        lambda write: record() if write.exception() is None else None
+                    )
+
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            # Bad field values raise all kinds of errors in prepare_data()
+            self.logger.error("Job %s failed: %s", job.job_id, e)
+            result.error = str(e)
+
+        result.duration = time.perf_counter() - started
+        return result
+
+    def _write_image(self, job: BatchJob, generator: BaseQRGenerator, handle: QRHandle,
+                     result: BatchResult):
+        """Render (and verify) a job's image and write it to its file, archive or sink."""
+        if self._writer is not None and not self.verify and not handle.streams(
+                image_format(result.path)):
+            # Writer threads store the file while this thread encodes the next one
+            local = self.sink.is_local
+            name = str(result.path.absolute()) if local else self._entry_name(result.path)
+            result.write = self._writer.submit(name, handle.encode(image_format(result.path)))
+            if not local:
+                result.path = Path(name)
+        elif not self.sink.is_local:
+            if self.verify:
+                result.damage, result.flagged = self._verify(job, handle.image, handle.matrix,
+                                                             handle.settings)
+            result.path = self._put(handle, result.path)
+        elif (self._archive is None and not self.verify
+                and handle.streams(image_format(result.path))):
+            with_parent(result.path, handle.save)  # Never held in memory
+        else:
+            qr_image = handle.image
+            if self.verify:
+                result.damage, result.flagged = self._verify(job, qr_image, handle.matrix,
+                                                             handle.settings)
+            if self._archive is not None:
+                result.path = self._add_to_archive(job, handle.data, qr_image, result.path)
+            else:
+                with_parent(result.path, partial(generator.save_image, qr_image))
+
+    def _entry_name(self, path: Path) -> str:
+        """Return the archive entry or sink name of an image path."""
+        try:
+            return path.relative_to(self.output_dir).as_posix()
+        except ValueError:
+            return path.name
+
+    def _put(self, handle: QRHandle, path: Path) -> Path:
+        """Write an image into the remote sink (streamed if it is large); return its name."""
+        name = self._entry_name(path)
+        with self.sink.open(name) as stream:
+            handle.write_to(stream, image_format(path))
+        return Path(name)
+
+    def _add_to_archive(self, job: BatchJob, data: str, qr_image, path: Path) -> Path:
+        """Stream an image into the archive; return its entry name."""
+        name = self._entry_name(path)
+        encoded = encode_image(qr_image, image_format(path))
+        with self._sink_lock:
+            self._archive.add(name, encoded, job_id=job.job_id, qr_type=job.qr_type,
+                              payload_hash=payload_hash(data).hex())
+        return Path(name)
+
+    def _check_logo(self, job: BatchJob, plan: LogoPlan) -> float:
+        """Warn about a logo over its damage budget; return the planned damage."""
+        if not plan.passed:
+            self.logger.warning("Job %s: logo covers %d modules and uses %.0f%% of the "
+                                "correction capacity at EC level %s", job.job_id,
+                                plan.covered, plan.damage * 100, plan.error_correction)
+        return plan.damage
+
+    def _verify(self, job, qr_image, matrix, settings) -> Tuple[float, bool]:
+        """Read a rendered image back; reject it or return (damage, flagged)."""
+        readback = verify_image(qr_image, matrix, settings, self.max_damage)
+        if readback.passed:
+            return readback.damage, False
+
+        message = (f"damage uses {readback.damage:.0%} of the correction capacity "
+                   f"({readback.damaged_codewords} codewords, "
+                   f"{readback.finder_errors} finder modules)")
+        if self.verify == 'fail':
+            raise ReadbackError(f"Readback failed: {message}", readback)
+        self.logger.warning("Job %s flagged: %s", job.job_id, message)
+        return readback.damage, True
+
+
+def _init_worker(runner: BatchRunner):
+    """Process-pool initializer: keep the unpickled runner for this worker."""
+    if runner.manifest_path:
+        # Commit every record: workers are stopped without a chance to flush
+        runner._manifest = Manifest(runner.manifest_path, batch_size=1)  # pylint: disable=protected-access
+    if isinstance(runner.sink, SQLiteSink):
+        runner.sink.batch_size = 1
+    _worker['runner'] = runner
+    # Task limits are enforced by the pool where the executor supports them
+    max_tasks = None if NATIVE_TASK_LIMIT else runner.max_tasks_per_worker
+    _worker['watch'] = MemoryWatch(max_tasks, runner.max_worker_rss)
+
+
+def _run_in_worker(job: BatchJob) -> Tuple[Tuple[BatchResult, int, int], bool]:
+    """Run a job; return its result and cache hits and misses, and whether to recycle."""
+    hits, misses = cache_stats()
+    result = _worker['runner']._run_job(job)  # pylint: disable=protected-access
+    after = cache_stats()
+    return (result, after[0] - hits, after[1] - misses), _worker['watch'].check()
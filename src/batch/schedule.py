@@ -0,0 +1,130 @@
+"""Settings-aware job scheduling.
+
+Mixed batches interleave job types, logos, error correction levels and box
+sizes, so a job rarely reuses what the one before it cached: loaded logos,
+module sprites, per-version layout tables. With a scheduling window the
+runner sorts each window of jobs by a key of those settings before running
+them, so similar jobs run back to back, and puts the results back into
+input order afterwards. The window bounds both the reordering and the
+results held back.
+
+Version estimates come from a capacity table built once at import rather
+than from the cached layout tables, so scheduling doesn't add lookups to
+the cache hit rates a batch reports.
+"""
+
+from __future__ import annotations
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple, TypeVar
+
+from qrcode import base as qr_base
+
+from ..core.render import ERROR_CORRECTION_MAP, is_auto_error_correction
+from .jobs import BatchJob
+
+# Byte mode header (mode indicator and character count) and terminator
+BYTE_MODE_OVERHEAD = 3
+MAX_VERSION = 40
+
+Result = TypeVar('Result')
+
+# Data codewords per EC level and version (index 0 is version 1)
+DATA_CAPACITY: Dict[str, List[int]] = {
+    level: [sum(block.data_count for block in qr_base.rs_blocks(version, ec))
+            for version in range(1, MAX_VERSION + 1)]
+    for level, ec in ERROR_CORRECTION_MAP.items()
+}
+
+
+def estimate_version(size: int, settings: Dict[str, Any]) -> int:
+    """Estimate the version a payload encodes at.
+
+    Assumes byte mode, which is exact for most payloads and an upper bound
+    for the others.
+
+    Args:
+        size: Payload size in bytes (UTF-8)
+        settings: Effective QR settings (version, error_correction)
+
+    Returns:
+        Smallest version that fits, or MAX_VERSION + 1 if none does
+    """
+    level = str(settings.get('error_correction', 'H')).upper()
+    if is_auto_error_correction(settings):
+        level = 'M'  # As encode_matrix() does
+    elif level not in ERROR_CORRECTION_MAP:
+        level = 'H'
+    capacities = DATA_CAPACITY[level]
+    for version in range(max(int(settings.get('version') or 1), 1), MAX_VERSION + 1):
+        if capacities[version - 1] >= size + BYTE_MODE_OVERHEAD:
+            return version
+    return MAX_VERSION + 1
+
+
+def reorder(
+    jobs: Iterable[BatchJob],
+    key: Callable[[BatchJob], Tuple],
+    window: int
+) -> Iterator[Tuple[int, BatchJob]]:
+    """Sort each window of jobs by key.
+
+    Args:
+        jobs: Jobs in input order (read lazily, one window at a time)
+        key: Sort key of a job; computed once per job
+        window: Number of jobs per window
+
+    Yields:
+        (input index, job) tuples; the sort is stable, so jobs with equal
+        keys keep their input order
+    """
+    pending: List[Tuple[Any, int, BatchJob]] = []
+    for index, job in enumerate(jobs):
+        pending.append((key(job), index, job))
+        if len(pending) >= window:
+            yield from _sorted(pending)
+            pending = []
+    yield from _sorted(pending)
+
+
+def _sorted(pending: List[Tuple[Any, int, BatchJob]]) -> Iterator[Tuple[int, BatchJob]]:
+    for _, index, job in sorted(pending, key=lambda item: item[:2]):
+        yield index, job
+
+
+def run_scheduled(
+    jobs: Iterable[BatchJob],
+    run: Callable[[Iterable[BatchJob]], Iterator[Result]],
+    key: Callable[[BatchJob], Tuple],
+    window: int,
+    *,
+    ordered: bool = True
+) -> Iterator[Result]:
+    """Run jobs reordered within windows.
+
+    Args:
+        jobs: Jobs in input order
+        run: Runs jobs, yielding one result per job in the order given
+        key: Sort key of a job
+        window: Number of jobs per window
+        ordered: Yield results in input order (otherwise in run order)
+
+    Yields:
+        One result per job
+    """
+    order: deque = deque()
+
+    def scheduled() -> Iterator[BatchJob]:
+        for index, job in reorder(jobs, key, window):
+            order.append(index)
+            yield job
+
+    if not ordered:
+        yield from run(scheduled())
+        return
+    held: Dict[int, Result] = {}
+    expected = 0
+    for result in run(scheduled()):
+        held[order.popleft()] = result
+        while expected in held:
+            yield held.pop(expected)
+            expected += 1
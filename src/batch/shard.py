@@ -0,0 +1,118 @@
+"""Deterministic partitioning of batches across nodes.
+
+Every node reads the same job file with ``--shard i/n`` and keeps the jobs
+whose ID hashes to shard ``i``. The hash only depends on the job ID (the
+row number for jobs without one), so nodes need no coordination, and a
+rerun of one shard regenerates exactly the same jobs. Each node writes its
+own manifest and status report; merge_reports() and Manifest.merge()
+combine them afterwards.
+"""
+
+from __future__ import annotations
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Tuple, Union
+
+from .jobs import BatchJob
+
+# Counters of a batch report, summed over shards (older reports may lack some)
+REPORT_COUNTERS = ('total', 'succeeded', 'skipped', 'recycled')
+
+
+def parse_shard(spec: str) -> Tuple[int, int]:
+    """Parse a shard specification such as ``2/8``.
+
+    Args:
+        spec: ``i/n`` with 1 <= i <= n
+
+    Returns:
+        (index, count) tuple
+
+    Raises:
+        ValueError: If the specification is malformed or out of range
+    """
+    try:
+        index, count = (int(part) for part in spec.split('/'))
+    except ValueError as e:
+        raise ValueError(f"Invalid shard {spec!r} (expected i/n, e.g. 1/4)") from e
+    if not 1 <= index <= count:
+        raise ValueError(f"Invalid shard {spec!r}: i must be between 1 and n")
+    return index, count
+
+
+def shard_of(job_id: str, count: int) -> int:
+    """Return the 1-based shard a job ID belongs to.
+
+    Uses BLAKE2b rather than hash(), which is salted per process.
+    """
+    digest = hashlib.blake2b(job_id.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') % count + 1
+
+
+def shard_jobs(jobs: Iterable[BatchJob], index: int, count: int) -> Iterator[BatchJob]:
+    """Yield only the jobs of one shard.
+
+    Args:
+        jobs: All jobs of the batch
+        index: 1-based shard index
+        count: Number of shards
+
+    Yields:
+        BatchJob objects of shard ``index``
+    """
+    if count == 1:
+        yield from jobs
+        return
+    for job in jobs:
+        if shard_of(job.job_id, count) == index:
+            yield job
+
+
+def merge_reports(paths: Iterable[Union[str, Path]]) -> Dict[str, Any]:
+    """Combine the JSON status reports of several shards.
+
+    Counts and failures are summed; the duration is the slowest shard's,
+    since shards run side by side.
+
+    Args:
+        paths: Report files written by ``qr-utils batch --report``
+
+    Returns:
+        Merged report, with ``shards`` listing the shards found and
+        ``missing_shards`` those of the same split that had no report
+    """
+    merged: Dict[str, Any] = {
+        'shards': [], 'missing_shards': [], **dict.fromkeys(REPORT_COUNTERS, 0),
+        'failed': [], 'flagged': [],
+        'cache': {'hits': 0, 'misses': 0, 'hit_rate': None}, 'duration': 0.0,
+    }
+    counts = set()
+    found: List[Tuple[int, int]] = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            report = json.load(f)
+        if report.get('shard'):
+            index, count = parse_shard(report['shard'])
+            found.append((index, count))
+            counts.add(count)
+        for count in REPORT_COUNTERS:
+            merged[count] += report.get(count, 0)
+        merged['failed'].extend(report['failed'])
+        merged['flagged'].extend(report['flagged'])
+        for count in ('hits', 'misses'):
+            merged['cache'][count] += report.get('cache', {}).get(count, 0)
+        merged['duration'] = max(merged['duration'], report['duration'])
+
+    lookups = merged['cache']['hits'] + merged['cache']['misses']
+    if lookups:
+        merged['cache']['hit_rate'] = merged['cache']['hits'] / lookups
+    if len(counts) > 1:
+        raise ValueError(f"Reports come from different splits: {sorted(counts)} shards")
+    merged['shards'] = [f"{index}/{count}" for index, count in sorted(found)]
+    if counts:
+        count = counts.pop()
+        present = {index for index, _ in found}
+        merged['missing_shards'] = [f"{index}/{count}" for index in range(1, count + 1)
+                                    if index not in present]
+    return merged
@@ -0,0 +1,303 @@
+"""Spool-directory work queue.
+
+Producers drop job files (.csv or .jsonl, the same format as ``qr-utils
+batch --input``) into ``incoming/``. Any number of workers, on any number
+of hosts sharing the directory, claim files by renaming them into
+``processing/<worker-id>/``. A rename within one file system is atomic
+(NFS included), so exactly one worker wins each file and no lock or broker
+is needed. Finished files move to ``done/``; files with failed jobs move to
+``failed/`` next to a ``<name>.errors.jsonl`` report. A file whose name an
+earlier run already left in ``done/`` or ``failed/`` is kept as
+``<stem>.<UTC time>-<worker-id><suffix>``, so producers may reuse names
+without losing the record of earlier runs.
+
+Workers touch a heartbeat file while they run. Claims of a worker whose
+heartbeat is older than ``stale_after`` seconds are moved back to
+``incoming/`` by the next worker that notices, so a crashed host delays
+its files but does not lose them. Each file's images go to a subdirectory
+named after the file (``<stem>/<id>.png``), so files whose job IDs default
+to row numbers don't overwrite each other's images, and a file that is
+processed twice writes the same images again.
+Producers should write job files under a dot-name or elsewhere on the same
+file system and rename them into ``incoming/`` when complete.
+"""
+
+from __future__ import annotations
+import json
+import os
+import socket
+import threading
+import time
+from pathlib import Path
+from typing import Iterator, List, Optional, Union
+
+from .jobs import BatchJob, load_jobs, safe_filename
+from .runner import BatchReport, BatchResult, BatchRunner
+
+INCOMING = 'incoming'
+PROCESSING = 'processing'
+DONE = 'done'
+FAILED = 'failed'
+HEARTBEAT = '.heartbeat'
+JOB_SUFFIXES = ('.csv', '.jsonl')
+DEFAULT_POLL_INTERVAL = 1.0
+DEFAULT_STALE_AFTER = 300.0
+
+
+def default_worker_id() -> str:
+    """Return a worker ID unique across hosts: ``<hostname>-<pid>``."""
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class SpoolWorker:
+    """Claim and process job files from a spool directory.
+
+    Heartbeats compare file modification times with this host's clock, so
+    clocks of the hosts sharing a spool must agree to well within
+    ``stale_after``.
+    """
+
+    def __init__(
+        self,
+        runner: BatchRunner,
+        spool_dir: Union[str, Path],
+        *,
+        worker_id: Optional[str] = None,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        stale_after: float = DEFAULT_STALE_AFTER,
+        executor: Optional[str] = None,
+        workers: Optional[int] = None
+    ):
+        """Initialize the worker and create the spool directories.
+
+        Args:
+            runner: Batch runner that generates each file's jobs
+            spool_dir: Spool directory shared by producers and workers
+            worker_id: Name of this worker's claim directory
+                (default: hostname and process ID)
+            poll_interval: Seconds to wait when incoming/ is empty
+            stale_after: Seconds without a heartbeat after which another
+                worker's claims are returned to incoming/
+            executor: 'thread' or 'process' to run each file's jobs
+                concurrently (default: one at a time)
+            workers: Number of concurrent workers per file (default: CPU count)
+
+        Raises:
+            ValueError: If the worker ID isn't a plain name or stale_after
+                isn't positive
+        """
+        worker_id = worker_id or default_worker_id()
+        if not worker_id or worker_id.startswith('.') or os.sep in worker_id:
+            raise ValueError(f"Invalid worker ID: {worker_id!r}")
+        if stale_after <= 0:
+            raise ValueError("stale_after must be positive")
+
+        self.runner = runner
+        self.spool_dir = Path(spool_dir)
+        self.worker_id = worker_id
+        self.poll_interval = poll_interval
+        self.stale_after = stale_after
+        self.executor = executor
+        self.workers = workers
+        self.logger = runner.logger
+        self.incoming = self.spool_dir / INCOMING
+        self.processing = self.spool_dir / PROCESSING
+        self.claims = self.processing / worker_id
+        self.done = self.spool_dir / DONE
+        self.failed = self.spool_dir / FAILED
+        for directory in (self.incoming, self.claims, self.done, self.failed):
+            directory.mkdir(parents=True, exist_ok=True)
+        self._next_recovery = 0.0
+
+    def run(self, *, once: bool = False, stop: Optional[threading.Event] = None) -> BatchReport:
+        """Process job files until stopped.
+
+        Args:
+            once: Return as soon as incoming/ is empty instead of polling
+            stop: Event that ends the loop after the current file
+
+        Returns:
+            BatchReport over all jobs of all processed files
+        """
+        stop = stop or threading.Event()
+        report = BatchReport(self.runner.output)
+        started = time.perf_counter()
+        usage = self.runner.usage()
+        heartbeat_done = threading.Event()
+        heartbeat = threading.Thread(target=self._beat, args=(heartbeat_done,), daemon=True)
+        self._touch_heartbeat()
+        heartbeat.start()
+        try:
+            while not stop.is_set():
+                self.recover_stale()
+                claimed = self.claim()
+                if claimed is not None:
+                    self.process(claimed, report)
+                elif once:
+                    break
+                else:
+                    stop.wait(self.poll_interval)
+        finally:
+            heartbeat_done.set()
+            heartbeat.join()
+            self._release_claims()
+        report.duration = time.perf_counter() - started
+        report.add_usage(usage, self.runner.usage())
+        return report
+
+    def claim(self) -> Optional[Path]:
+        """Claim the first available job file.
+
+        Returns:
+            Path of the claimed file in this worker's claim directory, or
+            None if incoming/ is empty
+        """
+        for name in sorted(self._job_files(self.incoming)):
+            claimed = self.claims / name
+            try:
+                os.rename(self.incoming / name, claimed)
+            except FileNotFoundError:
+                continue  # Another worker was faster
+            return claimed
+        return None
+
+    def process(self, claimed: Path, report: Optional[BatchReport] = None) -> bool:
+        """Run a claimed file's jobs and move it to done/ or failed/.
+
+        Args:
+            claimed: Path returned by claim()
+            report: Report to add each job's result to
+
+        Returns:
+            True if every job succeeded
+        """
+        errors: List[dict] = []
+        try:
+            for result in self._results(claimed):
+                if report is not None:
+                    report.add(result)
+                if not result.ok:
+                    errors.append({'id': result.job_id, 'error': result.error})
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            # A file that can't be processed mustn't come back for every worker
+            errors.append({'id': None, 'error': str(e) or type(e).__name__})
+        except (KeyboardInterrupt, SystemExit):
+            # Interrupted: hand the file back for another worker
+            self._move(claimed, self.incoming)
+            raise
+
+        name = self._finished_name(claimed)
+        if errors:
+            with open(self.failed / f"{name}.errors.jsonl", 'w', encoding='utf-8') as f:
+                f.writelines(json.dumps(error) + '\n' for error in errors)
+            self.logger.warning("Spool file %s: %d job(s) failed", claimed.name, len(errors))
+        self._move(claimed, self.failed if errors else self.done, name)
+        return not errors
+
+    def recover_stale(self, force: bool = False) -> int:
+        """Return the claims of workers without a recent heartbeat to incoming/.
+
+        Runs at most once per heartbeat interval unless forced.
+
+        Args:
+            force: Check now regardless of the last check
+
+        Returns:
+            Number of files returned
+        """
+        now = time.time()
+        if not force and now < self._next_recovery:
+            return 0
+        self._next_recovery = now + self.stale_after / 3
+
+        recovered = 0
+        for claims in self.processing.iterdir():
+            if claims.name == self.worker_id or not claims.is_dir():
+                continue
+            try:
+                beat = (claims / HEARTBEAT).stat().st_mtime
+            except FileNotFoundError:
+                beat = claims.stat().st_mtime
+            if now - beat < self.stale_after:
+                continue
+            for name in self._job_files(claims):
+                if self._move(claims / name, self.incoming):
+                    recovered += 1
+                    self.logger.warning("Recovered %s from stale worker %s", name, claims.name)
+            self._remove_claim_dir(claims)
+        return recovered
+
+    def _results(self, claimed: Path) -> Iterator[BatchResult]:
+        jobs = (self._namespaced(job, claimed) for job in load_jobs(claimed))
+        if self.executor:
+            return self.runner.generate_many(jobs, self.executor, self.workers)
+        return self.runner.iter_results(jobs)
+
+    def _namespaced(self, job: BatchJob, claimed: Path) -> BatchJob:
+        """Place a job's image below a directory named after its spool file."""
+        if not job.output and job.error is None:
+            path = self.runner.get_output_path(job)
+            relative = path.relative_to(self.runner.output_dir)
+            job.output = str(self.runner.output_dir / safe_filename(claimed.stem) / relative)
+        return job
+
+    def _finished_name(self, claimed: Path) -> str:
+        """Return a name for a finished file that no earlier run left in done/ or failed/."""
+        name = claimed.name
+        stamp = time.strftime('%Y%m%dT%H%M%S', time.gmtime())
+        attempt = 1
+        while any(path.exists() for path in (self.done / name, self.failed / name,
+                                             self.failed / f"{name}.errors.jsonl")):
+            # The worker ID keeps other workers from picking the same name
+            counter = f"-{attempt}" if attempt > 1 else ''
+            name = f"{claimed.stem}.{stamp}-{self.worker_id}{counter}{claimed.suffix}"
+            attempt += 1
+        return name
+
+    def _move(self, path: Path, directory: Path, name: Optional[str] = None) -> bool:
+        """Move a file into a directory; False if it is gone (claim recovered)."""
+        try:
+            os.replace(path, directory / (name or path.name))
+        except FileNotFoundError:
+            self.logger.warning("Spool file %s was taken over by another worker", path.name)
+            return False
+        return True
+
+    def _beat(self, done: threading.Event):
+        while not done.wait(self.stale_after / 3):
+            self._touch_heartbeat()
+
+    def _touch_heartbeat(self):
+        path = self.claims / HEARTBEAT
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            # Recovered while paused: claim the directory again
+            self.claims.mkdir(parents=True, exist_ok=True)
+            path.touch()
+
+    def _release_claims(self):
+        """Hand unfinished claims back and remove the claim directory."""
+        for name in self._job_files(self.claims):
+            self._move(self.claims / name, self.incoming)
+        self._remove_claim_dir(self.claims)
+
+    @staticmethod
+    def _job_files(directory: Path) -> List[str]:
+        try:
+            names = os.listdir(directory)
+        except FileNotFoundError:
+            return []
+        return [name for name in names
+                if not name.startswith('.') and name.lower().endswith(JOB_SUFFIXES)]
+
+    @staticmethod
+    def _remove_claim_dir(claims: Path):
+        try:
+            (claims / HEARTBEAT).unlink()
+        except FileNotFoundError:
+            pass
+        try:
+            claims.rmdir()
+        except OSError:
+            pass  # Claimed again in the meantime
@@ -0,0 +1,217 @@
+"""Incremental regeneration of a job file that changes over time.
+
+The watcher keeps a fingerprint of every row: the content key of the
+payload prepare_data() produces, the effective settings and the logo. When
+the job file changes, only rows whose fingerprint changed (or whose image
+went missing) are rendered again, and the images of removed rows are
+deleted. Preparing a payload is cheap compared to rendering, so a
+re-export of an unchanged spreadsheet costs one pass over the rows and no
+images.
+
+Rows are tracked by job ID. A row without one gets its row number, which
+shifts when a row is inserted above it, so such rows are tracked by their
+fingerprint instead: an inserted row is one addition rather than a change
+of every row below it. Rows whose ID is their row number are treated the
+same way.
+
+Changes are detected by polling the file's size, modification time and
+inode, which is portable and costs one stat() per interval. There is no
+inotify (or other OS notification) path: it isn't in the standard
+library, misses changes on network shares, and a change still has to
+settle before it is read. A change is only acted on once the file has
+stayed the same for one interval, so a spreadsheet that is still being
+exported is not read half-written.
+Fingerprints are kept in a state file next to the images, so a restarted
+watcher picks up where it left off.
+"""
+
+from __future__ import annotations
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from ..output.manifest import Manifest
+from ..output.paths import content_key
+from .jobs import BatchJob, load_jobs
+from .runner import BatchResult, BatchRunner
+
+DEFAULT_POLL_INTERVAL = 2.0
+
+
+class SyncReport:
+    """Outcome of one pass over the job file."""
+
+    __slots__ = ('added', 'changed', 'removed', 'unchanged', 'failed')
+
+    def __init__(self):
+        self.added = 0
+        self.changed = 0
+        self.removed = 0
+        self.unchanged = 0
+        self.failed: List[BatchResult] = []
+
+    def __repr__(self) -> str:
+        return (f"SyncReport(added={self.added}, changed={self.changed}, "
+                f"removed={self.removed}, unchanged={self.unchanged}, "
+                f"failed={len(self.failed)})")
+
+
+class JobWatcher:
+    """Keep the images of a job file in sync with its rows."""
+
+    def __init__(
+        self,
+        runner: BatchRunner,
+        input_path: Union[str, Path],
+        *,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        state_path: Optional[Union[str, Path]] = None
+    ):
+        """Initialize the watcher.
+
+        Args:
+            runner: Batch runner that renders changed rows
+            input_path: Job file (.csv or JSON Lines)
+            poll_interval: Seconds between checks of the file
+            state_path: Fingerprint file (default: .<input name>.watch.json
+                in the output directory)
+
+        Raises:
+            ValueError: If the runner writes a .qrm container or an archive
+        """
+        if runner.encode_only or runner.archive is not None:
+            raise ValueError("Watching needs image files; encode-only and archive output "
+                             "can't be updated in place")
+        self.runner = runner
+        self.input_path = Path(input_path)
+        self.poll_interval = poll_interval
+        self.state_path = Path(state_path) if state_path else (
+            runner.output_dir / f".{self.input_path.stem}.watch.json"
+        )
+        self.logger = runner.logger
+        # job ID -> (fingerprint, image path)
+        self._rows: Dict[str, Tuple[str, str]] = self._load_state()
+
+    def watch(self, stop: Optional[threading.Event] = None, on_sync=None):
+        """Sync now and after every change of the job file, until stopped.
+
+        Args:
+            stop: Event that ends watching
+            on_sync: Called with each SyncReport
+        """
+        stop = stop or threading.Event()
+        synced = None
+        last = self._signature()
+        while True:
+            current = self._signature()
+            # Act once the file has settled: unchanged since the last check
+            if current is not None and current == last and current != synced:
+                synced = current
+                try:
+                    report = self.sync()
+                except Exception as e:  # pylint: disable=broad-exception-caught
+                    # Keep watching: the next export may fix the file
+                    self.logger.error("Can't sync %s: %s", self.input_path, e)
+                else:
+                    if on_sync is not None:
+                        on_sync(report)
+            last = current
+            if stop.wait(self.poll_interval):
+                break
+
+    def sync(self) -> SyncReport:
+        """Regenerate added and changed rows and delete removed ones.
+
+        Returns:
+            SyncReport
+        """
+        report = SyncReport()
+        pending: Dict[str, str] = {}
+        jobs: List[BatchJob] = []
+        seen = set()
+        for job in load_jobs(self.input_path):
+            fingerprint = self._fingerprint(job)
+            if job.job_id == str(job.row) and fingerprint:
+                # Row numbers shift when rows are inserted; key by content instead
+                job.job_id = fingerprint[:16]
+                if job.job_id in seen:
+                    report.unchanged += 1  # Duplicate row: same image
+                    continue
+            seen.add(job.job_id)
+            known = self._rows.get(job.job_id)
+            if known and known[0] == fingerprint and os.path.exists(known[1]):
+                report.unchanged += 1
+                continue
+            if known:
+                report.changed += 1
+            else:
+                report.added += 1
+            pending[job.job_id] = fingerprint
+            jobs.append(job)
+
+        removed = [job_id for job_id in self._rows if job_id not in seen]
+        for job_id in removed:
+            self._delete_output(self._rows.pop(job_id)[1])
+        report.removed = len(removed)
+        if removed and self.runner.manifest_path:
+            with Manifest(self.runner.manifest_path) as manifest:
+                manifest.remove(removed)
+
+        for result in self.runner.iter_results(jobs):
+            if not result.ok:
+                # Keep a changed row's old entry: its image is still on disk, and
+                # the stale fingerprint retries the row on the next sync
+                report.failed.append(result)
+                continue
+            old = self._rows.get(result.job_id)
+            if old and old[1] != str(result.path):
+                self._delete_output(old[1])  # The row now writes elsewhere
+            self._rows[result.job_id] = (pending[result.job_id], str(result.path))
+
+        if jobs or removed:
+            self._save_state()
+        self.logger.info("Synced %s: %s", self.input_path, report)
+        return report
+
+    def _fingerprint(self, job: BatchJob) -> str:
+        try:
+            payload = self.runner.prepare_payload(job)
+            settings = self.runner.get_generator(job.qr_type).get_settings(job.settings)
+        except Exception:  # pylint: disable=broad-exception-caught
+            return ''  # Never matches: the runner reports the error
+        return content_key(payload, settings, job.logo or self.runner.default_logo)
+
+    def _signature(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            stat = os.stat(self.input_path)
+        except FileNotFoundError:
+            return None  # Being replaced
+        return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+    @staticmethod
+    def _delete_output(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def _load_state(self) -> Dict[str, Tuple[str, str]]:
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except ValueError:
+            self.logger.warning("Ignoring unreadable watch state %s", self.state_path)
+            return {}
+        return {job_id: tuple(row) for job_id, row in state.get('rows', {}).items()}
+
+    def _save_state(self):
+        """Write the fingerprints atomically."""
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = self.state_path.with_name(self.state_path.name + '.tmp')
+        with open(temporary, 'w', encoding='utf-8') as f:
+            json.dump({'input': str(self.input_path.resolve()), 'rows': self._rows}, f)
+        os.replace(temporary, self.state_path)
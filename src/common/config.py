@@ -1,5 +1,6 @@
 """Configuration management for QR Code Utils."""
 
+import json
 from pathlib import Path
 from typing import Any, Dict, Optional
 import yaml
@@ -11,6 +12,7 @@ class Config:
     DEFAULT_CONFIG_FILE = "config.yml"
     DEFAULT_LOGS_DIR = "logs"
     DEFAULT_OUTPUT_DIR = "output"
+    DEFAULT_OUTPUT_LAYOUT = "flat"  # flat or sharded
 
     DEFAULT_QR_SETTINGS = {
         "version": 1,
@@ -61,6 +63,7 @@ class Config:
             "qr_settings": self.DEFAULT_QR_SETTINGS.copy(),
             "output_format": "png",
             "default_output_dir": str(self.output_dir),
+            "output_layout": self.DEFAULT_OUTPUT_LAYOUT,
             "vcard_defaults": {
                 "version": "3.0"
             }
@@ -113,10 +116,18 @@ class Config:
         if save:
             self._save_config()
 
+    def snapshot(self) -> str:
+        """Return the effective configuration, unsaved changes included, as a comparable string."""
+        return json.dumps(self._config, sort_keys=True, default=str)
+
     def get_qr_settings(self) -> Dict[str, Any]:
         """Get QR code settings."""
         return self.get('qr_settings', self.DEFAULT_QR_SETTINGS.copy())
 
+    def get_output_layout(self) -> str:
+        """Get the output directory layout ('flat' or 'sharded')."""
+        return self.get('output_layout', self.DEFAULT_OUTPUT_LAYOUT)
+
     def get_output_path(self, filename: str) -> Path:
         """Get full output path for a file.
 
@@ -2,11 +2,15 @@
 
 import logging
 import sys
+import threading
 from pathlib import Path
 from typing import Optional
 from logging.handlers import RotatingFileHandler
 from datetime import datetime
 
+# Serializes handler setup so concurrent callers can't add duplicate handlers
+_setup_lock = threading.Lock()
+
 
 def setup_logger(
     name: str,
@@ -25,7 +29,17 @@ def setup_logger(
     Returns:
         Configured logger instance
     """
-    logger = logging.getLogger(name)
+    with _setup_lock:
+        return _configure(logging.getLogger(name), log_dir, level, console)
+
+
+def _configure(
+    logger: logging.Logger,
+    log_dir: Optional[Path],
+    level: int,
+    console: bool
+) -> logging.Logger:
+    """Attach handlers to a logger that has none yet."""
     logger.setLevel(level)
 
     # Avoid adding handlers multiple times
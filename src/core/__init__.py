@@ -1,6 +1,9 @@
 """Core QR code generators."""
 
 from .base import BaseQRGenerator
+from .handle import QRHandle
+from .matrix import QRMatrix
+from .variants import OutputVariant
 from .url import URLQRGenerator
 from .vcard import VCardQRGenerator
 from .wifi import WiFiQRGenerator
@@ -12,9 +15,15 @@ from .location import LocationQRGenerator
 from .event import EventQRGenerator
 from .whatsapp import WhatsAppQRGenerator
 from .payment import PaymentQRGenerator
+from .factory import GENERATORS, GeneratorFactory
 
 __all__ = [
+    'GENERATORS',
     'BaseQRGenerator',
+    'GeneratorFactory',
+    'OutputVariant',
+    'QRHandle',
+    'QRMatrix',
     'URLQRGenerator',
     'VCardQRGenerator',
     'WiFiQRGenerator',
@@ -1,40 +1,55 @@
 """Base QR code generator."""
 
 from __future__ import annotations
-from datetime import datetime
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, BinaryIO, List, Mapping, Sequence, Tuple, Union
 from abc import ABC, abstractmethod
-import qrcode
-import qrcode.constants
 from PIL import Image
 
 from ..common.config import Config
 from ..common.logger import setup_logger
+from ..output.archive import STDOUT, ArchiveWriter, binary_stdout
+from ..output.paths import OutputLayout, content_key, ensure_parent
+from ..output.sinks import OutputSink
+# Module import: output.qrm imports core.matrix, so it may still be initializing
+from ..output import qrm
+from .matrix import QRMatrix
+from .handle import QRHandle
+from .render import (
+    ERROR_CORRECTION_MAP, encode_matrix, image_format, paste_logo, render_matrix
+)
+from .variants import OutputVariant, save_variants, variant_extension
 
 
 class BaseQRGenerator(ABC):
-    """Base class for all QR code generators."""
+    """Base class for all QR code generators.
 
-    ERROR_CORRECTION_MAP = {
-        'L': qrcode.constants.ERROR_CORRECT_L,
-        'M': qrcode.constants.ERROR_CORRECT_M,
-        'Q': qrcode.constants.ERROR_CORRECT_Q,
-        'H': qrcode.constants.ERROR_CORRECT_H,
-    }
+    Generators keep no per-call state: their config and settings are only
+    read after construction, so one instance may serve several threads at
+    once. Subclasses must keep it that way.
+    """
 
-    def __init__(self, config: Optional[Config] = None):
+    ERROR_CORRECTION_MAP = ERROR_CORRECTION_MAP
+
+    def __init__(
+        self,
+        config: Optional[Config] = None,
+        *,
+        settings: Optional[Mapping[str, Any]] = None
+    ):
         """Initialize the QR generator.
 
         Args:
             config: Configuration object
+            settings: QR settings to use instead of the config's (e.g. a
+                read-only mapping shared by a GeneratorFactory)
         """
         self.config = config or Config()
         self.logger = setup_logger(
             self.__class__.__name__,
             log_dir=self.config.logs_dir
         )
-        self.qr_settings = self.config.get_qr_settings()
+        self.qr_settings = settings if settings is not None else self.config.get_qr_settings()
 
     @abstractmethod
     def prepare_data(self, **kwargs) -> str:
@@ -48,6 +63,74 @@ class BaseQRGenerator(ABC):
         """
         raise NotImplementedError("Subclasses must implement prepare_data")
 
+    @classmethod
+    def prepare_many(cls, columns: Mapping[str, Sequence[Any]]) -> List[str]:
+        """Prepare the data of many rows at once.
+
+        Takes one column per prepare_data() argument (lists, tuples, NumPy
+        or Arrow arrays) and returns exactly the strings prepare_data()
+        would return row by row, without per-row keyword handling or
+        logging. Absent optional columns take prepare_data()'s defaults.
+
+        Args:
+            columns: Argument name -> values, one per row
+
+        Returns:
+            List of strings to encode, in row order
+
+        Raises:
+            ValueError: If a required column is missing or lengths differ
+        """
+        raise NotImplementedError(f"{cls.__name__} has no bulk builder")
+
+    def get_settings(self, custom_settings: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Merge custom settings over the configured QR settings.
+
+        Args:
+            custom_settings: Optional custom QR settings
+
+        Returns:
+            Effective settings dictionary
+        """
+        settings = dict(self.qr_settings)
+        if custom_settings:
+            settings.update(custom_settings)
+        return settings
+
+    def prepare(
+        self,
+        logo_path: Optional[str] = None,
+        custom_settings: Optional[Dict[str, Any]] = None,
+        **kwargs
+    ) -> QRHandle:
+        """Prepare a QR code without encoding or rendering it.
+
+        Args:
+            logo_path: Optional logo to embed when the image is rendered
+            custom_settings: Optional custom QR settings
+            **kwargs: Additional arguments for prepare_data
+
+        Returns:
+            QRHandle that computes the matrix, image and file bytes on demand
+        """
+        return QRHandle(self.prepare_data(**kwargs), self.get_settings(custom_settings), logo_path)
+
+    def create_matrix(
+        self,
+        data: str,
+        custom_settings: Optional[Dict[str, Any]] = None
+    ) -> QRMatrix:
+        """Encode data into a packed module matrix without rendering it.
+
+        Args:
+            data: Data to encode
+            custom_settings: Optional custom QR settings
+
+        Returns:
+            QRMatrix object
+        """
+        return encode_matrix(data, self.get_settings(custom_settings))
+
     def create_qr_code(
         self,
         data: str,
@@ -62,31 +145,24 @@ class BaseQRGenerator(ABC):
         Returns:
             PIL Image object
         """
-        settings = self.qr_settings.copy()
-        if custom_settings:
-            settings.update(custom_settings)
-
-        error_correction = self.ERROR_CORRECTION_MAP.get(
-            settings.get('error_correction', 'H'),
-            qrcode.constants.ERROR_CORRECT_H
-        )
+        settings = self.get_settings(custom_settings)
+        return render_matrix(encode_matrix(data, settings), settings)
 
-        qr = qrcode.QRCode(
-            version=settings.get('version', 1),
-            error_correction=error_correction,
-            box_size=settings.get('box_size', 10),
-            border=settings.get('border', 4),
-        )
-
-        qr.add_data(data)
-        qr.make(fit=True)
+    def render_matrix(
+        self,
+        matrix: QRMatrix,
+        custom_settings: Optional[Dict[str, Any]] = None
+    ) -> Image.Image:
+        """Render an encoded matrix with this generator's settings.
 
-        img = qr.make_image(
-            fill_color=settings.get('fill_color', 'black'),
-            back_color=settings.get('back_color', 'white')
-        )
+        Args:
+            matrix: Encoded QR matrix
+            custom_settings: Optional custom QR settings
 
-        return img
+        Returns:
+            PIL Image object
+        """
+        return render_matrix(matrix, self.get_settings(custom_settings))
 
     def add_logo(
         self,
@@ -104,80 +180,90 @@ class BaseQRGenerator(ABC):
         Returns:
             QR code image with logo
         """
-        logo = Image.open(logo_path)
-
-        # Calculate logo size if not provided
-        if not logo_size:
-            qr_width, qr_height = qr_image.size
-            logo_size = (qr_width // 4, qr_height // 4)
-
-        logo = logo.resize(logo_size, Image.Resampling.LANCZOS)
-
-        # Calculate position to paste logo at center
-        pos = (
-            (qr_image.size[0] - logo.size[0]) // 2,
-            (qr_image.size[1] - logo.size[1]) // 2
-        )
-
-        # Convert QR image to RGB if necessary
-        if qr_image.mode != 'RGB':
-            qr_image = qr_image.convert('RGB')
-
-        # Ensure logo has proper mode for pasting
-        if logo.mode == 'RGBA':
-            qr_image.paste(logo, pos, logo)
-        else:
-            if logo.mode != 'RGB':
-                logo = logo.convert('RGB')
-            qr_image.paste(logo, pos)
-
-        return qr_image
+        return paste_logo(qr_image, logo_path, logo_size)
 
     def generate(
         self,
         output_path: Optional[str] = None,
         logo_path: Optional[str] = None,
         custom_settings: Optional[Dict[str, Any]] = None,
+        output_format: Optional[str] = None,
+        *,
+        sink: Optional[OutputSink] = None,
         **kwargs
     ) -> Path:
         """Generate QR code and save to file.
 
         Args:
-            output_path: Output file path
+            output_path: Output file path (a name within the sink if one is given)
             logo_path: Optional logo to embed in QR code
             custom_settings: Optional custom QR settings
+            output_format: 'qrm' to write the encoded matrix only; any other
+                value (or None) renders an image whose format follows the
+                file extension. Defaults to 'qrm' for '.qrm' paths.
+            sink: Store the file in this output sink instead of the
+                configured output directory (see output.sinks)
             **kwargs: Additional arguments for prepare_data
 
         Returns:
-            Path to saved QR code
+            Path to saved QR code ('-' if written to stdout; the output name
+            for sinks without local files)
+
+        Raises:
+            ValueError: If .qrm output is requested for a sink without local files
         """
+        if output_path == STDOUT:
+            self.generate_to(binary_stdout(), logo_path=logo_path,
+                             custom_settings=custom_settings, **kwargs)
+            return Path(STDOUT)
+
         try:
             # Prepare data
-            data = self.prepare_data(**kwargs)
-            self.logger.info("Generated data for QR code: %s...", data[:50])
+            handle = self.prepare(logo_path, custom_settings, **kwargs)
+            self.logger.info("Generated data for QR code: %s...", handle.data[:50])
 
-            # Create QR code
-            qr_image = self.create_qr_code(data, custom_settings)
+            if not output_format and output_path and Path(output_path).suffix.lower() == '.qrm':
+                output_format = 'qrm'
+            extension = 'qrm' if output_format == 'qrm' else 'png'
 
-            # Add logo if provided
-            if logo_path:
-                self.logger.info("Adding logo from %s", logo_path)
-                qr_image = self.add_logo(qr_image, logo_path)
-
-            # Determine output path
-            output_path_obj: Path
-            if not output_path:
-                output_path_obj = self.config.get_output_path(
-                    f"qr_{self._get_type_name()}_{self._get_timestamp()}.png"
-                )
-            else:
-                output_path_obj = Path(output_path)
+            # Determine output name and path
+            name, output_path_obj = self._output_location(handle, output_path, extension,
+                                                          sink=sink)
+            if output_path_obj is None and output_format == 'qrm':
+                raise ValueError(".qrm output needs a local file; use a directory sink")
 
             # Ensure parent directory exists
-            output_path_obj.parent.mkdir(parents=True, exist_ok=True)
+            if output_path_obj is not None:
+                ensure_parent(output_path_obj, cached=False)
+
+            if output_format == 'qrm':
+                # Encode only; rendering happens wherever the file is read
+                with qrm.QRMWriter(output_path_obj) as writer:
+                    writer.add(handle.matrix, handle.data)
+                self.logger.info("QR matrix saved to %s", output_path_obj)
+                return output_path_obj
 
-            # Save image
-            qr_image.save(str(output_path_obj))
+            # Create QR code (the handle adds the logo if provided)
+            if logo_path:
+                plan = handle.logo_plan
+                self.logger.info("Adding logo from %s: covers %d modules, uses %.0f%% of "
+                                 "EC level %s's correction capacity", logo_path,
+                                 plan.covered, plan.damage * 100, plan.error_correction)
+                if not plan.passed:
+                    self.logger.warning("Logo exceeds the damage budget; the code may not scan")
+
+            if output_path_obj is None:
+                # Remote sink: the file goes straight from the renderer into storage
+                with sink.open(name.as_posix()) as stream:
+                    handle.write_to(stream, image_format(name))
+                self.logger.info("QR code saved to %s", sink.location(name.as_posix()))
+                return name
+
+            # Save image (large PNG/TIFF codes are streamed band by band)
+            if handle.streams(image_format(output_path_obj)):
+                handle.save(output_path_obj)
+            else:
+                self.save_image(handle.image, output_path_obj)
             self.logger.info("QR code saved to %s", output_path_obj)
 
             return output_path_obj
@@ -186,9 +272,151 @@ class BaseQRGenerator(ABC):
             self.logger.error("Error generating QR code: %s", e, exc_info=True)
             raise
 
-    def _get_timestamp(self) -> str:
-        """Get current timestamp string."""
-        return datetime.now().strftime("%Y%m%d_%H%M%S")
+    def _output_location(
+        self,
+        handle: QRHandle,
+        output_path: Optional[str],
+        extension: str,
+        *,
+        sink: Optional[OutputSink] = None
+    ) -> Tuple[Path, Optional[Path]]:
+        """Return the output name of a code and its local path (None in remote sinks).
+
+        Without an output path, the name is a content hash in the configured
+        layout; content-hash names never collide and equal codes map to the
+        same file.
+        """
+        if output_path:
+            name = Path(output_path)
+        else:
+            key = content_key(handle.data, handle.settings, handle.logo_path)
+            layout = OutputLayout(Path(), self.config.get_output_layout())
+            name = layout.path_for(f"qr_{self._get_type_name()}_{key[:16]}.{extension}", key)
+        if sink is not None:
+            return name, sink.local_path(name.as_posix())
+        return name, name if output_path else self.config.output_dir / name
+
+    def generate_variants(
+        self,
+        variants: Sequence[Union[OutputVariant, str]],
+        output_path: Optional[str] = None,
+        logo_path: Optional[str] = None,
+        custom_settings: Optional[Dict[str, Any]] = None,
+        *,
+        workers: Optional[int] = None,
+        **kwargs
+    ) -> Dict[str, Path]:
+        """Generate several sizes and formats of one QR code from a single encode.
+
+        The code is encoded and rendered once at one pixel per module; every
+        variant is an integer upscale of that image (see core.variants).
+
+        Args:
+            variants: OutputVariant objects or specs such as 'thumb:2',
+                'web:512px' or 'print:40:tiff'
+            output_path: Base file path; each variant is written next to it
+                as <stem>_<name>.<ext> (default: the configured output
+                directory and a content-hash name)
+            logo_path: Optional logo to embed in every variant
+            custom_settings: Optional custom QR settings
+            workers: Threads writing variants (default: up to the CPU count)
+            **kwargs: Additional arguments for prepare_data
+
+        Returns:
+            Variant name -> path written, in the given order
+
+        Raises:
+            ValueError: If a spec is malformed or two variants share a name
+        """
+        variants = [variant if isinstance(variant, OutputVariant) else OutputVariant.parse(variant)
+                    for variant in variants]
+        names = [variant.name for variant in variants]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Variant names must be unique: {names}")
+
+        try:
+            handle = self.prepare(logo_path, custom_settings, **kwargs)
+            self.logger.info("Generated data for QR code: %s...", handle.data[:50])
+
+            paths = []
+            if output_path:
+                base = Path(output_path)
+                default_format = image_format(base)
+                for variant in variants:
+                    suffix = variant_extension(variant.output_format or default_format)
+                    paths.append(base.with_name(f"{base.stem}_{variant.name}{suffix}"))
+            else:
+                key = content_key(handle.data, handle.settings, logo_path)
+                layout = OutputLayout(self.config.output_dir, self.config.get_output_layout())
+                for variant in variants:
+                    suffix = variant_extension(variant.output_format or 'PNG')
+                    paths.append(layout.path_for(
+                        f"qr_{self._get_type_name()}_{key[:16]}_{variant.name}{suffix}", key
+                    ))
+            for path in paths:
+                ensure_parent(path, cached=False)
+
+            results = save_variants(handle, variants, paths, workers)
+            for result in results:
+                plan = result.logo_plan
+                if plan is not None and not plan.passed:
+                    self.logger.warning("Logo exceeds the damage budget in variant %s; the code "
+                                        "may not scan", result.variant.name)
+                self.logger.info("QR code variant %s (%dpx) saved to %s", result.variant.name,
+                                 result.pixel_size, result.path)
+            return {result.variant.name: result.path for result in results}
+
+        except Exception as e:
+            self.logger.error("Error generating QR code variants: %s", e, exc_info=True)
+            raise
+
+    def generate_to(
+        self,
+        target: Union[ArchiveWriter, BinaryIO],
+        name: Optional[str] = None,
+        *,
+        logo_path: Optional[str] = None,
+        custom_settings: Optional[Dict[str, Any]] = None,
+        output_format: str = 'PNG',
+        **kwargs
+    ) -> str:
+        """Generate a QR code into an archive or binary stream instead of a file.
+
+        Args:
+            target: Open ArchiveWriter (the image becomes one entry) or a
+                binary file object such as stdout
+            name: Entry name (default: qr_<type>_<content-hash>.<format>)
+            logo_path: Optional logo to embed in QR code
+            custom_settings: Optional custom QR settings
+            output_format: PIL image format
+            **kwargs: Additional arguments for prepare_data
+
+        Returns:
+            Entry name
+        """
+        handle = self.prepare(logo_path, custom_settings, **kwargs)
+        encoded = handle.encode(output_format)
+        if name is None:
+            key = content_key(handle.data, handle.settings, logo_path)
+            name = f"qr_{self._get_type_name()}_{key[:16]}.{output_format.lower()}"
+
+        if isinstance(target, ArchiveWriter):
+            target.add(name, encoded, qr_type=self._get_type_name(),
+                       payload_hash=qrm.payload_hash(handle.data).hex())
+        else:
+            target.write(encoded)
+            target.flush()
+        self.logger.info("QR code written to %s", name)
+        return name
+
+    def save_image(self, qr_image: Image.Image, output_path: Path):
+        """Save a rendered QR code, choosing the format from the extension.
+
+        Args:
+            qr_image: Rendered QR code image
+            output_path: Destination path (PNG if the extension is unknown)
+        """
+        qr_image.save(str(output_path), format=image_format(output_path))
 
     def _get_type_name(self) -> str:
         """Get the QR code type name (e.g., 'url', 'wifi', 'sms')."""
@@ -0,0 +1,64 @@
+"""Helpers for the bulk payload builders (``prepare_many``)."""
+
+from __future__ import annotations
+import urllib.parse
+from functools import lru_cache
+from typing import Any, Dict, List, Mapping, Sequence, Tuple
+
+
+@lru_cache(maxsize=65536)
+def quote(text: str) -> str:
+    """Percent-encode text like urllib.parse.quote, caching repeated values.
+
+    Bulk data tends to repeat subjects, messages and place names, and quote()
+    is one of the more expensive steps of building a payload.
+    """
+    return urllib.parse.quote(text)
+
+
+def to_list(values: Sequence[Any]) -> List[Any]:
+    """Return a column as a list of Python objects.
+
+    Accepts lists and tuples, NumPy arrays and pandas Series (tolist())
+    and Arrow arrays (to_pylist()).
+    """
+    if isinstance(values, list):
+        return values
+    for method in ('to_pylist', 'tolist'):
+        convert = getattr(values, method, None)
+        if convert is not None:
+            return convert()
+    return list(values)
+
+
+def read_columns(
+    columns: Mapping[str, Sequence[Any]],
+    required: Tuple[str, ...],
+    optional: Dict[str, Any]
+) -> List[List[Any]]:
+    """Return columns as equal-length lists: required ones first, then optional ones.
+
+    Args:
+        columns: Column name -> values
+        required: Columns that must be present
+        optional: Columns that may be absent, with the value to use instead
+
+    Returns:
+        One list per column, in the order given
+
+    Raises:
+        ValueError: If a required column is missing or the lengths differ
+    """
+    missing = [name for name in required if name not in columns]
+    if missing:
+        raise ValueError(f"Missing column(s): {', '.join(missing)}")
+    lists = [to_list(columns[name]) for name in required]
+    length = len(lists[0])
+    if any(len(values) != length for values in lists):
+        raise ValueError("All columns must have the same length")
+    for name, default in optional.items():
+        values = to_list(columns[name]) if name in columns else [default] * length
+        if len(values) != length:
+            raise ValueError("All columns must have the same length")
+        lists.append(values)
+    return lists
@@ -1,8 +1,8 @@
 """Email QR code generator."""
 
-import urllib.parse
-from typing import Optional
+from typing import Any, List, Mapping, Optional, Sequence
 from .base import BaseQRGenerator
+from .columns import quote, read_columns
 
 
 class EmailQRGenerator(BaseQRGenerator):
@@ -27,27 +27,27 @@ class EmailQRGenerator(BaseQRGenerator):
         Returns:
             Mailto formatted string
         """
+        mailto_string = self._payload(email, subject, body)
+        self.logger.debug("Prepared email data for %s", email)
+        return mailto_string
+
+    @classmethod
+    def prepare_many(cls, columns: Mapping[str, Sequence[Any]]) -> List[str]:
+        """Prepare many mailto links at once (columns: email, subject, body)."""
+        emails, subjects, bodies = read_columns(columns, ('email',),
+                                                {'subject': None, 'body': None})
+        return [cls._payload(*row) for row in zip(emails, subjects, bodies)]
+
+    @staticmethod
+    def _payload(email: str, subject: Optional[str], body: Optional[str]) -> str:
         mailto_string = f"mailto:{email}"
 
         params = []
         if subject:
-            params.append(f"subject={self._url_encode(subject)}")
+            params.append(f"subject={quote(subject)}")
         if body:
-            params.append(f"body={self._url_encode(body)}")
+            params.append(f"body={quote(body)}")
 
         if params:
             mailto_string += "?" + "&".join(params)
-
-        self.logger.debug("Prepared email data for %s", email)
         return mailto_string
-
-    def _url_encode(self, text: str) -> str:
-        """URL encode text.
-
-        Args:
-            text: Text to encode
-
-        Returns:
-            URL encoded text
-        """
-        return urllib.parse.quote(text)
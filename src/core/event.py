@@ -1,8 +1,9 @@
 """Calendar event QR code generator."""
 
-from typing import Optional
+from typing import Any, List, Mapping, Optional, Sequence
 from datetime import datetime
 from .base import BaseQRGenerator
+from .columns import read_columns
 
 
 class EventQRGenerator(BaseQRGenerator):
@@ -31,6 +32,28 @@ class EventQRGenerator(BaseQRGenerator):
         Returns:
             vCalendar formatted string
         """
+        vevent_data = self._payload(title, start_time, end_time, location, description)
+        self.logger.debug("Prepared event data: %s", title)
+        return vevent_data
+
+    @classmethod
+    def prepare_many(cls, columns: Mapping[str, Sequence[Any]]) -> List[str]:
+        """Prepare many calendar events at once.
+
+        Columns: title, start_time, end_time, location, description.
+        """
+        rows = read_columns(columns, ('title', 'start_time', 'end_time'),
+                            {'location': None, 'description': None})
+        return [cls._payload(*row) for row in zip(*rows)]
+
+    @staticmethod
+    def _payload(
+        title: str,
+        start_time: datetime,
+        end_time: datetime,
+        location: Optional[str],
+        description: Optional[str]
+    ) -> str:
         # Format dates in iCalendar format (YYYYMMDDTHHMMSS)
         start_str = start_time.strftime("%Y%m%dT%H%M%S")
         end_str = end_time.strftime("%Y%m%dT%H%M%S")
@@ -49,8 +72,4 @@ class EventQRGenerator(BaseQRGenerator):
             vevent_lines.append(f"DESCRIPTION:{description}")
 
         vevent_lines.append("END:VEVENT")
-
-        vevent_data = "\n".join(vevent_lines)
-
-        self.logger.debug("Prepared event data: %s", title)
-        return vevent_data
+        return "\n".join(vevent_lines)
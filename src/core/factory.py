@@ -0,0 +1,116 @@
+"""Generator registry and shared factory."""
+
+from __future__ import annotations
+import os
+import threading
+from types import MappingProxyType
+from typing import Dict, Optional, Tuple, Type
+
+from ..common.config import Config
+from .base import BaseQRGenerator
+# pylint: disable=duplicate-code  # The package re-exports the same classes
+from .url import URLQRGenerator
+from .vcard import VCardQRGenerator
+from .wifi import WiFiQRGenerator
+from .sms import SMSQRGenerator
+from .email import EmailQRGenerator
+from .phone import PhoneQRGenerator
+from .text import TextQRGenerator
+from .location import LocationQRGenerator
+from .event import EventQRGenerator
+from .whatsapp import WhatsAppQRGenerator
+from .payment import PaymentQRGenerator
+
+# CLI/batch type name -> generator class
+GENERATORS: Dict[str, Type[BaseQRGenerator]] = {
+    'url': URLQRGenerator,
+    'vcard': VCardQRGenerator,
+    'wifi': WiFiQRGenerator,
+    'sms': SMSQRGenerator,
+    'email': EmailQRGenerator,
+    'phone': PhoneQRGenerator,
+    'text': TextQRGenerator,
+    'location': LocationQRGenerator,
+    'event': EventQRGenerator,
+    'whatsapp': WhatsAppQRGenerator,
+    'payment': PaymentQRGenerator,
+}
+
+# Shared factories by configuration directory and effective configuration,
+# with the config file's mtime
+_shared: Dict[Tuple[str, str], Tuple[Optional[int], GeneratorFactory]] = {}
+_shared_lock = threading.Lock()
+
+
+class GeneratorFactory:
+    """Creates one generator per QR type on first use and hands out that instance.
+
+    All generators of a factory share its Config and one read-only copy of
+    the QR settings. Generators are safe to share between threads, and so
+    is the factory.
+    """
+
+    def __init__(self, config: Optional[Config] = None):
+        """Initialize the factory.
+
+        Args:
+            config: Configuration object
+        """
+        self.config = config or Config()
+        self.settings = MappingProxyType(dict(self.config.get_qr_settings()))
+        self._generators: Dict[str, BaseQRGenerator] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls, config: Optional[Config] = None) -> GeneratorFactory:
+        """Return the process-wide factory for a configuration directory.
+
+        Configs of the same directory share a factory only if their
+        effective settings (unsaved changes included) are the same. The
+        factory is replaced when the directory's config file changes, so
+        long-running processes pick up new settings.
+
+        Args:
+            config: Configuration object (default: the default directory)
+
+        Returns:
+            GeneratorFactory
+        """
+        config = config or Config()
+        key = (os.path.abspath(config.config_dir), config.snapshot())
+        try:
+            mtime = os.stat(config.config_file).st_mtime_ns
+        except OSError:
+            mtime = None
+
+        with _shared_lock:
+            cached = _shared.get(key)
+            if cached is None or cached[0] != mtime:
+                # Factories of an older version of the config file are stale
+                for stale in [other for other, (other_mtime, _) in _shared.items()
+                              if other[0] == key[0] and other_mtime != mtime]:
+                    del _shared[stale]
+                cached = (mtime, cls(config))
+                _shared[key] = cached
+            return cached[1]
+
+    def get(self, qr_type: str) -> BaseQRGenerator:
+        """Return the generator for a QR type, creating it on first use.
+
+        Raises:
+            ValueError: If the type is unknown
+        """
+        generator = self._generators.get(qr_type)
+        if generator is not None:
+            return generator
+        if qr_type not in GENERATORS:
+            raise ValueError(f"Unknown QR type: {qr_type}")
+        with self._lock:
+            generator = self._generators.get(qr_type)
+            if generator is None:
+                generator = GENERATORS[qr_type](self.config, settings=self.settings)
+                self._generators[qr_type] = generator
+        return generator
+
+    def __contains__(self, qr_type: str) -> bool:
+        return qr_type in GENERATORS
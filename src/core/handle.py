@@ -0,0 +1,184 @@
+"""Lazily evaluated QR code handles."""
+
+from __future__ import annotations
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Optional, Union
+
+from PIL import Image
+
+from .logo import LogoPlan, clear_modules, logo_pixel_size, measure_logo, plan_logo
+from .matrix import QRMatrix
+from .render import (
+    encode_image, encode_matrix, image_format, is_auto_error_correction, paste_logo,
+    render_matrix
+)
+from .stream import save_streamed, should_stream
+
+
+class QRHandle:
+    """A prepared QR code whose matrix, image and file bytes are computed on demand.
+
+    Each stage is computed on first access and memoized: ``matrix`` encodes,
+    ``image`` renders (and adds the logo), ``encode()`` serializes. Properties
+    such as ``version`` or ``pixel_size`` only need the matrix, so checking
+    them never renders an image.
+
+    With a logo, ``logo_plan`` reports the modules it covers and the share of
+    the correction capacity they use; if the settings' error_correction is
+    'auto', the matrix is encoded at the lowest level the logo allows.
+
+    Handles pickle as their payload, settings and logo path only, so they
+    are cheap to ship to worker processes; the receiver recomputes whatever
+    stages it uses.
+    """
+
+    __slots__ = ('data', 'settings', 'logo_path', '_matrix', '_logo_plan', '_image', '_encoded')
+
+    def __init__(
+        self,
+        data: str,
+        settings: Dict[str, Any],
+        logo_path: Optional[str] = None
+    ):
+        """Initialize the handle.
+
+        Args:
+            data: Prepared payload to encode
+            settings: Effective QR settings
+            logo_path: Optional logo to paste onto the rendered image
+        """
+        self.data = data
+        self.settings = settings
+        self.logo_path = logo_path
+        self._matrix: Optional[QRMatrix] = None
+        self._logo_plan: Optional[LogoPlan] = None
+        self._image: Optional[Image.Image] = None
+        self._encoded: Dict[str, bytes] = {}
+
+    @property
+    def matrix(self) -> QRMatrix:
+        """Encoded module matrix (computed on first access)."""
+        if self._matrix is None:
+            if self.logo_path and is_auto_error_correction(self.settings):
+                return self.logo_plan.matrix
+            self._matrix = encode_matrix(self.data, self.settings)
+        return self._matrix
+
+    @property
+    def logo_plan(self) -> Optional[LogoPlan]:
+        """Modules the logo covers and the damage they do (None without a logo)."""
+        if self._logo_plan is None and self.logo_path:
+            if self._matrix is None and is_auto_error_correction(self.settings):
+                self._logo_plan = plan_logo(self.data, self.settings)
+                self._matrix = self._logo_plan.matrix
+            else:
+                self._logo_plan = measure_logo(self.matrix, self.settings)
+        return self._logo_plan
+
+    @property
+    def image(self) -> Image.Image:
+        """Rendered image including the logo (computed on first access)."""
+        if self._image is None:
+            image = render_matrix(self.matrix, self.settings)
+            if self.logo_path:
+                if self.settings.get('logo_clear'):
+                    image = clear_modules(image, self.logo_plan.modules, self.settings)
+                image = paste_logo(image, self.logo_path,
+                                   logo_pixel_size(self.matrix.width, self.settings))
+            self._image = image
+        return self._image
+
+    @property
+    def version(self) -> int:
+        """QR version the payload fits in."""
+        return self.matrix.version
+
+    @property
+    def width(self) -> int:
+        """Modules per side."""
+        return self.matrix.width
+
+    @property
+    def pixel_size(self) -> int:
+        """Side length of the rendered image in pixels (without rendering it)."""
+        border = int(self.settings.get('border', 4))
+        return (self.matrix.width + 2 * border) * int(self.settings.get('box_size', 10))
+
+    @property
+    def is_encoded(self) -> bool:
+        """Whether the matrix has been computed."""
+        return self._matrix is not None
+
+    @property
+    def is_rendered(self) -> bool:
+        """Whether the image has been computed."""
+        return self._image is not None
+
+    def encode(self, output_format: str = 'PNG') -> bytes:
+        """Return the image file bytes in a PIL format (memoized per format).
+
+        Args:
+            output_format: PIL format name, e.g. 'PNG', 'JPEG'
+
+        Returns:
+            Encoded image file
+        """
+        output_format = output_format.upper()
+        encoded = self._encoded.get(output_format)
+        if encoded is None:
+            encoded = encode_image(self.image, output_format)
+            self._encoded[output_format] = encoded
+        return encoded
+
+    def streams(self, output_format: str = 'PNG') -> bool:
+        """Whether save() renders this code band by band instead of in memory.
+
+        Large PNG and TIFF codes (see core.stream) are streamed unless the
+        image has already been rendered.
+        """
+        return self._image is None and should_stream(self.width, self.settings, output_format)
+
+    def write_to(self, stream: BinaryIO, output_format: str = 'PNG'):
+        """Write the image file to a binary stream, such as an output sink's.
+
+        Large codes are streamed band by band (TIFF only into seekable
+        streams); others are encoded in memory first.
+
+        Args:
+            stream: Writable binary stream
+            output_format: PIL format name
+        """
+        output_format = output_format.upper()
+        if self.streams(output_format) and (output_format != 'TIFF' or stream.seekable()):
+            save_streamed(self.matrix, self.settings, stream, self.logo_path, output_format)
+        else:
+            stream.write(self.encode(output_format))
+
+    def save(self, output_path: Union[str, Path]) -> Path:
+        """Write the image to a file, choosing the format from the extension.
+
+        Args:
+            output_path: Destination path (PNG if the extension is unknown)
+
+        Returns:
+            Path written
+        """
+        output_path = Path(output_path)
+        output_format = image_format(output_path)
+        if self.streams(output_format):
+            save_streamed(self.matrix, self.settings, output_path, self.logo_path, output_format)
+        else:
+            output_path.write_bytes(self.encode(output_format))
+        return output_path
+
+    def __getstate__(self) -> tuple:
+        # Computed stages are deliberately dropped
+        return self.data, self.settings, self.logo_path
+
+    def __setstate__(self, state: tuple):
+        data, settings, logo_path = state
+        QRHandle.__init__(self, data, settings, logo_path)
+
+    def __repr__(self) -> str:
+        stage = 'rendered' if self.is_rendered else 'encoded' if self.is_encoded else 'prepared'
+        return f"QRHandle({self.data[:30]!r}, {stage})"
@@ -0,0 +1,149 @@
+"""QR symbol layout tables (function patterns, codeword placement, RS blocks).
+
+All tables are computed once per version (and EC level) and cached. They
+are shared by readback verification, logo planning and the decoder.
+"""
+
+from __future__ import annotations
+from functools import lru_cache
+from typing import List, Tuple
+
+import numpy as np
+from qrcode import base as qr_base
+from qrcode import util as qr_util
+
+from .render import ERROR_CORRECTION_MAP
+
+# Misdecode protection codewords (ISO/IEC 18004 table 9): these are subtracted
+# from the error correction codewords before halving for small symbols.
+_MISDECODE_PROTECTION = {
+    (1, 'L'): 3, (1, 'M'): 2, (1, 'Q'): 1, (1, 'H'): 1,
+    (2, 'L'): 2, (3, 'L'): 1,
+}
+
+
+def symbol_width(version: int) -> int:
+    """Return the number of modules per side for a version."""
+    return version * 4 + 17
+
+
+@lru_cache(maxsize=None)
+def finder_mask(version: int) -> np.ndarray:
+    """Return a mask of the finder patterns, separators and format areas."""
+    width = symbol_width(version)
+    mask = np.zeros((width, width), dtype=bool)
+    mask[:9, :9] = True
+    mask[:9, width - 8:] = True
+    mask[width - 8:, :9] = True
+    mask.setflags(write=False)
+    return mask
+
+
+@lru_cache(maxsize=None)
+def function_mask(version: int) -> np.ndarray:
+    """Return a mask of every module that does not carry data.
+
+    Covers finder patterns, separators, format and version information,
+    timing patterns, alignment patterns and the dark module.
+    """
+    width = symbol_width(version)
+    mask = np.array(finder_mask(version))
+    mask[6, :] = True
+    mask[:, 6] = True
+
+    positions = qr_util.pattern_position(version)
+    for row in positions:
+        for col in positions:
+            if finder_mask(version)[row, col]:
+                continue
+            mask[row - 2:row + 3, col - 2:col + 3] = True
+
+    if version >= 7:
+        mask[:6, width - 11:width - 8] = True
+        mask[width - 11:width - 8, :6] = True
+
+    mask.setflags(write=False)
+    return mask
+
+
+@lru_cache(maxsize=None)
+def data_positions(version: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the (rows, cols) of data modules in placement order.
+
+    Placement runs in two-column strips from the bottom-right corner,
+    alternating upwards and downwards and skipping the vertical timing
+    pattern, exactly as the encoder writes the bit stream.
+    """
+    width = symbol_width(version)
+    functions = function_mask(version)
+    rows: List[int] = []
+    cols: List[int] = []
+    upward = True
+
+    for right in range(width - 1, 0, -2):
+        if right <= 6:
+            right -= 1
+        row_order = range(width - 1, -1, -1) if upward else range(width)
+        for row in row_order:
+            for col in (right, right - 1):
+                if not functions[row, col]:
+                    rows.append(row)
+                    cols.append(col)
+        upward = not upward
+
+    result = (np.array(rows, dtype=np.intp), np.array(cols, dtype=np.intp))
+    for array in result:
+        array.setflags(write=False)
+    return result
+
+
+@lru_cache(maxsize=None)
+def codeword_map(version: int) -> np.ndarray:
+    """Return the codeword index of every module (-1 for non-data modules).
+
+    Remainder bits after the last complete codeword are also -1.
+    """
+    width = symbol_width(version)
+    rows, cols = data_positions(version)
+    codewords = len(rows) // 8
+
+    indexes = np.full((width, width), -1, dtype=np.int32)
+    bit_indexes = np.arange(codewords * 8)
+    indexes[rows[:codewords * 8], cols[:codewords * 8]] = bit_indexes // 8
+    indexes.setflags(write=False)
+    return indexes
+
+
+class BlockLayout:
+    """Reed-Solomon block structure for a version and EC level."""
+
+    __slots__ = ('data_counts', 'total_counts', 'capacities', 'codeword_blocks')
+
+    def __init__(self, blocks: List[qr_base.RSBlock], protection: int):
+        self.data_counts = [block.data_count for block in blocks]
+        self.total_counts = [block.total_count for block in blocks]
+        self.capacities = np.array([
+            max((block.total_count - block.data_count - protection) // 2, 0)
+            for block in blocks
+        ])
+
+        # Codewords are interleaved: data codewords of all blocks, then EC codewords
+        order: List[int] = []
+        for i in range(max(self.data_counts)):
+            order.extend(b for b, count in enumerate(self.data_counts) if i < count)
+        ec_counts = [total - data for total, data in zip(self.total_counts, self.data_counts)]
+        for i in range(max(ec_counts)):
+            order.extend(b for b, count in enumerate(ec_counts) if i < count)
+        self.codeword_blocks = np.array(order, dtype=np.intp)
+
+    @property
+    def block_count(self) -> int:
+        """Number of RS blocks."""
+        return len(self.data_counts)
+
+
+@lru_cache(maxsize=None)
+def block_layout(version: int, error_correction: str) -> BlockLayout:
+    """Return the RS block layout for a version and EC level (L, M, Q, H)."""
+    blocks = qr_base.rs_blocks(version, ERROR_CORRECTION_MAP[error_correction])
+    return BlockLayout(blocks, _MISDECODE_PROTECTION.get((version, error_correction), 0))
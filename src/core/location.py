@@ -1,8 +1,8 @@
 """Location/GPS QR code generator."""
 
-from typing import Optional
-import urllib.parse
+from typing import Any, List, Mapping, Optional, Sequence
 from .base import BaseQRGenerator
+from .columns import quote, read_columns
 
 
 class LocationQRGenerator(BaseQRGenerator):
@@ -27,23 +27,23 @@ class LocationQRGenerator(BaseQRGenerator):
         Returns:
             Geo URI formatted string
         """
+        geo_string = self._payload(latitude, longitude, query)
+        self.logger.debug("Prepared location data: %s, %s", latitude, longitude)
+        return geo_string
+
+    @classmethod
+    def prepare_many(cls, columns: Mapping[str, Sequence[Any]]) -> List[str]:
+        """Prepare many geo URIs at once (columns: latitude, longitude, query)."""
+        latitudes, longitudes, queries = read_columns(columns, ('latitude', 'longitude'),
+                                                      {'query': None})
+        return [cls._payload(*row) for row in zip(latitudes, longitudes, queries)]
+
+    @staticmethod
+    def _payload(latitude: float, longitude: float, query: Optional[str]) -> str:
         # Use geo URI scheme
         geo_string = f"geo:{latitude},{longitude}"
 
         if query:
             # Add query parameter for location name
-            geo_string += f"?q={latitude},{longitude}({self._url_encode(query)})"
-
-        self.logger.debug("Prepared location data: %s, %s", latitude, longitude)
+            geo_string += f"?q={latitude},{longitude}({quote(query)})"
         return geo_string
-
-    def _url_encode(self, text: str) -> str:
-        """URL encode text.
-
-        Args:
-            text: Text to encode
-
-        Returns:
-            URL encoded text
-        """
-        return urllib.parse.quote(text)
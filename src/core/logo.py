@@ -0,0 +1,212 @@
+"""Logo-aware encoding: which modules a logo covers and which EC level it needs.
+
+A logo pasted onto the centre of a code hides every module it overlaps.
+The covered modules are known before anything is rendered (the logo's
+size and position follow from the symbol width, ``box_size`` and
+``border``), so the damage can be measured on the matrix alone with
+``analyze_damage``: every covered module is counted as wrong, whatever the
+logo looks like. That makes it cheap to try the EC levels from L upwards
+and keep the first whose worst Reed-Solomon block stays within
+``logo_max_damage`` of its correction capacity, leaving the rest as a
+margin for print and scan wear.
+
+Settings (all optional):
+    error_correction: 'auto' to let the plan pick the level
+    logo_scale: Logo side as a share of the image side (default: 0.25,
+        the size paste_logo() uses)
+    logo_max_damage: Share of the correction capacity the logo may use
+        (default: DEFAULT_LOGO_MAX_DAMAGE)
+    logo_clear: Clear the covered modules to the background color before
+        pasting, so no partial modules show around or through the logo
+"""
+
+from __future__ import annotations
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from .matrix import QRMatrix
+from .render import encode_matrix, image_mode, is_auto_error_correction
+from .verify import DEFAULT_MAX_DAMAGE, ReadbackResult, analyze_damage
+
+# Share of the correction capacity a planned logo may use. Every covered
+# module is counted as wrong, so the damage a reader actually sees is lower
+# and a planned code always passes readback verification at the same limit.
+DEFAULT_LOGO_MAX_DAMAGE = DEFAULT_MAX_DAMAGE
+DEFAULT_LOGO_SCALE = 0.25
+
+# Levels tried for error_correction 'auto', lowest (smallest code) first
+AUTO_LEVELS = ('L', 'M', 'Q', 'H')
+
+
+class LogoPlan:
+    """An encoded matrix together with the damage a logo does to it."""
+
+    __slots__ = ('matrix', 'modules', 'readback')
+
+    def __init__(
+        self,
+        matrix: QRMatrix,
+        modules: Tuple[int, int, int, int],
+        readback: ReadbackResult
+    ):
+        """Initialize the plan.
+
+        Args:
+            matrix: Encoded matrix
+            modules: Covered module box (top, left, bottom, right), end exclusive
+            readback: Damage of the covered modules
+        """
+        self.matrix = matrix
+        self.modules = modules
+        self.readback = readback
+
+    @property
+    def error_correction(self) -> str:
+        """EC level the matrix was encoded with."""
+        return self.matrix.error_correction
+
+    @property
+    def covered(self) -> int:
+        """Number of modules under the logo."""
+        top, left, bottom, right = self.modules
+        return (bottom - top) * (right - left)
+
+    @property
+    def damage(self) -> float:
+        """Largest share of any RS block's correction capacity the logo uses."""
+        return self.readback.damage
+
+    @property
+    def passed(self) -> bool:
+        """Whether the logo stays within the damage budget."""
+        return self.readback.passed
+
+    def __repr__(self) -> str:
+        return (f"LogoPlan(error_correction={self.error_correction!r}, "
+                f"version={self.matrix.version}, covered={self.covered}, "
+                f"damage={self.damage:.2f}, passed={self.passed})")
+
+
+def logo_pixel_size(width: int, settings: Dict[str, Any]) -> Tuple[int, int]:
+    """Return the logo size in pixels for a symbol width and logo_scale."""
+    pixel_size = (width + 2 * int(settings.get('border', 4))) * int(settings.get('box_size', 10))
+    side = max(int(pixel_size * float(settings.get('logo_scale', DEFAULT_LOGO_SCALE))), 1)
+    return side, side
+
+
+def logo_modules(
+    width: int,
+    settings: Dict[str, Any],
+    logo_size: Optional[Tuple[int, int]] = None
+) -> Tuple[int, int, int, int]:
+    """Return the module box a centred logo overlaps.
+
+    Uses the same geometry as paste_logo(): a logo of logo_size pixels
+    (default: logo_pixel_size()) centred on the rendered image.
+
+    Args:
+        width: Modules per side
+        settings: QR settings (box_size, border)
+        logo_size: Logo size in pixels (width, height)
+
+    Returns:
+        (top, left, bottom, right) in modules, end exclusive
+    """
+    box_size = int(settings.get('box_size', 10))
+    border = int(settings.get('border', 4))
+    pixel_size = (width + 2 * border) * box_size
+    logo_width, logo_height = logo_size or logo_pixel_size(width, settings)
+
+    def span(length: int) -> Tuple[int, int]:
+        start = (pixel_size - length) // 2
+        first = start // box_size - border
+        last = (start + length - 1) // box_size - border
+        return max(first, 0), min(last + 1, width)
+
+    top, bottom = span(logo_height)
+    left, right = span(logo_width)
+    return top, left, max(bottom, top), max(right, left)
+
+
+def measure_logo(
+    matrix: QRMatrix,
+    settings: Dict[str, Any],
+    logo_size: Optional[Tuple[int, int]] = None
+) -> LogoPlan:
+    """Measure the damage a centred logo does to an encoded matrix.
+
+    Args:
+        matrix: Encoded matrix (version and error_correction must be set)
+        settings: QR settings (box_size, border, logo_max_damage)
+        logo_size: Logo size in pixels (default: logo_pixel_size())
+
+    Returns:
+        LogoPlan for the matrix
+    """
+    modules = logo_modules(matrix.width, settings, logo_size)
+    top, left, bottom, right = modules
+    covered = np.zeros((matrix.width, matrix.width), dtype=bool)
+    covered[top:bottom, left:right] = True
+    max_damage = float(settings.get('logo_max_damage', DEFAULT_LOGO_MAX_DAMAGE))
+    return LogoPlan(matrix, modules, analyze_damage(matrix, covered, max_damage))
+
+
+def plan_logo(
+    data: str,
+    settings: Dict[str, Any],
+    logo_size: Optional[Tuple[int, int]] = None
+) -> LogoPlan:
+    """Encode data for a centred logo.
+
+    With error_correction 'auto' the levels are tried from L upwards and the
+    first whose logo damage stays within logo_max_damage is used (H if none
+    does; check ``passed``). Any other level is encoded as configured.
+
+    Args:
+        data: Data to encode
+        settings: Effective QR settings
+        logo_size: Logo size in pixels (default: logo_pixel_size())
+
+    Returns:
+        LogoPlan
+    """
+    if not is_auto_error_correction(settings):
+        return measure_logo(encode_matrix(data, settings), settings, logo_size)
+
+    plan = None
+    for level in AUTO_LEVELS:
+        matrix = encode_matrix(data, {**settings, 'error_correction': level})
+        plan = measure_logo(matrix, settings, logo_size)
+        if plan.passed:
+            break
+    return plan
+
+
+def clear_modules(
+    image: Image.Image,
+    modules: Tuple[int, int, int, int],
+    settings: Dict[str, Any]
+) -> Image.Image:
+    """Paint a module box of a rendered code in the background color.
+
+    Args:
+        image: Image rendered by render_matrix() with the same settings
+        modules: (top, left, bottom, right) in modules, end exclusive
+        settings: QR settings (box_size, border, back_color)
+
+    Returns:
+        The image, modified in place
+    """
+    box_size = int(settings.get('box_size', 10))
+    offset = int(settings.get('border', 4)) * box_size
+    top, left, bottom, right = modules
+    back_color = image_mode(settings)[2]
+    if image.mode == 'P':
+        back_color = 0  # Palette index of the background
+    elif back_color is None:
+        back_color = (0, 0, 0, 0)  # Transparent background
+    image.paste(back_color, (offset + left * box_size, offset + top * box_size,
+                             offset + right * box_size, offset + bottom * box_size))
+    return image
@@ -0,0 +1,195 @@
+"""Compact bit-packed QR module matrix."""
+
+from __future__ import annotations
+from typing import Any, Iterator, List, Optional, Sequence, Tuple
+
+from qrcode import util as qr_util
+
+# Format information bits -> (error correction letter, mask pattern).
+# The two-bit EC indicator uses the spec order M=0, L=1, H=2, Q=3.
+_EC_INDICATORS = {0: 'M', 1: 'L', 2: 'H', 3: 'Q'}
+FORMAT_INFO = {
+    qr_util.BCH_type_info(data): (_EC_INDICATORS[data >> 3], data & 0x07)
+    for data in range(32)
+}
+
+
+class QRMatrix:
+    """Square matrix of QR modules stored one bit per module.
+
+    Rows are packed most-significant-bit first and padded to a whole byte,
+    which is the same layout as PIL's mode ``'1'`` raw data and
+    ``numpy.packbits``. A set bit is a dark module.
+    """
+
+    __slots__ = ('width', 'stride', 'version', 'error_correction', 'mask_pattern', '_buffer')
+
+    def __init__(
+        self,
+        width: int,
+        buffer: Optional[Any] = None,
+        *,
+        version: Optional[int] = None,
+        error_correction: Optional[str] = None,
+        mask_pattern: Optional[int] = None
+    ):
+        """Initialize the matrix.
+
+        Args:
+            width: Number of modules per side
+            buffer: Optional packed row data (``width * stride`` bytes)
+            version: QR version the matrix was encoded with
+            error_correction: Error correction level (L, M, Q, H)
+            mask_pattern: Mask pattern (0-7)
+        """
+        self.width = width
+        self.stride = (width + 7) // 8
+        self.version = version
+        self.error_correction = error_correction
+        self.mask_pattern = mask_pattern
+
+        size = self.stride * width
+        if buffer is None:
+            self._buffer = bytearray(size)
+        else:
+            if len(buffer) != size:
+                raise ValueError(
+                    f"Buffer has {len(buffer)} bytes, expected {size} for width {width}"
+                )
+            self._buffer = buffer
+
+    @classmethod
+    def from_modules(
+        cls,
+        modules: Sequence[Sequence[Any]],
+        version: Optional[int] = None,
+        error_correction: Optional[str] = None
+    ) -> QRMatrix:
+        """Pack a list-of-lists module matrix (as produced by qrcode).
+
+        The mask pattern is read back from the format information.
+
+        Args:
+            modules: Rows of truthy (dark) / falsy (light) modules
+            version: QR version
+            error_correction: Error correction level
+
+        Returns:
+            Packed matrix
+        """
+        width = len(modules)
+        stride = (width + 7) // 8
+        padding = stride * 8 - width
+        buffer = bytearray()
+        for row in modules:
+            bits = ''.join('1' if module else '0' for module in row) + '0' * padding
+            buffer += int(bits, 2).to_bytes(stride, 'big')
+
+        matrix = cls(width, buffer, version=version, error_correction=error_correction)
+        format_info = matrix.format_info()
+        if format_info:
+            matrix.error_correction = matrix.error_correction or format_info[0]
+            matrix.mask_pattern = format_info[1]
+        return matrix
+
+    def get(self, row: int, col: int) -> bool:
+        """Return True if the module at (row, col) is dark."""
+        return bool(self._buffer[row * self.stride + (col >> 3)] & (0x80 >> (col & 7)))
+
+    def set(self, row: int, col: int, dark: bool = True):
+        """Set the module at (row, col) to dark or light."""
+        index = row * self.stride + (col >> 3)
+        bit = 0x80 >> (col & 7)
+        if dark:
+            self._buffer[index] |= bit
+        else:
+            self._buffer[index] &= ~bit & 0xFF
+
+    def row(self, row: int) -> List[bool]:
+        """Return one row of modules as booleans."""
+        start = row * self.stride
+        packed = int.from_bytes(self._buffer[start:start + self.stride], 'big')
+        shift = self.stride * 8 - 1
+        return [bool(packed >> (shift - col) & 1) for col in range(self.width)]
+
+    def rows(self) -> Iterator[List[bool]]:
+        """Iterate over the rows of the matrix."""
+        for row in range(self.width):
+            yield self.row(row)
+
+    def __iter__(self) -> Iterator[List[bool]]:
+        return self.rows()
+
+    def __len__(self) -> int:
+        return self.width
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, QRMatrix):
+            return NotImplemented
+        return self.width == other.width and bytes(self._buffer) == bytes(other._buffer)
+
+    def __hash__(self) -> int:
+        return hash((self.width, bytes(self._buffer)))
+
+    def __repr__(self) -> str:
+        return (f"QRMatrix(width={self.width}, version={self.version}, "
+                f"error_correction={self.error_correction!r}, mask_pattern={self.mask_pattern})")
+
+    def memoryview(self) -> memoryview:
+        """Return a zero-copy view of the packed row data."""
+        return memoryview(self._buffer)
+
+    def tobytes(self) -> bytes:
+        """Return a copy of the packed row data."""
+        return bytes(self._buffer)
+
+    def numpy(self, packed: bool = False) -> Any:
+        """Return the matrix as a NumPy array.
+
+        Args:
+            packed: Return the packed ``(width, stride)`` uint8 rows as a
+                zero-copy view instead of an unpacked boolean array
+
+        Returns:
+            ``numpy.ndarray``
+        """
+        import numpy as np  # pylint: disable=import-outside-toplevel
+
+        rows = np.frombuffer(self._buffer, dtype=np.uint8).reshape(self.width, self.stride)
+        if packed:
+            return rows
+        return np.unpackbits(rows, axis=1, count=self.width).astype(bool)
+
+    def dark_count(self) -> int:
+        """Return the number of dark modules."""
+        return sum(bin(byte).count('1') for byte in self._buffer)
+
+    def copy(self) -> QRMatrix:
+        """Return an independent copy of the matrix."""
+        return QRMatrix(
+            self.width,
+            bytearray(self._buffer),
+            version=self.version,
+            error_correction=self.error_correction,
+            mask_pattern=self.mask_pattern
+        )
+
+    def format_info(self) -> Optional[Tuple[str, int]]:
+        """Read the error correction level and mask from the format bits.
+
+        Returns:
+            (error_correction, mask_pattern) or None if the bits are not valid
+        """
+        if self.width < 21:
+            return None
+        bits = 0
+        for i in range(15):
+            if i < 6:
+                row = i
+            elif i < 8:
+                row = i + 1
+            else:
+                row = self.width - 15 + i
+            if self.get(row, 8):
+                bits |= 1 << i
+        return FORMAT_INFO.get(bits)
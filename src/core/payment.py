@@ -1,9 +1,9 @@
 """Payment QR code generator."""
 
-from typing import Optional
+from typing import Any, List, Mapping, Optional, Sequence
 from decimal import Decimal
-import urllib.parse
 from .base import BaseQRGenerator
+from .columns import quote, read_columns
 
 
 class PaymentQRGenerator(BaseQRGenerator):
@@ -32,25 +32,49 @@ class PaymentQRGenerator(BaseQRGenerator):
         Returns:
             Payment formatted string
         """
+        payment_string = self._payload(payment_type, recipient, amount, currency, message)
+        self.logger.debug("Prepared %s payment data", payment_type.lower())
+        return payment_string
+
+    @classmethod
+    def prepare_many(cls, columns: Mapping[str, Sequence[Any]]) -> List[str]:
+        """Prepare many payments at once.
+
+        Columns: payment_type, recipient and optionally amount, currency
+        and message.
+        """
+        rows = read_columns(columns, ('payment_type', 'recipient'),
+                            {'amount': None, 'currency': None, 'message': None})
+        return [cls._payload(*row) for row in zip(*rows)]
+
+    @classmethod
+    def _payload(  # pylint: disable=too-many-positional-arguments
+        cls,
+        payment_type: str,
+        recipient: str,
+        amount: Optional[Decimal],
+        currency: Optional[str],
+        message: Optional[str]
+    ) -> str:
         payment_type = payment_type.lower()
 
         if payment_type == "bitcoin":
-            return self._prepare_bitcoin(recipient, amount, message)
+            return cls._prepare_bitcoin(recipient, amount, message)
         if payment_type == "ethereum":
-            return self._prepare_ethereum(recipient, amount, message)
+            return cls._prepare_ethereum(recipient, amount, message)
         if payment_type == "paypal":
-            return self._prepare_paypal(recipient, amount, currency, message)
+            return cls._prepare_paypal(recipient, amount, currency, message)
 
         # Generic format
         payment_string = f"{payment_type}:{recipient}"
         if amount:
             payment_string += f"?amount={amount}"
         if message:
-            payment_string += f"&message={self._url_encode(message)}"
+            payment_string += f"&message={quote(message)}"
         return payment_string
 
+    @staticmethod
     def _prepare_bitcoin(
-        self,
         address: str,
         amount: Optional[Decimal] = None,
         message: Optional[str] = None
@@ -62,16 +86,15 @@ class PaymentQRGenerator(BaseQRGenerator):
         if amount:
             params.append(f"amount={amount}")
         if message:
-            params.append(f"message={self._url_encode(message)}")
+            params.append(f"message={quote(message)}")
 
         if params:
             btc_string += "?" + "&".join(params)
 
-        self.logger.debug("Prepared Bitcoin payment data")
         return btc_string
 
+    @staticmethod
     def _prepare_ethereum(
-        self,
         address: str,
         amount: Optional[Decimal] = None,
         message: Optional[str] = None
@@ -83,16 +106,15 @@ class PaymentQRGenerator(BaseQRGenerator):
         if amount:
             params.append(f"value={amount}")
         if message:
-            params.append(f"message={self._url_encode(message)}")
+            params.append(f"message={quote(message)}")
 
         if params:
             eth_string += "?" + "&".join(params)
 
-        self.logger.debug("Prepared Ethereum payment data")
         return eth_string
 
+    @staticmethod
     def _prepare_paypal(
-        self,
         email: str,
         amount: Optional[Decimal] = None,
         currency: Optional[str] = "USD",
@@ -104,9 +126,4 @@ class PaymentQRGenerator(BaseQRGenerator):
         if amount:
             paypal_url += f"/{amount}{currency}"
 
-        self.logger.debug("Prepared PayPal payment data")
         return paypal_url
-
-    def _url_encode(self, text: str) -> str:
-        """URL encode text."""
-        return urllib.parse.quote(text)
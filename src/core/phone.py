@@ -1,6 +1,8 @@
 """Phone QR code generator."""
 
+from typing import Any, List, Mapping, Sequence
 from .base import BaseQRGenerator
+from .columns import read_columns
 
 
 class PhoneQRGenerator(BaseQRGenerator):
@@ -21,10 +23,17 @@ class PhoneQRGenerator(BaseQRGenerator):
         Returns:
             Tel formatted string
         """
-        # Remove spaces and formatting, keep + for international
-        phone_number = ''.join(c for c in phone_number if c.isdigit() or c == '+')
-
-        tel_string = f"tel:{phone_number}"
-
+        tel_string = self._payload(phone_number)
         self.logger.debug("Prepared phone data for %s", phone_number)
         return tel_string
+
+    @classmethod
+    def prepare_many(cls, columns: Mapping[str, Sequence[Any]]) -> List[str]:
+        """Prepare many phone numbers at once (column: phone_number)."""
+        numbers, = read_columns(columns, ('phone_number',), {})
+        return [cls._payload(number) for number in numbers]
+
+    @staticmethod
+    def _payload(phone_number: str) -> str:
+        # Remove spaces and formatting, keep + for international
+        return "tel:" + ''.join([c for c in phone_number if c.isdigit() or c == '+'])
@@ -0,0 +1,236 @@
+"""Encoding and rendering helpers shared by all generators."""
+
+from __future__ import annotations
+import io
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+import qrcode
+import qrcode.constants
+from PIL import Image
+
+from .matrix import QRMatrix
+from .style import is_styled, render_styled
+
+ERROR_CORRECTION_MAP = {
+    'L': qrcode.constants.ERROR_CORRECT_L,
+    'M': qrcode.constants.ERROR_CORRECT_M,
+    'Q': qrcode.constants.ERROR_CORRECT_Q,
+    'H': qrcode.constants.ERROR_CORRECT_H,
+}
+
+# error_correction value that lets a logo plan pick the level (see core.logo)
+AUTO_ERROR_CORRECTION = 'auto'
+
+
+def is_auto_error_correction(settings: Dict[str, Any]) -> bool:
+    """Return True if the settings leave the EC level to the logo plan."""
+    return str(settings.get('error_correction', '')).lower() == AUTO_ERROR_CORRECTION
+
+
+def encode_matrix(data: str, settings: Dict[str, Any]) -> QRMatrix:
+    """Encode data into a packed module matrix.
+
+    Args:
+        data: Data to encode
+        settings: Effective QR settings (version, error_correction; 'auto'
+            encodes at level M)
+
+    Returns:
+        Packed QR matrix
+    """
+    level = settings.get('error_correction', 'H')
+    if is_auto_error_correction(settings):
+        level = 'M'  # Nothing covers the code; with a logo, plan_logo() picks the level
+    elif level not in ERROR_CORRECTION_MAP:
+        level = 'H'
+
+    qr = qrcode.QRCode(
+        version=settings.get('version', 1),
+        error_correction=ERROR_CORRECTION_MAP[level],
+        box_size=settings.get('box_size', 10),
+        border=settings.get('border', 4),
+    )
+    qr.add_data(data)
+    qr.make(fit=True)
+
+    return QRMatrix.from_modules(qr.modules, version=qr.version, error_correction=level)
+
+
+def image_mode(settings: Dict[str, Any]) -> Tuple[str, Any, Any]:
+    """Resolve the PIL mode and colors for the configured fill/back colors.
+
+    Mirrors qrcode's PilImage: black on white renders as a 1-bit image,
+    a 'transparent' background as RGBA and anything else as RGB.
+
+    Returns:
+        (mode, fill_color, back_color)
+    """
+    fill_color = settings.get('fill_color', 'black')
+    back_color = settings.get('back_color', 'white')
+    if isinstance(fill_color, str):
+        fill_color = fill_color.lower()
+    if isinstance(back_color, str):
+        back_color = back_color.lower()
+
+    if fill_color == 'black' and back_color == 'white':
+        return '1', 0, 255
+    if back_color == 'transparent':
+        return 'RGBA', fill_color, None
+    return 'RGB', fill_color, back_color
+
+
+def palette_rgb(color: Any) -> Tuple[int, int, int]:
+    """Return the RGB palette entry for a fill or background color (None is black).
+
+    Colors resolve exactly as they do for an RGB render.
+    """
+    if color is None:
+        return (0, 0, 0)
+    return Image.new('RGB', (1, 1), color).getpixel((0, 0))
+
+
+def module_image(matrix: QRMatrix) -> Image.Image:
+    """Return a 1-pixel-per-module mask image (dark modules are 255).
+
+    The image shares the matrix buffer where PIL allows it.
+    """
+    return Image.frombuffer(
+        '1', (matrix.width, matrix.width), matrix.memoryview(), 'raw', '1', matrix.stride, 1
+    )
+
+
+def render_matrix(matrix: QRMatrix, settings: Dict[str, Any]) -> Image.Image:
+    """Render a packed matrix to a PIL image.
+
+    Args:
+        matrix: Packed QR matrix
+        settings: Effective QR settings (box_size, border, fill_color,
+            back_color; module_style and gradient select the styled renderer;
+            palette renders colored codes as a two-entry palette image whose
+            colors output.recolor can change without re-rendering)
+
+    Returns:
+        PIL Image object
+    """
+    if is_styled(settings):
+        return render_styled(matrix.numpy(), settings, image_mode(settings))
+
+    box_size = int(settings.get('box_size', 10))
+    border = int(settings.get('border', 4))
+    mode, fill_color, back_color = image_mode(settings)
+
+    symbol_size = matrix.width * box_size
+    pixel_size = symbol_size + 2 * border * box_size
+    offset = border * box_size
+
+    mask = module_image(matrix)
+    if box_size != 1:
+        mask = mask.resize((symbol_size, symbol_size), Image.Resampling.NEAREST)
+
+    box = (offset, offset, offset + symbol_size, offset + symbol_size)
+    if mode != '1' and settings.get('palette'):
+        # Index 0 is the background, index 1 the modules
+        img = Image.new('P', (pixel_size, pixel_size), 0)
+        img.putpalette(palette_rgb(back_color) + palette_rgb(fill_color))
+        if back_color is None:
+            img.info['transparency'] = 0
+        img.paste(1, box, mask)
+        return img
+
+    img = Image.new(mode, (pixel_size, pixel_size), back_color)
+    img.paste(fill_color, box, mask)
+    return img
+
+
+def paste_logo(
+    qr_image: Image.Image,
+    logo_path: str,
+    logo_size: Optional[tuple] = None
+) -> Image.Image:
+    """Paste a logo onto the center of a rendered QR code.
+
+    Args:
+        qr_image: QR code image
+        logo_path: Path to logo image
+        logo_size: Size to resize logo to (width, height), default a quarter
+            of the code's size
+
+    Returns:
+        QR code image with logo (RGB)
+    """
+    # Calculate logo size if not provided
+    if not logo_size:
+        qr_width, qr_height = qr_image.size
+        logo_size = (qr_width // 4, qr_height // 4)
+
+    logo = load_logo(logo_path, logo_size)
+
+    # Calculate position to paste logo at center
+    pos = (
+        (qr_image.size[0] - logo.size[0]) // 2,
+        (qr_image.size[1] - logo.size[1]) // 2
+    )
+
+    # Convert QR image to RGB if necessary
+    if qr_image.mode != 'RGB':
+        qr_image = qr_image.convert('RGB')
+        # A transparent palette background becomes an RGB color key that would
+        # make that color (black) transparent when saved; the background is
+        # opaque from here on, as in streamed output
+        qr_image.info.pop('transparency', None)
+
+    qr_image.paste(logo, pos, logo if logo.mode == 'RGBA' else None)
+    return qr_image
+
+
+def load_logo(logo_path: Union[str, Path], logo_size: Tuple[int, int]) -> Image.Image:
+    """Open and resize a logo, cached per path, modification time and size.
+
+    The cache is process-wide and shared by all generators and threads, so
+    a batch decodes and resizes each logo once. Treat the result as
+    read-only.
+
+    Args:
+        logo_path: Path to logo image
+        logo_size: Size to resize logo to (width, height)
+
+    Returns:
+        Logo in RGB or RGBA mode
+    """
+    logo_path = os.fspath(logo_path)
+    return _load_logo(logo_path, os.stat(logo_path).st_mtime_ns, tuple(logo_size))
+
+
+@lru_cache(maxsize=32)
+def _load_logo(logo_path: str, mtime_ns: int, logo_size: Tuple[int, int]) -> Image.Image:
+    del mtime_ns  # Only part of the cache key
+    with Image.open(logo_path) as logo:
+        logo = logo.resize(logo_size, Image.Resampling.LANCZOS)
+    if logo.mode not in ('RGB', 'RGBA'):
+        logo = logo.convert('RGB')
+    return logo
+
+
+def image_format(output_path: Union[str, Path]) -> str:
+    """Return the PIL format for a file name (PNG if the extension is unknown)."""
+    return Image.registered_extensions().get(Path(output_path).suffix.lower(), 'PNG')
+
+
+def encode_image(image: Image.Image, output_format: str = 'PNG') -> bytes:
+    """Serialize an image to file bytes.
+
+    Args:
+        image: Rendered image
+        output_format: PIL format name, e.g. 'PNG', 'JPEG'
+
+    Returns:
+        Encoded image file
+    """
+    output_format = output_format.upper()
+    if output_format == 'JPEG' and image.mode not in ('L', 'RGB'):
+        image = image.convert('RGB')
+    buffer = io.BytesIO()
+    image.save(buffer, format=output_format)
+    return buffer.getvalue()
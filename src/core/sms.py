@@ -1,7 +1,8 @@
 """SMS QR code generator."""
 
-from typing import Optional
+from typing import Any, List, Mapping, Optional, Sequence
 from .base import BaseQRGenerator
+from .columns import read_columns
 
 
 class SMSQRGenerator(BaseQRGenerator):
@@ -24,13 +25,20 @@ class SMSQRGenerator(BaseQRGenerator):
         Returns:
             SMS formatted string
         """
+        sms_string = self._payload(phone_number, message)
+        self.logger.debug("Prepared SMS data for %s", phone_number)
+        return sms_string
+
+    @classmethod
+    def prepare_many(cls, columns: Mapping[str, Sequence[Any]]) -> List[str]:
+        """Prepare many SMS messages at once (columns: phone_number, message)."""
+        numbers, messages = read_columns(columns, ('phone_number',), {'message': None})
+        return [cls._payload(number, message) for number, message in zip(numbers, messages)]
+
+    @staticmethod
+    def _payload(phone_number: str, message: Optional[str]) -> str:
         # Remove spaces and formatting from phone number
         phone_number = ''.join(filter(str.isdigit, phone_number))
-
         if message:
-            sms_string = f"SMSTO:{phone_number}:{message}"
-        else:
-            sms_string = f"SMSTO:{phone_number}"
-
-        self.logger.debug("Prepared SMS data for %s", phone_number)
-        return sms_string
+            return f"SMSTO:{phone_number}:{message}"
+        return f"SMSTO:{phone_number}"
@@ -0,0 +1,168 @@
+"""Row-streamed rendering of large QR codes.
+
+A rendered code is a few hundred distinct pixel rows at most: every pixel
+row of a module row is the same, and only the rows that cross the logo
+differ. The image is therefore produced one module row (``box_size``
+pixel rows) at a time from the packed matrix and handed to an incremental
+PNG or TIFF encoder, so peak memory is one band instead of the whole
+image. Bands that cross the logo get the logo's slice pasted in; the
+others are never materialized beyond a single line.
+
+The output is pixel for pixel what render_matrix() followed by
+paste_logo() produces, including palette images for the ``palette``
+setting. Styled modules (see core.style) are rendered in memory.
+"""
+
+from __future__ import annotations
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, Optional, Tuple, Union
+
+import numpy as np
+from PIL import Image, ImageColor
+
+from ..output.raster import RASTER_FORMATS, open_raster
+from .logo import logo_modules, logo_pixel_size
+from .matrix import QRMatrix
+from .render import image_mode, load_logo, palette_rgb
+from .style import is_styled
+
+# Images with at least this many pixels are streamed when saved (about 48 MB as RGB)
+DEFAULT_STREAM_THRESHOLD = 16_000_000
+
+
+def can_stream(settings: Dict[str, Any], output_format: str) -> bool:
+    """Return True if codes with these settings can be streamed in this format."""
+    return output_format.upper() in RASTER_FORMATS and not is_styled(settings)
+
+
+def should_stream(width: int, settings: Dict[str, Any], output_format: str) -> bool:
+    """Return True if a code is large enough to be worth streaming.
+
+    The limit is the ``stream_threshold`` setting in pixels (default
+    DEFAULT_STREAM_THRESHOLD); 0 streams everything that can be streamed.
+    """
+    size = (width + 2 * int(settings.get('border', 4))) * int(settings.get('box_size', 10))
+    threshold = int(settings.get('stream_threshold', DEFAULT_STREAM_THRESHOLD))
+    return can_stream(settings, output_format) and size * size >= threshold
+
+
+def iter_bands(
+    matrix: QRMatrix,
+    settings: Dict[str, Any],
+    logo_path: Optional[str] = None
+) -> Tuple[str, int, Iterator[np.ndarray]]:
+    """Render a matrix one module row at a time.
+
+    Args:
+        matrix: Encoded matrix
+        settings: Effective QR settings (square modules only)
+        logo_path: Optional logo to paste onto the centre
+
+    Returns:
+        (mode, image size in pixels, iterator of bands); bands are
+        (box_size, size) booleans in modes '1' (True for white) and 'P'
+        (True for the modules, palette index 1), otherwise
+        (box_size, size, channels) uint8 arrays
+
+    Raises:
+        ValueError: If the settings ask for styled modules
+    """
+    if is_styled(settings):
+        raise ValueError("Styled modules can't be streamed")
+    box_size = int(settings.get('box_size', 10))
+    border = int(settings.get('border', 4))
+    size = (matrix.width + 2 * border) * box_size
+    mode, fill_color, back_color = image_mode(settings)
+    modules = matrix.numpy()
+
+    logo = None
+    if logo_path:
+        logo_size = logo_pixel_size(matrix.width, settings)
+        if settings.get('logo_clear'):
+            top, left, bottom, right = logo_modules(matrix.width, settings, logo_size)
+            modules = modules.copy()
+            modules[top:bottom, left:right] = False
+        logo = load_logo(logo_path, logo_size)
+        # paste_logo() converts to RGB; a transparent background loses its alpha
+        fill_color, back_color = _rgb(fill_color, mode), _rgb(back_color, mode)
+        mode = 'RGB'
+
+    if mode != '1' and logo is None and settings.get('palette'):
+        mode = 'P'
+    if mode in ('1', 'P'):
+        palette = np.array([mode == '1', mode == 'P'])  # Light, dark
+    else:
+        palette = np.array([_color(back_color, mode), _color(fill_color, mode)], dtype=np.uint8)
+    padded = np.pad(modules, border)
+
+    def bands() -> Iterator[np.ndarray]:
+        for row in range(padded.shape[0]):
+            line = palette[np.repeat(padded[row], box_size).astype(np.intp)]
+            band = np.broadcast_to(line, (box_size,) + line.shape)
+            top = row * box_size
+            if logo is not None:
+                band = _paste_logo_slice(band, logo, size, top)
+            yield band
+
+    return mode, size, bands()
+
+
+def save_streamed(
+    matrix: QRMatrix,
+    settings: Dict[str, Any],
+    target: Union[str, Path, BinaryIO],
+    logo_path: Optional[str] = None,
+    output_format: str = 'PNG'
+):
+    """Render a matrix straight into a PNG or TIFF file, one band at a time.
+
+    Args:
+        matrix: Encoded matrix
+        settings: Effective QR settings (square modules only)
+        target: Output path or binary file object (seekable for TIFF)
+        logo_path: Optional logo to paste onto the centre
+        output_format: 'PNG' or 'TIFF'
+
+    Raises:
+        ValueError: If the format is not supported or the modules are styled
+    """
+    mode, size, bands = iter_bands(matrix, settings, logo_path)
+    palette = transparency = None
+    if mode == 'P':
+        _, fill_color, back_color = image_mode(settings)
+        palette = bytes(palette_rgb(back_color) + palette_rgb(fill_color))
+        transparency = b'\x00' if back_color is None else None
+    with open_raster(target, output_format, size, mode, palette=palette,
+                     transparency=transparency) as writer:
+        for band in bands:
+            writer.write(band)
+
+
+def _paste_logo_slice(band: np.ndarray, logo: Image.Image, size: int, top: int) -> np.ndarray:
+    """Paste the part of a centred logo that falls into a band."""
+    left = (size - logo.size[0]) // 2
+    logo_top = (size - logo.size[1]) // 2
+    if top + band.shape[0] <= logo_top or top >= logo_top + logo.size[1]:
+        return band
+    image = Image.fromarray(np.ascontiguousarray(band), 'RGB')
+    image.paste(logo, (left, logo_top - top), logo if logo.mode == 'RGBA' else None)
+    return np.asarray(image)
+
+
+def _rgb(color: Any, mode: str) -> Tuple[int, int, int]:
+    """Return the RGB color a pixel of ``color`` in ``mode`` becomes in RGB."""
+    if mode == '1':
+        return (255, 255, 255) if color else (0, 0, 0)
+    if color is None:
+        return (0, 0, 0)  # Transparent black
+    return tuple(_color(color, 'RGB'))[:3]
+
+
+def _color(color: Any, mode: str) -> Tuple[int, ...]:
+    if color is None:
+        return (0,) * len(mode)
+    if isinstance(color, str):
+        return ImageColor.getcolor(color, mode)
+    if isinstance(color, int):
+        return (color,) * len(mode)
+    return tuple(color) + (255,) * (len(mode) - len(color))  # Opaque unless given
@@ -1,6 +1,8 @@
 """Plain text QR code generator."""
 
+from typing import Any, List, Mapping, Sequence
 from .base import BaseQRGenerator
+from .columns import read_columns
 
 
 class TextQRGenerator(BaseQRGenerator):
@@ -23,3 +25,9 @@ class TextQRGenerator(BaseQRGenerator):
         """
         self.logger.debug("Prepared text data: %s...", text[:50])
         return text
+
+    @classmethod
+    def prepare_many(cls, columns: Mapping[str, Sequence[Any]]) -> List[str]:
+        """Prepare many texts at once (column: text)."""
+        texts, = read_columns(columns, ('text',), {})
+        return list(texts)
@@ -1,6 +1,8 @@
 """URL QR code generator."""
 
+from typing import Any, List, Mapping, Sequence
 from .base import BaseQRGenerator
+from .columns import read_columns
 
 
 class URLQRGenerator(BaseQRGenerator):
@@ -16,9 +18,19 @@ class URLQRGenerator(BaseQRGenerator):
         Returns:
             URL string
         """
+        url = self._payload(url)
+        self.logger.debug("Prepared URL: %s", url)
+        return url
+
+    @classmethod
+    def prepare_many(cls, columns: Mapping[str, Sequence[Any]]) -> List[str]:
+        """Prepare many URLs at once (column: url)."""
+        urls, = read_columns(columns, ('url',), {})
+        return [cls._payload(url) for url in urls]
+
+    @staticmethod
+    def _payload(url: str) -> str:
         # Ensure URL has protocol
         if not url.startswith(('http://', 'https://')):
             url = 'https://' + url
-
-        self.logger.debug("Prepared URL: %s", url)
         return url
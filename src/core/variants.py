@@ -0,0 +1,255 @@
+"""Several output sizes and formats of one QR code from a single encode.
+
+The payload is encoded once and the code is rendered once at one pixel
+per module, border included. Every output is an integer nearest-neighbour
+upscale of that base image, which is exactly what render_matrix() would
+draw at that box_size, followed by the logo (resized for that output and
+served from the logo cache). Outputs are scaled, encoded and written in a
+thread pool; Pillow releases the GIL while resizing and compressing.
+
+Outputs large enough to stream (see core.stream) are written band by band
+instead, and styled modules (see core.style) are rendered per size, since
+their anti-aliased shapes depend on box_size.
+"""
+
+from __future__ import annotations
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from PIL import Image
+
+from .handle import QRHandle
+from .logo import AUTO_LEVELS, LogoPlan, clear_modules, logo_pixel_size, measure_logo
+from .matrix import QRMatrix
+from .render import (
+    encode_image, encode_matrix, is_auto_error_correction, paste_logo, render_matrix
+)
+from .stream import save_streamed, should_stream
+from .style import is_styled
+
+# Variant names become part of file names: letters, digits, '.', '_' and '-'
+# only, not starting with '.' (no paths, '..' or hidden files)
+_VARIANT_NAME = re.compile(r'[A-Za-z0-9_-][A-Za-z0-9._-]*')
+
+# File extension per output format (others use the lower-cased format name)
+EXTENSIONS = {'PNG': '.png', 'JPEG': '.jpg', 'TIFF': '.tiff', 'WEBP': '.webp', 'GIF': '.gif',
+              'BMP': '.bmp'}
+
+
+class OutputVariant:
+    """One output of a multi-size render: a name, a size and a format.
+
+    The size is either a box_size (pixels per module) or a target image
+    size in pixels, which becomes the largest box_size whose image fits
+    (at least 1).
+    """
+
+    __slots__ = ('name', 'box_size', 'size', 'output_format')
+
+    def __init__(
+        self,
+        name: str,
+        box_size: Optional[int] = None,
+        size: Optional[int] = None,
+        output_format: Optional[str] = None
+    ):
+        """Initialize the variant.
+
+        Args:
+            name: Variant name, appended to the output file name (letters,
+                digits, '.', '_' and '-', not starting with '.')
+            box_size: Pixels per module
+            size: Target image size in pixels (instead of box_size)
+            output_format: PIL format name (default: from the output path)
+
+        Raises:
+            ValueError: If the name isn't a plain file name part, or unless
+                exactly one of box_size and size is a positive number
+        """
+        if not _VARIANT_NAME.fullmatch(name):
+            raise ValueError(f"Invalid variant name {name!r} (letters, digits, '.', '_' and '-')")
+        if (box_size is None) == (size is None):
+            raise ValueError(f"Variant {name!r} needs either a box_size or a size")
+        if (box_size if box_size is not None else size) < 1:
+            raise ValueError(f"Variant {name!r} must have a positive size")
+        self.name = name
+        self.box_size = box_size
+        self.size = size
+        self.output_format = output_format.upper() if output_format else None
+
+    @classmethod
+    def parse(cls, spec: str) -> OutputVariant:
+        """Parse 'name:box_size[:format]' or 'name:<pixels>px[:format]'.
+
+        Examples: 'thumb:2', 'web:512px:webp', 'print:40:tiff'.
+
+        Raises:
+            ValueError: If the spec is malformed
+        """
+        parts = spec.split(':')
+        if len(parts) not in (2, 3) or not parts[0]:
+            raise ValueError(f"Invalid variant {spec!r} (expected name:size[:format])")
+        name, size = parts[0], parts[1].strip().lower()
+        output_format = parts[2] if len(parts) == 3 else None
+        try:
+            if size.endswith('px'):
+                return cls(name, size=int(size[:-2]), output_format=output_format)
+            return cls(name, box_size=int(size), output_format=output_format)
+        except ValueError as exc:
+            raise ValueError(f"Invalid variant {spec!r}: {exc}") from exc
+
+    def box_size_for(self, width: int, border: int) -> int:
+        """Return the box_size of this variant for a symbol of ``width`` modules."""
+        if self.box_size is not None:
+            return self.box_size
+        return max(self.size // (width + 2 * border), 1)
+
+    def __repr__(self) -> str:
+        size = f"box_size={self.box_size}" if self.box_size is not None else f"size={self.size}"
+        return f"OutputVariant({self.name!r}, {size}, output_format={self.output_format!r})"
+
+
+class VariantResult:
+    """A written variant."""
+
+    __slots__ = ('variant', 'path', 'box_size', 'pixel_size', 'logo_plan')
+
+    def __init__(
+        self,
+        variant: OutputVariant,
+        path: Path,
+        box_size: int,
+        pixel_size: int,
+        *,
+        logo_plan: Optional[LogoPlan] = None
+    ):
+        self.variant = variant
+        self.path = path
+        self.box_size = box_size
+        self.pixel_size = pixel_size
+        self.logo_plan = logo_plan
+
+    def __repr__(self) -> str:
+        return f"VariantResult({self.variant.name!r}, {str(self.path)!r}, {self.pixel_size}px)"
+
+
+def variant_extension(output_format: str) -> str:
+    """Return the file extension for an output format."""
+    return EXTENSIONS.get(output_format.upper(), f".{output_format.lower()}")
+
+
+def render_base(matrix: QRMatrix, settings: Dict[str, Any]) -> Image.Image:
+    """Render a code at one pixel per module, border included."""
+    return render_matrix(matrix, {**settings, 'box_size': 1})
+
+
+def render_variant(
+    base: Image.Image,
+    matrix: QRMatrix,
+    settings: Dict[str, Any],
+    logo_path: Optional[str] = None
+) -> Image.Image:
+    """Scale a base image to the settings' box_size and add the logo.
+
+    Args:
+        base: Image from render_base()
+        matrix: Encoded matrix (for styled modules and the logo geometry)
+        settings: QR settings of the variant (box_size set)
+        logo_path: Optional logo to paste onto the centre
+
+    Returns:
+        The image handle.image would be for these settings
+    """
+    box_size = int(settings.get('box_size', 10))
+    if is_styled(settings):
+        image = render_matrix(matrix, settings)
+    elif box_size == 1:
+        image = base.copy()
+    else:
+        image = base.resize((base.width * box_size, base.height * box_size),
+                            Image.Resampling.NEAREST)
+    if logo_path:
+        if settings.get('logo_clear'):
+            image = clear_modules(image, measure_logo(matrix, settings).modules, settings)
+        image = paste_logo(image, logo_path, logo_pixel_size(matrix.width, settings))
+    return image
+
+
+def save_variants(
+    handle: QRHandle,
+    variants: Sequence[OutputVariant],
+    paths: Sequence[Union[str, Path]],
+    workers: Optional[int] = None
+) -> List[VariantResult]:
+    """Write several sizes and formats of a prepared code.
+
+    With a logo and error_correction 'auto', the level is the lowest that
+    keeps the logo within budget at every size.
+
+    Args:
+        handle: Prepared code (its box_size is ignored)
+        variants: Outputs to write
+        paths: Output path of each variant (format from the variant, else the extension)
+        workers: Threads writing outputs (default: one per variant, at most the CPU count)
+
+    Returns:
+        One VariantResult per variant, in order
+    """
+    if len(variants) != len(paths):
+        raise ValueError(f"{len(variants)} variants but {len(paths)} output paths")
+    if not variants:
+        return []
+
+    border = int(handle.settings.get('border', 4))
+    matrix, sized = _plan_variants(handle, variants)
+    base = None
+    if not all(is_styled(settings) for settings, _ in sized):
+        base = render_base(matrix, handle.settings)
+
+    def write(index: int) -> VariantResult:
+        variant, path = variants[index], Path(paths[index])
+        settings, plan = sized[index]
+        output_format = variant.output_format or Image.registered_extensions().get(
+            path.suffix.lower(), 'PNG')
+        if should_stream(matrix.width, settings, output_format):
+            save_streamed(matrix, settings, path, handle.logo_path, output_format)
+        else:
+            image = render_variant(base, matrix, settings, handle.logo_path)
+            path.write_bytes(encode_image(image, output_format))
+        box_size = int(settings['box_size'])
+        return VariantResult(variant, path, box_size, (matrix.width + 2 * border) * box_size,
+                             logo_plan=plan)
+
+    workers = max(min(workers or os.cpu_count() or 1, len(variants)), 1)
+    if workers == 1:
+        return [write(index) for index in range(len(variants))]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(write, range(len(variants))))
+
+
+def _plan_variants(
+    handle: QRHandle,
+    variants: Sequence[OutputVariant]
+) -> Tuple[QRMatrix, List[Tuple[Dict[str, Any], Optional[LogoPlan]]]]:
+    """Return the matrix to render and each variant's settings and logo plan."""
+    border = int(handle.settings.get('border', 4))
+
+    def sized(matrix: QRMatrix) -> List[Dict[str, Any]]:
+        return [{**handle.settings, 'box_size': variant.box_size_for(matrix.width, border)}
+                for variant in variants]
+
+    if not handle.logo_path:
+        return handle.matrix, [(settings, None) for settings in sized(handle.matrix)]
+    if not is_auto_error_correction(handle.settings):
+        matrix = handle.matrix
+        return matrix, [(settings, measure_logo(matrix, settings)) for settings in sized(matrix)]
+
+    for level in AUTO_LEVELS:
+        matrix = encode_matrix(handle.data, {**handle.settings, 'error_correction': level})
+        plans = [(settings, measure_logo(matrix, settings)) for settings in sized(matrix)]
+        if all(plan.passed for _, plan in plans):
+            break
+    return matrix, plans
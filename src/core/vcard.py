@@ -1,7 +1,14 @@
 """vCard QR code generator."""
 
-from typing import Optional, Dict
+from typing import Any, Dict, List, Mapping, Optional, Sequence
 from .base import BaseQRGenerator
+from .columns import read_columns
+
+# Optional prepare_data() arguments, in _payload() order, with their defaults
+_OPTIONAL = {
+    'phone': None, 'email': None, 'organization': None, 'title': None, 'url': None,
+    'address': None, 'birthday': None, 'note': None, 'version': "3.0",
+}
 
 
 class VCardQRGenerator(BaseQRGenerator):
@@ -43,6 +50,36 @@ class VCardQRGenerator(BaseQRGenerator):
         Returns:
             vCard formatted string
         """
+        vcard_data = self._payload(first_name, last_name, phone, email, organization, title,
+                                   url, address, birthday, note, version)
+        self.logger.debug("Prepared vCard data")
+        return vcard_data
+
+    @classmethod
+    def prepare_many(cls, columns: Mapping[str, Sequence[Any]]) -> List[str]:
+        """Prepare many vCards at once.
+
+        Columns: first_name, last_name and any of phone, email,
+        organization, title, url, address (dicts), birthday, note, version.
+        """
+        rows = read_columns(columns, ('first_name', 'last_name'), _OPTIONAL)
+        return [cls._payload(*row) for row in zip(*rows)]
+
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    @staticmethod
+    def _payload(
+        first_name: str,
+        last_name: str,
+        phone: Optional[str],
+        email: Optional[str],
+        organization: Optional[str],
+        title: Optional[str],
+        url: Optional[str],
+        address: Optional[Dict[str, str]],
+        birthday: Optional[str],
+        note: Optional[str],
+        version: str
+    ) -> str:
         vcard_lines = [
             "BEGIN:VCARD",
             f"VERSION:{version}",
@@ -80,7 +117,4 @@ class VCardQRGenerator(BaseQRGenerator):
             vcard_lines.append(f"NOTE:{note}")
 
         vcard_lines.append("END:VCARD")
-
-        vcard_data = "\n".join(vcard_lines)
-        self.logger.debug("Prepared vCard data")
-        return vcard_data
+        return "\n".join(vcard_lines)
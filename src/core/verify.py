@@ -0,0 +1,202 @@
+"""Readback verification of rendered QR codes.
+
+The rendered image is sampled at the centre of every module (the geometry
+is known from ``box_size`` and ``border``), compared with the encoded
+matrix, and the damaged modules are mapped to the Reed-Solomon codewords
+and blocks they belong to. A code is only as readable as its worst block,
+so damage is reported as the largest fraction of any block's correction
+capacity that the damage consumes.
+"""
+
+from __future__ import annotations
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+from PIL import Image, ImageColor
+
+from .layout import block_layout, codeword_map, finder_mask, function_mask
+from .matrix import QRMatrix
+from .render import image_mode
+
+# Default share of the correction capacity damage may use before a code is rejected
+DEFAULT_MAX_DAMAGE = 0.8
+
+
+class ReadbackError(ValueError):
+    """Raised when a rendered code is too damaged to be reliably scanned."""
+
+    def __init__(self, message: str, result: ReadbackResult):
+        super().__init__(message)
+        self.result = result
+
+
+class ReadbackResult:
+    """Damage found when reading a rendered code back."""
+
+    __slots__ = ('damaged_modules', 'damaged_codewords', 'function_errors',
+                 'finder_errors', 'damage', 'max_damage')
+
+    def __init__(
+        self,
+        damaged_modules: int,
+        damaged_codewords: int,
+        *,
+        function_errors: int,
+        finder_errors: int,
+        damage: float,
+        max_damage: float
+    ):
+        """Initialize the result.
+
+        Args:
+            damaged_modules: Data modules that read back wrong
+            damaged_codewords: Codewords containing at least one damaged module
+            function_errors: Wrong modules in timing/alignment/version patterns
+            finder_errors: Wrong modules in finder patterns or format information
+            damage: Largest share of any RS block's correction capacity used
+            max_damage: Threshold the result is judged against
+        """
+        self.damaged_modules = damaged_modules
+        self.damaged_codewords = damaged_codewords
+        self.function_errors = function_errors
+        self.finder_errors = finder_errors
+        self.damage = damage
+        self.max_damage = max_damage
+
+    @property
+    def passed(self) -> bool:
+        """Whether the code is within the damage budget."""
+        return self.finder_errors == 0 and self.damage <= self.max_damage
+
+    def __repr__(self) -> str:
+        return (f"ReadbackResult(damage={self.damage:.2f}, "
+                f"damaged_codewords={self.damaged_codewords}, "
+                f"finder_errors={self.finder_errors}, passed={self.passed})")
+
+
+def analyze_damage(
+    matrix: QRMatrix,
+    damaged: np.ndarray,
+    max_damage: float = DEFAULT_MAX_DAMAGE
+) -> ReadbackResult:
+    """Measure how much of the error correction budget a damage mask uses.
+
+    Args:
+        matrix: Encoded matrix (version and error_correction must be set)
+        damaged: Boolean (width, width) array of unreadable/wrong modules
+        max_damage: Share of correction capacity allowed before failing
+
+    Returns:
+        ReadbackResult
+    """
+    version = matrix.version
+    functions = function_mask(version)
+    finders = finder_mask(version)
+
+    codewords = codeword_map(version)[damaged]
+    codewords = np.unique(codewords[codewords >= 0])
+
+    layout = block_layout(version, matrix.error_correction)
+    per_block = np.bincount(layout.codeword_blocks[codewords], minlength=layout.block_count)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        usage = np.where(layout.capacities > 0, per_block / layout.capacities,
+                         np.where(per_block > 0, np.inf, 0.0))
+
+    return ReadbackResult(
+        int(np.count_nonzero(damaged & ~functions)),
+        int(codewords.size),
+        function_errors=int(np.count_nonzero(damaged & functions & ~finders)),
+        finder_errors=int(np.count_nonzero(damaged & finders)),
+        damage=float(usage.max()) if usage.size else 0.0,
+        max_damage=max_damage
+    )
+
+
+def sample_modules(
+    image: Image.Image,
+    width: int,
+    settings: Dict[str, Any],
+    threshold: Optional[float] = None
+) -> np.ndarray:
+    """Sample a rendered image back into a module grid.
+
+    Only the module centres are read, so the cost is independent of
+    ``box_size``.
+
+    Args:
+        image: Rendered QR code
+        width: Modules per side
+        settings: QR settings the image was rendered with
+        threshold: Luminance separating fill from background (default:
+            midway between the fill and background colors)
+
+    Returns:
+        Boolean (width, width) array, True for fill (dark in the matrix)
+        modules; inverted codes, with a fill lighter than the background,
+        are read as such
+    """
+    box_size = int(settings.get('box_size', 10))
+    offset = int(settings.get('border', 4)) * box_size
+    end = offset + width * box_size
+
+    if image.mode not in ('1', 'L', 'RGB', 'RGBA'):
+        image = image.convert('RGBA')
+    # A nearest-neighbour downscale of the symbol area picks each module's centre pixel
+    pixels = np.asarray(
+        image.resize((width, width), Image.Resampling.NEAREST, box=(offset, offset, end, end))
+    )
+
+    if image.mode == '1':
+        return ~pixels
+    if image.mode == 'L':
+        luminance = pixels.astype(np.float32)
+    else:
+        rgb = pixels[..., :3].astype(np.float32)
+        luminance = rgb @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+        if image.mode == 'RGBA':
+            # Transparent areas are read as if printed on white
+            alpha = pixels[..., 3].astype(np.float32) / 255.0
+            luminance = luminance * alpha + 255.0 * (1.0 - alpha)
+
+    fill, back = _fill_and_back(settings)
+    if threshold is None:
+        threshold = 128.0 if abs(fill - back) < 1.0 else (fill + back) / 2.0
+    if fill > back:
+        return luminance > threshold
+    return luminance < threshold
+
+
+def verify_image(
+    image: Image.Image,
+    matrix: QRMatrix,
+    settings: Dict[str, Any],
+    max_damage: float = DEFAULT_MAX_DAMAGE
+) -> ReadbackResult:
+    """Compare a rendered image with the matrix it was rendered from.
+
+    Args:
+        image: Rendered QR code (after any logo was added)
+        matrix: Encoded matrix
+        settings: QR settings the image was rendered with
+        max_damage: Share of correction capacity allowed before failing
+
+    Returns:
+        ReadbackResult
+    """
+    sampled = sample_modules(image, matrix.width, settings)
+    return analyze_damage(matrix, sampled != matrix.numpy(), max_damage)
+
+
+def _fill_and_back(settings: Dict[str, Any]) -> Tuple[float, float]:
+    """Return the luminance of the fill and background colors (transparent reads as white)."""
+    _, fill_color, back_color = image_mode(settings)
+    return _luminance(fill_color), 255.0 if back_color is None else _luminance(back_color)
+
+
+def _luminance(color: Any) -> float:
+    if isinstance(color, str):
+        color = ImageColor.getrgb(color)
+    if isinstance(color, (int, float)):
+        return float(color)
+    red, green, blue = color[:3]
+    return red * 0.299 + green * 0.587 + blue * 0.114
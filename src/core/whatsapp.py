@@ -1,8 +1,8 @@
 """WhatsApp QR code generator."""
 
-from typing import Optional
-import urllib.parse
+from typing import Any, List, Mapping, Optional, Sequence
 from .base import BaseQRGenerator
+from .columns import quote, read_columns
 
 
 class WhatsAppQRGenerator(BaseQRGenerator):
@@ -25,25 +25,21 @@ class WhatsAppQRGenerator(BaseQRGenerator):
         Returns:
             WhatsApp URL formatted string
         """
+        whatsapp_url = self._payload(phone_number, message)
+        self.logger.debug("Prepared WhatsApp data for %s", phone_number)
+        return whatsapp_url
+
+    @classmethod
+    def prepare_many(cls, columns: Mapping[str, Sequence[Any]]) -> List[str]:
+        """Prepare many WhatsApp links at once (columns: phone_number, message)."""
+        numbers, messages = read_columns(columns, ('phone_number',), {'message': None})
+        return [cls._payload(number, message) for number, message in zip(numbers, messages)]
+
+    @staticmethod
+    def _payload(phone_number: str, message: Optional[str]) -> str:
         # Remove all non-digit characters except ensure it starts without +
         phone_number = ''.join(filter(str.isdigit, phone_number))
-
         whatsapp_url = f"https://wa.me/{phone_number}"
-
         if message:
-            encoded_message = self._url_encode(message)
-            whatsapp_url += f"?text={encoded_message}"
-
-        self.logger.debug("Prepared WhatsApp data for %s", phone_number)
+            whatsapp_url += f"?text={quote(message)}"
         return whatsapp_url
-
-    def _url_encode(self, text: str) -> str:
-        """URL encode text.
-
-        Args:
-            text: Text to encode
-
-        Returns:
-            URL encoded text
-        """
-        return urllib.parse.quote(text)
@@ -1,6 +1,11 @@
 """WiFi QR code generator."""
 
+from typing import Any, List, Mapping, Sequence
 from .base import BaseQRGenerator
+from .columns import read_columns
+
+# Backslash-escape the characters that delimit fields, in a single pass
+_ESCAPE = str.maketrans({char: f'\\{char}' for char in '\\;,:"'})
 
 
 class WiFiQRGenerator(BaseQRGenerator):
@@ -27,27 +32,25 @@ class WiFiQRGenerator(BaseQRGenerator):
         Returns:
             WiFi formatted string
         """
-        # Escape special characters
-        ssid = self._escape_special_chars(ssid)
-        password = self._escape_special_chars(password)
-
-        hidden_flag = "true" if hidden else "false"
-
-        wifi_string = f"WIFI:T:{security};S:{ssid};P:{password};H:{hidden_flag};;"
-
+        wifi_string = self._payload(ssid, password, security, hidden)
         self.logger.debug("Prepared WiFi data for SSID: %s", ssid)
         return wifi_string
 
-    def _escape_special_chars(self, text: str) -> str:
-        """Escape special characters for WiFi QR format.
+    @classmethod
+    def prepare_many(cls, columns: Mapping[str, Sequence[Any]]) -> List[str]:
+        """Prepare many WiFi configurations at once.
 
-        Args:
-            text: Text to escape
-
-        Returns:
-            Escaped text
+        Columns: ssid, password, security, hidden.
         """
-        special_chars = ['\\', ';', ',', ':', '"']
-        for char in special_chars:
-            text = text.replace(char, f'\\{char}')
-        return text
+        ssids, passwords, securities, hidden = read_columns(
+            columns, ('ssid', 'password'), {'security': "WPA", 'hidden': False}
+        )
+        return [cls._payload(*row) for row in zip(ssids, passwords, securities, hidden)]
+
+    @staticmethod
+    def _payload(ssid: str, password: str, security: str, hidden: bool) -> str:
+        # Escape special characters
+        ssid = ssid.translate(_ESCAPE)
+        password = password.translate(_ESCAPE)
+        hidden_flag = "true" if hidden else "false"
+        return f"WIFI:T:{security};S:{ssid};P:{password};H:{hidden_flag};;"
@@ -0,0 +1,11 @@
+"""Built-in QR code decoder (pure Python and NumPy) for QR Code Utils."""
+
+from .errors import DecodeError
+from .image import decode_image
+from .reader import DecodedSymbol, decode_matrix
+from .scan import ScanReport, ScanResult, scan, scan_directory
+
+__all__ = [
+    'DecodeError', 'DecodedSymbol', 'ScanReport', 'ScanResult',
+    'decode_image', 'decode_matrix', 'scan', 'scan_directory'
+]
@@ -0,0 +1,5 @@
+"""Decoder exceptions."""
+
+
+class DecodeError(ValueError):
+    """Raised when an image or module grid cannot be decoded."""
@@ -0,0 +1,46 @@
+"""Decoding QR codes from images."""
+
+from __future__ import annotations
+from pathlib import Path
+from typing import Union
+
+from PIL import Image
+
+from .detector import (
+    binarize, candidate_triples, estimate_version, find_finder_patterns, sample_grid
+)
+from .errors import DecodeError
+from .reader import DecodedSymbol, decode_matrix
+
+
+def decode_image(image: Union[Image.Image, str, Path]) -> DecodedSymbol:
+    """Locate and decode the QR code in an image.
+
+    Args:
+        image: PIL image or path to an image file
+
+    Returns:
+        DecodedSymbol
+
+    Raises:
+        DecodeError: If no readable QR code is found
+    """
+    if not isinstance(image, Image.Image):
+        with Image.open(image) as opened:
+            opened.load()
+            return decode_image(opened)
+
+    dark = binarize(image)
+    last_error = DecodeError("No QR code found")
+    # Light-on-dark codes are tried inverted if nothing is found
+    for binary in (dark, ~dark):
+        for triple in candidate_triples(find_finder_patterns(binary)):
+            estimate = estimate_version(triple)
+            for version in (estimate, estimate - 1, estimate + 1):
+                if not 1 <= version <= 40:
+                    continue
+                try:
+                    return decode_matrix(sample_grid(binary, triple, version))
+                except DecodeError as e:
+                    last_error = e
+    raise last_error
@@ -0,0 +1,221 @@
+"""Decoding of a sampled module grid: format, version, unmasking and RS correction."""
+
+from __future__ import annotations
+from functools import lru_cache
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+from qrcode import util as qr_util
+
+from ..core.layout import block_layout, data_positions, symbol_width
+from ..core.matrix import FORMAT_INFO, QRMatrix
+from .errors import DecodeError
+from .reedsolomon import correct
+from .segments import decode_segments
+
+# Format and version information survive up to three bit errors
+_MAX_INFO_ERRORS = 3
+
+VERSION_INFO = {qr_util.BCH_type_number(version): version for version in range(7, 41)}
+
+
+class DecodedSymbol:
+    """Text and symbol parameters read from a QR code."""
+
+    __slots__ = ('data', 'version', 'error_correction', 'mask_pattern', 'corrected')
+
+    def __init__(
+        self,
+        data: str,
+        version: int,
+        *,
+        error_correction: str,
+        mask_pattern: int,
+        corrected: int
+    ):
+        """Initialize the result.
+
+        Args:
+            data: Decoded text
+            version: Symbol version
+            error_correction: Error correction level (L, M, Q, H)
+            mask_pattern: Mask pattern (0-7)
+            corrected: Number of codewords repaired by error correction
+        """
+        self.data = data
+        self.version = version
+        self.error_correction = error_correction
+        self.mask_pattern = mask_pattern
+        self.corrected = corrected
+
+    def __repr__(self) -> str:
+        return (f"DecodedSymbol(version={self.version}, "
+                f"error_correction={self.error_correction!r}, data={self.data!r})")
+
+
+def _nearest(bits: int, table: dict) -> Tuple[Optional[Any], int]:
+    best, distance = None, _MAX_INFO_ERRORS + 1
+    for code, value in table.items():
+        errors = bin(bits ^ code).count('1')
+        if errors < distance:
+            best, distance = value, errors
+    return best, distance
+
+
+def _read_bits(grid: np.ndarray, positions: List[Tuple[int, int]]) -> int:
+    bits = 0
+    for i, (row, col) in enumerate(positions):
+        if grid[row, col]:
+            bits |= 1 << i
+    return bits
+
+
+@lru_cache(maxsize=None)
+def _format_positions(width: int) -> Tuple[List[Tuple[int, int]], List[Tuple[int, int]]]:
+    vertical = []
+    horizontal = []
+    for i in range(15):
+        if i < 6:
+            vertical.append((i, 8))
+        elif i < 8:
+            vertical.append((i + 1, 8))
+        else:
+            vertical.append((width - 15 + i, 8))
+
+        if i < 8:
+            horizontal.append((8, width - 1 - i))
+        elif i == 8:
+            horizontal.append((8, 7))
+        else:
+            horizontal.append((8, 14 - i))
+    return vertical, horizontal
+
+
+def read_format(grid: np.ndarray) -> Tuple[str, int]:
+    """Read the error correction level and mask from either format copy.
+
+    Raises:
+        DecodeError: If neither copy is within three bit errors of a valid code
+    """
+    best, distance = None, _MAX_INFO_ERRORS + 1
+    for positions in _format_positions(grid.shape[0]):
+        value, errors = _nearest(_read_bits(grid, positions), FORMAT_INFO)
+        if errors < distance:
+            best, distance = value, errors
+    if best is None:
+        raise DecodeError("Could not read format information")
+    return best
+
+
+def read_version(grid: np.ndarray) -> int:
+    """Read the version from the version information blocks (version 7+).
+
+    Raises:
+        DecodeError: If the symbol size is invalid or the version can't be read
+    """
+    width = grid.shape[0]
+    estimate, remainder = divmod(width - 17, 4)
+    if remainder or not 1 <= estimate <= 40:
+        raise DecodeError(f"Invalid symbol size: {width} modules")
+    if estimate < 7:
+        return estimate
+
+    best, distance = None, _MAX_INFO_ERRORS + 1
+    for transpose in (False, True):
+        positions = [(i // 3, i % 3 + width - 11) for i in range(18)]
+        if transpose:
+            positions = [(col, row) for row, col in positions]
+        value, errors = _nearest(_read_bits(grid, positions), VERSION_INFO)
+        if errors < distance:
+            best, distance = value, errors
+    if best is None or symbol_width(best) != width:
+        raise DecodeError("Could not read version information")
+    return best
+
+
+@lru_cache(maxsize=None)
+def _mask_bits(version: int, mask_pattern: int) -> np.ndarray:
+    rows, cols = data_positions(version)
+    i, j = rows, cols
+    masks = (
+        lambda: (i + j) % 2 == 0,
+        lambda: i % 2 == 0,
+        lambda: j % 3 == 0,
+        lambda: (i + j) % 3 == 0,
+        lambda: (i // 2 + j // 3) % 2 == 0,
+        lambda: (i * j) % 2 + (i * j) % 3 == 0,
+        lambda: ((i * j) % 2 + (i * j) % 3) % 2 == 0,
+        lambda: ((i * j) % 3 + (i + j) % 2) % 2 == 0,
+    )
+    bits = masks[mask_pattern]()
+    bits.setflags(write=False)
+    return bits
+
+
+def decode_grid(grid: np.ndarray) -> DecodedSymbol:
+    """Decode a boolean module grid (True for dark modules, no quiet zone).
+
+    Args:
+        grid: Square (width, width) boolean array
+
+    Returns:
+        DecodedSymbol
+
+    Raises:
+        DecodeError: If the grid can't be decoded
+    """
+    grid = np.asarray(grid, dtype=bool)
+    if grid.ndim != 2 or grid.shape[0] != grid.shape[1]:
+        raise DecodeError("Module grid must be square")
+
+    version = read_version(grid)
+    error_correction, mask_pattern = read_format(grid)
+
+    rows, cols = data_positions(version)
+    bits = grid[rows, cols] ^ _mask_bits(version, mask_pattern)
+    layout = block_layout(version, error_correction)
+    total = sum(layout.total_counts)
+    codewords = np.packbits(bits[:total * 8]).tolist()
+
+    blocks: List[List[int]] = [[] for _ in range(layout.block_count)]
+    for codeword, block in zip(codewords, layout.codeword_blocks.tolist()):
+        blocks[block].append(codeword)
+
+    data = bytearray()
+    corrected = 0
+    for block, data_count, total_count in zip(blocks, layout.data_counts, layout.total_counts):
+        fixed = correct(block, total_count - data_count)
+        corrected += sum(1 for before, after in zip(block, fixed) if before != after)
+        data += bytes(fixed[:data_count])
+
+    return DecodedSymbol(
+        decode_segments(bytes(data), version),
+        version,
+        error_correction=error_correction,
+        mask_pattern=mask_pattern,
+        corrected=corrected
+    )
+
+
+def decode_matrix(matrix: Any) -> DecodedSymbol:
+    """Decode a QRMatrix or module grid, trying the mirrored symbol on failure.
+
+    Args:
+        matrix: QRMatrix, boolean array or list of module rows
+
+    Returns:
+        DecodedSymbol
+
+    Raises:
+        DecodeError: If the symbol can't be decoded
+    """
+    grid = matrix.numpy() if isinstance(matrix, QRMatrix) else np.asarray(matrix, dtype=bool)
+    try:
+        return decode_grid(grid)
+    except DecodeError:
+        # Codes printed mirrored (e.g. read through glass) decode when transposed
+        try:
+            return decode_grid(grid.T)
+        except DecodeError:
+            pass
+        raise
@@ -0,0 +1,154 @@
+"""Reed-Solomon error correction over GF(256) as used by QR codes.
+
+QR codes use the field generated by x^8 + x^4 + x^3 + x^2 + 1 (0x11d) and
+generator polynomials whose roots are consecutive powers of alpha starting
+at alpha^0. Codewords are stored highest-degree coefficient first.
+"""
+
+from __future__ import annotations
+from typing import List
+
+import numpy as np
+
+from .errors import DecodeError
+
+_PRIMITIVE = 0x11D
+
+EXP = [0] * 512
+LOG = [0] * 256
+
+
+def _build_tables():
+    value = 1
+    for power in range(255):
+        EXP[power] = value
+        LOG[value] = power
+        value <<= 1
+        if value & 0x100:
+            value ^= _PRIMITIVE
+    for power in range(255, 512):
+        EXP[power] = EXP[power - 255]
+
+
+_build_tables()
+_EXP_ARRAY = np.array(EXP, dtype=np.uint8)
+_LOG_ARRAY = np.array(LOG, dtype=np.intp)
+
+
+def _mul(a: int, b: int) -> int:
+    if a == 0 or b == 0:
+        return 0
+    return EXP[LOG[a] + LOG[b]]
+
+
+def _div(a: int, b: int) -> int:
+    if a == 0:
+        return 0
+    return EXP[(LOG[a] - LOG[b]) % 255]
+
+
+def _eval_low_first(poly: List[int], x: int) -> int:
+    """Evaluate a polynomial stored lowest-degree coefficient first."""
+    result = 0
+    for coefficient in reversed(poly):
+        result = _mul(result, x) ^ coefficient
+    return result
+
+
+def syndromes(codewords: List[int], ec_count: int) -> List[int]:
+    """Return the syndromes S_0 .. S_(ec_count-1) of a received block."""
+    # S_i = sum_j c_j * alpha^(i * (n-1-j)), computed in the log domain for all i at once
+    values = np.asarray(codewords, dtype=np.intp)
+    present = values != 0
+    degrees = np.arange(len(values) - 1, -1, -1)[present]
+    logs = _LOG_ARRAY[values[present]]
+    exponents = (logs[None, :] + np.arange(ec_count)[:, None] * degrees[None, :]) % 255
+    return np.bitwise_xor.reduce(_EXP_ARRAY[exponents], axis=1).tolist()
+
+
+def _error_locator(synd: List[int]) -> List[int]:
+    """Berlekamp-Massey: return the error locator polynomial (lowest first)."""
+    locator = [1]
+    previous = [1]
+    length = 0
+    shift = 1
+    previous_discrepancy = 1
+
+    for n, syndrome in enumerate(synd):
+        discrepancy = syndrome
+        for i in range(1, length + 1):
+            discrepancy ^= _mul(locator[i], synd[n - i])
+
+        if discrepancy == 0:
+            shift += 1
+            continue
+
+        coefficient = _div(discrepancy, previous_discrepancy)
+        updated = locator + [0] * max(0, len(previous) + shift - len(locator))
+        for i, value in enumerate(previous):
+            updated[i + shift] ^= _mul(coefficient, value)
+
+        if 2 * length <= n:
+            previous = locator
+            length = n + 1 - length
+            previous_discrepancy = discrepancy
+            shift = 1
+        else:
+            shift += 1
+        locator = updated
+
+    return locator[:length + 1]
+
+
+def correct(codewords: List[int], ec_count: int) -> List[int]:
+    """Correct errors in one RS block.
+
+    Args:
+        codewords: Data followed by EC codewords of one block
+        ec_count: Number of EC codewords in the block
+
+    Returns:
+        Corrected codewords (same length)
+
+    Raises:
+        DecodeError: If the block has more errors than can be corrected
+    """
+    synd = syndromes(codewords, ec_count)
+    if not any(synd):
+        return list(codewords)
+
+    locator = _error_locator(synd)
+    errors = len(locator) - 1
+    if errors * 2 > ec_count:
+        raise DecodeError("Too many errors in Reed-Solomon block")
+
+    # Chien search: position j holds the coefficient of x^(n-1-j)
+    n = len(codewords)
+    positions = []
+    for j in range(n):
+        power = n - 1 - j
+        if _eval_low_first(locator, EXP[(255 - power) % 255]) == 0:
+            positions.append(j)
+    if len(positions) != errors:
+        raise DecodeError("Could not locate Reed-Solomon errors")
+
+    # Forney: omega = S(x) * locator(x) mod x^ec_count
+    omega = [0] * ec_count
+    for i, s_value in enumerate(synd):
+        for k, l_value in enumerate(locator):
+            if i + k < ec_count:
+                omega[i + k] ^= _mul(s_value, l_value)
+    derivative = [locator[i] if i % 2 == 1 else 0 for i in range(1, len(locator))]
+
+    corrected = list(codewords)
+    for j in positions:
+        x = EXP[n - 1 - j]
+        x_inv = EXP[(255 - (n - 1 - j)) % 255]
+        denominator = _eval_low_first(derivative, x_inv)
+        if denominator == 0:
+            raise DecodeError("Could not compute Reed-Solomon error value")
+        corrected[j] ^= _mul(x, _div(_eval_low_first(omega, x_inv), denominator))
+
+    if any(syndromes(corrected, ec_count)):
+        raise DecodeError("Reed-Solomon correction failed")
+    return corrected
@@ -0,0 +1,163 @@
+"""Bulk decoding of image directories."""
+
+from __future__ import annotations
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from .errors import DecodeError
+from .image import decode_image
+
+IMAGE_SUFFIXES = ('.png', '.jpg', '.jpeg', '.bmp', '.gif', '.tif', '.tiff', '.webp')
+
+
+class ScanResult:
+    """Outcome of decoding one image."""
+
+    __slots__ = ('path', 'data', 'error', 'duration', 'expected')
+
+    def __init__(
+        self,
+        path: Path,
+        data: Optional[str] = None,
+        error: Optional[str] = None,
+        duration: float = 0.0
+    ):
+        self.path = path
+        self.data = data
+        self.error = error
+        self.duration = duration
+        self.expected: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        """Whether the image was decoded."""
+        return self.error is None
+
+    @property
+    def mismatch(self) -> bool:
+        """Whether a decoded payload differs from the expected one."""
+        return self.ok and self.expected is not None and self.data != self.expected
+
+
+class ScanReport:
+    """Summary of a directory scan."""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.decoded = 0
+        self.failed: List[ScanResult] = []
+        self.mismatched: List[ScanResult] = []
+        self.missing: List[Path] = []
+        self.duration = 0.0
+
+    @property
+    def total(self) -> int:
+        """Number of images scanned."""
+        return self.decoded + len(self.failed)
+
+    def add(self, result: ScanResult):
+        """Record a scan result."""
+        if result.ok:
+            self.decoded += 1
+        else:
+            self.failed.append(result)
+        if result.mismatch:
+            self.mismatched.append(result)
+
+
+def find_images(directory: Path, recursive: bool = False) -> List[Path]:
+    """Return the image files in a directory, sorted by path."""
+    pattern = '**/*' if recursive else '*'
+    return sorted(
+        path for path in Path(directory).glob(pattern)
+        if path.suffix.lower() in IMAGE_SUFFIXES and path.is_file()
+    )
+
+
+def scan_file(path: Path) -> ScanResult:
+    """Decode a single image file.
+
+    Args:
+        path: Image path
+
+    Returns:
+        ScanResult (decoding errors are recorded, not raised)
+    """
+    started = time.perf_counter()
+    result = ScanResult(Path(path))
+    try:
+        result.data = decode_image(path).data
+    except (DecodeError, OSError) as e:
+        result.error = str(e)
+    result.duration = time.perf_counter() - started
+    return result
+
+
+def scan_directory(
+    directory: Path,
+    *,
+    workers: int = 1,
+    expected: Optional[Dict[Path, str]] = None,
+    recursive: bool = False
+) -> Iterator[ScanResult]:
+    """Decode every image in a directory, yielding results in path order.
+
+    Args:
+        directory: Directory to scan
+        workers: Number of worker processes (1 decodes in this process)
+        expected: Expected payload per resolved image path
+        recursive: Also scan subdirectories
+
+    Yields:
+        ScanResult objects
+    """
+    paths = find_images(directory, recursive)
+    if workers > 1 and len(paths) > 1:
+        chunksize = max(1, min(64, len(paths) // (workers * 4)))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(scan_file, paths, chunksize=chunksize)
+            yield from _attach_expected(results, expected)
+    else:
+        yield from _attach_expected(map(scan_file, paths), expected)
+
+
+def scan(
+    directory: Path,
+    *,
+    workers: int = 1,
+    expected: Optional[Dict[Path, str]] = None,
+    recursive: bool = False
+) -> ScanReport:
+    """Scan a directory and summarize the results.
+
+    Expected payloads without a matching image are reported as missing.
+
+    Args:
+        directory: Directory to scan
+        workers: Number of worker processes
+        expected: Expected payload per resolved image path
+        recursive: Also scan subdirectories
+
+    Returns:
+        ScanReport
+    """
+    report = ScanReport(Path(directory))
+    started = time.perf_counter()
+    seen = set()
+    for result in scan_directory(directory, workers=workers, expected=expected,
+                                 recursive=recursive):
+        report.add(result)
+        seen.add(result.path.resolve())
+    if expected:
+        report.missing = sorted(path for path in expected if path not in seen)
+    report.duration = time.perf_counter() - started
+    return report
+
+
+def _attach_expected(results, expected: Optional[Dict[Path, str]]) -> Iterator[ScanResult]:
+    for result in results:
+        if expected:
+            result.expected = expected.get(result.path.resolve())
+        yield result
@@ -0,0 +1,178 @@
+"""Decoding of the QR data bit stream into text."""
+
+from __future__ import annotations
+from typing import List
+
+from .errors import DecodeError
+
+MODE_TERMINATOR = 0x0
+MODE_NUMERIC = 0x1
+MODE_ALPHANUMERIC = 0x2
+MODE_STRUCTURED_APPEND = 0x3
+MODE_BYTE = 0x4
+MODE_FNC1_FIRST = 0x5
+MODE_ECI = 0x7
+MODE_KANJI = 0x8
+MODE_FNC1_SECOND = 0x9
+
+ALPHANUMERIC_CHARS = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ $%*+-./:'
+
+# Character count indicator lengths for versions 1-9, 10-26 and 27-40
+_COUNT_BITS = {
+    MODE_NUMERIC: (10, 12, 14),
+    MODE_ALPHANUMERIC: (9, 11, 13),
+    MODE_BYTE: (8, 16, 16),
+    MODE_KANJI: (8, 10, 12),
+}
+
+# ECI assignment numbers -> Python codecs
+_ECI_ENCODINGS = {
+    1: 'latin-1', 3: 'latin-1', 4: 'iso8859-2', 5: 'iso8859-3', 6: 'iso8859-4',
+    7: 'iso8859-5', 8: 'iso8859-6', 9: 'iso8859-7', 10: 'iso8859-8', 11: 'iso8859-9',
+    13: 'iso8859-11', 15: 'iso8859-13', 16: 'iso8859-14', 17: 'iso8859-15',
+    18: 'iso8859-16', 20: 'shift_jis', 21: 'cp1250', 22: 'cp1251', 23: 'cp1252',
+    24: 'cp1256', 25: 'utf-16-be', 26: 'utf-8', 27: 'ascii', 28: 'big5', 29: 'gb18030',
+    30: 'euc-kr',
+}
+
+
+class _BitReader:
+    """Read big-endian bit fields from a byte string."""
+
+    def __init__(self, data: bytes):
+        self._value = int.from_bytes(data, 'big')
+        self._bits = len(data) * 8
+        self._position = 0
+
+    @property
+    def remaining(self) -> int:
+        """Number of unread bits."""
+        return self._bits - self._position
+
+    def read(self, count: int) -> int:
+        """Read the next count bits as an unsigned integer."""
+        if count > self.remaining:
+            raise DecodeError("Unexpected end of QR data")
+        self._position += count
+        return (self._value >> (self._bits - self._position)) & ((1 << count) - 1)
+
+
+def _count_bits(mode: int, version: int) -> int:
+    if version <= 9:
+        return _COUNT_BITS[mode][0]
+    if version <= 26:
+        return _COUNT_BITS[mode][1]
+    return _COUNT_BITS[mode][2]
+
+
+def _decode_bytes(raw: bytearray, encoding: str) -> str:
+    if encoding == 'utf-8':
+        try:
+            return raw.decode('utf-8')
+        except UnicodeDecodeError:
+            return raw.decode('latin-1')
+    return raw.decode(encoding, errors='replace')
+
+
+def _read_numeric(reader: _BitReader, count: int) -> str:
+    digits = []
+    # Groups of three digits in 10 bits, a trailing pair in 7 or single digit in 4
+    for size, bits in ((3, 10), (2, 7), (1, 4)):
+        while count >= size:
+            value = reader.read(bits)
+            if value >= 10 ** size:
+                raise DecodeError("Invalid numeric segment")
+            digits.append(f"{value:0{size}d}")
+            count -= size
+    return ''.join(digits)
+
+
+def _read_alphanumeric(reader: _BitReader, count: int) -> str:
+    chars = []
+    while count >= 2:
+        value = reader.read(11)
+        if value >= 45 * 45:
+            raise DecodeError("Invalid alphanumeric segment")
+        chars.append(ALPHANUMERIC_CHARS[value // 45])
+        chars.append(ALPHANUMERIC_CHARS[value % 45])
+        count -= 2
+    if count == 1:
+        value = reader.read(6)
+        if value >= 45:
+            raise DecodeError("Invalid alphanumeric segment")
+        chars.append(ALPHANUMERIC_CHARS[value])
+    return ''.join(chars)
+
+
+def _read_kanji(reader: _BitReader, count: int) -> str:
+    kanji = bytearray()
+    for _ in range(count):
+        value = reader.read(13)
+        value = (value // 0xC0) << 8 | (value % 0xC0)
+        value += 0x8140 if value < 0x1F00 else 0xC140
+        kanji += value.to_bytes(2, 'big')
+    return kanji.decode('shift_jis', errors='replace')
+
+
+def _read_eci(reader: _BitReader) -> str:
+    first = reader.read(8)
+    if first & 0x80 == 0:
+        assignment = first
+    elif first & 0xC0 == 0x80:
+        assignment = (first & 0x3F) << 8 | reader.read(8)
+    else:
+        assignment = (first & 0x1F) << 16 | reader.read(16)
+    return _ECI_ENCODINGS.get(assignment, 'utf-8')
+
+
+def decode_segments(data: bytes, version: int) -> str:
+    """Decode the data codewords of a symbol.
+
+    Byte segments are decoded as UTF-8 (falling back to ISO-8859-1) unless
+    an ECI header selects another character set.
+
+    Args:
+        data: Error-corrected data codewords
+        version: Symbol version (selects the count indicator lengths)
+
+    Returns:
+        Decoded text
+
+    Raises:
+        DecodeError: If the bit stream is malformed
+    """
+    reader = _BitReader(data)
+    parts: List[str] = []
+    raw = bytearray()
+    encoding = 'utf-8'
+
+    while reader.remaining >= 4:
+        mode = reader.read(4)
+        if mode == MODE_TERMINATOR:
+            break
+
+        if mode in (MODE_NUMERIC, MODE_ALPHANUMERIC, MODE_BYTE):
+            count = reader.read(_count_bits(mode, version))
+            if mode == MODE_NUMERIC:
+                raw += _read_numeric(reader, count).encode('ascii')
+            elif mode == MODE_ALPHANUMERIC:
+                raw += _read_alphanumeric(reader, count).encode('ascii')
+            else:
+                raw += bytes(reader.read(8) for _ in range(count))
+        elif mode in (MODE_KANJI, MODE_ECI):
+            # Flush bytes decoded so far with the current character set
+            parts.append(_decode_bytes(raw, encoding))
+            raw = bytearray()
+            if mode == MODE_KANJI:
+                parts.append(_read_kanji(reader, reader.read(_count_bits(mode, version))))
+            else:
+                encoding = _read_eci(reader)
+        elif mode == MODE_STRUCTURED_APPEND:
+            reader.read(16)
+        elif mode == MODE_FNC1_SECOND:
+            reader.read(8)
+        elif mode != MODE_FNC1_FIRST:
+            raise DecodeError(f"Unknown segment mode {mode:#x}")
+
+    parts.append(_decode_bytes(raw, encoding))
+    return ''.join(parts)
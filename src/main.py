@@ -5,31 +5,52 @@ QR Code Utils - Main Entry Point
 A comprehensive toolkit for generating various types of QR codes.
 """
 
+import os
 import sys
+
+# Add parent directory to path to allow absolute imports from src
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# pylint: disable=wrong-import-position  # Need to modify path before importing from src
+# pylint: disable=wrong-import-order  # The daemon client is imported before everything else
+from src.service.client import forward_and_exit
+
+# Hand the command to a running daemon before importing Pillow, qrcode and numpy
+if __name__ == '__main__':
+    forward_and_exit(sys.argv[1:])
+
 import argparse
+import json
+import signal
+import threading
+from contextlib import nullcontext
 from pathlib import Path
+from typing import Optional, Tuple
 from datetime import datetime
 from decimal import Decimal
+from functools import partial
 
-# Add parent directory to path to allow absolute imports from src
-sys.path.insert(0, str(Path(__file__).parent.parent))
-
-# pylint: disable=wrong-import-position  # Need to modify path before importing from src
 from src.common.config import Config
 from src.common.logger import setup_logger
-from src.core import (
-    URLQRGenerator,
-    VCardQRGenerator,
-    WiFiQRGenerator,
-    SMSQRGenerator,
-    EmailQRGenerator,
-    PhoneQRGenerator,
-    TextQRGenerator,
-    LocationQRGenerator,
-    EventQRGenerator,
-    WhatsAppQRGenerator,
-    PaymentQRGenerator,
-)
+from src.core import GeneratorFactory
+from src.batch import BatchRunner, JobPipe, SpoolWorker, load_jobs, safe_filename
+from src.batch.checkpoint import Checkpoint
+from src.batch.pipe import DEFAULT_IN_FLIGHT, RETURN_MODES
+from src.batch.runner import EXECUTORS, MANIFEST_NAME
+from src.batch.shard import merge_reports, parse_shard, shard_jobs
+from src.batch.spool import DEFAULT_POLL_INTERVAL, DEFAULT_STALE_AFTER
+from src.batch.watch import DEFAULT_POLL_INTERVAL as WATCH_POLL_INTERVAL, JobWatcher, SyncReport
+from src.core.verify import DEFAULT_MAX_DAMAGE
+from src.decoder import scan
+from src.decoder.scan import find_images
+from src.output import Manifest, QRMReader
+from src.output.archive import ARCHIVE_FORMATS, STDOUT
+from src.output.recolor import recolor_files, recolor_manifest
+from src.output.paths import LAYOUTS
+from src.output.sinks import OutputSink, open_sink
+from src.output.writer import FSYNC_POLICIES
+from src.service.client import socket_path
+from src.service.daemon import CommandDaemon, daemon_pid, start_daemon, stop_daemon
 
 
 def create_parser() -> argparse.ArgumentParser:
@@ -50,6 +71,36 @@ Examples:
 
   # Generate QR code with logo
   qr-utils url --url "https://example.com" --logo logo.png --output qr.png
+
+  # Generate QR codes for every row of a CSV/JSONL file
+  qr-utils batch --input jobs.csv --output-dir out/
+
+  # Encode only, then render the matrices elsewhere
+  qr-utils --output codes.qrm batch --input jobs.csv --encode-only
+  qr-utils render --input codes.qrm --output-dir out/
+
+  # Shard a large batch and look codes up in its manifest
+  qr-utils batch --input jobs.csv --output-dir out/ --layout sharded
+  qr-utils lookup --manifest out/manifest.sqlite --job customer-42
+
+  # Stream a batch as a ZIP archive to another program
+  qr-utils batch --input jobs.csv --archive - | ssh host 'cat > codes.zip'
+
+  # Upload a batch straight to an S3-compatible bucket (e.g. MinIO)
+  AWS_ENDPOINT_URL=http://localhost:9000 qr-utils batch --input jobs.csv --sink s3://codes/2024
+
+  # Keep one process generating codes for another program
+  echo '{"id": "a", "type": "text", "text": "hi"}' | qr-utils pipe --return base64
+
+  # Keep a warm process so repeated calls skip startup
+  qr-utils daemon start
+  qr-utils daemon stop
+
+  # Decode a directory and check it against the job file
+  qr-utils scan out/ --workers 4 --jobs jobs.csv
+
+  # Change the colors of a batch without re-rendering it
+  qr-utils recolor --manifest out/manifest.sqlite --fill-color navy --back-color white
         """
     )
 
@@ -62,7 +113,7 @@ Examples:
     parser.add_argument(
         '--output', '-o',
         type=str,
-        help='Output file path for QR code'
+        help="Output file path for QR code ('-' writes the PNG to stdout)"
     )
 
     parser.add_argument(
@@ -153,12 +204,231 @@ Examples:
     payment_parser.add_argument('--currency', default='USD', help='Currency code')
     payment_parser.add_argument('--message', help='Payment message')
 
+    add_tool_parsers(subparsers)
+    add_output_parsers(subparsers)
+
     return parser
 
 
+def add_tool_parsers(subparsers):
+    """Add the non-generator commands (batch processing, rendering, ...)."""
+    # Batch generation
+    batch_parser = subparsers.add_parser('batch', help='Generate QR codes from a CSV/JSONL file')
+    batch_parser.add_argument('--input', '-i', required=True,
+                             help='Job file (.csv with header row, or JSON Lines)')
+    batch_parser.add_argument('--output-dir',
+                             help='Directory for generated images (default: config output dir)')
+    batch_parser.add_argument('--encode-only', action='store_true',
+                             help='Write encoded matrices to one .qrm file (--output) '
+                                  'instead of rendering images')
+    batch_parser.add_argument('--verify', choices=['flag', 'fail'],
+                             help='Read every image back and flag or fail codes whose '
+                                  'damage (e.g. from a logo) exceeds --max-damage')
+    batch_parser.add_argument('--max-damage', type=float, default=DEFAULT_MAX_DAMAGE,
+                             help='Share of the error correction capacity damage may use '
+                                  f'(default: {DEFAULT_MAX_DAMAGE})')
+    batch_parser.add_argument('--layout', choices=list(LAYOUTS),
+                             help='Output directory layout; sharded spreads images over '
+                                  'hash-prefixed subdirectories (default: config output_layout)')
+    batch_parser.add_argument('--manifest',
+                             help='SQLite manifest of generated codes (default: '
+                                  'manifest.sqlite in the output directory for sharded layouts)')
+    batch_parser.add_argument('--archive',
+                             help="Stream all images into one ZIP/TAR archive ('-' for stdout) "
+                                  'instead of writing files')
+    batch_parser.add_argument('--executor', choices=list(EXECUTORS),
+                             help='Run jobs concurrently in threads or processes '
+                                  '(default: one at a time)')
+    batch_parser.add_argument('--workers', type=int,
+                             help='Number of concurrent workers for --executor '
+                                  '(default: CPU count)')
+    batch_parser.add_argument('--archive-format', choices=list(ARCHIVE_FORMATS),
+                             help='Archive format (default: from the file suffix, zip for stdout)')
+    batch_parser.add_argument('--sink',
+                             help='Store images in a directory, an SQLite database '
+                                  "('sqlite:codes.sqlite') or an S3-compatible bucket "
+                                  "('s3://bucket/prefix'; endpoint and credentials from the "
+                                  'AWS_* environment variables) instead of the output directory')
+    batch_parser.add_argument('--writers', type=int, default=0,
+                             help='Write images in this many background threads while '
+                                  'the next ones are encoded (default: write inline)')
+    batch_parser.add_argument('--fsync', choices=list(FSYNC_POLICIES), default='none',
+                             help="Sync written images to disk per file or once per batch "
+                                  "(default: none)")
+    batch_parser.add_argument('--drop-cache', action='store_true',
+                             help='Drop written images from the page cache so large batches '
+                                  'do not evict other data')
+    add_recycling_arguments(batch_parser)
+    batch_parser.add_argument('--schedule-window', type=int, default=0, metavar='N',
+                             help='Run each window of N jobs grouped by type, settings, logo '
+                                  'and size so cached logos and tables are reused '
+                                  '(default: input order)')
+    batch_parser.add_argument('--unordered', action='store_true',
+                             help='With --schedule-window, report results in the order jobs '
+                                  'ran instead of input order')
+    batch_parser.add_argument('--shard', metavar='I/N',
+                             help='Only generate the jobs of shard I of N (by a stable hash of '
+                                  'the job ID), e.g. 2/8; sharded layouts default to '
+                                  'manifest-I-of-N.sqlite')
+    batch_parser.add_argument('--report',
+                             help='Write a JSON status report (counts, failures, timing)')
+    batch_parser.add_argument('--resume', action='store_true',
+                             help='Skip jobs whose images an earlier run of the same batch '
+                                  'finished (per the checkpoint)')
+    batch_parser.add_argument('--checkpoint',
+                             help='Checkpoint of finished jobs (default: .<input name>.checkpoint '
+                                  'in the output directory)')
+
+    # Combine shard results
+    merge_parser = subparsers.add_parser(
+        'merge', help='Combine the manifests and status reports of batch shards'
+    )
+    merge_parser.add_argument('inputs', nargs='+',
+                             help='Shard manifests (.sqlite) and status reports (.json)')
+    merge_parser.add_argument('--manifest',
+                             help='Merged manifest (default: manifest.sqlite in the config '
+                                  'output dir)')
+    merge_parser.add_argument('--report', help='Write the merged status report to this file')
+
+    # JSONL coprocess
+    pipe_parser = subparsers.add_parser(
+        'pipe', help='Read JSONL jobs on stdin, write JSONL results on stdout'
+    )
+    pipe_parser.add_argument('--return', dest='return_mode', choices=list(RETURN_MODES),
+                            default='path',
+                            help='Return the image as a file path (written to --output-dir) '
+                                 'or inline as base64 / a data URI (default: path)')
+    pipe_parser.add_argument('--unordered', action='store_true',
+                            help='Write results as they finish instead of in input order')
+    pipe_parser.add_argument('--in-flight', type=int, default=DEFAULT_IN_FLIGHT,
+                            help='Maximum jobs read but not yet answered '
+                                 f'(default: {DEFAULT_IN_FLIGHT})')
+    pipe_parser.add_argument('--output-dir',
+                            help='Directory for generated images (default: config output dir)')
+    pipe_parser.add_argument('--max-rss', type=int, metavar='MIB',
+                            help='Clear caches whenever the process grows beyond this many MiB')
+
+    # Spool-directory worker
+    worker_parser = subparsers.add_parser(
+        'worker', help='Process job files dropped into a shared spool directory'
+    )
+    worker_parser.add_argument('--spool', required=True,
+                              help='Spool directory with incoming/, processing/, done/ '
+                                   'and failed/ subdirectories')
+    worker_parser.add_argument('--output-dir',
+                              help='Directory for generated images (default: config output dir)')
+    worker_parser.add_argument('--layout', choices=list(LAYOUTS),
+                              help='Output directory layout (default: config output_layout)')
+    worker_parser.add_argument('--manifest',
+                              help='SQLite manifest of generated codes (default: '
+                                   'manifest.sqlite in the output directory for sharded layouts)')
+    worker_parser.add_argument('--worker-id',
+                              help='Name of this worker (default: hostname and process ID)')
+    worker_parser.add_argument('--poll', type=float, default=DEFAULT_POLL_INTERVAL,
+                              help='Seconds between checks of an empty spool '
+                                   f'(default: {DEFAULT_POLL_INTERVAL})')
+    worker_parser.add_argument('--stale-after', type=float, default=DEFAULT_STALE_AFTER,
+                              help='Seconds without a heartbeat before a worker\'s claims are '
+                                   f'recovered (default: {DEFAULT_STALE_AFTER:.0f})')
+    worker_parser.add_argument('--executor', choices=list(EXECUTORS),
+                              help='Run each file\'s jobs concurrently in threads or processes')
+    worker_parser.add_argument('--workers', type=int,
+                              help='Number of concurrent workers for --executor '
+                                   '(default: CPU count)')
+    worker_parser.add_argument('--once', action='store_true',
+                              help='Exit when the spool is empty instead of waiting for files')
+    add_recycling_arguments(worker_parser)
+
+    # Regenerate changed rows of a job file
+    watch_parser = subparsers.add_parser(
+        'watch', help='Keep the QR codes of a job file up to date as it changes'
+    )
+    watch_parser.add_argument('--input', '-i', required=True,
+                             help='Job file to watch (.csv with header row, or JSON Lines)')
+    watch_parser.add_argument('--output-dir',
+                             help='Directory for generated images (default: config output dir)')
+    watch_parser.add_argument('--layout', choices=list(LAYOUTS),
+                             help='Output directory layout (default: config output_layout)')
+    watch_parser.add_argument('--poll', type=float, default=WATCH_POLL_INTERVAL,
+                             help='Seconds between checks of the file '
+                                  f'(default: {WATCH_POLL_INTERVAL})')
+    watch_parser.add_argument('--once', action='store_true',
+                             help='Sync once and exit instead of watching')
+
+    # Warm background process
+    daemon_parser = subparsers.add_parser(
+        'daemon', help='Keep a warm process that runs commands for the CLI'
+    )
+    daemon_parser.add_argument('action', choices=['start', 'stop', 'status', 'run'],
+                              help='run keeps the daemon in the foreground')
+
+
+
+def add_recycling_arguments(parser: argparse.ArgumentParser):
+    """Add the worker recycling options of long-running batch commands."""
+    parser.add_argument('--max-tasks-per-worker', type=int, metavar='N',
+                        help='Replace --executor process workers after N jobs each')
+    parser.add_argument('--max-worker-rss', type=int, metavar='MIB',
+                        help='Clear caches of processes grown beyond this many MiB, and '
+                             'replace process workers still above it')
+
+
+def add_output_parsers(subparsers):
+    """Add the commands that work on generated output (render, lookup, recolor, scan)."""
+    # Render a .qrm container
+    render_parser = subparsers.add_parser('render', help='Render QR codes from a .qrm file')
+    render_parser.add_argument('--input', '-i', required=True, help='.qrm file to render')
+    render_parser.add_argument('--record', type=int,
+                              help='Render only this record (0-based); default: all')
+    render_parser.add_argument('--output-dir',
+                              help='Directory for rendered images (default: config output dir)')
+
+    # Look up codes in a manifest
+    lookup_parser = subparsers.add_parser('lookup', help='Find generated codes in a manifest')
+    lookup_parser.add_argument('--manifest', '-m',
+                              help='Manifest file (default: manifest.sqlite in the config '
+                                   'output dir)')
+    lookup_group = lookup_parser.add_mutually_exclusive_group(required=True)
+    lookup_group.add_argument('--job', help='Job ID to look up')
+    lookup_group.add_argument('--payload', help='Encoded payload to look up')
+
+    # Change the colors of generated codes
+    recolor_parser = subparsers.add_parser(
+        'recolor', help='Change the colors of two-color PNG codes without re-rendering them'
+    )
+    recolor_parser.add_argument('paths', nargs='*',
+                               help='PNG files or directories (default: the codes in the '
+                                    'manifest)')
+    recolor_parser.add_argument('--manifest', '-m',
+                               help='Manifest whose codes to recolor; their recorded settings '
+                                    'are updated (default: manifest.sqlite in the config '
+                                    'output dir)')
+    recolor_parser.add_argument('--fill-color', required=True, help='New module color')
+    recolor_parser.add_argument('--back-color', required=True,
+                               help="New background color ('transparent' for none)")
+    recolor_parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                               help='Number of threads (default: CPU count)')
+    recolor_parser.add_argument('--recursive', '-r', action='store_true',
+                               help='Also recolor PNGs in subdirectories')
+
+    # Decode a directory of images
+    scan_parser = subparsers.add_parser('scan', help='Decode all QR code images in a directory')
+    scan_parser.add_argument('directory', help='Directory of images to decode')
+    scan_parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Number of decoding processes (default: CPU count)')
+    scan_parser.add_argument('--jobs', '-j',
+                            help='Job file the images were generated from; decoded payloads '
+                                 'are compared with what each generator produces')
+    scan_parser.add_argument('--recursive', '-r', action='store_true',
+                            help='Also scan subdirectories')
+    scan_parser.add_argument('--layout', choices=list(LAYOUTS),
+                            help='Layout the batch was written with (sharded implies '
+                                 '--recursive; default: config output_layout)')
+
+
 def handle_url(args, config: Config) -> Path:
     """Handle URL QR code generation."""
-    generator = URLQRGenerator(config)
+    generator = GeneratorFactory.shared(config).get('url')
     return generator.generate(
         url=args.url,
         output_path=args.output,
@@ -168,7 +438,7 @@ def handle_url(args, config: Config) -> Path:
 
 def handle_vcard(args, config: Config) -> Path:
     """Handle vCard QR code generation."""
-    generator = VCardQRGenerator(config)
+    generator = GeneratorFactory.shared(config).get('vcard')
     return generator.generate(
         first_name=args.first_name,
         last_name=args.last_name,
@@ -186,7 +456,7 @@ def handle_vcard(args, config: Config) -> Path:
 
 def handle_wifi(args, config: Config) -> Path:
     """Handle WiFi QR code generation."""
-    generator = WiFiQRGenerator(config)
+    generator = GeneratorFactory.shared(config).get('wifi')
     return generator.generate(
         ssid=args.ssid,
         password=args.password,
@@ -199,7 +469,7 @@ def handle_wifi(args, config: Config) -> Path:
 
 def handle_sms(args, config: Config) -> Path:
     """Handle SMS QR code generation."""
-    generator = SMSQRGenerator(config)
+    generator = GeneratorFactory.shared(config).get('sms')
     return generator.generate(
         phone_number=args.phone,
         message=args.message,
@@ -210,7 +480,7 @@ def handle_sms(args, config: Config) -> Path:
 
 def handle_email(args, config: Config) -> Path:
     """Handle email QR code generation."""
-    generator = EmailQRGenerator(config)
+    generator = GeneratorFactory.shared(config).get('email')
     return generator.generate(
         email=args.email,
         subject=args.subject,
@@ -222,7 +492,7 @@ def handle_email(args, config: Config) -> Path:
 
 def handle_phone(args, config: Config) -> Path:
     """Handle phone QR code generation."""
-    generator = PhoneQRGenerator(config)
+    generator = GeneratorFactory.shared(config).get('phone')
     return generator.generate(
         phone_number=args.phone,
         output_path=args.output,
@@ -232,7 +502,7 @@ def handle_phone(args, config: Config) -> Path:
 
 def handle_text(args, config: Config) -> Path:
     """Handle text QR code generation."""
-    generator = TextQRGenerator(config)
+    generator = GeneratorFactory.shared(config).get('text')
     return generator.generate(
         text=args.text,
         output_path=args.output,
@@ -242,7 +512,7 @@ def handle_text(args, config: Config) -> Path:
 
 def handle_location(args, config: Config) -> Path:
     """Handle location QR code generation."""
-    generator = LocationQRGenerator(config)
+    generator = GeneratorFactory.shared(config).get('location')
     return generator.generate(
         latitude=args.latitude,
         longitude=args.longitude,
@@ -255,7 +525,7 @@ def handle_location(args, config: Config) -> Path:
 def handle_event(args, config: Config) -> Path:
     """Handle event QR code generation."""
 
-    generator = EventQRGenerator(config)
+    generator = GeneratorFactory.shared(config).get('event')
 
     # Parse datetime strings
     start_time = datetime.strptime(args.start, "%Y-%m-%d %H:%M")
@@ -274,7 +544,7 @@ def handle_event(args, config: Config) -> Path:
 
 def handle_whatsapp(args, config: Config) -> Path:
     """Handle WhatsApp QR code generation."""
-    generator = WhatsAppQRGenerator(config)
+    generator = GeneratorFactory.shared(config).get('whatsapp')
     return generator.generate(
         phone_number=args.phone,
         message=args.message,
@@ -286,7 +556,7 @@ def handle_whatsapp(args, config: Config) -> Path:
 def handle_payment(args, config: Config) -> Path:
     """Handle payment QR code generation."""
 
-    generator = PaymentQRGenerator(config)
+    generator = GeneratorFactory.shared(config).get('payment')
 
     amount = Decimal(str(args.amount)) if args.amount else None
 
@@ -301,15 +571,346 @@ def handle_payment(args, config: Config) -> Path:
     )
 
 
-def main():
-    """Main entry point."""
-    parser = create_parser()
-    args = parser.parse_args()
+def batch_files(args, config: Config) -> Tuple[Optional[Path], Optional[Path]]:
+    """Return the manifest and checkpoint paths for a batch command.
+
+    Shards may share an output directory, so each gets its own manifest
+    and checkpoint. Encode-only, archive and sink batches have no
+    checkpoint unless one is requested.
+    """
+    output_dir = Path(args.output_dir) if args.output_dir else config.output_dir
+    suffix = f"-{'-of-'.join(map(str, parse_shard(args.shard)))}" if args.shard else ''
+
+    manifest_path = Path(args.manifest) if args.manifest else None
+    if (args.shard and manifest_path is None and args.archive is None
+            and (args.layout or config.get_output_layout()) == 'sharded'):
+        manifest_path = output_dir / f"manifest{suffix}.sqlite"
+
+    checkpoint_path = Path(args.checkpoint) if args.checkpoint else None
+    if checkpoint_path is None and (args.resume
+                                    or not (args.encode_only or args.archive or args.sink)):
+        checkpoint_path = output_dir / f".{Path(args.input).stem}{suffix}.checkpoint"
+    return manifest_path, checkpoint_path
+
+
+def handle_batch(args, config: Config) -> int:
+    """Handle batch generation from a job file."""
+    manifest_path, checkpoint_path = batch_files(args, config)
+    with open_sink(args.sink) if args.sink else nullcontext() as sink:
+        return run_batch(args, config, manifest_path, checkpoint_path, sink)
+
+
+def run_batch(args, config: Config, manifest_path: Optional[Path],
+              checkpoint_path: Optional[Path], sink: Optional[OutputSink]) -> int:
+    """Run a batch command's jobs and print its summary."""
+    index, count = parse_shard(args.shard) if args.shard else (1, 1)
+    runner = BatchRunner(
+        config,
+        output_dir=Path(args.output_dir) if args.output_dir else None,
+        encode_only=args.encode_only,
+        qrm_path=Path(args.output) if args.output else None,
+        default_logo=args.logo,
+        verify=args.verify,
+        max_damage=args.max_damage,
+        layout=args.layout,
+        manifest_path=manifest_path,
+        archive=args.archive,
+        archive_format=args.archive_format,
+        sink=sink,
+        writers=args.writers,
+        fsync=args.fsync,
+        drop_cache=args.drop_cache,
+        max_tasks_per_worker=args.max_tasks_per_worker,
+        max_worker_rss=mebibytes(args.max_worker_rss),
+        schedule_window=args.schedule_window,
+        ordered=not args.unordered
+    )
+    jobs = shard_jobs(load_jobs(args.input), index, count)
+    with (Checkpoint(checkpoint_path, resume=args.resume) if checkpoint_path
+          else nullcontext()) as checkpoint:
+        report = runner.run(jobs, executor=args.executor, workers=args.workers,
+                            checkpoint=checkpoint)
+    if args.report:
+        manifest = str(runner.manifest_path) if runner.manifest_path else None
+        write_json(args.report, {'shard': args.shard, 'manifest': manifest, **report.to_dict()})
+
+    print(f"\n{'⚠️' if report.failed or report.flagged else '✅'} Batch finished: "
+          f"{report.succeeded}/{report.total} QR codes generated in {report.duration:.2f}s")
+    if report.skipped:
+        print(f"⏭️ Skipped {report.skipped} jobs finished by an earlier run")
+    if report.recycled:
+        print(f"♻️ Worker processes recycled {report.recycled} times")
+    if args.schedule_window and report.cache_hit_rate is not None:
+        print(f"🧮 Cache hit rate: {report.cache_hit_rate:.1%} "
+              f"of {report.cache_hits + report.cache_misses} lookups")
+    print(f"📁 Output: {report.output}")
+    if runner.manifest_path:
+        print(f"🗂️ Manifest: {runner.manifest_path}")
+    for result in report.failed:
+        print(f"❌ {result.job_id}: {result.error}")
+    for result in report.flagged:
+        print(f"⚠️ {result.job_id}: damage uses {result.damage:.0%} of the correction capacity")
+    return 1 if report.failed else 0
+
+
+def handle_merge(args, config: Config) -> int:
+    """Handle merging the manifests and status reports of batch shards."""
+    reports = [path for path in args.inputs if path.lower().endswith('.json')]
+    manifests = [path for path in args.inputs if not path.lower().endswith('.json')]
+
+    if manifests:
+        merged_path = Path(args.manifest) if args.manifest else config.output_dir / MANIFEST_NAME
+        with Manifest(merged_path) as manifest:
+            copied = manifest.merge(manifests)
+            print(f"🗂️ Manifest: {merged_path} ({copied} entries from {len(manifests)} shards, "
+                  f"{len(manifest)} in total)")
+    if not reports:
+        return 0
+
+    merged = merge_reports(reports)
+    if args.report:
+        write_json(args.report, merged)
+        print(f"📋 Report: {args.report}")
+    print(f"{'⚠️' if merged['failed'] or merged['missing_shards'] else '✅'} "
+          f"{merged['succeeded']}/{merged['total']} QR codes generated by "
+          f"{len(merged['shards']) or len(reports)} shards")
+    for failure in merged['failed']:
+        print(f"❌ {failure['id']}: {failure['error']}")
+    if merged['missing_shards']:
+        print(f"⚠️ Missing shards: {', '.join(merged['missing_shards'])}")
+    return 1 if merged['failed'] or merged['missing_shards'] else 0
+
+
+def mebibytes(size: Optional[int]) -> Optional[int]:
+    """Convert a size option given in MiB to bytes."""
+    return size << 20 if size is not None else None
+
+
+def write_json(path: str, data: dict):
+    """Write a JSON document, creating its directory."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, indent=2) + '\n', encoding='utf-8')
+
+
+def handle_pipe(args, config: Config) -> int:
+    """Handle JSONL coprocess mode on stdin/stdout."""
+    runner = BatchRunner(
+        config,
+        output_dir=Path(args.output_dir) if args.output_dir else None,
+        default_logo=args.logo,
+        max_worker_rss=mebibytes(args.max_rss)
+    )
+    pipe = JobPipe(runner, return_mode=args.return_mode, ordered=not args.unordered,
+                   in_flight=args.in_flight)
+    # Results go to the real stdout; sys.stdout was pointed at stderr
+    report = pipe.serve(sys.stdin, sys.__stdout__)
+    runner.logger.info("Pipe closed: %d succeeded, %d failed in %.2fs",
+                       report.succeeded, len(report.failed), report.duration)
+    return 0
+
+
+def handle_worker(args, config: Config) -> int:
+    """Handle a spool-directory worker."""
+    runner = BatchRunner(
+        config,
+        output_dir=Path(args.output_dir) if args.output_dir else None,
+        default_logo=args.logo,
+        layout=args.layout,
+        manifest_path=Path(args.manifest) if args.manifest else None,
+        max_tasks_per_worker=args.max_tasks_per_worker,
+        max_worker_rss=mebibytes(args.max_worker_rss)
+    )
+    worker = SpoolWorker(runner, args.spool, worker_id=args.worker_id, poll_interval=args.poll,
+                         stale_after=args.stale_after, executor=args.executor,
+                         workers=args.workers)
+    # Finish the current file on SIGTERM; Ctrl+C hands it back to the spool
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    print(f"👷 Worker {worker.worker_id} watching {worker.incoming}")
+    try:
+        report = worker.run(once=args.once, stop=stop)
+    except KeyboardInterrupt:
+        return 130
+
+    print(f"\n✅ Worker stopped: {report.succeeded}/{report.total} QR codes generated "
+          f"in {report.duration:.2f}s")
+    if report.recycled:
+        print(f"♻️ Worker processes recycled {report.recycled} times")
+    return 0
+
+
+def handle_watch(args, config: Config) -> int:
+    """Handle keeping a job file's QR codes in sync with its rows."""
+    runner = BatchRunner(
+        config,
+        output_dir=Path(args.output_dir) if args.output_dir else None,
+        default_logo=args.logo,
+        layout=args.layout
+    )
+    watcher = JobWatcher(runner, args.input, poll_interval=args.poll)
+
+    def report(sync: SyncReport):
+        print(f"{'⚠️' if sync.failed else '✅'} {args.input}: {sync.added} added, "
+              f"{sync.changed} changed, {sync.removed} removed, {sync.unchanged} unchanged")
+        for result in sync.failed:
+            print(f"❌ {result.job_id}: {result.error}")
+
+    if args.once:
+        sync = watcher.sync()
+        report(sync)
+        return 1 if sync.failed else 0
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    print(f"👀 Watching {args.input} (Ctrl+C to stop)")
+    try:
+        watcher.watch(stop, on_sync=report)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def handle_daemon(args, config: Config) -> int:
+    """Handle starting, stopping and running the command daemon."""
+    if args.action == 'run':
+        CommandDaemon(config.config_dir, partial(main, parser=create_parser())).serve_forever()
+        return 0
+
+    if args.action == 'start':
+        command = [sys.executable, os.path.abspath(__file__),
+                   '--config-dir', str(config.config_dir), 'daemon', 'run']
+        try:
+            start_daemon(config.config_dir, command)
+        except RuntimeError as e:
+            print(f"❌ Error: {e}", file=sys.stderr)
+            return 1
+    elif args.action == 'stop':
+        if stop_daemon(config.config_dir):
+            print("✅ Daemon stopped")
+            return 0
+
+    pid = daemon_pid(config.config_dir)
+    if pid is None:
+        print("❌ Daemon is not running")
+        return 1
+    print(f"✅ Daemon running (PID {pid}) on {socket_path(config.config_dir)}")
+    return 0
+
+
+def handle_render(args, config: Config) -> int:
+    """Handle rendering of a .qrm container to images."""
+    output_dir = Path(args.output_dir) if args.output_dir else config.output_dir
+    output_dir.mkdir(parents=True, exist_ok=True)
+    settings = config.get_qr_settings()
+
+    with QRMReader(args.input) as reader:
+        indexes = [args.record] if args.record is not None else range(len(reader))
+        for index in indexes:
+            record = reader[index]
+            name = safe_filename(record.job_id) if record.job_id else f"record_{record.index}"
+            record.render(settings).save(output_dir / f"{name}.png")
+
+    print(f"\n✅ Rendered {len(indexes)} QR code(s) from {args.input}")
+    print(f"📁 Output: {output_dir}")
+    return 0
+
+
+def handle_lookup(args, config: Config) -> int:
+    """Handle looking up generated codes in a manifest."""
+    manifest_path = Path(args.manifest) if args.manifest else config.output_dir / MANIFEST_NAME
+    if not manifest_path.exists():
+        print(f"❌ Error: manifest {manifest_path} not found", file=sys.stderr)
+        return 1
+    with Manifest(manifest_path) as manifest:
+        if args.job is not None:
+            entry = manifest.get(args.job)
+            entries = [entry] if entry else []
+        else:
+            entries = manifest.find_payload(args.payload)
+
+    if not entries:
+        print("❌ No matching codes")
+        return 1
+    for entry in entries:
+        print(f"{entry.job_id}\t{entry.qr_type or ''}\t{entry.path}")
+    return 0
+
+
+def handle_recolor(args, config: Config) -> int:
+    """Handle recoloring generated codes in place."""
+    workers = max(args.workers, 1)
+    if args.paths and args.manifest:
+        print("❌ Error: give either paths or --manifest, not both", file=sys.stderr)
+        return 1
+    if args.paths:
+        paths = []
+        for path in map(Path, args.paths):
+            if path.is_dir():
+                paths.extend(image for image in find_images(path, args.recursive)
+                             if image.suffix.lower() == '.png')
+            else:
+                paths.append(path)
+        report = recolor_files(paths, args.fill_color, args.back_color, workers=workers)
+    else:
+        manifest_path = (Path(args.manifest) if args.manifest
+                         else config.output_dir / MANIFEST_NAME)
+        if not manifest_path.exists():
+            print(f"❌ Error: manifest {manifest_path} not found", file=sys.stderr)
+            return 1
+        report = recolor_manifest(manifest_path, args.fill_color, args.back_color,
+                                  workers=workers)
+
+    print(f"\n{'⚠️' if report.failed else '✅'} Recolored {report.recolored}/{report.total} "
+          f"codes in {report.duration:.2f}s ({report.in_place} patched in place)")
+    for result in report.failed:
+        print(f"❌ {result.path}: {result.error}")
+    return 1 if report.failed else 0
+
+
+def handle_scan(args, config: Config) -> int:
+    """Handle decoding (and checking) a directory of QR code images."""
+    directory = Path(args.directory)
+    if not directory.is_dir():
+        print(f"❌ Error: {directory} is not a directory", file=sys.stderr)
+        return 1
+
+    runner = BatchRunner(config, output_dir=directory, layout=args.layout)
+    expected = runner.expected_payloads(load_jobs(args.jobs)) if args.jobs else None
+    report = scan(directory, workers=max(args.workers, 1), expected=expected,
+                  recursive=args.recursive or runner.layout.sharded)
+
+    problems = report.failed or report.mismatched or report.missing
+    rate = report.total / report.duration if report.duration else 0.0
+    print(f"\n{'⚠️' if problems else '✅'} Scan finished: {report.decoded}/{report.total} "
+          f"images decoded in {report.duration:.2f}s ({rate:.0f} images/s)")
+    for result in report.failed:
+        print(f"❌ {result.path}: {result.error}")
+    for result in report.mismatched:
+        print(f"❌ {result.path}: decoded {result.data!r}, expected {result.expected!r}")
+    for path in report.missing:
+        print(f"❌ {path}: missing")
+    return 1 if problems else 0
+
+
+def main(argv=None, parser=None):
+    """Main entry point.
+
+    Args:
+        argv: Command line arguments (default: sys.argv[1:])
+        parser: Parser to reuse (default: a new one from create_parser())
+    """
+    parser = parser or create_parser()
+    args = parser.parse_args(argv)
 
     if not args.command:
         parser.print_help()
         sys.exit(1)
 
+    # Keep messages out of image data and pipe results written to stdout
+    if args.command == 'pipe' or STDOUT in (args.output, getattr(args, 'archive', None)):
+        sys.stdout = sys.stderr
+
     # Initialize configuration
     config_dir = Path(args.config_dir) if args.config_dir else None
     config = Config(config_dir)
@@ -318,6 +919,22 @@ def main():
     logger = setup_logger('main', log_dir=config.logs_dir)
 
     try:
+        # Commands that report their own results and exit status
+        tools = {
+            'batch': handle_batch,
+            'merge': handle_merge,
+            'daemon': handle_daemon,
+            'pipe': handle_pipe,
+            'watch': handle_watch,
+            'worker': handle_worker,
+            'render': handle_render,
+            'lookup': handle_lookup,
+            'recolor': handle_recolor,
+            'scan': handle_scan,
+        }
+        if args.command in tools:
+            sys.exit(tools[args.command](args, config))
+
         # Dispatch to appropriate handler
         handlers = {
             'url': handle_url,
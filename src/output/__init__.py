@@ -0,0 +1,18 @@
+"""Output formats and writers for QR Code Utils."""
+
+from .archive import ArchiveWriter, TarArchiveWriter, ZipArchiveWriter, open_archive
+from .manifest import Manifest, ManifestEntry
+from .paths import OutputLayout, content_key, ensure_parent, with_parent
+from .qrm import QRMReader, QRMRecord, QRMWriter
+from .raster import PNGStreamWriter, RasterWriter, TIFFStreamWriter, open_raster
+from .recolor import RecolorReport, recolor_files, recolor_manifest, recolor_png
+from .sinks import LocalSink, OutputSink, S3Sink, SQLiteSink, open_sink
+from .writer import BackgroundWriter
+
+__all__ = [
+    'ArchiveWriter', 'BackgroundWriter', 'LocalSink', 'Manifest', 'ManifestEntry', 'OutputLayout',
+    'OutputSink', 'PNGStreamWriter', 'QRMReader', 'QRMRecord', 'QRMWriter', 'RasterWriter',
+    'RecolorReport', 'S3Sink', 'SQLiteSink', 'TIFFStreamWriter', 'TarArchiveWriter',
+    'ZipArchiveWriter', 'content_key', 'ensure_parent', 'open_archive', 'open_raster', 'open_sink',
+    'recolor_files', 'recolor_manifest', 'recolor_png', 'with_parent'
+]
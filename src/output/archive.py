@@ -0,0 +1,224 @@
+"""Streaming ZIP and TAR writers for batch output.
+
+Entries are written one at a time as they are produced, so a batch never
+needs the individual files on disk and memory use does not grow with the
+number of entries (the index is spooled to a temporary file). Both formats
+are written in streaming mode and work on non-seekable outputs such as
+stdout. ZIP entries are stored uncompressed, since PNGs are already
+compressed.
+
+The last entry of every archive is an index in JSON Lines format with one
+object per entry: name, size, SHA-256 and any metadata passed to add().
+"""
+
+from __future__ import annotations
+import hashlib
+import io
+import json
+import shutil
+import sys
+import tarfile
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+from typing import Any, BinaryIO, Optional, Union
+
+ARCHIVE_FORMATS = ('zip', 'tar', 'tgz')
+INDEX_NAME = 'index.jsonl'
+STDOUT = '-'
+
+_SUFFIX_FORMATS = {
+    '.zip': 'zip',
+    '.tar': 'tar',
+    '.tgz': 'tgz',
+    '.gz': 'tgz',
+}
+
+
+def binary_stdout() -> BinaryIO:
+    """Return the process's binary standard output.
+
+    This is the real stdout even when ``sys.stdout`` has been pointed at
+    stderr to keep messages out of a data stream.
+    """
+    return (sys.__stdout__ or sys.stdout).buffer
+
+
+def archive_format(target: Union[str, Path, BinaryIO], archive_type: Optional[str] = None) -> str:
+    """Resolve the archive format from an explicit type or the file suffix.
+
+    Args:
+        target: Archive path, '-' or file object
+        archive_type: Explicit format ('zip', 'tar' or 'tgz')
+
+    Returns:
+        Archive format (ZIP for stdout and unknown suffixes)
+
+    Raises:
+        ValueError: If the explicit format is unknown
+    """
+    if archive_type:
+        if archive_type not in ARCHIVE_FORMATS:
+            raise ValueError(
+                f"Unknown archive format: {archive_type} (expected one of {ARCHIVE_FORMATS})"
+            )
+        return archive_type
+    if isinstance(target, (str, Path)) and str(target) != STDOUT:
+        return _SUFFIX_FORMATS.get(Path(target).suffix.lower(), 'zip')
+    return 'zip'
+
+
+class ArchiveWriter:
+    """Base class for streaming archive writers.
+
+    Use as a context manager; the index entry is written on close.
+    """
+
+    def __init__(self, target: Union[str, Path, BinaryIO], index_name: str = INDEX_NAME):
+        """Open the archive.
+
+        Args:
+            target: Archive path, '-' for stdout, or a binary file object
+            index_name: Name of the final index entry
+        """
+        if isinstance(target, (str, Path)) and str(target) == STDOUT:
+            target = binary_stdout()
+        if isinstance(target, (str, Path)):
+            self.path: Optional[Path] = Path(target)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._stream: BinaryIO = open(self.path, 'wb')  # pylint: disable=consider-using-with
+            self._owns_stream = True
+        else:
+            self.path = None
+            self._stream = target
+            self._owns_stream = False
+        self.index_name = index_name
+        self._index = tempfile.TemporaryFile()  # pylint: disable=consider-using-with
+        self._count = 0
+        self._closed = False
+
+    def __enter__(self) -> ArchiveWriter:
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def add(self, name: str, data: bytes, mtime: Optional[float] = None, **metadata: Any):
+        """Append one entry.
+
+        Args:
+            name: Entry name (may contain '/' for directories)
+            data: Entry contents
+            mtime: Modification time (default: now)
+            **metadata: Extra JSON-serializable fields for the index
+        """
+        mtime = time.time() if mtime is None else mtime
+        self._write_entry(name, data, mtime)
+        record = {'name': name, 'size': len(data), 'sha256': hashlib.sha256(data).hexdigest()}
+        record.update(metadata)
+        self._index.write(json.dumps(record, default=str).encode('utf-8') + b'\n')
+        self._count += 1
+
+    def close(self):
+        """Write the index entry and finish the archive."""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            size = self._index.tell()
+            self._index.seek(0)
+            self._write_stream(self.index_name, self._index, size, time.time())
+            self._finish()
+        finally:
+            self._index.close()
+            if self._owns_stream:
+                self._stream.close()
+            else:
+                self._stream.flush()
+
+    def _write_entry(self, name: str, data: bytes, mtime: float):
+        self._write_stream(name, io.BytesIO(data), len(data), mtime)
+
+    def _write_stream(self, name: str, source: BinaryIO, size: int, mtime: float):
+        raise NotImplementedError
+
+    def _finish(self):
+        raise NotImplementedError
+
+
+class ZipArchiveWriter(ArchiveWriter):
+    """Streaming ZIP writer (entries stored uncompressed)."""
+
+    def __init__(self, target: Union[str, Path, BinaryIO], index_name: str = INDEX_NAME):
+        super().__init__(target, index_name)
+        self._zip = zipfile.ZipFile(  # pylint: disable=consider-using-with
+            self._stream, 'w', compression=zipfile.ZIP_STORED
+        )
+
+    def _zip_info(self, name: str, size: int, mtime: float) -> zipfile.ZipInfo:
+        info = zipfile.ZipInfo(name, date_time=time.localtime(mtime)[:6])
+        info.compress_type = zipfile.ZIP_STORED
+        info.external_attr = 0o644 << 16
+        info.file_size = size
+        return info
+
+    def _write_entry(self, name: str, data: bytes, mtime: float):
+        self._zip.writestr(self._zip_info(name, len(data), mtime), data)
+
+    def _write_stream(self, name: str, source: BinaryIO, size: int, mtime: float):
+        info = self._zip_info(name, size, mtime)
+        with self._zip.open(info, 'w', force_zip64=size >= zipfile.ZIP64_LIMIT) as entry:
+            shutil.copyfileobj(source, entry)
+
+    def _finish(self):
+        self._zip.close()
+
+
+class TarArchiveWriter(ArchiveWriter):
+    """Streaming TAR writer, optionally gzip-compressed."""
+
+    def __init__(
+        self,
+        target: Union[str, Path, BinaryIO],
+        index_name: str = INDEX_NAME,
+        compress: bool = False
+    ):
+        super().__init__(target, index_name)
+        self._tar = tarfile.open(  # pylint: disable=consider-using-with
+            fileobj=self._stream, mode='w|gz' if compress else 'w|', format=tarfile.PAX_FORMAT
+        )
+
+    def _write_stream(self, name: str, source: BinaryIO, size: int, mtime: float):
+        info = tarfile.TarInfo(name)
+        info.size = size
+        info.mtime = int(mtime)
+        info.mode = 0o644
+        self._tar.addfile(info, source)
+
+    def _finish(self):
+        self._tar.close()
+
+
+def open_archive(
+    target: Union[str, Path, BinaryIO],
+    archive_type: Optional[str] = None,
+    index_name: str = INDEX_NAME
+) -> ArchiveWriter:
+    """Open a streaming archive writer.
+
+    Args:
+        target: Archive path, '-' for stdout, or a binary file object
+        archive_type: 'zip', 'tar' or 'tgz' (default: from the suffix, ZIP otherwise)
+        index_name: Name of the final index entry
+
+    Returns:
+        ArchiveWriter
+    """
+    resolved = archive_format(target, archive_type)
+    if resolved == 'zip':
+        return ZipArchiveWriter(target, index_name)
+    return TarArchiveWriter(target, index_name, compress=resolved == 'tgz')
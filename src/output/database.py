@@ -0,0 +1,76 @@
+"""SQLite databases with buffered, batched writes (manifests and blob sinks)."""
+
+from __future__ import annotations
+import sqlite3
+import threading
+from pathlib import Path
+from typing import List, Union
+
+
+class BufferedDatabase:
+    """SQLite database whose inserts are buffered and committed in batches.
+
+    Use as a context manager (or call close()) to flush the last batch. The
+    database may be shared between threads. Several processes may write the
+    same file, each through its own instance (WAL journal).
+
+    Subclasses set SCHEMA, TABLE and INSERT (a statement taking one buffered
+    record).
+    """
+
+    SCHEMA = ''
+    TABLE = ''
+    INSERT = ''
+
+    def __init__(self, path: Union[str, Path], batch_size: int):
+        """Open or create the database.
+
+        Args:
+            path: Database file
+            batch_size: Number of records buffered per transaction
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self._lock = threading.RLock()
+        self._connection = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        self._connection.executescript(self.SCHEMA)
+        self._pending: List[tuple] = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _buffer(self, record: tuple):
+        """Queue a record for the next batch, committing the batch when full."""
+        with self._lock:
+            self._pending.append(record)
+            if len(self._pending) >= self.batch_size:
+                self.flush()
+
+    def flush(self):
+        """Commit buffered records."""
+        with self._lock:
+            if not self._pending or self._connection is None:
+                return
+            with self._connection:
+                self._connection.executemany(self.INSERT, self._pending)
+            self._pending = []
+
+    def __len__(self) -> int:
+        with self._lock:
+            self.flush()
+            return self._connection.execute(f"SELECT COUNT(*) FROM {self.TABLE}").fetchone()[0]
+
+    def close(self):
+        """Flush pending records and close the database."""
+        with self._lock:
+            if self._connection is None:
+                return
+            self.flush()
+            self._connection.close()
+            self._connection = None
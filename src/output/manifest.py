@@ -0,0 +1,200 @@
+"""SQLite manifest of generated codes.
+
+The manifest maps job IDs and payload hashes to output paths, effective
+settings and timings. Job IDs, payload hashes and paths are indexed, so
+lookups stay logarithmic however many codes a directory holds.
+"""
+
+from __future__ import annotations
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from .database import BufferedDatabase
+from .qrm import payload_hash
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS codes (
+    job_id TEXT PRIMARY KEY,
+    payload_hash TEXT NOT NULL,
+    path TEXT NOT NULL,
+    qr_type TEXT,
+    settings TEXT,
+    duration REAL,
+    created REAL
+);
+CREATE INDEX IF NOT EXISTS codes_payload_hash ON codes (payload_hash);
+CREATE INDEX IF NOT EXISTS codes_path ON codes (path);
+"""
+
+_COLUMNS = 'job_id, payload_hash, path, qr_type, settings, duration, created'
+
+
+class ManifestEntry:
+    """One generated code recorded in a manifest."""
+
+    __slots__ = ('job_id', 'payload_hash', 'path', 'qr_type', 'settings', 'duration', 'created')
+
+    def __init__(self, row: tuple):
+        job_id, digest, path, qr_type, settings, duration, created = row
+        self.job_id = job_id
+        self.payload_hash = digest
+        self.path = Path(path)
+        self.qr_type = qr_type
+        self.settings: Dict[str, Any] = json.loads(settings) if settings else {}
+        self.duration = duration
+        self.created = created
+
+    def __repr__(self) -> str:
+        return f"ManifestEntry(job_id={self.job_id!r}, path={str(self.path)!r})"
+
+
+class Manifest(BufferedDatabase):
+    """Index of generated codes stored in an SQLite database.
+
+    Writes are buffered and committed in batches; use the manifest as a
+    context manager (or call close()) to flush the last batch. A manifest
+    may be shared between threads. Several processes may write the same
+    database, each through its own Manifest.
+    """
+
+    SCHEMA = SCHEMA
+    TABLE = 'codes'
+    INSERT = f"INSERT OR REPLACE INTO codes ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)"
+
+    def __init__(self, path: Union[str, Path], batch_size: int = 500):
+        """Open or create a manifest.
+
+        Args:
+            path: Database file
+            batch_size: Number of records buffered per transaction
+        """
+        super().__init__(path, batch_size)
+
+    def __enter__(self) -> Manifest:
+        return self
+
+    def add(
+        self,
+        job_id: str,
+        payload: str,
+        path: Union[str, Path],
+        *,
+        qr_type: Optional[str] = None,
+        settings: Optional[Dict[str, Any]] = None,
+        duration: Optional[float] = None
+    ):
+        """Record a generated code (replacing any entry for the same job ID).
+
+        Args:
+            job_id: Job identifier
+            payload: Encoded payload (stored as its hash)
+            path: Output path (stored as an absolute path)
+            qr_type: QR type name
+            settings: Effective QR settings
+            duration: Generation time in seconds
+        """
+        record = (
+            job_id,
+            payload_hash(payload).hex(),
+            os.path.abspath(path),
+            qr_type,
+            json.dumps(settings, sort_keys=True, default=str) if settings else None,
+            duration,
+            time.time(),
+        )
+        self._buffer(record)
+
+    def get(self, job_id: str) -> Optional[ManifestEntry]:
+        """Return the entry for a job ID, or None."""
+        with self._lock:
+            self.flush()
+            row = self._connection.execute(
+                f"SELECT {_COLUMNS} FROM codes WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        return ManifestEntry(row) if row else None
+
+    def find_payload(self, payload: str) -> List[ManifestEntry]:
+        """Return all entries that encode a payload."""
+        with self._lock:
+            self.flush()
+            rows = self._connection.execute(
+                f"SELECT {_COLUMNS} FROM codes WHERE payload_hash = ?",
+                (payload_hash(payload).hex(),)
+            ).fetchall()
+        return [ManifestEntry(row) for row in rows]
+
+    def entries(self) -> List[ManifestEntry]:
+        """Return all entries, ordered by job ID."""
+        with self._lock:
+            self.flush()
+            rows = self._connection.execute(
+                f"SELECT {_COLUMNS} FROM codes ORDER BY job_id"
+            ).fetchall()
+        return [ManifestEntry(row) for row in rows]
+
+    def update_settings(self, settings: Iterable[Tuple[str, Dict[str, Any]]]) -> int:
+        """Replace the recorded settings of existing entries.
+
+        Args:
+            settings: (job ID, effective QR settings) pairs
+
+        Returns:
+            Number of entries updated
+        """
+        with self._lock:
+            self.flush()
+            with self._connection:
+                return self._connection.executemany(
+                    "UPDATE codes SET settings = ? WHERE job_id = ?",
+                    ((json.dumps(values, sort_keys=True, default=str), job_id)
+                     for job_id, values in settings)
+                ).rowcount
+
+    def remove(self, job_ids: Iterable[str]) -> int:
+        """Delete the entries of job IDs.
+
+        Returns:
+            Number of entries deleted
+        """
+        with self._lock:
+            self.flush()
+            with self._connection:
+                return self._connection.executemany(
+                    "DELETE FROM codes WHERE job_id = ?", ((job_id,) for job_id in job_ids)
+                ).rowcount
+
+    def merge(self, sources: Iterable[Union[str, Path]]) -> int:
+        """Copy the entries of other manifests into this one.
+
+        Entries for a job ID that is already present are replaced, so
+        merging is idempotent and later sources win.
+
+        Args:
+            sources: Manifest files to merge
+
+        Returns:
+            Number of entries copied
+
+        Raises:
+            FileNotFoundError: If a source doesn't exist
+        """
+        copied = 0
+        with self._lock:
+            self.flush()
+            for source in sources:
+                if not os.path.isfile(source):
+                    # ATTACH would silently create an empty database
+                    raise FileNotFoundError(f"Manifest not found: {source}")
+                self._connection.execute("ATTACH DATABASE ? AS source", (str(source),))
+                try:
+                    with self._connection:
+                        copied += self._connection.execute(
+                            f"INSERT OR REPLACE INTO codes ({_COLUMNS}) "
+                            f"SELECT {_COLUMNS} FROM source.codes"
+                        ).rowcount
+                finally:
+                    self._connection.execute("DETACH DATABASE source")
+        return copied
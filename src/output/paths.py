@@ -0,0 +1,150 @@
+"""Collision-free output names and hash-sharded directory layouts.
+
+Names are derived from a content hash (payload, settings and logo), so two
+different codes never share a file name and regenerating the same code
+overwrites the same file. With sharding, files are spread over
+``ab/cd/`` subdirectories taken from the hash, which keeps every directory
+small even for millions of codes.
+"""
+
+from __future__ import annotations
+import hashlib
+import json
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, TypeVar, Union
+
+LAYOUTS = ('flat', 'sharded')
+
+Written = TypeVar('Written')
+
+# Parent directories known to exist, so mkdir runs once per directory
+_created: Set[Path] = set()
+_created_lock = threading.Lock()
+
+
+def content_key(
+    payload: str,
+    settings: Optional[Dict[str, Any]] = None,
+    logo_path: Optional[str] = None
+) -> str:
+    """Return a hex digest identifying a rendered code.
+
+    Args:
+        payload: Encoded payload
+        settings: Effective QR settings
+        logo_path: Logo pasted onto the code, if any
+
+    Returns:
+        64-character hex SHA-256 digest
+    """
+    digest = hashlib.sha256(payload.encode('utf-8'))
+    if settings:
+        digest.update(json.dumps(settings, sort_keys=True, default=str).encode('utf-8'))
+    if logo_path:
+        digest.update(str(logo_path).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def ensure_parent(
+    path: Path,
+    cached: bool = True,
+    created: Optional[List[Path]] = None
+) -> Path:
+    """Create a file's parent directory once per process.
+
+    A directory removed after it was created isn't noticed here; writers
+    that outlive a single command use with_parent(), which recreates it.
+
+    Args:
+        path: File path
+        cached: Skip directories this process created before; pass False
+            where a missing directory wouldn't be retried
+        created: Receives the directories this call created, outermost
+            first (callers that sync directory entries need them)
+
+    Returns:
+        The path, unchanged
+    """
+    parent = path.parent
+    if not cached or parent not in _created:
+        missing: List[Path] = []
+        if created is not None:
+            directory = parent
+            while not directory.is_dir() and directory != directory.parent:
+                missing.append(directory)
+                directory = directory.parent
+        parent.mkdir(parents=True, exist_ok=True)
+        if created is not None:
+            created.extend(reversed(missing))
+        with _created_lock:
+            _created.add(parent)
+    return path
+
+
+def with_parent(
+    path: Path,
+    write: Callable[[Path], Written],
+    created: Optional[List[Path]] = None
+) -> Written:
+    """Write a file through write(path), creating its parent directory first.
+
+    If the write fails because the directory was removed since it was
+    created, it is created again and the write retried once.
+
+    Args:
+        path: File path
+        write: Writes the file
+        created: Receives the directories created for it (see ensure_parent())
+
+    Returns:
+        What write() returns
+    """
+    try:
+        return write(ensure_parent(path, created=created))
+    except FileNotFoundError:
+        if path.parent.is_dir():
+            raise
+    return write(ensure_parent(path, cached=False, created=created))
+
+
+class OutputLayout:
+    """Maps output names to paths below a root directory."""
+
+    def __init__(self, root: Union[str, Path], layout: str = 'flat', depth: int = 2):
+        """Initialize the layout.
+
+        Args:
+            root: Output root directory
+            layout: 'flat' (all files in root) or 'sharded' (hash-prefixed
+                subdirectories)
+            depth: Number of two-character shard levels
+
+        Raises:
+            ValueError: If the layout is unknown
+        """
+        if layout not in LAYOUTS:
+            raise ValueError(f"Unknown output layout: {layout} (expected one of {LAYOUTS})")
+        self.root = Path(root)
+        self.layout = layout
+        self.depth = depth
+
+    @property
+    def sharded(self) -> bool:
+        """Whether files are placed in shard subdirectories."""
+        return self.layout == 'sharded'
+
+    def path_for(self, name: str, key: str) -> Path:
+        """Return the path for a file name.
+
+        Args:
+            name: File name
+            key: Hex digest selecting the shard directory
+
+        Returns:
+            Output path
+        """
+        if not self.sharded:
+            return self.root / name
+        shards = [key[i * 2:i * 2 + 2] for i in range(self.depth)]
+        return self.root.joinpath(*shards, name)
@@ -0,0 +1,248 @@
+"""Binary container for bit-packed QR matrices (``.qrm``).
+
+Layout (all integers little-endian)::
+
+    header   magic 'QRMX', format version (u16), flags (u16), reserved (8 bytes)
+    records  per record: job id length (u16), job id (UTF-8), packed matrix rows
+    index    one fixed-size entry per record (see INDEX_ENTRY)
+    footer   index offset (u64), record count (u32), magic 'QRMX'
+
+Records are appended as they are encoded and the index is written on
+close, so a writer never has to seek. Readers locate the index through the
+footer and memory-map the file, so any record can be read or rendered by
+position or offset without loading the rest of the file.
+"""
+
+from __future__ import annotations
+import hashlib
+import mmap
+import struct
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, Optional, Union
+
+from PIL import Image
+
+from ..core.matrix import QRMatrix
+from ..core.render import render_matrix
+
+MAGIC = b'QRMX'
+FORMAT_VERSION = 1
+
+HEADER = struct.Struct('<4sHH8x')
+# payload hash, record offset, width, version, EC level, mask pattern
+INDEX_ENTRY = struct.Struct('<16sQHBcB')
+FOOTER = struct.Struct('<QI4s')
+ID_LENGTH = struct.Struct('<H')
+
+
+def payload_hash(payload: str) -> bytes:
+    """Return the 16-byte digest used to identify a payload."""
+    return hashlib.sha256(payload.encode('utf-8')).digest()[:16]
+
+
+class QRMRecord:
+    """A single matrix read from a ``.qrm`` file."""
+
+    __slots__ = ('index', 'offset', 'job_id', 'payload_hash', 'matrix')
+
+    def __init__(self, index: int, offset: int, *, job_id: str, digest: bytes, matrix: QRMatrix):
+        self.index = index
+        self.offset = offset
+        self.job_id = job_id
+        self.payload_hash = digest.hex()
+        self.matrix = matrix
+
+    @property
+    def version(self) -> Optional[int]:
+        """QR version of the record."""
+        return self.matrix.version
+
+    @property
+    def error_correction(self) -> Optional[str]:
+        """Error correction level of the record."""
+        return self.matrix.error_correction
+
+    @property
+    def mask_pattern(self) -> Optional[int]:
+        """Mask pattern of the record."""
+        return self.matrix.mask_pattern
+
+    def render(self, settings: Optional[Dict[str, Any]] = None) -> Image.Image:
+        """Render the record with the given QR settings."""
+        return render_matrix(self.matrix, settings or {})
+
+
+class QRMWriter:
+    """Append QR matrices to a ``.qrm`` file."""
+
+    def __init__(self, path: Union[str, Path]):
+        """Open a new container for writing.
+
+        Args:
+            path: Output file path (overwritten if it exists)
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file: Optional[BinaryIO] = open(self.path, 'wb')  # pylint: disable=consider-using-with
+        self._file.write(HEADER.pack(MAGIC, FORMAT_VERSION, 0))
+        self._offset = HEADER.size
+        self._index = bytearray()
+        self._count = 0
+
+    def __enter__(self) -> QRMWriter:
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def add(self, matrix: QRMatrix, payload: str, job_id: str = '') -> int:
+        """Append a matrix.
+
+        Args:
+            matrix: Encoded matrix
+            payload: Data that was encoded (only its hash is stored)
+            job_id: Optional identifier stored with the record
+
+        Returns:
+            Byte offset of the record
+        """
+        if self._file is None:
+            raise ValueError("QRM writer is closed")
+
+        encoded_id = job_id.encode('utf-8')
+        offset = self._offset
+        self._file.write(ID_LENGTH.pack(len(encoded_id)))
+        self._file.write(encoded_id)
+        self._file.write(matrix.memoryview())
+        self._offset += ID_LENGTH.size + len(encoded_id) + len(matrix.memoryview())
+
+        self._index += INDEX_ENTRY.pack(
+            payload_hash(payload),
+            offset,
+            matrix.width,
+            matrix.version or 0,
+            (matrix.error_correction or '-').encode('ascii'),
+            0xFF if matrix.mask_pattern is None else matrix.mask_pattern
+        )
+        self._count += 1
+        return offset
+
+    def close(self):
+        """Write the index and footer and close the file."""
+        if self._file is None:
+            return
+        self._file.write(self._index)
+        self._file.write(FOOTER.pack(self._offset, self._count, MAGIC))
+        self._file.close()
+        self._file = None
+
+
+class QRMReader:
+    """Memory-mapped reader for ``.qrm`` files."""
+
+    def __init__(self, path: Union[str, Path]):
+        """Open a container for reading.
+
+        Args:
+            path: Path to a ``.qrm`` file
+
+        Raises:
+            ValueError: If the file is not a valid container
+        """
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self._mmap) < HEADER.size + FOOTER.size:
+            self.close()
+            raise ValueError(f"{self.path} is too small to be a QRM file")
+
+        magic, version = HEADER.unpack_from(self._mmap, 0)[:2]
+        index_offset, count, footer_magic = FOOTER.unpack_from(
+            self._mmap, len(self._mmap) - FOOTER.size
+        )
+        if magic != MAGIC or footer_magic != MAGIC:
+            self.close()
+            raise ValueError(f"{self.path} is not a QRM file")
+        if version != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"Unsupported QRM format version {version}")
+
+        self._index_offset = index_offset
+        self._count = count
+        self._offsets: Optional[Dict[int, int]] = None
+        self._hashes: Optional[Dict[bytes, int]] = None
+
+    def __enter__(self) -> QRMReader:
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[QRMRecord]:
+        for index in range(self._count):
+            yield self[index]
+
+    def __getitem__(self, index: int) -> QRMRecord:
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError(f"QRM record {index} out of range")
+
+        digest, offset, width, version, level, mask = INDEX_ENTRY.unpack_from(
+            self._mmap, self._index_offset + index * INDEX_ENTRY.size
+        )
+        (id_length,) = ID_LENGTH.unpack_from(self._mmap, offset)
+        start = offset + ID_LENGTH.size
+        job_id = self._mmap[start:start + id_length].decode('utf-8')
+        start += id_length
+        size = ((width + 7) // 8) * width
+
+        matrix = QRMatrix(
+            width,
+            bytearray(self._mmap[start:start + size]),
+            version=version or None,
+            error_correction=None if level == b'-' else level.decode('ascii'),
+            mask_pattern=None if mask == 0xFF else mask
+        )
+        return QRMRecord(index, offset, job_id=job_id, digest=digest, matrix=matrix)
+
+    def record_at(self, offset: int) -> QRMRecord:
+        """Return the record stored at a byte offset."""
+        if self._offsets is None:
+            self._offsets = {self._entry_offset(i): i for i in range(self._count)}
+        if offset not in self._offsets:
+            raise KeyError(f"No QRM record at offset {offset}")
+        return self[self._offsets[offset]]
+
+    def find(self, payload: str) -> Optional[QRMRecord]:
+        """Return the first record whose payload hash matches, if any."""
+        if self._hashes is None:
+            self._hashes = {}
+            for index in range(self._count):
+                digest = INDEX_ENTRY.unpack_from(
+                    self._mmap, self._index_offset + index * INDEX_ENTRY.size
+                )[0]
+                self._hashes.setdefault(digest, index)
+        index = self._hashes.get(payload_hash(payload))
+        return None if index is None else self[index]
+
+    def render(self, index: int, settings: Optional[Dict[str, Any]] = None) -> Image.Image:
+        """Render the record at a position with the given QR settings."""
+        return self[index].render(settings)
+
+    def close(self):
+        """Unmap the file."""
+        if not self._mmap.closed:
+            self._mmap.close()
+
+    def _entry_offset(self, index: int) -> int:
+        return INDEX_ENTRY.unpack_from(
+            self._mmap, self._index_offset + index * INDEX_ENTRY.size
+        )[1]
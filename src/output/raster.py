@@ -0,0 +1,302 @@
+"""Incremental PNG and TIFF encoders for images rendered a band at a time.
+
+The writers take pixel rows as NumPy arrays and compress them as they
+arrive, so memory use is bounded by one band plus the compressor's state,
+whatever the image size. PNG rows use the Up filter (the difference to the
+previous row), which turns the long runs of repeated rows in a QR code into
+zeros, and go through one zlib stream that is cut into IDAT chunks. TIFF
+bands become separately deflated strips, followed by the image directory
+(TIFF output therefore needs a seekable file).
+
+Supported modes are '1' (rows of booleans, True for white), 'L', 'RGB'
+and 'RGBA' (uint8 arrays of shape (rows, width[, channels])), and 'P':
+two-entry palette images whose rows are booleans (True for index 1).
+"""
+
+from __future__ import annotations
+import struct
+import zlib
+from pathlib import Path
+from typing import BinaryIO, List, Optional, Union
+
+import numpy as np
+
+RASTER_FORMATS = ('PNG', 'TIFF')
+
+# Flush compressed PNG data in IDAT chunks of about this size
+_IDAT_SIZE = 1 << 16
+
+_PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+# mode -> (bit depth, PNG color type, channels)
+_PNG_MODES = {'1': (1, 0, 1), 'L': (8, 0, 1), 'RGB': (8, 2, 3), 'RGBA': (8, 6, 4),
+              'P': (1, 3, 1)}
+# mode -> (bits per sample, photometric interpretation, samples per pixel)
+_TIFF_MODES = {'1': (1, 1, 1), 'L': (8, 1, 1), 'RGB': (8, 2, 3), 'RGBA': (8, 2, 4),
+               'P': (1, 3, 1)}
+
+# TIFF field types
+_SHORT, _LONG = 3, 4
+
+
+class RasterWriter:
+    """Base class for band-wise image encoders.
+
+    Use as a context manager; the image is finished on close.
+    """
+
+    def __init__(
+        self,
+        target: Union[str, Path, BinaryIO],
+        size: int,
+        mode: str,
+        compress_level: int = 6,
+        *,
+        palette: Optional[bytes] = None,
+        transparency: Optional[bytes] = None
+    ):
+        """Open the image.
+
+        Args:
+            target: Output path or binary file object
+            size: Width and height in pixels (QR codes are square)
+            mode: '1', 'L', 'RGB', 'RGBA' or 'P'
+            compress_level: zlib compression level
+            palette: RGB bytes of the two palette entries (mode 'P')
+            transparency: Alpha byte per palette entry (mode 'P', PNG only)
+
+        Raises:
+            ValueError: If the mode is not supported or a palette is missing
+        """
+        if mode not in _PNG_MODES:
+            raise ValueError(f"Unsupported mode for streamed output: {mode}")
+        if mode == 'P' and (palette is None or len(palette) != 6):
+            raise ValueError("Mode 'P' needs a palette of two RGB entries")
+        if isinstance(target, (str, Path)):
+            self._stream: BinaryIO = open(target, 'wb')  # pylint: disable=consider-using-with
+            self._owns_stream = True
+        else:
+            self._stream = target
+            self._owns_stream = False
+        self.size = size
+        self.mode = mode
+        self.compress_level = compress_level
+        self.palette = palette
+        self.transparency = transparency
+        self.rows_written = 0
+        self._closed = False
+
+    def __enter__(self) -> RasterWriter:
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write(self, rows: np.ndarray):
+        """Append pixel rows (a band) to the image.
+
+        Raises:
+            ValueError: If the band doesn't fit the image
+        """
+        if rows.shape[1] != self.size or self.rows_written + rows.shape[0] > self.size:
+            raise ValueError(f"Band of shape {rows.shape} doesn't fit a {self.size}px image "
+                             f"with {self.rows_written} rows written")
+        self._write_rows(self._row_bytes(rows))
+        self.rows_written += rows.shape[0]
+
+    def close(self):
+        """Finish the image and close the output if it was opened here.
+
+        Raises:
+            ValueError: If fewer rows than the image height were written
+        """
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            if self.rows_written != self.size:
+                raise ValueError(f"Image incomplete: {self.rows_written} of {self.size} rows")
+            self._finish()
+            self._stream.flush()
+        finally:
+            if self._owns_stream:
+                self._stream.close()
+
+    def _row_bytes(self, rows: np.ndarray) -> np.ndarray:
+        """Return the band as (rows, bytes per row) uint8, bit-packed for '1' and 'P'."""
+        if self.mode in ('1', 'P'):
+            return np.packbits(rows.astype(bool, copy=False), axis=1)
+        return np.ascontiguousarray(rows, dtype=np.uint8).reshape(rows.shape[0], -1)
+
+    def _write_rows(self, rows: np.ndarray):
+        raise NotImplementedError
+
+    def _finish(self):
+        raise NotImplementedError
+
+
+class PNGStreamWriter(RasterWriter):
+    """Streaming PNG encoder (works on non-seekable outputs)."""
+
+    def __init__(
+        self,
+        target: Union[str, Path, BinaryIO],
+        size: int,
+        mode: str,
+        compress_level: int = 6,
+        **palette
+    ):
+        super().__init__(target, size, mode, compress_level, **palette)
+        bit_depth, color_type, _ = _PNG_MODES[mode]
+        self._compressor = zlib.compressobj(compress_level)
+        self._pending = bytearray()
+        self._previous: Optional[np.ndarray] = None
+        self._stream.write(_PNG_SIGNATURE)
+        self._chunk(b'IHDR', struct.pack('>IIBBBBB', size, size, bit_depth, color_type, 0, 0, 0))
+        if mode == 'P':
+            self._chunk(b'PLTE', self.palette)
+            if self.transparency:
+                self._chunk(b'tRNS', self.transparency)
+
+    def _write_rows(self, rows: np.ndarray):
+        # Up filter: every row starts with filter type 2 and stores the
+        # byte-wise difference to the row above (modulo 256)
+        previous = self._previous if self._previous is not None else np.zeros_like(rows[:1])
+        filtered = np.empty((rows.shape[0], rows.shape[1] + 1), dtype=np.uint8)
+        filtered[:, 0] = 2
+        np.subtract(rows, np.concatenate([previous, rows[:-1]]), out=filtered[:, 1:])
+        self._previous = rows[-1:].copy()
+        self._pending += self._compressor.compress(filtered.tobytes())
+        if len(self._pending) >= _IDAT_SIZE:
+            self._chunk(b'IDAT', bytes(self._pending))
+            self._pending.clear()
+
+    def _finish(self):
+        self._pending += self._compressor.flush()
+        self._chunk(b'IDAT', bytes(self._pending))
+        self._pending.clear()
+        self._chunk(b'IEND', b'')
+
+    def _chunk(self, kind: bytes, data: bytes):
+        self._stream.write(struct.pack('>I', len(data)))
+        self._stream.write(kind)
+        self._stream.write(data)
+        self._stream.write(struct.pack('>I', zlib.crc32(data, zlib.crc32(kind))))
+
+
+class TIFFStreamWriter(RasterWriter):
+    """Streaming TIFF encoder: one Deflate-compressed strip per band.
+
+    Every band except the last must have the same number of rows. Palette
+    transparency is not stored (TIFF has no equivalent of PNG's tRNS).
+    """
+
+    def __init__(
+        self,
+        target: Union[str, Path, BinaryIO],
+        size: int,
+        mode: str,
+        compress_level: int = 6,
+        **palette
+    ):
+        super().__init__(target, size, mode, compress_level, **palette)
+        self._start = self._stream.tell()
+        self._stream.write(b'II*\x00\x00\x00\x00\x00')  # IFD offset filled in on close
+        self._offset = 8
+        self._strip_offsets: List[int] = []
+        self._strip_counts: List[int] = []
+        self._rows_per_strip: Optional[int] = None
+
+    def _write_rows(self, rows: np.ndarray):
+        if self._rows_per_strip is None:
+            self._rows_per_strip = rows.shape[0]
+        elif (self._rows_per_strip != rows.shape[0]
+              and self.rows_written + rows.shape[0] < self.size):
+            raise ValueError("All TIFF bands but the last must have the same number of rows")
+        strip = zlib.compress(rows.tobytes(), self.compress_level)
+        self._strip_offsets.append(self._offset)
+        self._strip_counts.append(len(strip))
+        self._stream.write(strip)
+        self._offset += len(strip)
+
+    def _finish(self):
+        bits, photometric, samples = _TIFF_MODES[self.mode]
+        strips = len(self._strip_offsets)
+        extra = bytearray()
+
+        def array(field_type: int, values: List[int]) -> int:
+            """Return the value (or offset) of a field, storing long arrays out of line."""
+            packed = struct.pack(f"<{len(values)}{'H' if field_type == _SHORT else 'I'}", *values)
+            if len(packed) <= 4:
+                return int.from_bytes(packed.ljust(4, b'\x00'), 'little')
+            offset = self._offset + len(extra)
+            extra.extend(packed + b'\x00' * (len(packed) % 2))
+            return offset
+
+        entries = [
+            (256, _LONG, 1, self.size),
+            (257, _LONG, 1, self.size),
+            (258, _SHORT, samples, array(_SHORT, [bits] * samples)),
+            (259, _SHORT, 1, 8),  # Deflate
+            (262, _SHORT, 1, photometric),
+            (273, _LONG, strips, array(_LONG, self._strip_offsets)),
+            (277, _SHORT, 1, samples),
+            (278, _LONG, 1, self._rows_per_strip or self.size),
+            (279, _LONG, strips, array(_LONG, self._strip_counts)),
+            (284, _SHORT, 1, 1),  # Chunky (interleaved) samples
+        ]
+        if self.mode == 'P':
+            # All reds, then greens, then blues, scaled to 16 bits
+            colors = [self.palette[entry * 3 + channel] * 257
+                      for channel in range(3) for entry in range(2)]
+            entries.append((320, _SHORT, len(colors), array(_SHORT, colors)))
+        if self.mode == 'RGBA':
+            entries.append((338, _SHORT, 1, 2))  # Unassociated alpha
+
+        self._stream.write(extra)
+        ifd_offset = self._offset + len(extra)
+        ifd = bytearray(struct.pack('<H', len(entries)))
+        for tag, field_type, count, value in entries:
+            if field_type == _SHORT and count == 1:
+                ifd += struct.pack('<HHIHH', tag, field_type, count, value, 0)
+            else:
+                ifd += struct.pack('<HHII', tag, field_type, count, value)
+        ifd += b'\x00\x00\x00\x00'  # No further directories
+        self._stream.write(ifd)
+
+        end = self._stream.tell()
+        self._stream.seek(self._start + 4)
+        self._stream.write(struct.pack('<I', ifd_offset))
+        self._stream.seek(end)
+
+
+def open_raster(
+    target: Union[str, Path, BinaryIO],
+    output_format: str,
+    size: int,
+    mode: str,
+    *,
+    palette: Optional[bytes] = None,
+    transparency: Optional[bytes] = None
+) -> RasterWriter:
+    """Open a streaming PNG or TIFF writer.
+
+    Args:
+        target: Output path or binary file object (seekable for TIFF)
+        output_format: 'PNG' or 'TIFF'
+        size: Width and height in pixels
+        mode: '1', 'L', 'RGB', 'RGBA' or 'P'
+        palette: RGB bytes of the two palette entries (mode 'P')
+        transparency: Alpha byte per palette entry (mode 'P', optional)
+
+    Returns:
+        RasterWriter
+
+    Raises:
+        ValueError: If the format or mode is not supported
+    """
+    output_format = output_format.upper()
+    if output_format == 'PNG':
+        return PNGStreamWriter(target, size, mode, palette=palette, transparency=transparency)
+    if output_format == 'TIFF':
+        return TIFFStreamWriter(target, size, mode, palette=palette)
+    raise ValueError(f"Streamed output supports {RASTER_FORMATS}, not {output_format}")
@@ -0,0 +1,285 @@
+"""Recoloring two-color PNG codes without re-rendering them.
+
+A code written as a 1-bit grayscale PNG (black on white) or as a
+two-entry palette PNG (the ``palette`` setting) keeps its colors apart
+from its pixels: the IDAT chunks only hold palette indices. Changing the
+colors therefore means rewriting the PLTE (and tRNS) chunk in front of the
+image data; nothing is decoded, re-encoded or re-rendered.
+
+Which index is the background is read from the top-left pixel, which lies
+in the quiet zone of any code with a border (only the first couple of
+bytes of the image data are inflated for that). When the new header has
+the same length as the old one (palette files keeping their
+transparency), it is patched in place with one small write; otherwise
+the file is rewritten with its image data copied through unchanged, which
+turns grayscale files into palette files so later recolors are in place.
+"""
+
+from __future__ import annotations
+import os
+import shutil
+import struct
+import tempfile
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Iterable, List, Optional, Tuple, Union
+
+from PIL import ImageColor
+
+from .manifest import Manifest
+
+_PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+# Bytes of the first IDAT chunk read to find the color of the top-left pixel
+_PROBE_SIZE = 4096
+# Chunks that describe the old palette or color type
+_PALETTE_CHUNKS = (b'PLTE', b'tRNS', b'bKGD', b'hIST', b'sPLT')
+
+
+class RecolorResult:
+    """Outcome of recoloring one file."""
+
+    __slots__ = ('path', 'error', 'in_place', 'job_id')
+
+    def __init__(
+        self,
+        path: Path,
+        error: Optional[str] = None,
+        in_place: bool = False,
+        job_id: Optional[str] = None
+    ):
+        self.path = path
+        self.error = error
+        self.in_place = in_place
+        self.job_id = job_id
+
+    @property
+    def ok(self) -> bool:
+        """Whether the file was recolored."""
+        return self.error is None
+
+
+class RecolorReport:
+    """Summary of a bulk recolor."""
+
+    def __init__(self):
+        self.recolored = 0
+        self.in_place = 0
+        self.failed: List[RecolorResult] = []
+        self.duration = 0.0
+
+    @property
+    def total(self) -> int:
+        """Number of files processed."""
+        return self.recolored + len(self.failed)
+
+    def add(self, result: RecolorResult):
+        """Record a recolor result."""
+        if result.ok:
+            self.recolored += 1
+            self.in_place += result.in_place
+        else:
+            self.failed.append(result)
+
+
+def recolor_png(
+    path: Union[str, Path],
+    fill_color: Any,
+    back_color: Any,
+    *,
+    quiet_zone: bool = True
+) -> bool:
+    """Change the colors of a two-color PNG code.
+
+    Args:
+        path: 1-bit grayscale or two-entry palette PNG
+        fill_color: New module color (name, '#rrggbb' or RGB(A) tuple)
+        back_color: New background color ('transparent' for none)
+        quiet_zone: Whether the code has a border; without one the
+            top-left pixel is a module, not the background
+
+    Returns:
+        True if the header was patched in place, False if the file was rewritten
+
+    Raises:
+        ValueError: If the file isn't a two-color PNG (it needs re-rendering)
+    """
+    path = Path(path)
+    with open(path, 'rb') as stream:
+        chunks, data_offset, probe = _read_header(stream)
+
+    ihdr = chunks[0][1]
+    _, _, bit_depth, color_type = struct.unpack('>IIBB', ihdr[:10])
+    palette = next((data for kind, data in chunks if kind == b'PLTE'), b'')
+    if not ((color_type == 0 and bit_depth == 1) or (color_type == 3 and len(palette) == 6)):
+        raise ValueError(f"{path.name} is not a two-color PNG; re-render it to change colors")
+
+    first = _first_pixel(probe, bit_depth, path)
+    background = first if quiet_zone else 1 - first
+    colors = [_rgba(fill_color), _rgba(fill_color)]
+    colors[background] = _rgba(back_color)
+
+    header = bytearray(_PNG_SIGNATURE)
+    header += _chunk(b'IHDR', ihdr[:9] + bytes([3]) + ihdr[10:])
+    for kind, data in chunks[1:]:
+        if kind not in _PALETTE_CHUNKS:
+            header += _chunk(kind, data)
+    header += _chunk(b'PLTE', bytes(colors[0][:3] + colors[1][:3]))
+    alpha = bytes(color[3] for color in colors).rstrip(b'\xff')
+    if alpha:
+        header += _chunk(b'tRNS', alpha)
+
+    if len(header) == data_offset:
+        with open(path, 'r+b') as stream:
+            stream.write(header)
+        return True
+
+    handle, temp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix='.tmp')
+    try:
+        with os.fdopen(handle, 'wb') as target, open(path, 'rb') as source:
+            target.write(header)
+            source.seek(data_offset)
+            shutil.copyfileobj(source, target)
+        shutil.copymode(path, temp_name)
+        os.replace(temp_name, path)
+    except BaseException:
+        os.unlink(temp_name)
+        raise
+    return False
+
+
+def recolor_files(
+    paths: Iterable[Union[str, Path]],
+    fill_color: Any,
+    back_color: Any,
+    *,
+    workers: int = 1,
+    quiet_zone: bool = True
+) -> RecolorReport:
+    """Recolor many PNG codes; files that can't be recolored are reported.
+
+    Args:
+        paths: PNG files
+        fill_color: New module color
+        back_color: New background color
+        workers: Number of threads (the work is file I/O)
+        quiet_zone: Whether the codes have a border
+
+    Returns:
+        RecolorReport
+    """
+    targets = [(Path(path), None, quiet_zone) for path in paths]
+    return _recolor(targets, fill_color, back_color, workers)
+
+
+def recolor_manifest(
+    manifest_path: Union[str, Path],
+    fill_color: Any,
+    back_color: Any,
+    *,
+    workers: int = 1
+) -> RecolorReport:
+    """Recolor every code recorded in a manifest and record the new colors.
+
+    The recorded settings of each recolored code get the new fill_color and
+    back_color (and ``palette``, since the file is now a palette PNG), so
+    regenerating it later gives the same colors.
+
+    Args:
+        manifest_path: SQLite manifest written by a batch
+        fill_color: New module color
+        back_color: New background color
+        workers: Number of threads
+
+    Returns:
+        RecolorReport
+    """
+    with Manifest(manifest_path) as manifest:
+        entries = {entry.job_id: entry for entry in manifest.entries()}
+        targets = [(entry.path, entry.job_id, int(entry.settings.get('border', 4)) > 0)
+                   for entry in entries.values()]
+        report = _recolor(targets, fill_color, back_color, workers)
+        failed = {result.job_id for result in report.failed}
+        manifest.update_settings(
+            (job_id, {**entry.settings, 'fill_color': fill_color, 'back_color': back_color,
+                      'palette': True})
+            for job_id, entry in entries.items() if job_id not in failed
+        )
+    return report
+
+
+def _recolor(
+    targets: List[Tuple[Path, Optional[str], bool]],
+    fill_color: Any,
+    back_color: Any,
+    workers: int
+) -> RecolorReport:
+    started = time.perf_counter()
+    # Resolve the colors once, so a bad color fails before any file is touched
+    _rgba(fill_color)
+    _rgba(back_color)
+
+    def recolor(target: Tuple[Path, Optional[str], bool]) -> RecolorResult:
+        path, job_id, quiet_zone = target
+        result = RecolorResult(path, job_id=job_id)
+        try:
+            result.in_place = recolor_png(path, fill_color, back_color, quiet_zone=quiet_zone)
+        except (ValueError, OSError) as e:
+            result.error = str(e)
+        return result
+
+    report = RecolorReport()
+    if workers > 1 and len(targets) > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(recolor, targets))
+    else:
+        results = [recolor(target) for target in targets]
+    for result in results:
+        report.add(result)
+    report.duration = time.perf_counter() - started
+    return report
+
+
+def _read_header(stream) -> Tuple[List[Tuple[bytes, bytes]], int, bytes]:
+    """Return the chunks before the first IDAT, its file offset and its first bytes."""
+    if stream.read(8) != _PNG_SIGNATURE:
+        raise ValueError(f"{Path(stream.name).name} is not a PNG file")
+    chunks = []
+    while True:
+        head = stream.read(8)
+        if len(head) < 8:
+            raise ValueError(f"{Path(stream.name).name} has no image data")
+        length, kind = struct.unpack('>I4s', head)
+        if kind == b'IDAT':
+            return chunks, stream.tell() - 8, stream.read(min(length, _PROBE_SIZE))
+        chunks.append((kind, stream.read(length)))
+        stream.seek(4, os.SEEK_CUR)  # CRC
+
+
+def _first_pixel(probe: bytes, bit_depth: int, path: Path) -> int:
+    """Return the palette index (or gray level) of the top-left pixel."""
+    try:
+        # Filter type byte, then the first byte of row 0 (no filter changes it)
+        raw = zlib.decompressobj().decompress(probe, 2)
+    except zlib.error as e:
+        raise ValueError(f"{path.name} has corrupt image data: {e}") from e
+    if len(raw) < 2:
+        raise ValueError(f"Can't read the first pixel of {path.name}")
+    return raw[1] >> (8 - bit_depth)
+
+
+def _chunk(kind: bytes, data: bytes) -> bytes:
+    return (struct.pack('>I', len(data)) + kind + data
+            + struct.pack('>I', zlib.crc32(data, zlib.crc32(kind))))
+
+
+def _rgba(color: Any) -> Tuple[int, int, int, int]:
+    if isinstance(color, str):
+        if color.lower() == 'transparent':
+            return (0, 0, 0, 0)
+        color = ImageColor.getrgb(color)
+    elif isinstance(color, (int, float)):
+        color = (int(color),) * 3
+    color = tuple(int(channel) for channel in color)
+    return color[:3] + ((color[3] if len(color) > 3 else 255),)
@@ -0,0 +1,693 @@
+"""Output sinks: where generated files are stored.
+
+A sink stores files under output names (relative paths such as
+``ab/cd/qr_url_0123456789abcdef.png``). Three sinks are provided:
+
+- LocalSink: files below a directory (what generators and batches have
+  always done)
+- SQLiteSink: blobs in a single SQLite database
+- S3Sink: objects in an S3-compatible bucket (AWS S3, MinIO, ...)
+
+Every sink accepts whole files (put()) or streams (open()), so images go
+from the renderer straight into storage without touching local disk.
+Sinks are safe to share between threads and pickle as their options, so
+each worker process reopens its own.
+
+S3Sink talks to the S3 REST API directly (Signature Version 4). It keeps a
+pool of keep-alive connections shared by all threads; files larger than
+one part are sent as multipart uploads whose parts go up concurrently.
+"""
+
+from __future__ import annotations
+import hashlib
+import hmac
+import http.client
+import io
+import os
+import queue
+import tempfile
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Optional, Tuple, Union
+from urllib.parse import quote, urlsplit
+from xml.etree import ElementTree
+
+from .database import BufferedDatabase
+from .paths import with_parent
+
+SINK_SCHEMES = ('file', 'sqlite', 's3')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    name TEXT PRIMARY KEY,
+    data BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL
+);
+"""
+
+# S3 rejects multipart parts below 5 MiB (except the last one)
+MIN_PART_SIZE = 5 * 1024 * 1024
+DEFAULT_PART_SIZE = 8 * 1024 * 1024
+DEFAULT_CONNECTIONS = 8
+
+_EMPTY_SHA256 = hashlib.sha256(b'').hexdigest()
+_URI_SAFE = '-_.~'
+
+
+class OutputSink:
+    """Base class for output sinks.
+
+    Use as a context manager; close() flushes buffered writes and releases
+    connections.
+    """
+
+    #: Whether files are stored on the local filesystem (see local_path())
+    is_local = False
+
+    def __enter__(self) -> OutputSink:
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def put(self, name: str, data: bytes) -> str:
+        """Store a whole file.
+
+        Args:
+            name: Output name ('/' separates directories)
+            data: File contents
+
+        Returns:
+            Location of the stored file (see location())
+        """
+        with self.open(name) as stream:
+            stream.write(data)
+        return self.location(name)
+
+    def open(self, name: str) -> BinaryIO:
+        """Open a file for streamed writing.
+
+        The file is stored when the stream is closed. Used as a context
+        manager, the stream is discarded instead if the block raises.
+
+        Args:
+            name: Output name
+
+        Returns:
+            Writable binary stream
+        """
+        raise NotImplementedError
+
+    def location(self, name: str) -> str:
+        """Return where a file is stored: a path or a URI."""
+        raise NotImplementedError
+
+    def local_path(self, name: str) -> Optional[Path]:
+        """Return the file path of a name for local sinks, None otherwise."""
+        del name  # Only local sinks have paths
+
+    def flush(self):
+        """Commit buffered writes."""
+
+    def close(self):
+        """Flush and release the sink."""
+        self.flush()
+
+
+class SinkWriter(io.BytesIO):
+    """In-memory stream stored in its sink on close (discarded on error)."""
+
+    def __init__(self, sink: OutputSink, name: str):
+        super().__init__()
+        self.sink = sink
+        self.name = name
+        self._discarded = False
+
+    def __exit__(self, exc_type, *exc_info):
+        if exc_type is not None:
+            self.discard()
+        self.close()
+
+    def discard(self):
+        """Drop the contents instead of storing them."""
+        self._discarded = True
+
+    def close(self):
+        if not self.closed and not self._discarded:
+            self.sink.put(self.name, self.getvalue())
+        super().close()
+
+
+class _LocalWriter(io.FileIO):
+    """Temporary file moved into place on close, so readers never see partial files."""
+
+    def __init__(self, path: Path):
+        handle, self._temp_name = with_parent(path, lambda path: tempfile.mkstemp(
+            dir=path.parent, prefix=f".{path.name}.", suffix='.tmp'))
+        super().__init__(handle, 'wb')
+        self.path = path
+        self._discarded = False
+        self._finished = False
+
+    def __exit__(self, exc_type, *exc_info):
+        if exc_type is not None:
+            self._discarded = True
+        self.close()
+
+    def close(self):
+        if self._finished:
+            return
+        self._finished = True
+        super().close()
+        if self._discarded:
+            os.unlink(self._temp_name)
+        else:
+            os.chmod(self._temp_name, 0o644)
+            os.replace(self._temp_name, self.path)
+
+
+class LocalSink(OutputSink):
+    """Files below a local directory.
+
+    Names map to paths the way Config.get_output_path() maps file names:
+    relative to the root directory. Absolute names are used as they are.
+    """
+
+    is_local = True
+
+    def __init__(self, root: Union[str, Path]):
+        """Initialize the sink.
+
+        Args:
+            root: Output directory (created on the first write)
+        """
+        self.root = Path(root)
+
+    def __getstate__(self) -> tuple:
+        return (self.root,)
+
+    def __setstate__(self, state: tuple):
+        LocalSink.__init__(self, *state)
+
+    def put(self, name: str, data: bytes) -> str:
+        path = self.local_path(name)
+        with_parent(path, lambda path: path.write_bytes(data))
+        return str(path)
+
+    def open(self, name: str) -> BinaryIO:
+        return _LocalWriter(self.local_path(name))
+
+    def location(self, name: str) -> str:
+        return str(self.local_path(name))
+
+    def local_path(self, name: str) -> Path:
+        return self.root / name
+
+
+class SQLiteSink(BufferedDatabase, OutputSink):
+    """Files stored as blobs in one SQLite database.
+
+    Writes are buffered and committed in batches, like manifest records;
+    close() (or flush()) commits the last batch. Several processes may
+    write the same database, each through its own sink.
+    """
+
+    SCHEMA = SCHEMA
+    TABLE = 'blobs'
+    INSERT = "INSERT OR REPLACE INTO blobs (name, data, size, created) VALUES (?, ?, ?, ?)"
+
+    def __init__(self, path: Union[str, Path], batch_size: int = 100):
+        """Open or create the database.
+
+        Args:
+            path: Database file
+            batch_size: Number of files buffered per transaction
+        """
+        super().__init__(path, batch_size)
+
+    def __getstate__(self) -> tuple:
+        return self.path, self.batch_size
+
+    def __setstate__(self, state: tuple):
+        SQLiteSink.__init__(self, *state)
+
+    def put(self, name: str, data: bytes) -> str:
+        self._buffer((name, bytes(data), len(data), time.time()))
+        return self.location(name)
+
+    def open(self, name: str) -> BinaryIO:
+        return SinkWriter(self, name)
+
+    def location(self, name: str) -> str:
+        return f"sqlite:{self.path}#{name}" if name else f"sqlite:{self.path}"
+
+    def get(self, name: str) -> Optional[bytes]:
+        """Return the contents of a stored file, or None."""
+        with self._lock:
+            self.flush()
+            row = self._connection.execute(
+                "SELECT data FROM blobs WHERE name = ?", (name,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def names(self) -> List[str]:
+        """Return the names of all stored files, sorted."""
+        with self._lock:
+            self.flush()
+            rows = self._connection.execute("SELECT name FROM blobs ORDER BY name").fetchall()
+        return [row[0] for row in rows]
+
+
+class S3Upload(io.RawIOBase):
+    """Streamed upload of one S3 object.
+
+    Data is buffered up to one part. Objects that fit in one part are sent
+    with a single PUT on close; larger ones become multipart uploads whose
+    parts are sent concurrently as they fill, with at most one part per
+    pooled connection in flight.
+    """
+
+    def __init__(self, sink: S3Sink, key: str):
+        super().__init__()
+        self.sink = sink
+        self.key = key
+        self.size = 0
+        self._buffer = bytearray()
+        self._upload_id: Optional[str] = None
+        self._parts: List[Future] = []
+        self._discarded = False
+        self._finished = False
+
+    def __exit__(self, exc_type, *exc_info):
+        if exc_type is not None:
+            self.discard()
+        self.close()
+
+    def writable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self.size
+
+    def write(self, data) -> int:
+        if self._finished:
+            raise ValueError("Upload is closed")
+        self._buffer += data
+        written = len(memoryview(data))
+        self.size += written
+        part_size = self.sink.part_size
+        while len(self._buffer) >= part_size:
+            self._send_part(bytes(self._buffer[:part_size]))
+            del self._buffer[:part_size]
+        return written
+
+    def discard(self):
+        """Abort the upload; nothing is stored."""
+        self._discarded = True
+
+    def close(self):
+        if self._finished:
+            return
+        self._finished = True
+        try:
+            if self._discarded:
+                self._abort()
+            elif self._upload_id is None:
+                self.sink.put_object(self.key, bytes(self._buffer))
+            else:
+                try:
+                    if self._buffer:
+                        self._send_part(bytes(self._buffer))
+                    etags = [part.result() for part in self._parts]
+                    self.sink.complete_upload(self.key, self._upload_id, etags)
+                except BaseException:
+                    self._abort()
+                    raise
+        finally:
+            self._buffer = bytearray()
+            super().close()
+
+    def _send_part(self, data: bytes):
+        if self._upload_id is None:
+            self._upload_id = self.sink.create_upload(self.key)
+        in_flight = [part for part in self._parts if not part.done()]
+        if len(in_flight) >= self.sink.connections:
+            wait(in_flight, return_when=FIRST_COMPLETED)
+        self._parts.append(self.sink.executor.submit(
+            self.sink.upload_part, self.key, self._upload_id, len(self._parts) + 1, data
+        ))
+
+    def _abort(self):
+        if self._upload_id is None:
+            return
+        wait(self._parts)
+        self.sink.abort_upload(self.key, self._upload_id)
+
+
+class S3Sink(OutputSink):
+    """Objects in an S3-compatible bucket.
+
+    Credentials, region and endpoint default to the usual AWS environment
+    variables (AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY, AWS_SESSION_TOKEN,
+    AWS_REGION or AWS_DEFAULT_REGION, AWS_ENDPOINT_URL_S3 or
+    AWS_ENDPOINT_URL). Without credentials requests are sent unsigned.
+    Custom endpoints (MinIO, local test servers) use path-style URLs,
+    AWS itself virtual-hosted ones.
+    """
+
+    def __init__(
+        self,
+        bucket: str,
+        prefix: str = '',
+        *,
+        endpoint_url: Optional[str] = None,
+        region: Optional[str] = None,
+        access_key: Optional[str] = None,
+        secret_key: Optional[str] = None,
+        session_token: Optional[str] = None,
+        connections: int = DEFAULT_CONNECTIONS,
+        part_size: int = DEFAULT_PART_SIZE,
+        timeout: float = 60.0
+    ):
+        """Initialize the sink; connections are opened as they are needed.
+
+        Args:
+            bucket: Bucket name
+            prefix: Key prefix for all objects (e.g. 'codes/2024')
+            endpoint_url: Service URL (default: AWS S3 in the region)
+            region: Signing region (default: us-east-1)
+            access_key: Access key ID
+            secret_key: Secret access key
+            session_token: Session token for temporary credentials
+            connections: Size of the connection pool, which also bounds
+                the concurrent requests and multipart parts in flight
+            part_size: Bytes per multipart part (objects up to this size
+                are sent with one PUT)
+            timeout: Socket timeout in seconds
+
+        Raises:
+            ValueError: If the part size is below S3's minimum or the
+                endpoint isn't an http(s) URL
+        """
+        if part_size < MIN_PART_SIZE:
+            raise ValueError(f"Part size must be at least {MIN_PART_SIZE} bytes")
+        env = os.environ
+        self._options = {
+            'endpoint_url': endpoint_url, 'region': region, 'access_key': access_key,
+            'secret_key': secret_key, 'session_token': session_token,
+            'connections': connections, 'part_size': part_size, 'timeout': timeout,
+        }
+        self.bucket = bucket
+        self.prefix = prefix.strip('/')
+        self.region = (region or env.get('AWS_REGION') or env.get('AWS_DEFAULT_REGION')
+                       or 'us-east-1')
+        self.access_key = access_key or env.get('AWS_ACCESS_KEY_ID')
+        self.secret_key = secret_key or env.get('AWS_SECRET_ACCESS_KEY')
+        self.session_token = session_token or env.get('AWS_SESSION_TOKEN')
+        self.connections = max(connections, 1)
+        self.part_size = part_size
+        self.timeout = timeout
+
+        endpoint_url = endpoint_url or env.get('AWS_ENDPOINT_URL_S3') or env.get('AWS_ENDPOINT_URL')
+        if endpoint_url:
+            endpoint = urlsplit(endpoint_url)
+            self._base_path = f"{endpoint.path.rstrip('/')}/{quote(bucket, safe=_URI_SAFE)}"
+        else:
+            endpoint = urlsplit(f"https://{bucket}.s3.{self.region}.amazonaws.com")
+            self._base_path = ''
+        if endpoint.scheme not in ('http', 'https') or not endpoint.hostname:
+            raise ValueError(f"Invalid S3 endpoint: {endpoint_url}")
+        self._secure = endpoint.scheme == 'https'
+        self.host = endpoint.netloc
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.connections)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    def __getstate__(self) -> tuple:
+        return self.bucket, self.prefix, self._options
+
+    def __setstate__(self, state: tuple):
+        bucket, prefix, options = state
+        S3Sink.__init__(self, bucket, prefix, **options)
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """Threads sending multipart parts (started on first use)."""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.connections,
+                                                    thread_name_prefix='s3-part')
+            return self._executor
+
+    def key(self, name: str) -> str:
+        """Return the object key of an output name."""
+        name = name.lstrip('/')
+        return f"{self.prefix}/{name}" if self.prefix else name
+
+    def put(self, name: str, data: bytes) -> str:
+        if len(data) <= self.part_size:
+            self.put_object(self.key(name), bytes(data))
+            return self.location(name)
+        return super().put(name, data)
+
+    def open(self, name: str) -> BinaryIO:
+        return S3Upload(self, self.key(name))
+
+    def location(self, name: str) -> str:
+        return f"s3://{self.bucket}/{self.key(name)}"
+
+    def get(self, name: str) -> bytes:
+        """Download an object.
+
+        Raises:
+            OSError: If the request fails (e.g. the object doesn't exist)
+        """
+        return self.request('GET', self.key(name))[1]
+
+    def put_object(self, key: str, data: bytes):
+        """Upload an object with a single PUT."""
+        self.request('PUT', key, body=data)
+
+    def create_upload(self, key: str) -> str:
+        """Start a multipart upload; return its upload ID."""
+        _, body = self.request('POST', key, {'uploads': ''})
+        upload_id = _xml_text(body, 'UploadId')
+        if not upload_id:
+            raise OSError(f"S3 returned no upload ID for {key}")
+        return upload_id
+
+    def upload_part(self, key: str, upload_id: str, number: int, data: bytes) -> str:
+        """Upload one part of a multipart upload; return its ETag."""
+        headers, _ = self.request('PUT', key, {'partNumber': str(number), 'uploadId': upload_id},
+                                  body=data)
+        return headers.get('etag', '')
+
+    def complete_upload(self, key: str, upload_id: str, etags: List[str]):
+        """Assemble the uploaded parts into the object."""
+        parts = ''.join(f"<Part><PartNumber>{number}</PartNumber><ETag>{etag}</ETag></Part>"
+                        for number, etag in enumerate(etags, 1))
+        body = f"<CompleteMultipartUpload>{parts}</CompleteMultipartUpload>".encode('utf-8')
+        _, response = self.request('POST', key, {'uploadId': upload_id}, body=body)
+        # S3 can report a failed assembly with status 200 and an error body
+        if b'<Error>' in response:
+            raise OSError(f"S3 multipart upload of {key} failed: {_xml_text(response, 'Code')}")
+
+    def abort_upload(self, key: str, upload_id: str):
+        """Abort a multipart upload and free its parts (errors are ignored)."""
+        try:
+            self.request('DELETE', key, {'uploadId': upload_id})
+        except OSError:
+            pass
+
+    def request(
+        self,
+        method: str,
+        key: str,
+        query: Optional[Dict[str, str]] = None,
+        body: bytes = b''
+    ) -> Tuple[Dict[str, str], bytes]:
+        """Send a signed request over a pooled connection.
+
+        A request that fails on a reused connection (closed by the server
+        while idle) is retried once on a fresh one.
+
+        Returns:
+            (lower-cased response headers, response body)
+
+        Raises:
+            OSError: If the request fails or S3 answers with an error
+        """
+        path = f"{self._base_path}/{quote(key, safe='/' + _URI_SAFE)}"
+        query = query or {}
+        query_string = _canonical_query(query)
+        target = f"{path}?{query_string}" if query_string else path
+        payload_hash = hashlib.sha256(body).hexdigest() if body else _EMPTY_SHA256
+
+        with self._slots:
+            for attempt in range(2):
+                connection, reused = self._connection()
+                headers = {'content-length': str(len(body))}
+                headers = sign_v4(method, path, query, headers, payload_hash,
+                                  host=self.host, region=self.region, access_key=self.access_key,
+                                  secret_key=self.secret_key, session_token=self.session_token)
+                try:
+                    connection.request(method, target, body=body, headers=headers)
+                    response = connection.getresponse()
+                    data = response.read()
+                except (http.client.HTTPException, OSError) as e:
+                    connection.close()
+                    if reused and attempt == 0:
+                        continue
+                    raise OSError(f"S3 {method} {key} failed: {e}") from e
+                if response.will_close:
+                    connection.close()
+                else:
+                    self._idle.put(connection)
+                break
+
+        if response.status >= 300:
+            code = _xml_text(data, 'Code') or response.reason
+            raise OSError(f"S3 {method} {key} failed: {response.status} {code}")
+        return {name.lower(): value for name, value in response.getheaders()}, data
+
+    def close(self):
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+    def _connection(self) -> Tuple[http.client.HTTPConnection, bool]:
+        """Return an idle pooled connection or a new one, and whether it was reused."""
+        try:
+            return self._idle.get_nowait(), True
+        except queue.Empty:
+            pass
+        if self._secure:
+            return http.client.HTTPSConnection(self.host, timeout=self.timeout), False
+        return http.client.HTTPConnection(self.host, timeout=self.timeout), False
+
+
+def sign_v4(
+    method: str,
+    path: str,
+    query: Dict[str, str],
+    headers: Dict[str, str],
+    payload_hash: str,
+    *,
+    host: str,
+    region: str,
+    access_key: Optional[str],
+    secret_key: Optional[str],
+    session_token: Optional[str] = None,
+    timestamp: Optional[float] = None
+) -> Dict[str, str]:
+    """Return request headers signed with AWS Signature Version 4 for S3.
+
+    Args:
+        method: HTTP method
+        path: URI-encoded request path
+        query: Query parameters (not encoded)
+        headers: Headers to send and sign
+        payload_hash: Hex SHA-256 of the request body
+        host: Host header value
+        region: Signing region
+        access_key: Access key ID (None sends the request unsigned)
+        secret_key: Secret access key
+        session_token: Session token for temporary credentials
+        timestamp: Request time (default: now)
+
+    Returns:
+        Headers including host, x-amz-date, x-amz-content-sha256 and
+        authorization
+    """
+    amz_date = time.strftime('%Y%m%dT%H%M%SZ', time.gmtime(timestamp))
+    signed = {name.lower(): str(value).strip() for name, value in headers.items()}
+    signed.update({'host': host, 'x-amz-date': amz_date, 'x-amz-content-sha256': payload_hash})
+    if session_token:
+        signed['x-amz-security-token'] = session_token
+    if not access_key or not secret_key:
+        return signed
+
+    names = sorted(signed)
+    signed_headers = ';'.join(names)
+    canonical_request = '\n'.join([
+        method, path, _canonical_query(query),
+        ''.join(f"{name}:{signed[name]}\n" for name in names),
+        signed_headers, payload_hash,
+    ])
+    scope = f"{amz_date[:8]}/{region}/s3/aws4_request"
+    string_to_sign = '\n'.join([
+        'AWS4-HMAC-SHA256', amz_date, scope,
+        hashlib.sha256(canonical_request.encode('utf-8')).hexdigest(),
+    ])
+    key = f"AWS4{secret_key}".encode('utf-8')
+    for part in (amz_date[:8], region, 's3', 'aws4_request'):
+        key = hmac.new(key, part.encode('utf-8'), hashlib.sha256).digest()
+    signature = hmac.new(key, string_to_sign.encode('utf-8'), hashlib.sha256).hexdigest()
+    signed['authorization'] = (f"AWS4-HMAC-SHA256 Credential={access_key}/{scope}, "
+                               f"SignedHeaders={signed_headers}, Signature={signature}")
+    return signed
+
+
+def open_sink(target: Union[str, Path, OutputSink], **options) -> OutputSink:
+    """Open a sink from a location.
+
+    Args:
+        target: An OutputSink (returned as is), a directory path or
+            file:// URI, 'sqlite:<path>' or 's3://<bucket>/<prefix>'
+        **options: Keyword arguments for the sink class (e.g. endpoint_url
+            or part_size for S3)
+
+    Returns:
+        OutputSink
+
+    Raises:
+        ValueError: If the scheme is unknown
+    """
+    if isinstance(target, OutputSink):
+        return target
+    if isinstance(target, Path):
+        return LocalSink(target, **options)
+
+    scheme, _, rest = target.partition(':')
+    if not rest or len(scheme) < 2:
+        # A plain path (a one-letter scheme is a Windows drive)
+        return LocalSink(target, **options)
+    scheme = scheme.lower()
+    if scheme == 'file':
+        return LocalSink(urlsplit(target).path, **options)
+    if scheme == 'sqlite':
+        # sqlite:relative.db, sqlite:/abs.db and sqlite:///abs.db
+        return SQLiteSink(rest[2:] if rest.startswith('///') else rest, **options)
+    if scheme == 's3':
+        location = urlsplit(target)
+        if not location.netloc:
+            raise ValueError(f"S3 sink needs a bucket: {target}")
+        return S3Sink(location.netloc, location.path, **options)
+    raise ValueError(f"Unknown sink: {target} (expected a directory or one of {SINK_SCHEMES})")
+
+
+def _canonical_query(query: Dict[str, str]) -> str:
+    return '&'.join(f"{quote(name, safe=_URI_SAFE)}={quote(value, safe=_URI_SAFE)}"
+                    for name, value in sorted(query.items()))
+
+
+def _xml_text(document: bytes, tag: str) -> Optional[str]:
+    """Return the text of the first element with a tag (any namespace) in an S3 response."""
+    try:
+        root = ElementTree.fromstring(document)
+    except ElementTree.ParseError:
+        return None
+    for element in root.iter():
+        if element.tag == tag or element.tag.endswith(f"}}{tag}"):
+            return element.text
+    return None
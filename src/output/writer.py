@@ -0,0 +1,205 @@
+"""Background writer threads for encoded images.
+
+Encoding and writing overlap: the producer hands encoded files to a
+bounded queue and goes on encoding while writer threads drain it. When
+the queue is full, submit() blocks, so a slow disk or network share holds
+the producer back instead of letting encoded files pile up in memory.
+
+Local files can be synced per file or once per batch, and their pages
+dropped from the page cache after writing (``posix_fadvise``), which keeps
+a large batch from evicting everything else. Files for remote sinks are
+handed to the sink's put().
+"""
+
+from __future__ import annotations
+import os
+import queue
+import threading
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Callable, List, Optional, Set
+
+from .paths import with_parent
+from .sinks import LocalSink, OutputSink
+
+FSYNC_POLICIES = ('none', 'file', 'batch')
+
+_STOP = object()
+
+
+class BackgroundWriter:
+    """Writer threads draining a bounded queue of encoded files.
+
+    Use as a context manager; close() waits for every queued file and
+    performs the batch sync.
+    """
+
+    def __init__(
+        self,
+        sink: Optional[OutputSink] = None,
+        workers: int = 2,
+        *,
+        queue_size: Optional[int] = None,
+        fsync: str = 'none',
+        drop_cache: bool = False
+    ):
+        """Start the writer threads.
+
+        Args:
+            sink: Where files go (default: local paths as given)
+            workers: Number of writer threads
+            queue_size: Files waiting to be written before submit() blocks
+                (default: four per writer)
+            fsync: 'none', 'file' (sync every file and its directory entry
+                before it counts as written) or 'batch' (sync all files and
+                their directories on close). Directories created for the
+                files are synced into their parents too. Local files only.
+            drop_cache: Drop written pages from the page cache (local files,
+                where the OS supports posix_fadvise)
+
+        Raises:
+            ValueError: If the fsync policy is unknown
+        """
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy: {fsync} (expected one of {FSYNC_POLICIES})")
+        self.sink = sink or LocalSink('.')
+        self.workers = max(workers, 1)
+        self.fsync = fsync
+        self.drop_cache = drop_cache and hasattr(os, 'posix_fadvise')
+        self.synced = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size or 4 * self.workers)
+        self._written: List[Path] = []
+        # Directories created for written files; their entries need a sync too
+        self._created: Set[Path] = set()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._threads = [threading.Thread(target=self._drain, name=f'writer-{index}', daemon=True)
+                         for index in range(self.workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def __enter__(self) -> BackgroundWriter:
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def pending(self) -> int:
+        """Number of files waiting for a writer thread."""
+        return self._queue.qsize()
+
+    def submit(
+        self,
+        name: str,
+        data: bytes,
+        callback: Optional[Callable[[], None]] = None
+    ) -> Future:
+        """Queue a file, blocking while the queue is full.
+
+        Args:
+            name: Output name in the sink (a path for local output)
+            data: File contents
+            callback: Called in the writer thread once the file is written
+
+        Returns:
+            Future that resolves when the file is written (or raises the
+            write error)
+
+        Raises:
+            ValueError: If the writer is closed
+        """
+        if self._closed:
+            raise ValueError("Writer is closed")
+        future: Future = Future()
+        self._queue.put((future, name, data, callback))
+        return future
+
+    def close(self):
+        """Write every queued file, stop the threads and run the batch sync.
+
+        Raises:
+            OSError: If the batch sync fails
+        """
+        if self._closed:
+            return
+        self._closed = True
+        for _ in self._threads:
+            self._queue.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+        if self.fsync == 'batch':
+            self._sync_batch()
+
+    def _drain(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            future, name, data, callback = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                self._write(name, data)
+                if callback is not None:
+                    callback()
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                future.set_exception(e)
+            else:
+                future.set_result(name)
+
+    def _write(self, name: str, data: bytes):
+        path = self.sink.local_path(name)
+        if path is None:
+            self.sink.put(name, data)
+            return
+        created: List[Path] = []
+        with_parent(path, lambda path: self._write_file(path, data), created)
+        if self.fsync == 'file':
+            # The file only survives a crash once its entry, and those of the
+            # directories created for it, are on disk as well
+            for directory in {path.parent, *(new.parent for new in created)}:
+                _sync_directory(directory)
+        elif self.fsync == 'batch':
+            with self._lock:
+                self._written.append(path)
+                self._created.update(created)
+
+    def _write_file(self, path: Path, data: bytes):
+        with open(path, 'wb') as stream:
+            stream.write(data)
+            stream.flush()
+            if self.fsync == 'file':
+                os.fsync(stream.fileno())
+                with self._lock:
+                    self.synced += 1
+            if self.drop_cache:
+                # Starts writeback of dirty pages; clean ones are dropped right away
+                os.posix_fadvise(stream.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+
+    def _sync_batch(self):
+        """Sync every written file, then each directory holding one or created for one."""
+        directories: Set[Path] = {directory.parent for directory in self._created}
+        for path in self._written:
+            fd = os.open(path, os.O_RDONLY)
+            try:
+                os.fsync(fd)
+                if self.drop_cache:
+                    os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+            finally:
+                os.close(fd)
+            self.synced += 1
+            directories.add(path.parent)
+        for directory in directories:
+            _sync_directory(directory)
+        self._written = []
+        self._created = set()
+
+
+def _sync_directory(directory: Path):
+    """Sync a directory's entries to disk."""
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
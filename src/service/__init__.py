@@ -0,0 +1,5 @@
+"""Long-running service modes for QR Code Utils.
+
+Import the submodules directly: the CLI loads ``client`` before anything
+else, so this package must not pull in the daemon or its dependencies.
+"""
@@ -0,0 +1,163 @@
+"""Thin client for the command daemon.
+
+The CLI loads this module before anything else, so it only imports what
+forwarding a command needs: no Pillow, qrcode, numpy or yaml. Requests and
+replies are marshal-encoded over the low-level ``_socket`` module, because
+``json`` and ``socket`` pull in ``re``, ``enum`` and ``selectors``, which
+would more than double the startup time of a forwarded command. Both ends
+run the same interpreter, and the socket is only accessible to its owner.
+
+Commands run with the client's environment and working directory. The
+daemon runs one command at a time: if it doesn't start a forwarded
+command within ACCEPT_TIMEOUT seconds (because it is busy with another),
+the request lapses and the client runs the command itself.
+"""
+
+from __future__ import annotations
+import marshal
+import os
+import sys
+import time
+import _socket
+
+SOCKET_NAME = 'daemon.sock'
+# Same as Config.DEFAULT_CONFIG_DIR, without importing yaml
+DEFAULT_CONFIG_DIR = os.path.join(os.path.expanduser('~'), '.qr-utils')
+CONNECT_TIMEOUT = 0.5
+# Seconds a forwarded command may wait for a busy daemon, and the extra time
+# the client allows for the daemon's acknowledgement to arrive
+ACCEPT_TIMEOUT = 1.0
+ACK_GRACE = 0.5
+# Sent by the daemon when it starts a request that set a deadline
+ACK = b'\x06'
+
+# Commands that stream through the client's own stdin/stdout, run long enough
+# to block the daemon, run until stopped or manage the daemon
+_LOCAL_ARGS = frozenset(('batch', 'daemon', 'pipe', 'watch', 'worker', '-'))
+# Options whose value '-' writes image data to stdout (argparse accepts prefixes)
+_STDOUT_OPTIONS = ('--output', '--archive')
+
+
+def socket_path(config_dir: str | os.PathLike | None = None) -> str:
+    """Return the daemon socket for a configuration directory."""
+    return os.path.join(config_dir or DEFAULT_CONFIG_DIR, SOCKET_NAME)
+
+
+def request(
+    path: str | os.PathLike,
+    message: dict,
+    timeout: float | None = None,
+    accept_timeout: float | None = None
+) -> dict:
+    """Send one request to the daemon and return its reply.
+
+    Args:
+        path: Daemon socket
+        message: Request of plain built-in types
+        timeout: Seconds to wait for the reply (default: no limit)
+        accept_timeout: Seconds the daemon has to start the request; it
+            drops requests it picks up later (default: no limit)
+
+    Returns:
+        Decoded reply
+
+    Raises:
+        OSError: If no daemon is listening on the socket, or it didn't
+            start the request within accept_timeout
+        ValueError: If the reply is malformed
+    """
+    if accept_timeout is not None:
+        message = dict(message, deadline=time.time() + accept_timeout)
+    sock = _socket.socket(_socket.AF_UNIX, _socket.SOCK_STREAM)
+    try:
+        sock.settimeout(CONNECT_TIMEOUT)
+        sock.connect(os.fspath(path))
+        sock.settimeout(timeout)
+        sock.sendall(marshal.dumps(message))
+        sock.shutdown(_socket.SHUT_WR)
+        if accept_timeout is not None:
+            sock.settimeout(accept_timeout + ACK_GRACE)
+            if sock.recv(1) != ACK:
+                raise OSError("Daemon dropped the request")
+            sock.settimeout(timeout)
+        chunks = []
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    finally:
+        sock.close()
+    try:
+        return marshal.loads(b''.join(chunks))
+    except (EOFError, TypeError) as e:
+        raise ValueError(f"Malformed daemon reply: {e}") from e
+
+
+def _config_dir(argv: list[str]) -> str | None:
+    """Find --config-dir in raw arguments."""
+    for index, arg in enumerate(argv):
+        if arg == '--config-dir' and index + 1 < len(argv):
+            return argv[index + 1]
+        if arg.startswith('--config-dir='):
+            return arg.split('=', 1)[1]
+    return None
+
+
+def _writes_stdout(argv: list[str]) -> bool:
+    """Tell whether raw arguments send image data to stdout (``-o -``, ``--output=-``, ...)."""
+    for index, arg in enumerate(argv):
+        following = argv[index + 1] if index + 1 < len(argv) else None
+        if arg.startswith('--'):
+            name, separator, value = arg.partition('=')
+            if len(name) < 3 or not any(option.startswith(name) for option in _STDOUT_OPTIONS):
+                continue
+            if not separator:
+                value = following
+        elif arg.startswith('-o'):
+            value = arg[2:] or following
+        else:
+            continue
+        if value == '-':
+            return True
+    return False
+
+
+def forward(argv: list[str]) -> int | None:
+    """Run a command in the daemon if one is listening.
+
+    Commands that use the client's stdin or stdout as a data stream,
+    batches, long-running workers and the daemon command itself always run
+    locally, as does any command a busy daemon doesn't start in time.
+
+    Args:
+        argv: Command line arguments (without the program name)
+
+    Returns:
+        Exit status of the command, or None if it should run in-process
+    """
+    if not argv or _LOCAL_ARGS.intersection(argv) or _writes_stdout(argv):
+        return None
+    path = socket_path(_config_dir(argv))
+    if not os.path.exists(path):
+        return None
+    try:
+        reply = request(path, {'argv': list(argv), 'cwd': os.getcwd(), 'env': dict(os.environ)},
+                        accept_timeout=ACCEPT_TIMEOUT)
+    except (OSError, ValueError):
+        return None
+
+    sys.stdout.write(reply.get('stdout', ''))
+    sys.stderr.write(reply.get('stderr', ''))
+    return int(reply.get('status', 1))
+
+
+def forward_and_exit(argv: list[str]):
+    """Run a command in the daemon and exit with its status.
+
+    Returns normally if the command has to run in-process.
+    """
+    status = forward(argv)
+    if status is not None:
+        sys.stdout.flush()
+        sys.exit(status)
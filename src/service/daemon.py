@@ -0,0 +1,198 @@
+"""Unix socket daemon that runs CLI commands in a warm process.
+
+The daemon imports everything once and then serves one command at a time.
+Each request carries the client's arguments, working directory and
+environment; the command's output and exit status are sent back for the
+client to print. Requests picked up after their deadline are dropped
+unanswered: the client has given up waiting and runs the command itself.
+"""
+
+from __future__ import annotations
+import io
+import marshal
+import os
+import socket
+import subprocess
+import sys
+import time
+import traceback
+from contextlib import suppress
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from .client import ACK, request, socket_path
+
+PID_NAME = 'daemon.pid'
+START_TIMEOUT = 10.0
+
+
+class _RequestStream(io.TextIOBase):
+    """Stand-in for stdout/stderr that writes to the current request's buffer.
+
+    Log handlers keep a reference to the stream they were created with, so
+    the daemon's stdout and stderr are pointed at these once and follow
+    whichever request is running.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.target: Optional[io.StringIO] = None
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, s: str) -> int:
+        if self.target is not None:
+            self.target.write(s)
+        return len(s)
+
+
+class CommandDaemon:
+    """Serve CLI commands over a Unix domain socket."""
+
+    def __init__(self, config_dir: Path, run_command: Callable[[List[str]], Optional[int]]):
+        """Initialize the daemon.
+
+        Args:
+            config_dir: Configuration directory holding the socket and PID file
+            run_command: Runs parsed-from-scratch CLI arguments and returns
+                the exit status (or raises SystemExit)
+        """
+        self.socket_path = Path(socket_path(config_dir))
+        self.pid_path = Path(config_dir) / PID_NAME
+        self.run_command = run_command
+        self._stdout = _RequestStream()
+        self._stderr = _RequestStream()
+        self._running = False
+
+    def serve_forever(self):
+        """Listen on the socket until a stop request arrives."""
+        if self.socket_path.exists():
+            self.socket_path.unlink()
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+            server.bind(str(self.socket_path))
+            os.chmod(self.socket_path, 0o600)
+            server.listen()
+            self.pid_path.write_text(str(os.getpid()), encoding='utf-8')
+            sys.stdout, sys.stderr = self._stdout, self._stderr
+            self._running = True
+            try:
+                while self._running:
+                    connection, _ = server.accept()
+                    with connection:
+                        self._handle(connection)
+            finally:
+                sys.stdout, sys.stderr = sys.__stdout__, sys.__stderr__
+                with suppress(FileNotFoundError):
+                    self.socket_path.unlink()
+                with suppress(FileNotFoundError):
+                    self.pid_path.unlink()
+
+    def _handle(self, connection: socket.socket):
+        try:
+            with connection.makefile('rb') as stream:
+                message = marshal.loads(stream.read())
+            if message.get('op') == 'stop':
+                self._running = False
+                reply = {'status': 0}
+            elif message.get('op') == 'ping':
+                reply = {'status': 0, 'pid': os.getpid()}
+            elif 'deadline' in message and time.time() > message['deadline']:
+                return
+            else:
+                if 'deadline' in message:
+                    connection.sendall(ACK)
+                reply = self._run(message['argv'], message['cwd'], message.get('env'))
+            connection.sendall(marshal.dumps(reply))
+        except (OSError, EOFError, ValueError, KeyError, TypeError, AttributeError):
+            # A broken client must not take the daemon down
+            pass
+
+    def _run(self, argv: List[str], cwd: str, env: Optional[Dict[str, str]] = None) -> Dict:
+        """Run one command with the client's working directory and environment.
+
+        Captures the command's output; the daemon's own environment and
+        stdout/stderr are restored afterwards.
+        """
+        stdout, stderr = io.StringIO(), io.StringIO()
+        self._stdout.target, self._stderr.target = stdout, stderr
+        previous_cwd = os.getcwd()
+        previous_env = dict(os.environ)
+        status = 0
+        try:
+            os.chdir(cwd)
+            if env is not None:
+                os.environ.clear()
+                os.environ.update(env)
+            status = self.run_command(argv) or 0
+        except SystemExit as e:
+            status = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+            if isinstance(e.code, str):
+                stderr.write(e.code + '\n')
+        except Exception:  # pylint: disable=broad-exception-caught
+            # Keep serving; report the failure to this client only
+            stderr.write(traceback.format_exc())
+            status = 1
+        finally:
+            os.chdir(previous_cwd)
+            os.environ.clear()
+            os.environ.update(previous_env)
+            # Commands may redirect stdout (e.g. to keep messages out of image data)
+            sys.stdout, sys.stderr = self._stdout, self._stderr
+            self._stdout.target = self._stderr.target = None
+        return {'status': status, 'stdout': stdout.getvalue(), 'stderr': stderr.getvalue()}
+
+
+def daemon_pid(config_dir: Path) -> Optional[int]:
+    """Return the PID of the daemon for a configuration directory, or None if it isn't running."""
+    try:
+        return request(socket_path(config_dir), {'op': 'ping'}, timeout=START_TIMEOUT)['pid']
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def start_daemon(config_dir: Path, command: List[str]) -> int:
+    """Start the daemon in the background and wait until it accepts requests.
+
+    Args:
+        config_dir: Configuration directory
+        command: Command line that runs the daemon in the foreground
+
+    Returns:
+        PID of the running daemon
+
+    Raises:
+        RuntimeError: If the daemon doesn't come up in time
+    """
+    pid = daemon_pid(config_dir)
+    if pid is not None:
+        return pid
+    with open(os.devnull, 'rb') as devnull_in, open(os.devnull, 'wb') as devnull_out:
+        subprocess.Popen(  # pylint: disable=consider-using-with
+            command, stdin=devnull_in, stdout=devnull_out, stderr=devnull_out,
+            start_new_session=True, close_fds=True
+        )
+    deadline = time.monotonic() + START_TIMEOUT
+    while time.monotonic() < deadline:
+        pid = daemon_pid(config_dir)
+        if pid is not None:
+            return pid
+        time.sleep(0.05)
+    raise RuntimeError(f"Daemon did not start within {START_TIMEOUT:.0f}s")
+
+
+def stop_daemon(config_dir: Path) -> bool:
+    """Ask the daemon to exit.
+
+    Returns:
+        True if a daemon was running
+    """
+    path = socket_path(config_dir)
+    try:
+        request(path, {'op': 'stop'}, timeout=START_TIMEOUT)
+    except (OSError, ValueError):
+        return False
+    deadline = time.monotonic() + START_TIMEOUT
+    while os.path.exists(path) and time.monotonic() < deadline:
+        time.sleep(0.02)
+    return True
@@ -33,7 +33,11 @@ def discover_tests() -> Dict[str, Type[BaseUnitTest]]:
     # Define the test modules to scan
     test_categories = [
         'common',  # common utilities tests
-        'core'     # QR generator tests
+        'core',    # QR generator tests
+        'output',  # output formats and writers tests
+        'batch',   # batch generation tests
+        'decoder',  # built-in decoder tests
+        'service'   # daemon tests
     ]
 
     # Scan each category directory for test modules
@@ -77,7 +81,7 @@ def parse_args():
     parser = argparse.ArgumentParser(description="Run unit tests for QR Code Utils")
     parser.add_argument(
         "--category",
-        choices=["common", "core"],
+        choices=["common", "core", "output", "batch", "decoder", "service"],
         help="Run tests from a specific category"
     )
     parser.add_argument(
@@ -0,0 +1,112 @@
+"""
+Unit tests for resumable batches.
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Setup paths
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+# pylint: disable=wrong-import-position
+from tests.unit.test_base import BaseUnitTest
+from src.batch.checkpoint import RECORD_SIZE, Checkpoint
+from src.batch.jobs import BatchJob
+from src.batch.runner import BatchRunner
+from src.common.config import Config
+
+
+def _jobs(count: int, changed: int = -1):
+    """Return text jobs; the job at index ``changed`` gets different text."""
+    return [BatchJob(f"job{i}", 'text', {'text': f"row {i}" + ("!" if i == changed else "")})
+            for i in range(count)]
+
+
+class TestCheckpoint(BaseUnitTest):
+    """Test checkpointing finished jobs and resuming batches."""
+
+    def run(self):
+        """Run all checkpoint tests."""
+        self.test_resume()
+        self.test_redo_changed_outputs()
+        self.test_torn_record()
+        return self.results
+
+    def test_resume(self):
+        """Test a resumed batch skips every finished job."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                runner = BatchRunner(Config(config_dir=Path(tmpdir)), Path(tmpdir) / "out")
+                path = Path(tmpdir) / "batch.checkpoint"
+                jobs = _jobs(20) + [BatchJob("bad", 'fax', {})]
+
+                with Checkpoint(path, flush_every=8) as checkpoint:
+                    first = runner.run(jobs, executor='thread', workers=3, checkpoint=checkpoint)
+                self.assert_equal(20 * RECORD_SIZE, path.stat().st_size, "checkpoint_records",
+                                  "One record per successful job")
+
+                with Checkpoint(path, resume=True) as checkpoint:
+                    self.assert_equal(20, len(checkpoint), "checkpoint_loaded",
+                                      "Finished jobs loaded")
+                    second = runner.run(jobs, checkpoint=checkpoint)
+                self.assert_equal((20, 0), (first.succeeded, second.succeeded),
+                                  "checkpoint_resume_nothing_left", "Finished jobs not rerun")
+                self.assert_equal(20, second.skipped, "checkpoint_skipped", "Skips reported")
+                self.assert_equal(["bad"], [result.job_id for result in second.failed],
+                                  "checkpoint_failed_rerun", "Failed jobs are retried")
+
+                with Checkpoint(path) as checkpoint:
+                    self.assert_equal(0, len(checkpoint), "checkpoint_fresh",
+                                      "Without resume the checkpoint starts over")
+
+                def archived():
+                    archive_runner = BatchRunner(Config(config_dir=Path(tmpdir)),
+                                                 archive=Path(tmpdir) / "codes.zip")
+                    with Checkpoint(path) as checkpoint:
+                        archive_runner.run(jobs, checkpoint=checkpoint)
+                self.assert_raises(ValueError, archived, "checkpoint_archive",
+                                   "Checkpoints need image files")
+        except Exception as exc:
+            self.add_result("checkpoint_resume", False, f"Failed: {exc}")
+
+    def test_redo_changed_outputs(self):
+        """Test missing, truncated and changed jobs are generated again."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                output_dir = Path(tmpdir) / "out"
+                runner = BatchRunner(Config(config_dir=Path(tmpdir)), output_dir)
+                path = Path(tmpdir) / "batch.checkpoint"
+                with Checkpoint(path) as checkpoint:
+                    runner.run(_jobs(10), checkpoint=checkpoint)
+
+                (output_dir / "job1.png").unlink()
+                with open(output_dir / "job2.png", 'r+b') as f:
+                    f.truncate(100)
+                with Checkpoint(path, resume=True) as checkpoint:
+                    report = runner.run(_jobs(10, changed=3), checkpoint=checkpoint)
+
+                self.assert_equal((3, 7), (report.succeeded, report.skipped),
+                                  "checkpoint_redo", "Missing, cut short and changed jobs redone")
+                with Checkpoint(path, resume=True) as checkpoint:
+                    report = runner.run(_jobs(10, changed=3), checkpoint=checkpoint)
+                self.assert_equal(10, report.skipped, "checkpoint_redo_recorded",
+                                  "Redone jobs recorded")
+        except Exception as exc:
+            self.add_result("checkpoint_redo", False, f"Failed: {exc}")
+
+    def test_torn_record(self):
+        """Test a record cut short by a crash is dropped on resume."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                path = Path(tmpdir) / "batch.checkpoint"
+                path.write_bytes(b"\x01" * (2 * RECORD_SIZE + 3))
+                with Checkpoint(path, resume=True) as checkpoint:
+                    self.assert_equal(1, len(checkpoint), "checkpoint_torn_loaded",
+                                      "Complete records loaded")
+                self.assert_equal(2 * RECORD_SIZE, path.stat().st_size,
+                                  "checkpoint_torn_truncated", "Partial record removed")
+        except Exception as exc:
+            self.add_result("checkpoint_torn", False, f"Failed: {exc}")
@@ -0,0 +1,121 @@
+"""
+Unit tests for the JSONL coprocess pipe.
+"""
+import base64
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+# Setup paths
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+# pylint: disable=wrong-import-position
+from tests.unit.test_base import BaseUnitTest
+from src.batch.pipe import JobPipe
+from src.batch.runner import BatchRunner
+from src.common.config import Config
+from src.decoder import decode_image
+
+
+class _Replies(io.StringIO):
+    """Output stream that signals every written line."""
+
+    def __init__(self):
+        super().__init__()
+        self.written = threading.Event()
+
+    def write(self, s):
+        count = super().write(s)
+        self.written.set()
+        return count
+
+
+class TestJobPipe(BaseUnitTest):
+    """Test JSONL requests and responses over a line stream."""
+
+    def run(self):
+        """Run all pipe tests."""
+        self.test_ordered_results()
+        self.test_inline_image()
+        self.test_interactive()
+        return self.results
+
+    def _runner(self, tmpdir):
+        return BatchRunner(Config(config_dir=Path(tmpdir)), Path(tmpdir) / "out")
+
+    def test_ordered_results(self):
+        """Test results come back in input order with errors reported per line."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                lines = [json.dumps({'id': str(i), 'type': 'text', 'text': f"code {i}"})
+                         for i in range(20)]
+                lines[3] = "not json"
+                lines[5] = json.dumps({'id': 'bad', 'type': 'nope'})
+                out = io.StringIO()
+                report = JobPipe(self._runner(tmpdir), in_flight=4).serve(lines, out)
+
+                records = [json.loads(line) for line in out.getvalue().splitlines()]
+                expected_ids = [str(i) for i in range(20)]
+                expected_ids[3:6] = [None, '4', 'bad']
+                self.assert_equal(expected_ids, [r['id'] for r in records], "pipe_ordered",
+                                  "One result per line in input order")
+                self.assert_equal(18, report.succeeded, "pipe_report", "Failures don't stop")
+                self.assert_true("Unknown QR type" in records[5]['error'], "pipe_error",
+                                 "Job errors reported in the result")
+                self.assert_true(Path(records[0]['path']).exists(), "pipe_path",
+                                 "Image written in path mode")
+
+                out = io.StringIO()
+                JobPipe(self._runner(tmpdir), ordered=False).serve(lines, out)
+                self.assert_equal(20, len(out.getvalue().splitlines()), "pipe_unordered",
+                                  "Unordered mode answers every line")
+        except Exception as exc:
+            self.add_result("pipe_ordered_results", False, f"Failed: {exc}")
+
+    def test_inline_image(self):
+        """Test base64 and data URI results decode to the requested payload."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                line = json.dumps({'id': 'x', 'type': 'url', 'url': 'example.com'})
+                out = io.StringIO()
+                JobPipe(self._runner(tmpdir), return_mode='base64').serve([line], out)
+                png = base64.b64decode(json.loads(out.getvalue())['base64'])
+                self.assert_equal("https://example.com", decode_image(io.BytesIO(png)).data,
+                                  "pipe_base64", "Inline PNG decodes")
+                self.assert_false((Path(tmpdir) / "out").exists(), "pipe_inline_no_files",
+                                  "Inline modes write no files")
+
+                out = io.StringIO()
+                JobPipe(self._runner(tmpdir), return_mode='data-uri').serve([line], out)
+                self.assert_true(json.loads(out.getvalue())['data_uri'].startswith(
+                    "data:image/png;base64,"), "pipe_data_uri", "Data URI returned")
+                self.assert_raises(ValueError,
+                                   lambda: JobPipe(self._runner(tmpdir), return_mode='svg'),
+                                   "pipe_invalid_mode", "Unknown return mode rejected")
+        except Exception as exc:
+            self.add_result("pipe_inline_image", False, f"Failed: {exc}")
+
+    def test_interactive(self):
+        """Test each answer is written before the next request is read."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                out = _Replies()
+                answered = []
+
+                def requests():
+                    for i in range(3):
+                        out.written.clear()
+                        yield json.dumps({'id': str(i), 'type': 'text', 'text': 'hi'})
+                        answered.append(out.written.wait(timeout=10))
+
+                JobPipe(self._runner(tmpdir), return_mode='base64').serve(requests(), out)
+                self.assert_equal([True] * 3, answered, "pipe_interactive",
+                                  "Client can wait for each answer")
+        except Exception as exc:
+            self.add_result("pipe_interactive", False, f"Failed: {exc}")
@@ -0,0 +1,111 @@
+"""
+Unit tests for worker memory limits and process recycling.
+"""
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Setup paths
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+# pylint: disable=wrong-import-position
+from tests.unit.test_base import BaseUnitTest
+from src.batch.jobs import BatchJob
+from src.batch.recycle import MemoryWatch, RecyclingPool, rss_bytes
+from src.batch.runner import BatchRunner
+from src.common.config import Config
+from src.core import layout
+
+
+def _recycling_task():
+    """Pool task that asks for its worker to be recycled."""
+    return os.getpid(), True
+
+
+def _pid_task(recycle):
+    """Pool task that reports its worker after a pause, optionally asking for a recycle."""
+    time.sleep(0.2)
+    return os.getpid(), recycle
+
+
+class TestBatchRecycle(BaseUnitTest):
+    """Test task and memory limits and recycled process pools."""
+
+    def run(self):
+        """Run all recycling tests."""
+        self.test_memory_watch()
+        self.test_recycling_pool()
+        self.test_batch_recycling()
+        return self.results
+
+    def test_memory_watch(self):
+        """Test task limits, cache clearing above the ceiling and option checks."""
+        try:
+            self.assert_true(rss_bytes() > 0, "recycle_rss", "Resident size measured")
+
+            watch = MemoryWatch(max_tasks=3)
+            self.assert_equal([False, False, True], [watch.check() for _ in range(3)],
+                              "recycle_max_tasks", "Recycled after the last allowed task")
+
+            layout.finder_mask(5)
+            watch = MemoryWatch(max_rss=1)
+            self.assert_true(watch.check(), "recycle_max_rss", "Still too large after clearing")
+            self.assert_equal((1, 0), (watch.evictions, layout.finder_mask.cache_info().currsize),
+                              "recycle_evicted", "Caches cleared above the ceiling")
+            self.assert_false(MemoryWatch(max_rss=1 << 50).check(), "recycle_under_ceiling",
+                              "Nothing happens below the ceiling")
+
+            self.assert_raises(ValueError, lambda: MemoryWatch(max_tasks=0),
+                               "recycle_invalid_tasks", "Task limit must be positive")
+            self.assert_raises(ValueError, lambda: MemoryWatch(max_rss=0),
+                               "recycle_invalid_rss", "Ceiling must be positive")
+        except Exception as exc:
+            self.add_result("recycle_memory_watch", False, f"Failed: {exc}")
+
+    def test_recycling_pool(self):
+        """Test a recycled pool starts new workers for later tasks."""
+        try:
+            with RecyclingPool(1) as pool:
+                pids = [pool.submit(_recycling_task).result() for _ in range(3)]
+            self.assert_equal(3, len(set(pids)), "recycle_pool_new_workers",
+                              "Each task ran on a fresh worker")
+            self.assert_equal(3, pool.recycled, "recycle_pool_count", "Recycles counted")
+
+            with RecyclingPool(2) as pool:
+                first = [pool.submit(_pid_task, flag) for flag in (False, True)]
+                first = [future.result() for future in first]
+                second = [pool.submit(_pid_task, False) for _ in range(2)]
+                second = {future.result() for future in second}
+            self.assert_true(first[0] in second and first[1] not in second,
+                             "recycle_pool_single_worker", "Only the worker that asked replaced")
+            self.assert_equal(1, pool.recycled, "recycle_pool_single_count", "One recycle")
+        except Exception as exc:
+            self.add_result("recycle_pool", False, f"Failed: {exc}")
+
+    def test_batch_recycling(self):
+        """Test process batches recycle workers and report it."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                config = Config(config_dir=Path(tmpdir))
+                runner = BatchRunner(config, output_dir=Path(tmpdir) / "out",
+                                     max_tasks_per_worker=2, max_worker_rss=1 << 40)
+                jobs = [BatchJob(f"job{index}", 'text', {'text': f"code {index}"})
+                        for index in range(6)]
+                report = runner.run(jobs, executor='process', workers=2)
+                self.assert_equal(6, report.succeeded, "recycle_batch_succeeded",
+                                  "Every job generated across worker generations")
+                self.assert_true(report.recycled >= 1, "recycle_batch_count",
+                                 "Recycles reported")
+                self.assert_equal(report.recycled, report.to_dict()['recycled'],
+                                  "recycle_batch_report", "Recycles in the JSON report")
+                self.assert_equal(6, len(list((Path(tmpdir) / "out").glob("*.png"))),
+                                  "recycle_batch_files", "Every image written")
+                self.assert_raises(ValueError,
+                                   lambda: BatchRunner(config, max_tasks_per_worker=0),
+                                   "recycle_batch_invalid", "Task limit must be positive")
+        except Exception as exc:
+            self.add_result("recycle_batch", False, f"Failed: {exc}")
@@ -0,0 +1,231 @@
+"""
+Unit tests for batch job loading and the batch runner.
+"""
+import os
+import pickle
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+from PIL import Image
+
+# Setup paths
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+# pylint: disable=wrong-import-position
+from tests.unit.test_base import BaseUnitTest
+from src.batch.jobs import BatchJob, load_jobs
+from src.batch.runner import BatchRunner
+from src.common.config import Config
+from src.output.manifest import Manifest
+from src.output.qrm import QRMReader
+
+CSV_JOBS = """id,type,url,ssid,password,hidden,settings.box_size
+site,url,example.com,,,,2
+net,wifi,,Office,secret,true,
+bad,unknown,,,,,
+"""
+
+JSONL_JOBS = """{"id": "meet", "type": "event", "title": "Sync", "start": "2025-01-02 10:00",\
+ "end": "2025-01-02 11:00"}
+
+{"type": "text", "text": "hello", "settings": {"error_correction": "l"}}
+"""
+
+
+class TestBatchRunner(BaseUnitTest):
+    """Test batch job loading and generation."""
+
+    def run(self):
+        """Run all batch runner tests."""
+        self.test_load_csv()
+        self.test_load_jsonl()
+        self.test_load_errors()
+        self.test_run_images()
+        self.test_run_encode_only()
+        self.test_run_verify()
+        self.test_generate_many()
+        return self.results
+
+    def test_load_csv(self):
+        """Test CSV rows are converted to typed jobs."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                path = Path(tmpdir) / "jobs.csv"
+                path.write_text(CSV_JOBS, encoding="utf-8")
+                jobs = list(load_jobs(path))
+
+                self.assert_equal(3, len(jobs), "batch_csv_count", "All rows loaded")
+                self.assert_equal({'url': 'example.com'}, jobs[0].fields, "batch_csv_fields",
+                                  "Empty columns are dropped")
+                self.assert_equal({'box_size': 2}, jobs[0].settings, "batch_csv_settings",
+                                  "settings.* columns become typed settings")
+                self.assert_true(jobs[1].fields['hidden'] is True, "batch_csv_bool",
+                                 "Boolean fields are converted")
+        except Exception as exc:
+            self.add_result("batch_load_csv", False, f"Failed: {exc}")
+
+    def test_load_jsonl(self):
+        """Test JSON Lines jobs, aliases and default IDs."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                path = Path(tmpdir) / "jobs.jsonl"
+                path.write_text(JSONL_JOBS, encoding="utf-8")
+                jobs = list(load_jobs(path))
+
+                self.assert_equal(datetime(2025, 1, 2, 10, 0), jobs[0].fields['start_time'],
+                                  "batch_jsonl_datetime", "CLI aliases and datetimes converted")
+                self.assert_equal("2", jobs[1].job_id, "batch_jsonl_default_id",
+                                  "Row number used as job ID")
+                self.assert_equal('L', jobs[1].settings['error_correction'],
+                                  "batch_jsonl_settings", "Settings object is used")
+        except Exception as exc:
+            self.add_result("batch_load_jsonl", False, f"Failed: {exc}")
+
+    def test_load_errors(self):
+        """Test unreadable rows and bad field values fail their job, not the batch."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                config = Config(config_dir=Path(tmpdir))
+                csv_path = Path(tmpdir) / "jobs.csv"
+                csv_path.write_text("id,type,text,settings.box_size\nok,text,hi,\n"
+                                    "size,text,hi,abc\nnotype,,hi,\n", encoding="utf-8")
+                jsonl_path = Path(tmpdir) / "jobs.jsonl"
+                jsonl_path.write_text('{"id": "url", "type": "url", "url": 5}\n{"id": \n[1]\n'
+                                      '{"type": "text", "text": "fine"}\n', encoding="utf-8")
+                runner = BatchRunner(config, output_dir=Path(tmpdir) / "out")
+
+                report = runner.run(load_jobs(csv_path))
+                self.assert_equal((1, ["size", "notype"]),
+                                  (report.succeeded, [r.job_id for r in report.failed]),
+                                  "batch_load_errors_csv", "Bad CSV rows fail alone")
+                self.assert_true(report.failed[0].error.startswith("Row 2:"),
+                                 "batch_load_errors_row", "Error names the row")
+
+                report = runner.run(load_jobs(jsonl_path))
+                self.assert_equal((1, ["url", "2", "3"]),
+                                  (report.succeeded, [r.job_id for r in report.failed]),
+                                  "batch_load_errors_jsonl",
+                                  "Malformed lines and bad values fail alone")
+        except Exception as exc:
+            self.add_result("batch_load_errors", False, f"Failed: {exc}")
+
+    def test_run_images(self):
+        """Test a batch writes one image per job and records failures."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                path = Path(tmpdir) / "jobs.csv"
+                path.write_text(CSV_JOBS, encoding="utf-8")
+                output_dir = Path(tmpdir) / "images"
+
+                runner = BatchRunner(Config(config_dir=Path(tmpdir)), output_dir=output_dir)
+                report = runner.run(load_jobs(path))
+
+                self.assert_equal(2, report.succeeded, "batch_run_succeeded",
+                                  "Valid jobs succeeded")
+                self.assert_equal(["bad"], [result.job_id for result in report.failed],
+                                  "batch_run_failed", "Unknown type recorded as failure")
+                self.assert_true((output_dir / "site.png").exists(), "batch_run_output",
+                                 "Image named after job ID")
+        except Exception as exc:
+            self.add_result("batch_run_images", False, f"Failed: {exc}")
+
+    def test_run_encode_only(self):
+        """Test encode-only batches write a single .qrm container."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                path = Path(tmpdir) / "jobs.csv"
+                path.write_text(CSV_JOBS, encoding="utf-8")
+                qrm_path = Path(tmpdir) / "codes.qrm"
+
+                runner = BatchRunner(Config(config_dir=Path(tmpdir)), encode_only=True,
+                                     qrm_path=qrm_path)
+                report = runner.run(load_jobs(path))
+
+                self.assert_equal(qrm_path, report.output, "batch_encode_output",
+                                  "Report points at the container")
+                with QRMReader(qrm_path) as reader:
+                    self.assert_equal(["site", "net"], [record.job_id for record in reader],
+                                      "batch_encode_records", "One record per successful job")
+        except Exception as exc:
+            self.add_result("batch_run_encode_only", False, f"Failed: {exc}")
+
+    def test_run_verify(self):
+        """Test readback verification flags or fails damaged codes."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                path = Path(tmpdir) / "jobs.csv"
+                path.write_text("id,type,url,settings.error_correction\n"
+                                "low,url,example.com/a,L\nhigh,url,example.com/a,H\n",
+                                encoding="utf-8")
+                logo_path = Path(tmpdir) / "logo.png"
+                Image.new('RGB', (40, 40), 'red').save(logo_path)
+                config = Config(config_dir=Path(tmpdir))
+
+                flagged = BatchRunner(config, Path(tmpdir) / "flag", default_logo=str(logo_path),
+                                      verify='flag').run(load_jobs(path))
+                self.assert_equal(["low"], [result.job_id for result in flagged.flagged],
+                                  "batch_verify_flagged", "Damaged low-EC code is flagged")
+                self.assert_equal(2, flagged.succeeded, "batch_verify_flag_writes",
+                                  "Flagged codes are still written")
+
+                failed = BatchRunner(config, Path(tmpdir) / "fail", default_logo=str(logo_path),
+                                     verify='fail').run(load_jobs(path))
+                self.assert_equal(["low"], [result.job_id for result in failed.failed],
+                                  "batch_verify_failed", "Damaged low-EC code fails")
+                self.assert_false((Path(tmpdir) / "fail" / "low.png").exists(),
+                                  "batch_verify_fail_not_written", "Failed code is not written")
+
+                auto_path = Path(tmpdir) / "auto.csv"
+                auto_path.write_text("id,type,url,settings.error_correction,settings.logo_scale\n"
+                                     "auto,url,example.com/a,auto,0.15\n", encoding="utf-8")
+                planned = list(BatchRunner(config, Path(tmpdir) / "auto",
+                                           default_logo=str(logo_path),
+                                           verify='fail').iter_results(load_jobs(auto_path)))
+                self.assert_true(planned[0].ok, "batch_verify_auto_passes",
+                                 "Logo-planned EC level passes verification")
+        except Exception as exc:
+            self.add_result("batch_run_verify", False, f"Failed: {exc}")
+
+    def test_generate_many(self):
+        """Test thread and process executors yield ordered results and write every code."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                config = Config(config_dir=Path(tmpdir))
+                jobs = [BatchJob(f"code{i}", 'text', {'text': f"item {i}"}) for i in range(12)]
+                jobs.append(BatchJob("bad", 'unknown', {}))
+
+                for executor in ('thread', 'process'):
+                    output_dir = Path(tmpdir) / executor
+                    runner = BatchRunner(config, output_dir=output_dir, layout='sharded')
+                    results = list(runner.generate_many(iter(jobs), executor, workers=3))
+
+                    self.assert_equal([job.job_id for job in jobs],
+                                      [result.job_id for result in results],
+                                      f"batch_many_{executor}_order", "Results in input order")
+                    self.assert_equal([True] * 12 + [False],
+                                      [result.ok for result in results],
+                                      f"batch_many_{executor}_success", "Only bad job fails")
+                    with Manifest(output_dir / "manifest.sqlite") as manifest:
+                        self.assert_equal(12, len(manifest), f"batch_many_{executor}_manifest",
+                                          "Every code recorded in the manifest")
+
+                copy = pickle.loads(pickle.dumps(runner))
+                self.assert_equal(runner.output_dir, copy.output_dir, "batch_many_pickle",
+                                  "Runner pickles by configuration")
+
+                def unknown():
+                    list(runner.generate_many(jobs, 'fiber'))
+
+                def process_archive():
+                    archived = BatchRunner(config, archive=Path(tmpdir) / "codes.zip")
+                    list(archived.generate_many(jobs, 'process'))
+                self.assert_raises(ValueError, unknown, "batch_many_unknown_executor",
+                                   "Unknown executor rejected")
+                self.assert_raises(ValueError, process_archive, "batch_many_process_archive",
+                                   "Archives need the thread executor")
+        except Exception as exc:
+            self.add_result("batch_generate_many", False, f"Failed: {exc}")
@@ -0,0 +1,135 @@
+"""
+Unit tests for settings-aware job scheduling.
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+from PIL import Image
+
+# Setup paths
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+# pylint: disable=wrong-import-position
+from tests.unit.test_base import BaseUnitTest
+from src.batch.jobs import BatchJob
+from src.batch.recycle import cache_stats, clear_caches
+from src.batch.runner import BatchRunner
+from src.batch.schedule import estimate_version, reorder, run_scheduled
+from src.common.config import Config
+from src.core.render import encode_matrix
+
+# More logos than the logo cache holds, so input order evicts each before its reuse
+LOGO_COUNT = 34
+
+
+class TestBatchSchedule(BaseUnitTest):
+    """Test version estimates, windowed reordering and scheduled batches."""
+
+    def run(self):
+        """Run all scheduling tests."""
+        self.test_estimate_version()
+        self.test_reorder()
+        self.test_scheduled_batch()
+        return self.results
+
+    def test_estimate_version(self):
+        """Test estimated versions match the encoder for byte payloads."""
+        try:
+            cases = [("x" * size, {'error_correction': level})
+                     for size in (1, 20, 150, 900) for level in ('L', 'H', 'auto')]
+            self.assert_equal([encode_matrix(data, settings).version for data, settings in cases],
+                              [estimate_version(len(data), settings) for data, settings in cases],
+                              "schedule_estimate", "Estimates match encoded versions")
+            self.assert_equal(7, estimate_version(1, {'version': 7}), "schedule_fixed_version",
+                              "Configured version is the minimum")
+            self.assert_equal(41, estimate_version(10000, {}), "schedule_too_large",
+                              "Oversized payloads sort last")
+            lookups = cache_stats()
+            estimate_version(500, {'error_correction': 'Q'})
+            self.assert_equal(lookups, cache_stats(), "schedule_no_cache_lookups",
+                              "Estimates don't count towards the hit rate")
+        except Exception as exc:
+            self.add_result("schedule_estimate_version", False, f"Failed: {exc}")
+
+    def test_reorder(self):
+        """Test windows are sorted stably and results return to input order."""
+        try:
+            jobs = [BatchJob(f"{kind}{index}", kind, {}) for index, kind in enumerate("ababba")]
+
+            def key(job):
+                return (job.qr_type,)
+
+            order = [(index, job.job_id) for index, job in reorder(jobs, key, 4)]
+            self.assert_equal([(0, "a0"), (2, "a2"), (1, "b1"), (3, "b3"), (5, "a5"), (4, "b4")],
+                              order, "schedule_reorder", "Each window sorted, ties kept in order")
+
+            ran = []
+
+            def run(scheduled):
+                for job in scheduled:
+                    ran.append(job.job_id)
+                    yield job.job_id
+
+            self.assert_equal([job.job_id for job in jobs], list(run_scheduled(jobs, run, key, 4)),
+                              "schedule_ordered", "Results in input order")
+            self.assert_equal(["a0", "a2", "b1", "b3", "a5", "b4"], ran[:6],
+                              "schedule_run_order", "Jobs ran grouped")
+            self.assert_equal(["a0", "a2", "b1", "b3", "a5", "b4"],
+                              list(run_scheduled(jobs, run, key, 4, ordered=False)),
+                              "schedule_unordered", "Results in run order")
+        except Exception as exc:
+            self.add_result("schedule_reorder", False, f"Failed: {exc}")
+
+    def test_scheduled_batch(self):
+        """Test a window grouping jobs by logo raises the cache hit rate."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                config = Config(config_dir=Path(tmpdir))
+                logos = []
+                for index in range(LOGO_COUNT):
+                    logos.append(Path(tmpdir) / f"logo{index}.png")
+                    Image.new('RGB', (8, 8), (index * 7, 0, 0)).save(logos[-1])
+                # Each logo twice, the second use after all others
+                jobs = [BatchJob(f"job{index}", 'text', {'text': f"code {index}"},
+                                 logo=str(logos[index % LOGO_COUNT]),
+                                 settings={'error_correction': 'H'})
+                        for index in range(2 * LOGO_COUNT)]
+
+                reports = {}
+                for window in (0, len(jobs)):
+                    clear_caches()
+                    runner = BatchRunner(config, output_dir=Path(tmpdir) / f"out{window}",
+                                         schedule_window=window)
+                    reports[window] = runner.run(jobs)
+                self.assert_equal(len(jobs), reports[len(jobs)].succeeded,
+                                  "schedule_batch_succeeded", "Every job generated")
+                self.assert_true(reports[len(jobs)].cache_hit_rate > reports[0].cache_hit_rate,
+                                 "schedule_batch_hit_rate",
+                                 f"Hit rate {reports[0].cache_hit_rate:.1%} -> "
+                                 f"{reports[len(jobs)].cache_hit_rate:.1%}")
+                self.assert_equal(reports[0].cache_hit_rate,
+                                  reports[0].to_dict()['cache']['hit_rate'],
+                                  "schedule_batch_report", "Hit rate in the JSON report")
+
+                runner = BatchRunner(config, output_dir=Path(tmpdir) / "threads",
+                                     schedule_window=len(jobs))
+                self.assert_equal([job.job_id for job in jobs],
+                                  [result.job_id for result in runner.generate_many(jobs)],
+                                  "schedule_batch_ordered", "Results in input order")
+                runner = BatchRunner(config, output_dir=Path(tmpdir) / "threads",
+                                     schedule_window=len(jobs), ordered=False)
+                self.assert_equal(["job0", f"job{LOGO_COUNT}"],
+                                  [result.job_id for result in runner.iter_results(jobs)][:2],
+                                  "schedule_batch_unordered", "Jobs sharing a logo ran together")
+                job = BatchJob("once", 'url', {'url': "example.com"})
+                runner.schedule_key(job)
+                self.assert_equal("https://example.com", job.payload, "schedule_payload_kept",
+                                  "Payload prepared once and kept for the run")
+                self.assert_raises(ValueError, lambda: BatchRunner(config, schedule_window=-1),
+                                   "schedule_batch_invalid", "Negative window rejected")
+        except Exception as exc:
+            self.add_result("schedule_batch", False, f"Failed: {exc}")
@@ -0,0 +1,111 @@
+"""
+Unit tests for shard partitioning and merging shard results.
+"""
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Setup paths
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+# pylint: disable=wrong-import-position
+from tests.unit.test_base import BaseUnitTest
+from src.batch.jobs import BatchJob
+from src.batch.shard import merge_reports, parse_shard, shard_jobs, shard_of
+from src.output.manifest import Manifest
+
+
+class TestShard(BaseUnitTest):
+    """Test --shard partitioning and the merge of manifests and reports."""
+
+    def run(self):
+        """Run all shard tests."""
+        self.test_parse_shard()
+        self.test_partition()
+        self.test_merge_reports()
+        self.test_merge_manifests()
+        return self.results
+
+    def test_parse_shard(self):
+        """Test shard specifications are validated."""
+        try:
+            self.assert_equal((2, 8), parse_shard("2/8"), "shard_parse", "i/n parsed")
+            for spec in ("0/4", "5/4", "1", "a/b"):
+                self.assert_raises(ValueError, lambda spec=spec: parse_shard(spec),
+                                   f"shard_parse_invalid_{spec}", "Invalid shard rejected")
+        except Exception as exc:
+            self.add_result("shard_parse", False, f"Failed: {exc}")
+
+    def test_partition(self):
+        """Test every job lands in exactly one shard, the same one every time."""
+        try:
+            jobs = [BatchJob(str(row), 'text', {'text': str(row)}) for row in range(1, 1001)]
+            shards = [[job.job_id for job in shard_jobs(iter(jobs), index, 4)]
+                      for index in range(1, 5)]
+
+            self.assert_equal(sorted(job.job_id for job in jobs),
+                              sorted(job_id for shard in shards for job_id in shard),
+                              "shard_partition_complete", "Shards cover all jobs exactly once")
+            self.assert_true(all(200 < len(shard) < 300 for shard in shards),
+                             "shard_partition_balanced", "Shards are roughly equal")
+            # Fixed value: must not change between processes or releases
+            self.assert_equal(3, shard_of("customer-42", 4), "shard_stable",
+                              "Shard of a job ID is stable")
+        except Exception as exc:
+            self.add_result("shard_partition", False, f"Failed: {exc}")
+
+    def test_merge_reports(self):
+        """Test shard reports are summed and missing shards detected."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                paths = []
+                for index, failed in ((1, []), (3, [{'id': 'x', 'error': 'boom'}])):
+                    path = Path(tmpdir) / f"report-{index}.json"
+                    path.write_text(json.dumps({
+                        'shard': f"{index}/3", 'total': 5, 'succeeded': 5 - len(failed),
+                        'skipped': index, 'failed': failed, 'flagged': [], 'duration': float(index),
+                    }), encoding='utf-8')
+                    paths.append(path)
+
+                merged = merge_reports(paths)
+                self.assert_equal((10, 9, 4), (merged['total'], merged['succeeded'],
+                                               merged['skipped']),
+                                  "shard_merge_counts", "Counts summed")
+                self.assert_equal(['x'], [failure['id'] for failure in merged['failed']],
+                                  "shard_merge_failed", "Failures combined")
+                self.assert_equal(3.0, merged['duration'], "shard_merge_duration",
+                                  "Duration of the slowest shard")
+                self.assert_equal(['2/3'], merged['missing_shards'], "shard_merge_missing",
+                                  "Missing shard reported")
+        except Exception as exc:
+            self.add_result("shard_merge_reports", False, f"Failed: {exc}")
+
+    def test_merge_manifests(self):
+        """Test shard manifests merge into one."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                sources = []
+                for index in (1, 2):
+                    path = Path(tmpdir) / f"manifest-{index}-of-2.sqlite"
+                    with Manifest(path) as manifest:
+                        manifest.add(f"job{index}", f"payload {index}", f"{index}.png")
+                        manifest.add("shared", "same", "shared.png")
+                    sources.append(path)
+
+                with Manifest(Path(tmpdir) / "manifest.sqlite") as merged:
+                    copied = merged.merge(sources)
+                    merged.merge(sources)
+                    self.assert_equal(4, copied, "shard_manifest_copied", "All entries copied")
+                    self.assert_equal(3, len(merged), "shard_manifest_idempotent",
+                                      "Job IDs stay unique across merges")
+                    self.assert_equal("2.png", merged.get("job2").path.name,
+                                      "shard_manifest_lookup", "Merged entries found")
+                    self.assert_raises(FileNotFoundError,
+                                       lambda: merged.merge([Path(tmpdir) / "missing.sqlite"]),
+                                       "shard_manifest_missing", "Missing source rejected")
+        except Exception as exc:
+            self.add_result("shard_merge_manifests", False, f"Failed: {exc}")
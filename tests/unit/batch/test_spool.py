@@ -0,0 +1,191 @@
+"""
+Unit tests for the spool-directory worker.
+"""
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+# Setup paths
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+# pylint: disable=wrong-import-position
+from tests.unit.test_base import BaseUnitTest
+from src.batch.runner import BatchRunner
+from src.batch.spool import SpoolWorker
+from src.common.config import Config
+
+
+class _CrashingRunner(BatchRunner):
+    """Runner that fails every file with an unexpected error."""
+
+    def iter_results(self, jobs, **kwargs):
+        raise RuntimeError("renderer crashed")
+
+
+def _write_jobs(path: Path, prefix: str, count: int, qr_type: str = 'text'):
+    """Write a JSONL job file with count jobs."""
+    lines = [json.dumps({'id': f"{prefix}{i}", 'type': qr_type, 'text': f"{prefix} {i}"})
+             for i in range(count)]
+    path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+
+
+class TestSpoolWorker(BaseUnitTest):
+    """Test claiming, processing and recovering spool files."""
+
+    def run(self):
+        """Run all spool worker tests."""
+        self.test_concurrent_workers()
+        self.test_failed_file()
+        self.test_output_names()
+        self.test_reused_names()
+        self.test_stale_recovery()
+        return self.results
+
+    def test_concurrent_workers(self):
+        """Test several workers process every file exactly once."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                spool = Path(tmpdir) / "spool"
+                runner = BatchRunner(Config(config_dir=Path(tmpdir)), Path(tmpdir) / "out")
+                workers = [SpoolWorker(runner, spool, worker_id=f"w{i}") for i in range(3)]
+                for index in range(9):
+                    _write_jobs(spool / "incoming" / f"file{index}.jsonl", f"f{index}-", 3)
+                (spool / "incoming" / ".partial.jsonl").touch()
+
+                reports = []
+                threads = [threading.Thread(target=lambda w=w: reports.append(w.run(once=True)))
+                           for w in workers]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+
+                self.assert_equal(27, sum(report.succeeded for report in reports),
+                                  "spool_all_jobs", "Every job generated exactly once")
+                self.assert_equal(9, len(list((spool / "done").iterdir())), "spool_done",
+                                  "Every file moved to done/")
+                self.assert_equal([".partial.jsonl"], os.listdir(spool / "incoming"),
+                                  "spool_ignores_dotfiles", "Unfinished dot-files left alone")
+                self.assert_equal([], os.listdir(spool / "processing"), "spool_claims_released",
+                                  "Claim directories removed on exit")
+        except Exception as exc:
+            self.add_result("spool_concurrent_workers", False, f"Failed: {exc}")
+
+    def test_failed_file(self):
+        """Test files with failing jobs move to failed/ with an error report."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                spool = Path(tmpdir) / "spool"
+                runner = BatchRunner(Config(config_dir=Path(tmpdir)), Path(tmpdir) / "out")
+                worker = SpoolWorker(runner, spool, worker_id="w")
+                _write_jobs(spool / "incoming" / "bad.jsonl", "b", 2, qr_type='fax')
+                (spool / "incoming" / "broken.jsonl").write_text("{not json\n", encoding='utf-8')
+
+                report = worker.run(once=True)
+                errors = (spool / "failed" / "bad.jsonl.errors.jsonl").read_text(encoding='utf-8')
+
+                self.assert_equal(3, len(report.failed), "spool_failed_jobs",
+                                  "Failed jobs and unreadable rows reported")
+                self.assert_equal(["b0", "b1"], [json.loads(line)['id'] for line in
+                                                 errors.splitlines()],
+                                  "spool_error_report", "One error line per failed job")
+                self.assert_true((spool / "failed" / "broken.jsonl").exists(),
+                                 "spool_unreadable_file", "Unreadable file moved to failed/")
+
+                config = Config(config_dir=Path(tmpdir))
+                worker = SpoolWorker(_CrashingRunner(config, Path(tmpdir) / "out"), spool,
+                                     worker_id="w")
+                _write_jobs(spool / "incoming" / "poison.jsonl", "p", 1)
+                self.assert_false(worker.process(worker.claim()), "spool_poison_file",
+                                  "Unexpected errors fail the file")
+                self.assert_equal([], os.listdir(spool / "incoming"), "spool_poison_not_requeued",
+                                  "Poison file not handed back to other workers")
+                self.assert_true((spool / "failed" / "poison.jsonl.errors.jsonl").exists(),
+                                 "spool_poison_report", "Error report written")
+        except Exception as exc:
+            self.add_result("spool_failed_file", False, f"Failed: {exc}")
+
+    def test_output_names(self):
+        """Test files whose IDs default to row numbers don't overwrite each other."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                spool = Path(tmpdir) / "spool"
+                out = Path(tmpdir) / "out"
+                worker = SpoolWorker(BatchRunner(Config(config_dir=Path(tmpdir)), out), spool,
+                                     worker_id="w")
+                for stem in ("a", "b"):
+                    (spool / "incoming" / f"{stem}.jsonl").write_text(
+                        json.dumps({'type': 'text', 'text': stem}) + '\n', encoding='utf-8')
+
+                report = worker.run(once=True)
+                self.assert_equal(2, report.succeeded, "spool_names_succeeded", "Both generated")
+                self.assert_equal(["a/1.png", "b/1.png"],
+                                  sorted(path.relative_to(out).as_posix()
+                                         for path in out.rglob("*.png")),
+                                  "spool_names_namespaced", "Images grouped per spool file")
+        except Exception as exc:
+            self.add_result("spool_output_names", False, f"Failed: {exc}")
+
+    def test_reused_names(self):
+        """Test a reused file name keeps the earlier file and error report."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                spool = Path(tmpdir) / "spool"
+                worker = SpoolWorker(BatchRunner(Config(config_dir=Path(tmpdir)),
+                                                 Path(tmpdir) / "out"), spool, worker_id="w")
+                for run in range(3):
+                    _write_jobs(spool / "incoming" / "jobs.jsonl", f"r{run}-", 1)
+                    worker.run(once=True)
+                    _write_jobs(spool / "incoming" / "bad.jsonl", f"x{run}-", 1, qr_type='fax')
+                    worker.run(once=True)
+
+                done = sorted(os.listdir(spool / "done"))
+                self.assert_equal(3, len(done), "spool_reused_done", "Every run kept in done/")
+                self.assert_equal("jobs.jsonl", done[-1], "spool_reused_first_name",
+                                  "First run keeps its name")
+                self.assert_true(all(re.fullmatch(r'jobs\.\d{8}T\d{6}-w(-\d+)?\.jsonl', name)
+                                     for name in done[:-1]),
+                                 "spool_reused_suffix", "Later runs get a timestamp and worker ID")
+                ids = sorted(json.loads(line)['id']
+                             for name in os.listdir(spool / "failed")
+                             if name.endswith(".errors.jsonl")
+                             for line in (spool / "failed" / name).read_text(
+                                 encoding='utf-8').splitlines())
+                self.assert_equal(["x0-0", "x1-0", "x2-0"], ids, "spool_reused_reports",
+                                  "Every run's error report kept")
+        except Exception as exc:
+            self.add_result("spool_reused_names", False, f"Failed: {exc}")
+
+    def test_stale_recovery(self):
+        """Test claims of a worker without heartbeat return to incoming/."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                spool = Path(tmpdir) / "spool"
+                runner = BatchRunner(Config(config_dir=Path(tmpdir)), Path(tmpdir) / "out")
+                dead = SpoolWorker(runner, spool, worker_id="dead", stale_after=60)
+                _write_jobs(spool / "incoming" / "orphan.jsonl", "o", 2)
+                self.assert_not_none(dead.claim(), "spool_claim", "File claimed")
+                self.assert_is_none(dead.claim(), "spool_claim_empty", "Nothing left to claim")
+
+                alive = SpoolWorker(runner, spool, worker_id="alive", stale_after=60)
+                self.assert_equal(0, alive.recover_stale(force=True), "spool_recent_claim",
+                                  "Claims with a recent heartbeat are kept")
+                os.utime(spool / "processing" / "dead", (0, 0))
+                self.assert_equal(1, alive.recover_stale(force=True), "spool_stale_claim",
+                                  "Stale claim returned to incoming/")
+                self.assert_false((spool / "processing" / "dead").exists(),
+                                  "spool_stale_dir_removed", "Dead worker's directory removed")
+
+                report = alive.run(once=True)
+                self.assert_equal(2, report.succeeded, "spool_recovered_processed",
+                                  "Recovered file processed by the live worker")
+                self.assert_raises(ValueError, lambda: SpoolWorker(runner, spool, worker_id="a/b"),
+                                   "spool_invalid_worker_id", "Worker IDs must be plain names")
+        except Exception as exc:
+            self.add_result("spool_stale_recovery", False, f"Failed: {exc}")
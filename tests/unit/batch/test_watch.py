@@ -0,0 +1,162 @@
+"""
+Unit tests for incremental watch mode.
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Setup paths
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+# pylint: disable=wrong-import-position
+from tests.unit.test_base import BaseUnitTest
+from src.batch.runner import BatchRunner
+from src.batch.watch import JobWatcher
+from src.common.config import Config
+
+HEADER = "id,type,first_name,last_name,phone\n"
+
+
+def _counts(report):
+    """Return (added, changed, removed, unchanged) of a sync."""
+    return report.added, report.changed, report.removed, report.unchanged
+
+
+class TestJobWatcher(BaseUnitTest):
+    """Test regenerating only changed rows of a job file."""
+
+    def run(self):
+        """Run all watch tests."""
+        self.test_sync()
+        self.test_rows_without_id()
+        self.test_failed_change()
+        self.test_watch_loop()
+        return self.results
+
+    def test_sync(self):
+        """Test added, changed and removed rows, and restarting with saved state."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                config = Config(config_dir=Path(tmpdir))
+                output_dir = Path(tmpdir) / "out"
+                contacts = Path(tmpdir) / "contacts.csv"
+                contacts.write_text(HEADER + "a,vcard,Ann,A,1\nb,vcard,Bob,B,2\nc,vcard,Cy,C,3\n",
+                                    encoding="utf-8")
+                watcher = JobWatcher(BatchRunner(config, output_dir), contacts)
+
+                self.assert_equal((3, 0, 0, 0), _counts(watcher.sync()), "watch_initial",
+                                  "All rows generated at first")
+                self.assert_equal((0, 0, 0, 3), _counts(watcher.sync()), "watch_unchanged",
+                                  "Nothing regenerated without changes")
+
+                before = (output_dir / "a.png").stat().st_mtime_ns
+                contacts.write_text(HEADER + "a,vcard,Ann,A,1\nb,vcard,Bob,B,9\nd,vcard,Di,D,4\n",
+                                    encoding="utf-8")
+                self.assert_equal((1, 1, 1, 1), _counts(watcher.sync()), "watch_changes",
+                                  "Added, changed and removed rows detected")
+                self.assert_equal(before, (output_dir / "a.png").stat().st_mtime_ns,
+                                  "watch_untouched", "Unchanged image not rewritten")
+                self.assert_false((output_dir / "c.png").exists(), "watch_removed_output",
+                                  "Image of removed row deleted")
+
+                (output_dir / "d.png").unlink()
+                restarted = JobWatcher(BatchRunner(config, output_dir), contacts)
+                self.assert_equal((0, 1, 0, 2), _counts(restarted.sync()), "watch_restart",
+                                  "Saved state reused; missing image regenerated")
+                self.assert_raises(ValueError,
+                                   lambda: JobWatcher(BatchRunner(config, encode_only=True),
+                                                      contacts),
+                                   "watch_encode_only", "Encode-only output rejected")
+        except Exception as exc:
+            self.add_result("watch_sync", False, f"Failed: {exc}")
+
+    def test_rows_without_id(self):
+        """Test rows without an ID keep their images when a row is inserted above them."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                output_dir = Path(tmpdir) / "out"
+                contacts = Path(tmpdir) / "contacts.csv"
+                contacts.write_text("type,text\ntext,one\ntext,two\n", encoding="utf-8")
+                watcher = JobWatcher(BatchRunner(Config(config_dir=Path(tmpdir)), output_dir),
+                                     contacts)
+                self.assert_equal((2, 0, 0, 0), _counts(watcher.sync()), "watch_no_id_initial",
+                                  "Rows generated")
+                before = {path.name: path.stat().st_mtime_ns for path in output_dir.glob("*.png")}
+
+                contacts.write_text("type,text\ntext,new\ntext,one\ntext,two\ntext,two\n",
+                                    encoding="utf-8")
+                self.assert_equal((1, 0, 0, 3), _counts(watcher.sync()), "watch_no_id_insert",
+                                  "Only the inserted row generated; duplicate row shared")
+                after = {path.name: path.stat().st_mtime_ns for path in output_dir.glob("*.png")}
+                self.assert_equal(before, {name: after[name] for name in before},
+                                  "watch_no_id_untouched", "Existing images kept and not rewritten")
+        except Exception as exc:
+            self.add_result("watch_rows_without_id", False, f"Failed: {exc}")
+
+    def test_failed_change(self):
+        """Test a row whose change fails keeps its image until the row is removed."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                output_dir = Path(tmpdir) / "out"
+                jobs = Path(tmpdir) / "jobs.jsonl"
+                keep = '{"id": "b", "type": "text", "text": "two"}\n'
+                jobs.write_text('{"id": "a", "type": "text", "text": "one"}\n' + keep,
+                                encoding="utf-8")
+                watcher = JobWatcher(BatchRunner(Config(config_dir=Path(tmpdir)), output_dir),
+                                     jobs)
+                watcher.sync()
+
+                jobs.write_text('{"id": "a", "type": "fax", "text": "one"}\n' + keep,
+                                encoding="utf-8")
+                report = watcher.sync()
+                self.assert_equal(["a"], [result.job_id for result in report.failed],
+                                  "watch_failed_change", "Changed row failed")
+                self.assert_equal((0, 1, 0, 1), _counts(watcher.sync()), "watch_failed_retried",
+                                  "Failed row retried on the next sync")
+
+                jobs.write_text(keep, encoding="utf-8")
+                self.assert_equal((0, 0, 1, 1), _counts(watcher.sync()), "watch_failed_removed",
+                                  "Removed row counted")
+                self.assert_false((output_dir / "a.png").exists(), "watch_failed_image_deleted",
+                                  "Image of the failed row deleted with the row")
+        except Exception as exc:
+            self.add_result("watch_failed_change", False, f"Failed: {exc}")
+
+    def test_watch_loop(self):
+        """Test the watcher syncs on start and once per settled change."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                contacts = Path(tmpdir) / "contacts.jsonl"
+                contacts.write_text('{"id": "a", "type": "text", "text": "one"}\n',
+                                    encoding="utf-8")
+                runner = BatchRunner(Config(config_dir=Path(tmpdir)), Path(tmpdir) / "out")
+                watcher = JobWatcher(runner, contacts, poll_interval=0.05)
+                reports = []
+                stop = threading.Event()
+                thread = threading.Thread(target=watcher.watch, args=(stop, reports.append))
+                thread.start()
+
+                time.sleep(0.3)
+                contacts.write_text('{"id": "a", "type": "text", "text": "two"}\n{not json\n',
+                                    encoding="utf-8")
+                time.sleep(0.3)
+                contacts.write_text('{"id": "b", "type": "text", "text": "two"}\n',
+                                    encoding="utf-8")
+                time.sleep(0.3)
+                stop.set()
+                thread.join(timeout=5)
+
+                self.assert_equal([(1, 0, 0, 0), (1, 1, 0, 0), (1, 0, 1, 0)],
+                                  [_counts(r) for r in reports], "watch_loop_syncs",
+                                  "One sync per change")
+                self.assert_equal([[], ["2"], []],
+                                  [[result.job_id for result in r.failed] for r in reports],
+                                  "watch_loop_bad_row", "Unreadable row fails alone")
+                self.assert_false(thread.is_alive(), "watch_loop_stop", "Watcher stops")
+        except Exception as exc:
+            self.add_result("watch_loop", False, f"Failed: {exc}")
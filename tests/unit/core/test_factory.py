@@ -0,0 +1,123 @@
+"""
+Unit tests for the shared generator factory.
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from PIL import Image
+
+# Setup paths
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+# pylint: disable=wrong-import-position
+from tests.unit.test_base import BaseUnitTest
+from src.common.config import Config
+from src.core import GeneratorFactory, URLQRGenerator
+from src.core.render import load_logo
+
+
+class TestGeneratorFactory(BaseUnitTest):
+    """Test generator sharing, read-only settings and the logo cache."""
+
+    def run(self):
+        """Run all factory tests."""
+        self.test_one_generator_per_type()
+        self.test_shared_settings()
+        self.test_shared_factory()
+        self.test_logo_cache()
+        return self.results
+
+    def test_one_generator_per_type(self):
+        """Test concurrent lookups create a single generator per type."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                factory = GeneratorFactory(Config(config_dir=Path(tmpdir)))
+                found = []
+                threads = [threading.Thread(target=lambda: found.append(factory.get('url')))
+                           for _ in range(8)]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+
+                self.assert_equal(1, len({id(g) for g in found}), "factory_single_instance",
+                                  "All threads get the same generator")
+                self.assert_true(isinstance(found[0], URLQRGenerator), "factory_type",
+                                 "Generator class matches the type")
+                self.assert_raises(ValueError, lambda: factory.get('fax'),
+                                   "factory_unknown_type", "Unknown type rejected")
+        except Exception as exc:
+            self.add_result("factory_single_instance", False, f"Failed: {exc}")
+
+    def test_shared_settings(self):
+        """Test generators share one read-only settings object."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                factory = GeneratorFactory(Config(config_dir=Path(tmpdir)))
+                url, text = factory.get('url'), factory.get('text')
+                self.assert_true(url.qr_settings is text.qr_settings, "factory_settings_shared",
+                                 "One settings object for all generators")
+
+                def mutate():
+                    url.qr_settings['box_size'] = 1
+                self.assert_raises(TypeError, mutate, "factory_settings_readonly",
+                                   "Shared settings can't be changed")
+                self.assert_equal(3, url.get_settings({'box_size': 3})['box_size'],
+                                  "factory_custom_settings", "Custom settings still apply")
+        except Exception as exc:
+            self.add_result("factory_shared_settings", False, f"Failed: {exc}")
+
+    def test_shared_factory(self):
+        """Test the process-wide factory is per directory and follows config changes."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                factory = GeneratorFactory.shared(Config(config_dir=Path(tmpdir)))
+                again = GeneratorFactory.shared(Config(config_dir=Path(tmpdir)))
+                self.assert_true(factory is again, "factory_shared_reused",
+                                 "Same directory, same factory")
+
+                config = Config(config_dir=Path(tmpdir))
+                config.set('qr_settings.box_size', 4)
+                stat = os.stat(config.config_file)
+                os.utime(config.config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+                changed = GeneratorFactory.shared(config)
+                self.assert_true(changed is not factory, "factory_shared_reloaded",
+                                 "Config change builds a new factory")
+                self.assert_equal(4, changed.get('text').get_settings()['box_size'],
+                                  "factory_shared_new_settings", "New settings used")
+
+                config.set('qr_settings.box_size', 6, save=False)
+                unsaved = GeneratorFactory.shared(config)
+                self.assert_equal(6, unsaved.get('text').get_settings()['box_size'],
+                                  "factory_shared_unsaved", "Unsaved changes get their own factory")
+                self.assert_equal(4, GeneratorFactory.shared(Config(config_dir=Path(tmpdir)))
+                                  .get('text').get_settings()['box_size'],
+                                  "factory_shared_saved", "Other configs keep the saved settings")
+        except Exception as exc:
+            self.add_result("factory_shared", False, f"Failed: {exc}")
+
+    def test_logo_cache(self):
+        """Test logos are loaded once per size and reloaded when the file changes."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                logo_path = Path(tmpdir) / "logo.png"
+                Image.new('RGB', (40, 40), 'red').save(logo_path)
+                first = load_logo(logo_path, (10, 10))
+                self.assert_true(first is load_logo(logo_path, (10, 10)), "logo_cache_hit",
+                                 "Same logo and size loaded once")
+                self.assert_equal((20, 20), load_logo(logo_path, (20, 20)).size,
+                                  "logo_cache_size", "Sizes cached separately")
+
+                time.sleep(0.01)
+                Image.new('RGB', (40, 40), 'blue').save(logo_path)
+                os.utime(logo_path, ns=(time.time_ns(), time.time_ns()))
+                self.assert_equal((0, 0, 255), load_logo(logo_path, (10, 10)).getpixel((5, 5)),
+                                  "logo_cache_reload", "Changed file reloaded")
+        except Exception as exc:
+            self.add_result("logo_cache", False, f"Failed: {exc}")
@@ -0,0 +1,107 @@
+"""
+Unit tests for lazily evaluated QR handles.
+"""
+import os
+import pickle
+import sys
+import tempfile
+from pathlib import Path
+
+from PIL import Image
+
+# Setup paths
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+# pylint: disable=wrong-import-position
+from tests.unit.test_base import BaseUnitTest
+from src.common.config import Config
+from src.core.url import URLQRGenerator
+
+
+class TestQRHandle(BaseUnitTest):
+    """Test BaseQRGenerator.prepare() handles."""
+
+    def run(self):
+        """Run all handle tests."""
+        self.test_lazy_stages()
+        self.test_memoized()
+        self.test_pickle()
+        self.test_save_with_logo()
+        return self.results
+
+    def test_lazy_stages(self):
+        """Test properties compute only the stages they need."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                generator = URLQRGenerator(Config(config_dir=Path(tmpdir)))
+                handle = generator.prepare(url="example.com/lazy", custom_settings={'border': 2})
+
+                self.assert_equal("https://example.com/lazy", handle.data, "handle_payload",
+                                  "Payload is prepared eagerly")
+                self.assert_false(handle.is_encoded, "handle_not_encoded",
+                                  "Nothing is encoded on prepare")
+
+                size = handle.pixel_size
+                self.assert_true(handle.is_encoded, "handle_encoded_on_access",
+                                 "Size needs the matrix")
+                self.assert_false(handle.is_rendered, "handle_size_not_rendered",
+                                  "Size does not render")
+                self.assert_equal((size, size), handle.image.size, "handle_pixel_size",
+                                  "Predicted size matches the image")
+        except Exception as exc:
+            self.add_result("handle_lazy_stages", False, f"Failed: {exc}")
+
+    def test_memoized(self):
+        """Test each stage is computed once."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                handle = URLQRGenerator(Config(config_dir=Path(tmpdir))).prepare(url="example.com")
+                self.assert_true(handle.matrix is handle.matrix, "handle_matrix_memoized",
+                                 "Matrix is reused")
+                self.assert_true(handle.image is handle.image, "handle_image_memoized",
+                                 "Image is reused")
+                self.assert_true(handle.encode() is handle.encode('png'),
+                                 "handle_bytes_memoized", "Encoded bytes are reused")
+                self.assert_equal(b'\x89PNG', handle.encode()[:4], "handle_bytes_png",
+                                  "PNG by default")
+        except Exception as exc:
+            self.add_result("handle_memoized", False, f"Failed: {exc}")
+
+    def test_pickle(self):
+        """Test handles pickle without their computed stages."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                handle = URLQRGenerator(Config(config_dir=Path(tmpdir))).prepare(url="example.com")
+                prepared_size = len(pickle.dumps(handle))
+                handle.encode()
+                restored = pickle.loads(pickle.dumps(handle))
+
+                self.assert_equal(prepared_size, len(pickle.dumps(handle)), "handle_pickle_small",
+                                  "Rendered handle pickles as its payload only")
+                self.assert_false(restored.is_encoded, "handle_pickle_lazy",
+                                  "Restored handle starts unevaluated")
+                self.assert_equal(handle.matrix, restored.matrix, "handle_pickle_same_matrix",
+                                  "Restored handle encodes the same matrix")
+        except Exception as exc:
+            self.add_result("handle_pickle", False, f"Failed: {exc}")
+
+    def test_save_with_logo(self):
+        """Test saving a handle with a logo picks the format from the extension."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                logo_path = Path(tmpdir) / "logo.png"
+                Image.new('RGB', (40, 40), 'red').save(logo_path)
+                generator = URLQRGenerator(Config(config_dir=Path(tmpdir)))
+                handle = generator.prepare(logo_path=str(logo_path), url="example.com")
+
+                output = handle.save(Path(tmpdir) / "code.jpg")
+                with Image.open(output) as image:
+                    self.assert_equal('JPEG', image.format, "handle_save_format",
+                                      "Format follows the extension")
+                    centre = image.getpixel((image.width // 2, image.height // 2))
+                    self.assert_true(centre[0] > 200 and centre[1] < 80, "handle_save_logo",
+                                     "Logo pasted on the image")
+        except Exception as exc:
+            self.add_result("handle_save_with_logo", False, f"Failed: {exc}")
@@ -0,0 +1,133 @@
+"""
+Unit tests for logo-aware encoding (covered modules and EC auto-tuning).
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+# Setup paths
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+# pylint: disable=wrong-import-position
+from tests.unit.test_base import BaseUnitTest
+from src.core.handle import QRHandle
+from src.core.logo import AUTO_LEVELS, logo_modules, measure_logo, plan_logo
+from src.core.render import encode_matrix, render_matrix
+from src.core.verify import verify_image
+
+SETTINGS = {'box_size': 4, 'border': 4, 'error_correction': 'auto', 'logo_scale': 0.2}
+PAYLOAD = "https://example.com/products/12345?ref=logo-planning"
+
+
+class TestLogoPlanning(BaseUnitTest):
+    """Test covered-module geometry, EC auto-tuning and module clearing."""
+
+    def run(self):
+        """Run all logo planning tests."""
+        self.test_logo_modules()
+        self.test_auto_level()
+        self.test_auto_without_logo()
+        self.test_handle_plan()
+        self.test_clear_modules()
+        return self.results
+
+    def test_logo_modules(self):
+        """Test the covered box matches paste_logo's geometry."""
+        try:
+            # v1 at box 10, border 4: 290 px image, 72 px logo at 109..180
+            box = logo_modules(21, {'box_size': 10, 'border': 4})
+            self.assert_equal((6, 6, 15, 15), box, "logo_modules_box",
+                              "Default quarter-size logo covers modules 6-14")
+            top, left, bottom, right = logo_modules(21, {'box_size': 10, 'border': 4,
+                                                         'logo_scale': 0.1})
+            self.assert_true(bottom - top < 9 and right - left < 9, "logo_modules_scale",
+                             "logo_scale shrinks the covered box")
+        except Exception as exc:
+            self.add_result("logo_modules", False, f"Failed: {exc}")
+
+    def test_auto_level(self):
+        """Test 'auto' picks the lowest level within the damage budget."""
+        try:
+            plan = plan_logo(PAYLOAD, SETTINGS)
+            self.assert_true(plan.passed, "logo_auto_passes", "Planned logo within budget")
+            self.assert_true(plan.error_correction != 'H', "logo_auto_below_h",
+                             "A small logo doesn't need level H")
+            for level in AUTO_LEVELS[:AUTO_LEVELS.index(plan.error_correction)]:
+                matrix = encode_matrix(PAYLOAD, {**SETTINGS, 'error_correction': level})
+                lower = measure_logo(matrix, SETTINGS)
+                self.assert_false(lower.passed, f"logo_auto_lower_{level}",
+                                  f"Level {level} would exceed the budget")
+            fixed = plan_logo(PAYLOAD, {**SETTINGS, 'error_correction': 'H'})
+            self.assert_equal('H', fixed.error_correction, "logo_fixed_level",
+                              "A configured level is kept")
+            strict = plan_logo(PAYLOAD, {**SETTINGS, 'logo_max_damage': 0.01})
+            self.assert_equal('H', strict.error_correction, "logo_auto_fallback",
+                              "Falls back to H when nothing fits")
+            self.assert_false(strict.passed, "logo_auto_fallback_flagged",
+                              "Over-budget plan is reported")
+        except Exception as exc:
+            self.add_result("logo_auto_level", False, f"Failed: {exc}")
+
+    def test_auto_without_logo(self):
+        """Test 'auto' without a logo encodes at level M."""
+        try:
+            self.assert_equal('M', encode_matrix("plain", {'error_correction': 'auto'})
+                              .error_correction, "logo_auto_no_logo", "No logo, level M")
+            self.assert_equal('M', QRHandle("plain", {'error_correction': 'AUTO'}).matrix
+                              .error_correction, "logo_auto_case", "Level name is case-blind")
+        except Exception as exc:
+            self.add_result("logo_auto_no_logo", False, f"Failed: {exc}")
+
+    def test_handle_plan(self):
+        """Test a handle encodes at the planned level and reads back within budget."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                logo_path = Path(tmpdir) / "logo.png"
+                Image.new('RGB', (50, 50), 'red').save(logo_path)
+
+                handle = QRHandle(PAYLOAD, SETTINGS, str(logo_path))
+                plan = handle.logo_plan
+                self.assert_equal(plan.error_correction, handle.matrix.error_correction,
+                                  "logo_handle_level", "Matrix uses the planned level")
+                readback = verify_image(handle.image, handle.matrix, SETTINGS)
+                self.assert_true(readback.passed, "logo_handle_readback",
+                                 "Rendered code passes verification")
+                self.assert_true(readback.damage <= plan.damage, "logo_handle_bound",
+                                 "Planned damage bounds the real damage")
+                self.assert_is_none(QRHandle(PAYLOAD, SETTINGS).logo_plan, "logo_handle_none",
+                                    "No logo, no plan")
+        except Exception as exc:
+            self.add_result("logo_handle_plan", False, f"Failed: {exc}")
+
+    def test_clear_modules(self):
+        """Test logo_clear paints the covered modules in the background color."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                logo_path = Path(tmpdir) / "logo.png"
+                Image.new('RGBA', (50, 50), (0, 0, 0, 0)).save(logo_path)
+                settings = {**SETTINGS, 'error_correction': 'H'}
+
+                cleared = QRHandle(PAYLOAD, {**settings, 'logo_clear': True}, str(logo_path))
+                top, left, bottom, right = cleared.logo_plan.modules
+                offset = 4 * 4
+                area = (offset + left * 4, offset + top * 4,
+                        offset + right * 4, offset + bottom * 4)
+                pixels = np.asarray(cleared.image.crop(area).convert('L'))
+                self.assert_true(bool((pixels == 255).all()), "logo_clear_white",
+                                 "Covered modules cleared under a transparent logo")
+
+                kept = QRHandle(PAYLOAD, settings, str(logo_path)).image.crop(area)
+                self.assert_true(bool((np.asarray(kept.convert('L')) < 128).any()),
+                                 "logo_clear_default_off", "Modules show without logo_clear")
+                plain = render_matrix(cleared.matrix, settings).crop(area)
+                self.assert_equal(np.asarray(plain.convert('L')).tolist(),
+                                  np.asarray(kept.convert('L')).tolist(),
+                                  "logo_clear_transparent_logo", "Transparent logo changes nothing")
+        except Exception as exc:
+            self.add_result("logo_clear_modules", False, f"Failed: {exc}")
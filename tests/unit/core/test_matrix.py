@@ -0,0 +1,122 @@
+"""
+Unit tests for the packed QR matrix and renderer.
+"""
+import os
+import sys
+
+import qrcode
+
+# Setup paths
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+# pylint: disable=wrong-import-position
+from tests.unit.test_base import BaseUnitTest
+from src.core.matrix import QRMatrix
+from src.core.render import ERROR_CORRECTION_MAP, encode_matrix, render_matrix
+
+
+class TestQRMatrix(BaseUnitTest):
+    """Test the QRMatrix type and matrix rendering."""
+
+    def run(self):
+        """Run all matrix tests."""
+        self.test_get_set()
+        self.test_from_modules()
+        self.test_buffer_export()
+        self.test_encode_metadata()
+        self.test_render_matches_qrcode()
+        return self.results
+
+    def test_get_set(self):
+        """Test setting and reading individual modules."""
+        try:
+            matrix = QRMatrix(21)
+            matrix.set(0, 0)
+            matrix.set(3, 20)
+            matrix.set(20, 9)
+            matrix.set(20, 9, False)
+
+            self.assert_true(matrix.get(0, 0), "matrix_get_set_first", "First module is dark")
+            self.assert_true(matrix.get(3, 20), "matrix_get_set_last_col", "Last column is dark")
+            self.assert_false(matrix.get(20, 9), "matrix_clear_module", "Cleared module is light")
+            self.assert_equal(2, matrix.dark_count(), "matrix_dark_count", "Two dark modules")
+            self.assert_equal(3 * 21, len(matrix.tobytes()), "matrix_packed_size",
+                              "Rows are packed to whole bytes")
+        except Exception as exc:
+            self.add_result("matrix_get_set", False, f"Failed: {exc}")
+
+    def test_from_modules(self):
+        """Test packing a list-of-lists matrix round-trips through rows()."""
+        try:
+            modules = [[(row * 7 + col) % 3 == 0 for col in range(25)] for row in range(25)]
+            matrix = QRMatrix.from_modules(modules)
+            self.assert_equal(modules, list(matrix.rows()), "matrix_rows_roundtrip",
+                              "Rows match the source modules")
+            self.assert_equal(25, matrix.width, "matrix_width", "Width matches")
+        except Exception as exc:
+            self.add_result("matrix_from_modules", False, f"Failed: {exc}")
+
+    def test_buffer_export(self):
+        """Test memoryview and NumPy exports share the packed buffer."""
+        try:
+            matrix = QRMatrix(21)
+            view = matrix.memoryview()
+            packed = matrix.numpy(packed=True)
+            matrix.set(1, 1)
+
+            self.assert_equal(0x40, view[3], "matrix_memoryview_zero_copy",
+                              "memoryview sees later writes")
+            self.assert_equal(0x40, int(packed[1, 0]), "matrix_numpy_packed_zero_copy",
+                              "Packed NumPy view sees later writes")
+            self.assert_equal((21, 21), matrix.numpy().shape, "matrix_numpy_shape",
+                              "Unpacked array is width x width")
+            self.assert_true(bool(matrix.numpy()[1, 1]), "matrix_numpy_value",
+                             "Unpacked array has the dark module")
+        except Exception as exc:
+            self.add_result("matrix_buffer_export", False, f"Failed: {exc}")
+
+    def test_encode_metadata(self):
+        """Test encoded matrices carry version, EC level and mask."""
+        try:
+            matrix = encode_matrix("https://example.com", {'error_correction': 'Q'})
+            self.assert_equal(matrix.version * 4 + 17, matrix.width, "matrix_encode_width",
+                              "Width matches version")
+            self.assert_equal('Q', matrix.error_correction, "matrix_encode_ec",
+                              "EC level recorded")
+            self.assert_equal(('Q', matrix.mask_pattern), matrix.format_info(),
+                              "matrix_format_info", "Format bits decode to EC and mask")
+        except Exception as exc:
+            self.add_result("matrix_encode_metadata", False, f"Failed: {exc}")
+
+    def test_render_matches_qrcode(self):
+        """Test rendered images are identical to qrcode's PIL output."""
+        cases = [
+            {'box_size': 10, 'border': 4, 'error_correction': 'H'},
+            {'box_size': 3, 'border': 1, 'error_correction': 'L',
+             'fill_color': '#123456', 'back_color': 'yellow'},
+            {'box_size': 2, 'border': 0, 'error_correction': 'M',
+             'fill_color': 'red', 'back_color': 'transparent'},
+        ]
+        try:
+            for index, settings in enumerate(cases):
+                qr = qrcode.QRCode(
+                    error_correction=ERROR_CORRECTION_MAP[settings['error_correction']],
+                    box_size=settings['box_size'],
+                    border=settings['border']
+                )
+                qr.add_data("QR Code Utils")
+                qr.make(fit=True)
+                expected = qr.make_image(
+                    fill_color=settings.get('fill_color', 'black'),
+                    back_color=settings.get('back_color', 'white')
+                ).get_image()
+
+                actual = render_matrix(encode_matrix("QR Code Utils", settings), settings)
+                self.assert_equal(expected.mode, actual.mode, f"matrix_render_mode_{index}",
+                                  "Image mode matches qrcode")
+                self.assert_true(expected.tobytes() == actual.tobytes(),
+                                 f"matrix_render_pixels_{index}", "Pixels match qrcode")
+        except Exception as exc:
+            self.add_result("matrix_render_matches_qrcode", False, f"Failed: {exc}")
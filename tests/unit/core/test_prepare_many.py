@@ -0,0 +1,129 @@
+"""
+Unit tests for the columnar bulk payload builders (prepare_many).
+"""
+import os
+import sys
+import tempfile
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+
+import numpy as np
+
+# Setup paths
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+# pylint: disable=wrong-import-position
+from tests.unit.test_base import BaseUnitTest
+from src.common.config import Config
+from src.core.factory import GENERATORS
+
+# Rows per QR type, covering optional arguments that are absent, None or empty
+ROWS = {
+    'url': [{'url': "example.com"}, {'url': "https://example.com/a b"}],
+    'text': [{'text': "hello"}, {'text': ""}],
+    'phone': [{'phone_number': "+1 (555) 123-4567"}, {'phone_number': "555.1234"}],
+    'sms': [{'phone_number': "+1 555", 'message': "Hi & bye"},
+            {'phone_number': "555", 'message': None}],
+    'whatsapp': [{'phone_number': "+41 79 123", 'message': "Grüezi?"},
+                 {'phone_number': "123", 'message': ""}],
+    'email': [{'email': "a@b.c", 'subject': "Re: x", 'body': "one two"},
+              {'email': "d@e.f", 'subject': None, 'body': None}],
+    'location': [{'latitude': 47.37, 'longitude': 8.54, 'query': "Zürich HB"},
+                 {'latitude': -1.5, 'longitude': 2.25, 'query': None}],
+    'wifi': [{'ssid': 'My;Net,"x"', 'password': 'p\\a:ss', 'security': "WPA", 'hidden': True},
+             {'ssid': "Open", 'password': "", 'security': "nopass", 'hidden': False}],
+    'event': [{'title': "Meet", 'start_time': datetime(2025, 1, 1, 10),
+               'end_time': datetime(2025, 1, 1, 11), 'location': "Room 1", 'description': "Plan"},
+              {'title': "Call", 'start_time': datetime(2025, 2, 1, 9),
+               'end_time': datetime(2025, 2, 1, 9, 30), 'location': None, 'description': None}],
+    'vcard': [{'first_name': "Ada", 'last_name': "Lovelace", 'phone': "+44 1", 'email': "a@l.uk",
+               'organization': "AE", 'title': "Analyst", 'url': "ada.example",
+               'address': {'street': "1 St", 'city': "London", 'country': "UK"},
+               'birthday': "1815-12-10", 'note': "First", 'version': "4.0"},
+              {'first_name': "Bob", 'last_name': "B", 'phone': None, 'email': None,
+               'organization': None, 'title': None, 'url': None, 'address': None,
+               'birthday': None, 'note': None, 'version': "3.0"}],
+    'payment': [{'payment_type': "Bitcoin", 'recipient': "1abc", 'amount': Decimal("0.5"),
+                 'currency': None, 'message': "For you"},
+                {'payment_type': "paypal", 'recipient': "ada", 'amount': Decimal("5"),
+                 'currency': "EUR", 'message': None},
+                {'payment_type': "ethereum", 'recipient': "0x1", 'amount': None,
+                 'currency': None, 'message': None},
+                {'payment_type': "iban", 'recipient': "CH00", 'amount': Decimal("1"),
+                 'currency': None, 'message': "a b"}],
+}
+
+
+def _columns(rows):
+    """Turn a list of row dicts into a dict of columns."""
+    return {name: [row[name] for row in rows] for name in rows[0]}
+
+
+class TestPrepareMany(BaseUnitTest):
+    """Test prepare_many matches prepare_data row by row for every type."""
+
+    def run(self):
+        """Run all bulk builder tests."""
+        self.test_matches_prepare_data()
+        self.test_numpy_columns()
+        self.test_optional_columns()
+        self.test_invalid_columns()
+        return self.results
+
+    def test_matches_prepare_data(self):
+        """Test every generator type builds the same payloads in bulk."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                config = Config(config_dir=Path(tmpdir))
+                for qr_type, generator_class in GENERATORS.items():
+                    rows = ROWS[qr_type]
+                    generator = generator_class(config)
+                    expected = [generator.prepare_data(**row) for row in rows]
+                    self.assert_equal(expected, generator_class.prepare_many(_columns(rows)),
+                                      f"prepare_many_{qr_type}",
+                                      f"{qr_type} bulk payloads match prepare_data")
+        except Exception as exc:
+            self.add_result("prepare_many_matches", False, f"Failed: {exc}")
+
+    def test_numpy_columns(self):
+        """Test NumPy arrays are accepted as columns."""
+        try:
+            location = GENERATORS['location']
+            payloads = location.prepare_many({'latitude': np.array([47.37, -1.5]),
+                                              'longitude': np.array([8.54, 2.25])})
+            self.assert_equal(["geo:47.37,8.54", "geo:-1.5,2.25"], payloads,
+                              "prepare_many_numpy", "NumPy columns become Python values")
+            self.assert_equal(["a", "b"], GENERATORS['text'].prepare_many(
+                {'text': np.array(["a", "b"])}), "prepare_many_numpy_text", "String arrays work")
+        except Exception as exc:
+            self.add_result("prepare_many_numpy", False, f"Failed: {exc}")
+
+    def test_optional_columns(self):
+        """Test absent optional columns take prepare_data's defaults."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                wifi = GENERATORS['wifi'](Config(config_dir=Path(tmpdir)))
+                self.assert_equal([wifi.prepare_data(ssid="Net", password="pw")],
+                                  GENERATORS['wifi'].prepare_many({'ssid': ["Net"],
+                                                                   'password': ["pw"]}),
+                                  "prepare_many_defaults", "WPA and visible by default")
+                self.assert_equal([], GENERATORS['url'].prepare_many({'url': []}),
+                                  "prepare_many_empty", "No rows, no payloads")
+        except Exception as exc:
+            self.add_result("prepare_many_defaults", False, f"Failed: {exc}")
+
+    def test_invalid_columns(self):
+        """Test missing and uneven columns are rejected."""
+        try:
+            sms = GENERATORS['sms']
+            self.assert_raises(ValueError, lambda: sms.prepare_many({'message': ["x"]}),
+                               "prepare_many_missing", "Missing required column rejected")
+            self.assert_raises(ValueError,
+                               lambda: sms.prepare_many({'phone_number': ["1", "2"],
+                                                         'message': ["x"]}),
+                               "prepare_many_uneven", "Columns of different lengths rejected")
+        except Exception as exc:
+            self.add_result("prepare_many_invalid", False, f"Failed: {exc}")
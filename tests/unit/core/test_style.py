@@ -0,0 +1,115 @@
+"""
+Unit tests for the styled module renderer (rounded, dots, gradients).
+"""
+import os
+import sys
+
+import numpy as np
+from PIL import Image
+
+# Setup paths
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+# pylint: disable=wrong-import-position
+from tests.unit.test_base import BaseUnitTest
+from src.core.render import encode_matrix, render_matrix
+from src.core.style import gradient_image, style_mask
+from src.core.verify import verify_image
+from src.decoder import decode_image
+
+PAYLOAD = "https://example.com/styled"
+BASE = {'box_size': 8, 'border': 4, 'error_correction': 'M'}
+
+
+class TestStyledRenderer(BaseUnitTest):
+    """Test module sprites, gradients and readability of styled codes."""
+
+    def run(self):
+        """Run all styled renderer tests."""
+        self.test_sprites()
+        self.test_gradient()
+        self.test_styled_codes_scan()
+        self.test_invalid_style()
+        return self.results
+
+    def test_sprites(self):
+        """Test rounded corners follow neighbours and dots keep finders square."""
+        try:
+            modules = np.zeros((3, 3), dtype=bool)
+            modules[1, 0] = modules[1, 1] = True
+            mask = np.asarray(style_mask(modules, 8, 'rounded'))
+            self.assert_equal(0, int(mask[8, 0]), "style_rounded_corner",
+                              "Free corner is rounded off")
+            self.assert_equal(255, int(mask[8, 7:9].min()), "style_rounded_joined",
+                              "Corners towards a dark neighbour stay square")
+            self.assert_equal(255, int(mask[12, 4]), "style_rounded_centre", "Centre is dark")
+
+            dots = np.asarray(style_mask(np.ones((21, 21), dtype=bool), 8, 'dots'))
+            self.assert_equal(255, int(dots[0, 0]), "style_dots_finder",
+                              "Finder patterns stay square")
+            self.assert_equal(0, int(dots[10 * 8, 10 * 8]), "style_dots_gap",
+                              "Data modules are separate dots")
+        except Exception as exc:
+            self.add_result("style_sprites", False, f"Failed: {exc}")
+
+    def test_gradient(self):
+        """Test gradients run from fill_color to gradient_color."""
+        try:
+            image = gradient_image(100, {'gradient': 'horizontal', 'fill_color': 'black',
+                                         'gradient_color': 'red'}, 'RGB')
+            self.assert_true(image.getpixel((0, 50))[0] <= 2, "style_gradient_start",
+                             "Starts at the fill color")
+            self.assert_true(image.getpixel((99, 50))[0] >= 252, "style_gradient_end",
+                             "Ends at the gradient color")
+            self.assert_equal(image.getpixel((40, 0)), image.getpixel((40, 99)),
+                              "style_gradient_direction", "Horizontal gradient is constant "
+                              "down a column")
+            radial = gradient_image(100, {'gradient': 'radial', 'fill_color': 'black',
+                                          'gradient_color': 'blue'}, 'RGB')
+            self.assert_true(radial.getpixel((50, 50))[2] < radial.getpixel((0, 0))[2],
+                             "style_gradient_radial", "Radial gradient grows outwards")
+        except Exception as exc:
+            self.add_result("style_gradient", False, f"Failed: {exc}")
+
+    def test_styled_codes_scan(self):
+        """Test styled codes read back cleanly and decode."""
+        try:
+            styles = {
+                'rounded': {'module_style': 'rounded'},
+                'dots': {'module_style': 'dots'},
+                'gradient': {'gradient': 'diagonal', 'fill_color': 'navy',
+                             'gradient_color': 'darkred'},
+                'transparent': {'module_style': 'rounded', 'gradient': 'radial',
+                                'back_color': 'transparent'},
+            }
+            for name, style in styles.items():
+                settings = {**BASE, **style}
+                matrix = encode_matrix(PAYLOAD, settings)
+                image = render_matrix(matrix, settings)
+                self.assert_equal(0, verify_image(image, matrix, settings).damaged_modules,
+                                  f"style_{name}_readback", f"{name} modules read back")
+                if image.mode == 'RGBA':
+                    flat = Image.new('RGB', image.size, 'white')
+                    flat.paste(image, (0, 0), image)
+                    image = flat
+                self.assert_equal(PAYLOAD, decode_image(image).data, f"style_{name}_decodes",
+                                  f"{name} code decodes")
+            self.assert_equal('1', render_matrix(encode_matrix(PAYLOAD, BASE), BASE).mode,
+                              "style_plain_unchanged", "Square modules use the plain renderer")
+        except Exception as exc:
+            self.add_result("style_codes_scan", False, f"Failed: {exc}")
+
+    def test_invalid_style(self):
+        """Test unknown styles and gradients are rejected."""
+        try:
+            matrix = encode_matrix(PAYLOAD, BASE)
+            self.assert_raises(ValueError,
+                               lambda: render_matrix(matrix, {**BASE, 'module_style': 'hearts'}),
+                               "style_unknown_module", "Unknown module style rejected")
+            self.assert_raises(ValueError,
+                               lambda: render_matrix(matrix, {**BASE, 'gradient': 'spiral'}),
+                               "style_unknown_gradient", "Unknown gradient rejected")
+        except Exception as exc:
+            self.add_result("style_invalid", False, f"Failed: {exc}")
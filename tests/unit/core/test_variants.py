@@ -0,0 +1,147 @@
+"""
+Unit tests for multi-size output from a single encode.
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+# Setup paths
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+# pylint: disable=wrong-import-position
+from tests.unit.test_base import BaseUnitTest
+from src.common.config import Config
+from src.core.handle import QRHandle
+from src.core.text import TextQRGenerator
+from src.core.variants import OutputVariant, render_base, render_variant, save_variants
+from src.decoder import decode_image
+
+PAYLOAD = "https://example.com/catalogue/2024"
+BASE = {'border': 4, 'error_correction': 'M'}
+
+
+class TestOutputVariants(BaseUnitTest):
+    """Test scaled variants match per-size rendering."""
+
+    def run(self):
+        """Run all variant tests."""
+        self.test_parse()
+        self.test_matches_handle()
+        self.test_target_size()
+        self.test_auto_level()
+        self.test_generate_variants()
+        return self.results
+
+    def test_parse(self):
+        """Test variant specs."""
+        try:
+            thumb = OutputVariant.parse('thumb:2')
+            self.assert_equal((2, None, None), (thumb.box_size, thumb.size, thumb.output_format),
+                              "variant_parse_box", "Box size spec")
+            web = OutputVariant.parse('web:512px:webp')
+            self.assert_equal((None, 512, 'WEBP'), (web.box_size, web.size, web.output_format),
+                              "variant_parse_pixels", "Pixel size and format spec")
+            for spec in ('thumb', 'thumb:big', 'thumb:0', ':4', 'a:1:png:x', '../up:2',
+                         'a/b:2', '.hidden:2', 'a\\b:2'):
+                self.assert_raises(ValueError, lambda s=spec: OutputVariant.parse(s),
+                                   f"variant_parse_invalid_{spec}", f"{spec!r} rejected")
+        except Exception as exc:
+            self.add_result("variant_parse", False, f"Failed: {exc}")
+
+    def test_matches_handle(self):
+        """Test scaled variants equal the image rendered at that box size."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                logo_path = Path(tmpdir) / "logo.png"
+                Image.new('RGBA', (30, 30), (220, 0, 0, 180)).save(logo_path)
+                cases = {
+                    'bw': ({}, None),
+                    'color': ({'fill_color': 'navy', 'back_color': 'ivory'}, None),
+                    'transparent': ({'back_color': 'transparent'}, None),
+                    'logo': ({'logo_clear': True, 'error_correction': 'H'}, str(logo_path)),
+                    'styled': ({'module_style': 'rounded'}, None),
+                }
+                for name, (extra, logo) in cases.items():
+                    settings = {**BASE, **extra}
+                    matrix = QRHandle(PAYLOAD, settings).matrix
+                    base = render_base(matrix, settings)
+                    for box_size in (1, 3, 7):
+                        sized = {**settings, 'box_size': box_size}
+                        expected = QRHandle(PAYLOAD, sized, logo).image
+                        actual = render_variant(base, matrix, sized, logo)
+                        self.assert_true(
+                            expected.mode == actual.mode
+                            and np.array_equal(np.asarray(expected), np.asarray(actual)),
+                            f"variant_{name}_box_{box_size}", "Same pixels as a direct render")
+        except Exception as exc:
+            self.add_result("variant_matches_handle", False, f"Failed: {exc}")
+
+    def test_target_size(self):
+        """Test pixel targets pick the largest box size that fits."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                handle = QRHandle(PAYLOAD, {**BASE, 'box_size': 10})
+                variants = [OutputVariant('web', size=500), OutputVariant('tiny', size=5),
+                            OutputVariant('print', box_size=12, output_format='TIFF')]
+                paths = [Path(tmpdir) / name for name in ("web.png", "tiny.png", "print.out")]
+                results = save_variants(handle, variants, paths, workers=3)
+                modules = handle.width + 8
+                self.assert_equal([500 // modules, 1, 12], [r.box_size for r in results],
+                                  "variant_target_box", "Box sizes from pixel targets")
+                with Image.open(paths[2]) as image:
+                    self.assert_equal(('TIFF', (modules * 12,) * 2), (image.format, image.size),
+                                      "variant_format", "Variant format overrides the extension")
+                self.assert_false(handle.is_rendered, "variant_handle_unrendered",
+                                  "The handle's own image is never rendered")
+                self.assert_raises(ValueError, lambda: save_variants(handle, variants, paths[:1]),
+                                   "variant_path_count", "One path per variant")
+        except Exception as exc:
+            self.add_result("variant_target_size", False, f"Failed: {exc}")
+
+    def test_auto_level(self):
+        """Test 'auto' picks one level that suits the logo at every size."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                logo_path = Path(tmpdir) / "logo.png"
+                Image.new('RGB', (40, 40), 'orange').save(logo_path)
+                settings = {**BASE, 'error_correction': 'auto', 'logo_scale': 0.2}
+                handle = QRHandle(PAYLOAD, settings, str(logo_path))
+                variants = [OutputVariant('small', box_size=2), OutputVariant('large', box_size=9)]
+                results = save_variants(handle, variants,
+                                        [Path(tmpdir) / "s.png", Path(tmpdir) / "l.png"])
+                levels = {result.logo_plan.error_correction for result in results}
+                self.assert_equal(1, len(levels), "variant_auto_one_level",
+                                  "All variants share one matrix")
+                self.assert_true(all(result.logo_plan.passed for result in results),
+                                 "variant_auto_passes", "Logo within budget at every size")
+                self.assert_equal(PAYLOAD, decode_image(Path(tmpdir) / "l.png").data,
+                                  "variant_auto_decodes", "Variant with logo decodes")
+        except Exception as exc:
+            self.add_result("variant_auto_level", False, f"Failed: {exc}")
+
+    def test_generate_variants(self):
+        """Test generate_variants() names and writes every variant."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                generator = TextQRGenerator(Config(config_dir=Path(tmpdir)))
+                paths = generator.generate_variants(
+                    ['thumb:2', 'web:400px:jpeg', 'print:20:tiff'],
+                    output_path=str(Path(tmpdir) / "code.png"), text="variants"
+                )
+                self.assert_equal(['code_thumb.png', 'code_web.jpg', 'code_print.tiff'],
+                                  [path.name for path in paths.values()], "variant_names",
+                                  "Variant files named after the base path")
+                for name, path in paths.items():
+                    self.assert_equal("variants", decode_image(path).data,
+                                      f"variant_{name}_decodes", f"{name} decodes")
+                self.assert_raises(ValueError,
+                                   lambda: generator.generate_variants(['a:2', 'a:3'], text="x"),
+                                   "variant_duplicate_names", "Duplicate names rejected")
+        except Exception as exc:
+            self.add_result("variant_generate", False, f"Failed: {exc}")
@@ -0,0 +1,115 @@
+"""
+Unit tests for symbol layout tables and readback verification.
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import qrcode
+from qrcode import util as qr_util
+from PIL import Image
+
+# Setup paths
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+# pylint: disable=wrong-import-position
+from tests.unit.test_base import BaseUnitTest
+from src.core.layout import block_layout, data_positions, function_mask
+from src.core.matrix import QRMatrix
+from src.core.render import ERROR_CORRECTION_MAP, encode_matrix, render_matrix
+from src.core.text import TextQRGenerator
+from src.core.verify import verify_image
+from src.common.config import Config
+
+
+class TestReadbackVerification(BaseUnitTest):
+    """Test layout tables and readback verification."""
+
+    def run(self):
+        """Run all verification tests."""
+        self.test_data_placement()
+        self.test_clean_render_passes()
+        self.test_colored_render_passes()
+        self.test_logo_damage()
+        return self.results
+
+    def test_data_placement(self):
+        """Test codeword placement matches the bits qrcode writes."""
+        try:
+            for version, level in ((1, 'L'), (7, 'Q'), (22, 'H')):
+                qr = qrcode.QRCode(version=version, error_correction=ERROR_CORRECTION_MAP[level])
+                qr.add_data("layout")
+                qr.make(fit=False)
+
+                matrix = QRMatrix.from_modules(qr.modules)
+                mask = qr_util.mask_func(matrix.mask_pattern)
+                rows, cols = data_positions(version)
+                modules = matrix.numpy()
+                bits = [modules[r, c] != bool(mask(r, c)) for r, c in zip(rows, cols)]
+
+                codewords = len(qr.data_cache)
+                expected = np.unpackbits(np.array(qr.data_cache, dtype=np.uint8)).astype(bool)
+                self.assert_true(bool((np.array(bits[:codewords * 8]) == expected).all()),
+                                 f"verify_placement_v{version}",
+                                 f"Version {version} codewords read back in order")
+                self.assert_equal(codewords, len(block_layout(version, level).codeword_blocks),
+                                  f"verify_block_map_v{version}", "Every codeword has a block")
+                self.assert_equal(len(rows), int((~function_mask(version)).sum()),
+                                  f"verify_function_mask_v{version}",
+                                  "Data modules are exactly the non-function modules")
+        except Exception as exc:
+            self.add_result("verify_data_placement", False, f"Failed: {exc}")
+
+    def test_clean_render_passes(self):
+        """Test an unmodified render has no damage."""
+        try:
+            settings = {'box_size': 4, 'border': 2, 'error_correction': 'M'}
+            matrix = encode_matrix("https://example.com/clean", settings)
+            result = verify_image(render_matrix(matrix, settings), matrix, settings)
+            self.assert_equal(0, result.damaged_modules, "verify_clean_no_damage",
+                              "No damaged modules")
+            self.assert_true(result.passed, "verify_clean_passes", "Clean render passes")
+        except Exception as exc:
+            self.add_result("verify_clean_render", False, f"Failed: {exc}")
+
+    def test_colored_render_passes(self):
+        """Test colored, transparent and inverted renders are thresholded correctly."""
+        try:
+            for fill_color, back_color in (('navy', 'lightyellow'), ('navy', 'transparent'),
+                                           ('white', 'black')):
+                settings = {'fill_color': fill_color, 'back_color': back_color, 'box_size': 3}
+                matrix = encode_matrix("colored", settings)
+                result = verify_image(render_matrix(matrix, settings), matrix, settings)
+                self.assert_equal(0, result.damaged_modules, f"verify_color_{back_color}",
+                                  f"No damage read on {back_color} background")
+        except Exception as exc:
+            self.add_result("verify_colored_render", False, f"Failed: {exc}")
+
+    def test_logo_damage(self):
+        """Test a centre logo is measured against the EC level's capacity."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                generator = TextQRGenerator(Config(config_dir=Path(tmpdir)))
+                logo_path = Path(tmpdir) / "logo.png"
+                Image.new('RGB', (40, 40), 'red').save(logo_path)
+
+                damage = {}
+                for level in ('L', 'H'):
+                    settings = generator.get_settings({'error_correction': level})
+                    matrix = encode_matrix("https://example.com/logo", settings)
+                    image = generator.add_logo(render_matrix(matrix, settings), str(logo_path))
+                    damage[level] = verify_image(image, matrix, settings)
+
+                self.assert_true(damage['L'].damaged_codewords > 0, "verify_logo_detected",
+                                 "Logo damage detected")
+                self.assert_false(damage['L'].passed, "verify_logo_low_ec_fails",
+                                  "Logo over EC level L is rejected")
+                self.assert_true(damage['H'].damage < damage['L'].damage,
+                                 "verify_logo_high_ec_lower",
+                                 "Same logo uses less of EC level H's capacity")
+        except Exception as exc:
+            self.add_result("verify_logo_damage", False, f"Failed: {exc}")
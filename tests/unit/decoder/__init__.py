@@ -0,0 +1 @@
+"""Decoder module unit tests."""
@@ -0,0 +1,131 @@
+"""
+Unit tests for the built-in decoder and directory scanning.
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+from PIL import Image
+
+# Setup paths
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+# pylint: disable=wrong-import-position
+from tests.unit.test_base import BaseUnitTest
+from src.batch.jobs import load_jobs
+from src.batch.runner import BatchRunner
+from src.common.config import Config
+from src.core.render import encode_matrix, render_matrix
+from src.decoder import DecodeError, decode_image, decode_matrix, scan
+from src.decoder.reedsolomon import correct
+
+
+class TestDecoder(BaseUnitTest):
+    """Test decoding of matrices, images and directories."""
+
+    def run(self):
+        """Run all decoder tests."""
+        self.test_reed_solomon()
+        self.test_decode_matrix()
+        self.test_decode_images()
+        self.test_decode_failure()
+        self.test_scan_directory()
+        return self.results
+
+    def test_reed_solomon(self):
+        """Test damaged codewords are repaired up to the block's capacity."""
+        try:
+            matrix = encode_matrix("reed-solomon", {'version': 1, 'error_correction': 'M'})
+            grid = matrix.numpy().copy()
+            # Flip a few data modules in the lower right (codewords 0-2)
+            grid[-1, -1] ^= True
+            grid[-5, -1] ^= True
+            grid[-9, -1] ^= True
+            decoded = decode_matrix(grid)
+            self.assert_equal("reed-solomon", decoded.data, "decoder_rs_corrected",
+                              "Damaged grid decodes")
+            self.assert_equal(3, decoded.corrected, "decoder_rs_count",
+                              "Three codewords repaired")
+
+            self.assert_raises(DecodeError, lambda: correct([1] * 10 + [0] * 4, 4),
+                               "decoder_rs_too_many", "Uncorrectable block raises")
+        except Exception as exc:
+            self.add_result("decoder_reed_solomon", False, f"Failed: {exc}")
+
+    def test_decode_matrix(self):
+        """Test every EC level, segment mode and a large version round-trip."""
+        try:
+            payloads = ("HELLO WORLD", "0123456789" * 3, "grüße ✓", "x" * 600)
+            for level in ('L', 'M', 'Q', 'H'):
+                for payload in payloads:
+                    matrix = encode_matrix(payload, {'error_correction': level})
+                    decoded = decode_matrix(matrix)
+                    if decoded.data != payload or decoded.version != matrix.version:
+                        self.add_result(f"decoder_matrix_{level}", False,
+                                        f"Failed: {payload[:20]!r} decoded as {decoded!r}")
+                        break
+                else:
+                    self.add_result(f"decoder_matrix_{level}", True,
+                                    f"EC level {level} payloads decode")
+        except Exception as exc:
+            self.add_result("decoder_decode_matrix", False, f"Failed: {exc}")
+
+    def test_decode_images(self):
+        """Test renders decode with colors, transparency, rotation and skew."""
+        try:
+            cases = {
+                'plain': ({}, None),
+                'small_modules': ({'box_size': 2, 'border': 1}, None),
+                'colored': ({'fill_color': 'navy', 'back_color': 'lightyellow'}, None),
+                'transparent': ({'back_color': 'transparent'}, None),
+                'rotated': ({}, lambda image: image.rotate(90, expand=True)),
+                'skewed': ({'box_size': 6}, lambda image: image.transform(
+                    (image.width + 40, image.height), Image.Transform.AFFINE,
+                    (1, 0.08, -20, 0.03, 1, 0), fillcolor=255)),
+            }
+            payload = "https://example.com/decoder?id=42"
+            for name, (settings, transform) in cases.items():
+                image = render_matrix(encode_matrix(payload, settings), settings)
+                if transform:
+                    image = transform(image)
+                self.assert_equal(payload, decode_image(image).data, f"decoder_image_{name}",
+                                  f"{name} image decodes")
+        except Exception as exc:
+            self.add_result("decoder_decode_images", False, f"Failed: {exc}")
+
+    def test_decode_failure(self):
+        """Test an image without a code raises DecodeError."""
+        try:
+            self.assert_raises(DecodeError, lambda: decode_image(Image.new('L', (100, 100), 255)),
+                               "decoder_no_code", "Blank image raises DecodeError")
+        except Exception as exc:
+            self.add_result("decoder_decode_failure", False, f"Failed: {exc}")
+
+    def test_scan_directory(self):
+        """Test scanning compares decoded payloads with the job file."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                jobs_path = Path(tmpdir) / "jobs.csv"
+                jobs_path.write_text("id,type,url,text\none,url,example.com,\n"
+                                     "two,text,,hello\n", encoding="utf-8")
+                output_dir = Path(tmpdir) / "images"
+                runner = BatchRunner(Config(config_dir=Path(tmpdir)), output_dir=output_dir)
+                runner.run(load_jobs(jobs_path))
+                (output_dir / "notes.txt").write_text("not an image", encoding="utf-8")
+
+                jobs_path.write_text("id,type,url,text\none,url,example.com,\n"
+                                     "two,text,,goodbye\nthree,text,,missing\n", encoding="utf-8")
+                report = scan(output_dir, workers=2,
+                              expected=runner.expected_payloads(load_jobs(jobs_path)))
+
+                self.assert_equal(2, report.decoded, "decoder_scan_decoded",
+                                  "Both images decoded in worker processes")
+                self.assert_equal(["two.png"], [r.path.name for r in report.mismatched],
+                                  "decoder_scan_mismatch", "Changed payload is reported")
+                self.assert_equal(["three.png"], [path.name for path in report.missing],
+                                  "decoder_scan_missing", "Image without a file is reported")
+        except Exception as exc:
+            self.add_result("decoder_scan_directory", False, f"Failed: {exc}")
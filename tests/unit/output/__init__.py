@@ -0,0 +1 @@
+"""Output module unit tests."""
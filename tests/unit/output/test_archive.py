@@ -0,0 +1,153 @@
+"""
+Unit tests for the streaming ZIP/TAR archive writers.
+"""
+import io
+import json
+import os
+import sys
+import tarfile
+import tempfile
+import zipfile
+from pathlib import Path
+
+# Setup paths
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+# pylint: disable=wrong-import-position
+from tests.unit.test_base import BaseUnitTest
+from src.batch.jobs import load_jobs
+from src.batch.runner import BatchRunner
+from src.common.config import Config
+from src.core.text import TextQRGenerator
+from src.decoder import decode_image
+from src.output.archive import INDEX_NAME, archive_format, open_archive
+
+
+class _PipeStream(io.RawIOBase):
+    """Write-only stream without seek or tell, like a pipe."""
+
+    def __init__(self):
+        super().__init__()
+        self.chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self.chunks.append(bytes(b))
+        return len(b)
+
+    def getvalue(self):
+        """Return everything written."""
+        return b''.join(self.chunks)
+
+
+class TestArchive(BaseUnitTest):
+    """Test streaming archives and the batch archive sink."""
+
+    def run(self):
+        """Run all archive tests."""
+        self.test_zip_archive()
+        self.test_tar_pipe()
+        self.test_generate_to()
+        self.test_batch_archive()
+        return self.results
+
+    def test_zip_archive(self):
+        """Test ZIP entries are stored and the index comes last."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                path = Path(tmpdir) / "codes.zip"
+                with open_archive(path) as archive:
+                    archive.add("a/one.bin", b"one", job_id="1")
+                    archive.add("two.bin", b"two" * 100)
+
+                with zipfile.ZipFile(path) as zipped:
+                    names = zipped.namelist()
+                    self.assert_equal(["a/one.bin", "two.bin", INDEX_NAME], names,
+                                      "archive_zip_order", "Entries in order, index last")
+                    self.assert_true(all(i.compress_type == zipfile.ZIP_STORED
+                                         for i in zipped.infolist()),
+                                     "archive_zip_stored", "Entries stored uncompressed")
+                    index = [json.loads(line) for line in zipped.read(INDEX_NAME).splitlines()]
+                    self.assert_equal(3, index[0]['size'], "archive_index_size", "Sizes indexed")
+                    self.assert_equal("1", index[0]['job_id'], "archive_index_metadata",
+                                      "Metadata indexed")
+                self.assert_equal('tgz', archive_format("codes.tar.gz"), "archive_format_suffix",
+                                  "Format from suffix")
+                self.assert_raises(ValueError, lambda: archive_format("-", "rar"),
+                                   "archive_format_invalid", "Unknown format rejected")
+        except Exception as exc:
+            self.add_result("archive_zip", False, f"Failed: {exc}")
+
+    def test_tar_pipe(self):
+        """Test TAR and ZIP archives can be written to a non-seekable stream."""
+        try:
+            for archive_type in ('tgz', 'zip'):
+                stream = _PipeStream()
+                with open_archive(stream, archive_type) as archive:
+                    archive.add("code.png", b"\x89PNG data")
+                data = io.BytesIO(stream.getvalue())
+
+                if archive_type == 'zip':
+                    with zipfile.ZipFile(data) as zipped:
+                        content = zipped.read("code.png")
+                else:
+                    with tarfile.open(fileobj=data, mode='r:gz') as tarred:
+                        content = tarred.extractfile("code.png").read()
+                self.assert_equal(b"\x89PNG data", content, f"archive_{archive_type}_pipe",
+                                  "Readable after streaming to a pipe")
+        except Exception as exc:
+            self.add_result("archive_pipe", False, f"Failed: {exc}")
+
+    def test_generate_to(self):
+        """Test generators write into archives and binary streams."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                generator = TextQRGenerator(Config(config_dir=Path(tmpdir)))
+                stream = io.BytesIO()
+                generator.generate_to(stream, text="streamed")
+                stream.seek(0)
+                self.assert_equal("streamed", decode_image(stream).data,
+                                  "archive_generate_stream", "PNG written to a stream")
+
+                path = Path(tmpdir) / "codes.tar"
+                with open_archive(path) as archive:
+                    name = generator.generate_to(archive, text="archived")
+                with tarfile.open(path) as tarred:
+                    self.assert_equal([name, INDEX_NAME], tarred.getnames(),
+                                      "archive_generate_entry", "Code added as one entry")
+        except Exception as exc:
+            self.add_result("archive_generate_to", False, f"Failed: {exc}")
+
+    def test_batch_archive(self):
+        """Test a batch streams into an archive without writing image files."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                jobs_path = Path(tmpdir) / "jobs.csv"
+                jobs_path.write_text("id,type,text\na,text,one\nb,text,two\n", encoding="utf-8")
+                output_dir = Path(tmpdir) / "out"
+                archive_path = Path(tmpdir) / "codes.zip"
+                config = Config(config_dir=Path(tmpdir))
+                report = BatchRunner(config, output_dir, archive=archive_path).run(
+                    load_jobs(jobs_path)
+                )
+
+                self.assert_equal(2, report.succeeded, "batch_archive_succeeded", "Both jobs ran")
+                self.assert_equal(archive_path, report.output, "batch_archive_output",
+                                  "Report points at the archive")
+                self.assert_false(output_dir.exists() and any(output_dir.iterdir()),
+                                  "batch_archive_no_files", "No image files written")
+                with zipfile.ZipFile(archive_path) as zipped:
+                    self.assert_equal(["a.png", "b.png", INDEX_NAME], zipped.namelist(),
+                                      "batch_archive_entries", "One entry per job")
+                    with zipped.open("b.png") as entry:
+                        self.assert_equal("two", decode_image(io.BytesIO(entry.read())).data,
+                                          "batch_archive_decodes", "Entries are valid codes")
+                self.assert_raises(ValueError,
+                                   lambda: BatchRunner(config, archive="-", encode_only=True),
+                                   "batch_archive_encode_only", "Conflicting options rejected")
+        except Exception as exc:
+            self.add_result("batch_archive", False, f"Failed: {exc}")
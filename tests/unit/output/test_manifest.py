@@ -0,0 +1,118 @@
+"""
+Unit tests for output naming, sharded layouts and the SQLite manifest.
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Setup paths
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+# pylint: disable=wrong-import-position
+from tests.unit.test_base import BaseUnitTest
+from src.batch.jobs import load_jobs
+from src.batch.runner import BatchRunner
+from src.common.config import Config
+from src.core.url import URLQRGenerator
+from src.output.manifest import Manifest
+from src.output.paths import OutputLayout, content_key
+
+
+class TestOutputManifest(BaseUnitTest):
+    """Test collision-free names, sharding and manifest lookups."""
+
+    def run(self):
+        """Run all output layout and manifest tests."""
+        self.test_content_names()
+        self.test_sharded_layout()
+        self.test_manifest_lookup()
+        self.test_sharded_batch()
+        return self.results
+
+    def test_content_names(self):
+        """Test default file names differ per code and are stable per content."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                generator = URLQRGenerator(Config(config_dir=Path(tmpdir)))
+                first = generator.generate(url="example.com/a")
+                second = generator.generate(url="example.com/b")
+                again = generator.generate(url="example.com/a")
+
+                self.assert_true(first != second, "output_names_distinct",
+                                 "Same-second codes get different names")
+                self.assert_equal(first, again, "output_names_stable",
+                                  "Same content maps to the same file")
+                self.assert_true(content_key("a", {'box_size': 1}) != content_key("a"),
+                                 "output_key_settings", "Settings are part of the key")
+        except Exception as exc:
+            self.add_result("output_content_names", False, f"Failed: {exc}")
+
+    def test_sharded_layout(self):
+        """Test sharded paths use hash-prefixed subdirectories."""
+        try:
+            key = content_key("payload")
+            sharded = OutputLayout("/out", 'sharded').path_for("code.png", key)
+            self.assert_equal(Path("/out") / key[:2] / key[2:4] / "code.png", sharded,
+                              "output_sharded_path", "Two shard levels from the hash")
+            self.assert_equal(Path("/out/code.png"), OutputLayout("/out").path_for("code.png", key),
+                              "output_flat_path", "Flat layout ignores the key")
+            self.assert_raises(ValueError, lambda: OutputLayout("/out", 'nested'),
+                               "output_layout_invalid", "Unknown layout rejected")
+        except Exception as exc:
+            self.add_result("output_sharded_layout", False, f"Failed: {exc}")
+
+    def test_manifest_lookup(self):
+        """Test entries are found by job ID and payload and replaced on rerun."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                path = Path(tmpdir) / "manifest.sqlite"
+                with Manifest(path, batch_size=2) as manifest:
+                    manifest.add("a", "hello", "a.png", qr_type="text", settings={'box_size': 2})
+                    manifest.add("b", "hello", "b.png", qr_type="text", duration=0.5)
+                    manifest.add("a", "hello again", "a2.png", qr_type="text")
+
+                with Manifest(path) as manifest:
+                    self.assert_equal(2, len(manifest), "manifest_count",
+                                      "Rerun job replaces its entry")
+                    entry = manifest.get("a")
+                    self.assert_equal("a2.png", entry.path.name, "manifest_get_job",
+                                      "Lookup by job ID")
+                    self.assert_equal(["b"], [e.job_id for e in manifest.find_payload("hello")],
+                                      "manifest_find_payload", "Lookup by payload")
+                    self.assert_equal(0.5, manifest.get("b").duration, "manifest_duration",
+                                      "Timings stored")
+                    self.assert_is_none(manifest.get("missing"), "manifest_missing",
+                                        "Unknown job returns None")
+                    self.assert_equal(1, manifest.remove(["b", "missing"]), "manifest_remove",
+                                      "Entries removed by job ID")
+                    self.assert_equal(1, len(manifest), "manifest_remove_count",
+                                      "Other entries kept")
+        except Exception as exc:
+            self.add_result("manifest_lookup", False, f"Failed: {exc}")
+
+    def test_sharded_batch(self):
+        """Test a sharded batch writes into shards and records a manifest."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                jobs_path = Path(tmpdir) / "jobs.csv"
+                jobs_path.write_text("id,type,text\nx/1,text,one\nx_1,text,two\n",
+                                     encoding="utf-8")
+                output_dir = Path(tmpdir) / "out"
+                runner = BatchRunner(Config(config_dir=Path(tmpdir)), output_dir, layout='sharded')
+                report = runner.run(load_jobs(jobs_path))
+
+                self.assert_equal(2, report.succeeded, "batch_sharded_succeeded", "Both jobs ran")
+                with Manifest(output_dir / "manifest.sqlite") as manifest:
+                    paths = [manifest.get("x/1").path, manifest.get("x_1").path]
+                    self.assert_true(paths[0] != paths[1], "batch_sharded_unique",
+                                     "Sanitized IDs don't collide")
+                    self.assert_true(all(p.exists() and p.parent.parent.parent == output_dir
+                                         for p in paths), "batch_sharded_dirs",
+                                     "Images written two shard levels deep")
+                    self.assert_equal(10, manifest.get("x_1").settings.get('box_size'),
+                                      "batch_sharded_settings", "Effective settings recorded")
+        except Exception as exc:
+            self.add_result("batch_sharded", False, f"Failed: {exc}")
@@ -0,0 +1,107 @@
+"""
+Unit tests for the .qrm matrix container.
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Setup paths
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+# pylint: disable=wrong-import-position
+from tests.unit.test_base import BaseUnitTest
+from src.core.render import encode_matrix
+from src.core.url import URLQRGenerator
+from src.common.config import Config
+from src.output.qrm import QRMReader, QRMWriter
+
+
+class TestQRMContainer(BaseUnitTest):
+    """Test writing and reading .qrm files."""
+
+    def run(self):
+        """Run all QRM tests."""
+        self.test_roundtrip()
+        self.test_lookup()
+        self.test_invalid_file()
+        self.test_generate_qrm()
+        return self.results
+
+    def test_roundtrip(self):
+        """Test matrices and metadata survive a write/read cycle."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                path = Path(tmpdir) / "codes.qrm"
+                matrices = [
+                    encode_matrix("first", {'error_correction': 'L'}),
+                    encode_matrix("second" * 40, {'error_correction': 'H'}),
+                ]
+                with QRMWriter(path) as writer:
+                    writer.add(matrices[0], "first", "job-1")
+                    writer.add(matrices[1], "second" * 40, "job-2")
+
+                with QRMReader(path) as reader:
+                    self.assert_equal(2, len(reader), "qrm_record_count", "Two records stored")
+                    record = reader[1]
+                    self.assert_equal("job-2", record.job_id, "qrm_job_id", "Job ID stored")
+                    self.assert_true(record.matrix == matrices[1], "qrm_matrix_roundtrip",
+                                     "Matrix read back unchanged")
+                    self.assert_equal(matrices[1].version, record.version, "qrm_version",
+                                      "Version stored")
+                    self.assert_equal('H', record.error_correction, "qrm_error_correction",
+                                      "EC level stored")
+                    self.assert_equal(matrices[1].mask_pattern, record.mask_pattern,
+                                      "qrm_mask_pattern", "Mask stored")
+                    size = record.render({'box_size': 2, 'border': 1}).size[0]
+                    self.assert_equal((record.matrix.width + 2) * 2, size, "qrm_render_size",
+                                      "Record renders with given geometry")
+        except Exception as exc:
+            self.add_result("qrm_roundtrip", False, f"Failed: {exc}")
+
+    def test_lookup(self):
+        """Test finding records by payload and offset."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                path = Path(tmpdir) / "codes.qrm"
+                with QRMWriter(path) as writer:
+                    for index in range(5):
+                        writer.add(encode_matrix(f"payload {index}", {}), f"payload {index}")
+
+                with QRMReader(path) as reader:
+                    record = reader.find("payload 3")
+                    self.assert_equal(3, record.index, "qrm_find_payload",
+                                      "Record found by payload")
+                    self.assert_is_none(reader.find("missing"), "qrm_find_missing",
+                                        "Unknown payload returns None")
+                    self.assert_equal(3, reader.record_at(record.offset).index,
+                                      "qrm_record_at_offset", "Record found by offset")
+        except Exception as exc:
+            self.add_result("qrm_lookup", False, f"Failed: {exc}")
+
+    def test_invalid_file(self):
+        """Test non-QRM files are rejected."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                path = Path(tmpdir) / "not_qrm.qrm"
+                path.write_bytes(b"\x89PNG" + b"\x00" * 64)
+                self.assert_raises(ValueError, lambda: QRMReader(path), "qrm_invalid_file",
+                                   "Invalid file raises ValueError")
+        except Exception as exc:
+            self.add_result("qrm_invalid_file", False, f"Failed: {exc}")
+
+    def test_generate_qrm(self):
+        """Test generate() writes an encode-only container."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                generator = URLQRGenerator(Config(config_dir=Path(tmpdir)))
+                path = generator.generate(url="example.com", output_format='qrm')
+                self.assert_equal(".qrm", path.suffix, "qrm_generate_suffix",
+                                  "Default name uses .qrm extension")
+                with QRMReader(path) as reader:
+                    self.assert_not_none(reader.find("https://example.com"),
+                                         "qrm_generate_payload", "Prepared payload stored")
+        except Exception as exc:
+            self.add_result("qrm_generate", False, f"Failed: {exc}")
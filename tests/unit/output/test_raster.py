@@ -0,0 +1,158 @@
+"""
+Unit tests for band-streamed PNG/TIFF output of large codes.
+"""
+import io
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+# Setup paths
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+# pylint: disable=wrong-import-position
+from tests.unit.test_base import BaseUnitTest
+from src.batch.jobs import load_jobs
+from src.batch.runner import BatchRunner
+from src.common.config import Config
+from src.core.handle import QRHandle
+from src.core.render import encode_image
+from src.core.stream import can_stream, iter_bands, save_streamed, should_stream
+from src.core.text import TextQRGenerator
+from src.decoder import decode_image
+from src.output.raster import open_raster
+
+PAYLOAD = "https://example.com/poster"
+BASE = {'box_size': 3, 'border': 4, 'error_correction': 'H'}
+STYLES = {
+    'bw': {},
+    'color': {'fill_color': 'navy', 'back_color': '#ffeedd'},
+    'transparent': {'fill_color': 'darkgreen', 'back_color': 'transparent'},
+    'palette': {'fill_color': 'navy', 'back_color': 'transparent', 'palette': True},
+}
+
+
+class TestRasterStreaming(BaseUnitTest):
+    """Test streamed images match the in-memory renderer."""
+
+    def run(self):
+        """Run all streamed output tests."""
+        self.test_matches_renderer()
+        self.test_logo_bands()
+        self.test_writer_checks()
+        self.test_stream_selection()
+        self.test_generate_and_batch()
+        return self.results
+
+    def _compare(self, handle, output_format, name):
+        stream = io.BytesIO()
+        save_streamed(handle.matrix, handle.settings, stream, handle.logo_path, output_format)
+        stream.seek(0)
+        streamed = Image.open(stream)
+        streamed.load()
+        expected = handle.image
+        self.assert_equal(expected.mode, streamed.mode, f"{name}_mode", "Same image mode")
+        self.assert_true(np.array_equal(np.asarray(expected), np.asarray(streamed)),
+                         f"{name}_pixels", "Pixel for pixel the rendered image")
+        saved = Image.open(io.BytesIO(encode_image(expected, output_format)))
+        self.assert_true(np.array_equal(np.asarray(saved.convert('RGBA')),
+                                        np.asarray(streamed.convert('RGBA'))),
+                         f"{name}_saved", "Same file as the in-memory path, transparency included")
+
+    def test_matches_renderer(self):
+        """Test PNG and TIFF output for every color mode."""
+        try:
+            for output_format in ('PNG', 'TIFF'):
+                for style, colors in STYLES.items():
+                    handle = QRHandle(PAYLOAD, {**BASE, **colors})
+                    self._compare(handle, output_format, f"raster_{output_format.lower()}_{style}")
+        except Exception as exc:
+            self.add_result("raster_matches_renderer", False, f"Failed: {exc}")
+
+    def test_logo_bands(self):
+        """Test the logo is pasted into the bands it crosses, with and without clearing."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                logo_path = Path(tmpdir) / "logo.png"
+                logo = Image.new('RGBA', (40, 40), (200, 0, 0, 255))
+                logo.paste((0, 0, 0, 0), (10, 10, 30, 30))  # Transparent hole
+                logo.save(logo_path)
+                for clear in (False, True):
+                    for style, colors in STYLES.items():
+                        settings = {**BASE, **colors, 'logo_clear': clear}
+                        handle = QRHandle(PAYLOAD, settings, str(logo_path))
+                        self._compare(handle, 'PNG', f"raster_logo_{style}_clear_{clear}")
+        except Exception as exc:
+            self.add_result("raster_logo_bands", False, f"Failed: {exc}")
+
+    def test_writer_checks(self):
+        """Test incomplete images, oversized bands and unsupported formats are rejected."""
+        try:
+            def incomplete():
+                with open_raster(io.BytesIO(), 'PNG', 4, 'L') as writer:
+                    writer.write(np.zeros((3, 4), dtype=np.uint8))
+
+            def oversized():
+                with open_raster(io.BytesIO(), 'TIFF', 4, 'L') as writer:
+                    writer.write(np.zeros((5, 4), dtype=np.uint8))
+
+            self.assert_raises(ValueError, incomplete, "raster_incomplete",
+                               "Missing rows rejected on close")
+            self.assert_raises(ValueError, oversized, "raster_oversized",
+                               "Band taller than the image rejected")
+            self.assert_raises(ValueError, lambda: open_raster(io.BytesIO(), 'JPEG', 4, 'L'),
+                               "raster_format", "Only PNG and TIFF stream")
+        except Exception as exc:
+            self.add_result("raster_writer_checks", False, f"Failed: {exc}")
+
+    def test_stream_selection(self):
+        """Test which codes are streamed."""
+        try:
+            styled = {**BASE, 'module_style': 'rounded'}
+            self.assert_false(can_stream(styled, 'PNG'), "raster_styled_in_memory",
+                              "Styled modules are rendered in memory")
+            self.assert_raises(ValueError,
+                               lambda: iter_bands(QRHandle(PAYLOAD, styled).matrix, styled),
+                               "raster_styled_rejected", "Styled bands rejected")
+            self.assert_false(can_stream(BASE, 'JPEG'), "raster_jpeg_in_memory",
+                              "JPEG is rendered in memory")
+            self.assert_false(should_stream(25, BASE, 'PNG'), "raster_small_in_memory",
+                              "Small codes stay in memory")
+            self.assert_true(should_stream(25, {**BASE, 'box_size': 200}, 'PNG'),
+                             "raster_large_streams", "Codes over the threshold stream")
+
+            handle = QRHandle(PAYLOAD, {**BASE, 'stream_threshold': 0})
+            self.assert_true(handle.streams('PNG'), "raster_threshold_zero",
+                             "Threshold 0 streams every code")
+            _ = handle.image
+            self.assert_false(handle.streams('PNG'), "raster_rendered_in_memory",
+                              "An already rendered image is saved as is")
+        except Exception as exc:
+            self.add_result("raster_stream_selection", False, f"Failed: {exc}")
+
+    def test_generate_and_batch(self):
+        """Test generate() and batch runs write readable streamed files."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                config = Config(config_dir=Path(tmpdir))
+                config.set('qr_settings.stream_threshold', 0)
+                path = TextQRGenerator(config).generate(Path(tmpdir) / "single.tiff",
+                                                        text="streamed")
+                self.assert_equal("streamed", decode_image(path).data,
+                                  "raster_generate_decodes", "Streamed TIFF decodes")
+
+                jobs_path = Path(tmpdir) / "jobs.csv"
+                jobs_path.write_text("id,type,text,settings.stream_threshold\n"
+                                     "a,text,one,0\n", encoding="utf-8")
+                report = BatchRunner(Config(config_dir=Path(tmpdir)),
+                                     Path(tmpdir) / "out").run(load_jobs(jobs_path))
+                self.assert_equal(1, report.succeeded, "raster_batch_succeeded", "Job ran")
+                self.assert_equal("one", decode_image(Path(tmpdir) / "out" / "a.png").data,
+                                  "raster_batch_decodes", "Streamed batch code decodes")
+        except Exception as exc:
+            self.add_result("raster_generate_and_batch", False, f"Failed: {exc}")
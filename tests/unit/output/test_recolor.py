@@ -0,0 +1,173 @@
+"""
+Unit tests for recoloring two-color PNG codes without re-rendering.
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+# Setup paths
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+# pylint: disable=wrong-import-position
+from tests.unit.test_base import BaseUnitTest
+from src.batch.jobs import load_jobs
+from src.batch.runner import BatchRunner
+from src.common.config import Config
+from src.core.handle import QRHandle
+from src.core.render import render_matrix
+from src.core.verify import verify_image
+from src.decoder import decode_image
+from src.output.manifest import Manifest
+from src.output.recolor import recolor_files, recolor_manifest, recolor_png
+
+PAYLOAD = "https://example.com/seasonal"
+BASE = {'box_size': 4, 'border': 4}
+
+
+def _rgba(path):
+    with Image.open(path) as image:
+        return np.asarray(image.convert('RGBA'))
+
+
+def _image_data(path):
+    """Return everything from the first IDAT chunk on."""
+    data = Path(path).read_bytes()
+    return data[data.index(b'IDAT') - 4:]
+
+
+class TestRecolor(BaseUnitTest):
+    """Test palette output and header-only recoloring."""
+
+    def run(self):
+        """Run all recolor tests."""
+        self.test_palette_render()
+        self.test_recolor_matches_render()
+        self.test_recolor_in_place()
+        self.test_unsupported_files()
+        self.test_recolor_manifest()
+        return self.results
+
+    def test_palette_render(self):
+        """Test the palette setting renders a two-entry palette image."""
+        try:
+            settings = {**BASE, 'fill_color': 'navy', 'back_color': 'ivory', 'palette': True}
+            handle = QRHandle(PAYLOAD, settings)
+            self.assert_equal('P', handle.image.mode, "recolor_palette_mode", "Palette image")
+            self.assert_equal([255, 255, 240, 0, 0, 128], handle.image.getpalette()[:6],
+                              "recolor_palette_entries", "Background first, then modules")
+            self.assert_true(verify_image(handle.image, handle.matrix, settings).passed,
+                             "recolor_palette_readback", "Palette image reads back")
+            plain = render_matrix(handle.matrix, {**settings, 'palette': False})
+            self.assert_true(np.array_equal(np.asarray(plain),
+                                            np.asarray(handle.image.convert('RGB'))),
+                             "recolor_palette_pixels", "Same colors as an RGB render")
+        except Exception as exc:
+            self.add_result("recolor_palette_render", False, f"Failed: {exc}")
+
+    def test_recolor_matches_render(self):
+        """Test recolored files look exactly like codes rendered in the new colors."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                sources = {
+                    'bw': {},
+                    'palette': {'fill_color': 'navy', 'back_color': 'ivory', 'palette': True},
+                    'transparent': {'back_color': 'transparent', 'palette': True,
+                                    'fill_color': 'red'},
+                }
+                targets = [('darkgreen', '#ffeecc'), ('maroon', 'transparent')]
+                for name, extra in sources.items():
+                    handle = QRHandle(PAYLOAD, {**BASE, **extra})
+                    path = handle.save(Path(tmpdir) / f"{name}.png")
+                    for fill_color, back_color in targets:
+                        recolor_png(path, fill_color, back_color)
+                        expected = render_matrix(handle.matrix, {
+                            **BASE, 'fill_color': fill_color, 'back_color': back_color
+                        }).convert('RGBA')
+                        actual = _rgba(path)
+                        if back_color == 'transparent':
+                            # Fully transparent pixels only need to match in alpha
+                            expected = np.asarray(expected).copy()
+                            expected[expected[..., 3] == 0] = 0
+                            actual = actual.copy()
+                            actual[actual[..., 3] == 0] = 0
+                        self.assert_true(np.array_equal(np.asarray(expected), actual),
+                                         f"recolor_{name}_{fill_color}",
+                                         f"{name} recolored to {fill_color} on {back_color}")
+                    self.assert_equal(PAYLOAD, decode_image(Image.open(path)).data,
+                                      f"recolor_{name}_decodes", "Recolored code decodes")
+        except Exception as exc:
+            self.add_result("recolor_matches_render", False, f"Failed: {exc}")
+
+    def test_recolor_in_place(self):
+        """Test image data is never rewritten and palette files are patched in place."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                path = QRHandle(PAYLOAD, BASE).save(Path(tmpdir) / "code.png")
+                data = _image_data(path)
+                self.assert_false(recolor_png(path, 'navy', 'white'), "recolor_bw_rewritten",
+                                  "Grayscale file gets a palette once")
+                self.assert_true(recolor_png(path, 'teal', 'ivory'), "recolor_in_place",
+                                 "Palette file is patched in place")
+                self.assert_equal(data, _image_data(path), "recolor_data_untouched",
+                                  "Image data copied through unchanged")
+
+                borderless = QRHandle(PAYLOAD, {**BASE, 'border': 0}).save(
+                    Path(tmpdir) / "borderless.png")
+                recolor_png(borderless, 'navy', 'white', quiet_zone=False)
+                self.assert_equal([0, 0, 128, 255], _rgba(borderless)[0, 0].tolist(),
+                                  "recolor_no_quiet_zone", "Finder corner gets the fill color")
+        except Exception as exc:
+            self.add_result("recolor_in_place", False, f"Failed: {exc}")
+
+    def test_unsupported_files(self):
+        """Test RGB and non-PNG files are reported, not changed."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                rgb = QRHandle(PAYLOAD, {**BASE, 'fill_color': 'navy'}).save(
+                    Path(tmpdir) / "rgb.png")
+                before = rgb.read_bytes()
+                jpeg = QRHandle(PAYLOAD, BASE).save(Path(tmpdir) / "code.jpg")
+                good = QRHandle(PAYLOAD, BASE).save(Path(tmpdir) / "good.png")
+
+                report = recolor_files([rgb, jpeg, good], 'navy', 'white', workers=2)
+                self.assert_equal((1, 2), (report.recolored, len(report.failed)),
+                                  "recolor_report", "Only the two-color PNG recolored")
+                self.assert_equal(before, rgb.read_bytes(), "recolor_rgb_untouched",
+                                  "RGB file left alone")
+                self.assert_raises(ValueError, lambda: recolor_files([good], 'nocolor', 'white'),
+                                   "recolor_bad_color", "Unknown colors rejected up front")
+        except Exception as exc:
+            self.add_result("recolor_unsupported", False, f"Failed: {exc}")
+
+    def test_recolor_manifest(self):
+        """Test a manifest's codes are recolored and their settings updated."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                jobs_path = Path(tmpdir) / "jobs.csv"
+                jobs_path.write_text("id,type,text\na,text,one\nb,text,two\n", encoding="utf-8")
+                manifest_path = Path(tmpdir) / "manifest.sqlite"
+                BatchRunner(Config(config_dir=Path(tmpdir)), Path(tmpdir) / "out",
+                            manifest_path=manifest_path).run(load_jobs(jobs_path))
+
+                report = recolor_manifest(manifest_path, 'darkblue', 'white', workers=2)
+                self.assert_equal(2, report.recolored, "recolor_manifest_count", "Both codes")
+                with Manifest(manifest_path) as manifest:
+                    entry = manifest.get('b')
+                self.assert_equal(('darkblue', 'white', True),
+                                  (entry.settings['fill_color'], entry.settings['back_color'],
+                                   entry.settings['palette']),
+                                  "recolor_manifest_settings", "New colors recorded")
+                box_size = int(entry.settings['box_size'])
+                corner = int(entry.settings['border']) * box_size + box_size // 2
+                self.assert_equal([0, 0, 139, 255], _rgba(entry.path)[corner, corner].tolist(),
+                                  "recolor_manifest_pixels", "Finder module in the new color")
+                self.assert_equal("two", decode_image(entry.path).data,
+                                  "recolor_manifest_decodes", "Recolored code decodes")
+        except Exception as exc:
+            self.add_result("recolor_manifest", False, f"Failed: {exc}")
@@ -0,0 +1,206 @@
+"""
+Unit tests for the background writer threads and batches that use them.
+"""
+import os
+import shutil
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+from PIL import Image
+
+# Setup paths
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+# pylint: disable=wrong-import-position
+from tests.unit.test_base import BaseUnitTest
+from src.batch.jobs import BatchJob
+from src.batch.runner import BatchRunner
+from src.common.config import Config
+from src.decoder import decode_image
+from src.output.manifest import Manifest
+from src.output.sinks import OutputSink, SinkWriter
+from src.output import writer as writer_module
+from src.output.writer import BackgroundWriter
+
+
+class _GatedSink(OutputSink):
+    """In-memory sink whose writes wait for a gate and fail for names containing 'bad'."""
+
+    def __init__(self):
+        self.files = {}
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def put(self, name, data):
+        self.gate.wait()
+        if 'bad' in name:
+            raise OSError(f"Cannot store {name}")
+        self.files[name] = data
+        return self.location(name)
+
+    def open(self, name):
+        return SinkWriter(self, name)
+
+    def location(self, name):
+        return f"memory:{name}"
+
+
+class TestOutputWriter(BaseUnitTest):
+    """Test queued writes, syncing, backpressure and write errors."""
+
+    def run(self):
+        """Run all background writer tests."""
+        self.test_local_writes()
+        self.test_removed_directory()
+        self.test_directory_sync()
+        self.test_backpressure()
+        self.test_write_errors()
+        self.test_batch_writers()
+        return self.results
+
+    def test_local_writes(self):
+        """Test files are written, synced per file or per batch, and callbacks run."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                written = []
+                with BackgroundWriter(workers=2, fsync='file', drop_cache=True) as writer:
+                    futures = [writer.submit(str(Path(tmpdir) / "a" / f"{index}.bin"),
+                                             bytes([index]) * 10,
+                                             callback=lambda index=index: written.append(index))
+                               for index in range(5)]
+                self.assert_true(all(future.done() for future in futures), "writer_drained",
+                                 "close() waits for every queued file")
+                self.assert_equal(b'\x03' * 10, (Path(tmpdir) / "a" / "3.bin").read_bytes(),
+                                  "writer_contents", "Files written in place")
+                self.assert_equal([0, 1, 2, 3, 4], sorted(written), "writer_callbacks",
+                                  "Callback per written file")
+                self.assert_equal(5, writer.synced, "writer_fsync_file", "Every file synced")
+
+                with BackgroundWriter(fsync='batch') as writer:
+                    for index in range(3):
+                        writer.submit(str(Path(tmpdir) / "b" / f"{index}.bin"), b'x')
+                    self.assert_equal(0, writer.synced, "writer_fsync_deferred",
+                                      "Batch sync waits for close()")
+                self.assert_equal(3, writer.synced, "writer_fsync_batch", "Synced on close")
+                self.assert_raises(ValueError, lambda: writer.submit("c.bin", b''),
+                                   "writer_closed", "No writes after close()")
+                self.assert_raises(ValueError, lambda: BackgroundWriter(fsync='always'),
+                                   "writer_fsync_policy", "Unknown policy rejected")
+        except Exception as exc:
+            self.add_result("writer_local_writes", False, f"Failed: {exc}")
+
+    def test_removed_directory(self):
+        """Test an output directory removed between writes is created again."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                path = Path(tmpdir) / "gone" / "1.bin"
+                for attempt in range(2):
+                    with BackgroundWriter() as writer:
+                        future = writer.submit(str(path), b'x')
+                    self.assert_is_none(future.exception(), f"writer_recreated_dir_{attempt}",
+                                        "Written although the directory was removed")
+                    shutil.rmtree(path.parent)
+        except Exception as exc:
+            self.add_result("writer_removed_directory", False, f"Failed: {exc}")
+
+    def test_directory_sync(self):
+        """Test new directories are synced into their parents for both fsync policies."""
+        synced = []
+        original = writer_module._sync_directory  # pylint: disable=protected-access
+        writer_module._sync_directory = synced.append  # pylint: disable=protected-access
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                root = Path(tmpdir).resolve()
+                for fsync in ('file', 'batch'):
+                    synced.clear()
+                    with BackgroundWriter(fsync=fsync) as writer:
+                        writer.submit(str(root / fsync / "ab" / "cd" / "1.bin"), b'x')
+                    self.assert_equal({root, root / fsync, root / fsync / "ab",
+                                       root / fsync / "ab" / "cd"}, set(synced),
+                                      f"writer_dir_sync_{fsync}",
+                                      "File and new directory entries synced")
+        except Exception as exc:
+            self.add_result("writer_directory_sync", False, f"Failed: {exc}")
+        finally:
+            writer_module._sync_directory = original  # pylint: disable=protected-access
+
+    def test_backpressure(self):
+        """Test submit() blocks once the queue is full."""
+        try:
+            sink = _GatedSink()
+            sink.gate.clear()
+            submitted = []
+            with BackgroundWriter(sink, workers=1, queue_size=2) as writer:
+                def produce():
+                    for index in range(10):
+                        writer.submit(f"{index}.png", b'data')
+                        submitted.append(index)
+
+                producer = threading.Thread(target=produce)
+                producer.start()
+                producer.join(0.3)
+                # One file held by the writer thread and two queued
+                self.assert_equal(3, len(submitted), "writer_backpressure",
+                                  "Producer blocked by the full queue")
+                sink.gate.set()
+                producer.join()
+            self.assert_equal(10, len(sink.files), "writer_backpressure_released",
+                              "All files written once the sink catches up")
+        except Exception as exc:
+            self.add_result("writer_backpressure", False, f"Failed: {exc}")
+
+    def test_write_errors(self):
+        """Test a failing write surfaces on its future and skips its callback."""
+        try:
+            sink = _GatedSink()
+            called = []
+            with BackgroundWriter(sink) as writer:
+                good = writer.submit("good.png", b'1', callback=lambda: called.append("good"))
+                bad = writer.submit("bad.png", b'2', callback=lambda: called.append("bad"))
+            self.assert_equal("good.png", good.result(), "writer_result", "Written name")
+            self.assert_true(isinstance(bad.exception(), OSError), "writer_error",
+                             "Write error kept on the future")
+            self.assert_equal(["good"], called, "writer_error_callback",
+                              "No callback for failed writes")
+        except Exception as exc:
+            self.add_result("writer_write_errors", False, f"Failed: {exc}")
+
+    def test_batch_writers(self):
+        """Test batches hand images to writer threads and report failed writes."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                config = Config(config_dir=Path(tmpdir))
+                jobs = [BatchJob(f"job{index}", 'text', {'text': f"code {index}"})
+                        for index in range(6)]
+                manifest_path = Path(tmpdir) / "manifest.sqlite"
+                runner = BatchRunner(config, output_dir=Path(tmpdir) / "out",
+                                     manifest_path=manifest_path, writers=2, fsync='batch')
+                report = runner.run(jobs, executor='thread', workers=2)
+                self.assert_equal(6, report.succeeded, "writer_batch_succeeded",
+                                  "Every job written")
+                with Manifest(manifest_path) as manifest:
+                    entry = manifest.get("job4")
+                    self.assert_equal(6, len(manifest), "writer_batch_manifest",
+                                      "Entries recorded once written")
+                self.assert_equal("code 4", decode_image(Image.open(entry.path)).data,
+                                  "writer_batch_decodes", "Written image decodes")
+
+                sink = _GatedSink()
+                results = list(BatchRunner(config, sink=sink, writers=1).iter_results(
+                    [BatchJob("ok", 'text', {'text': "ok"}),
+                     BatchJob("bad", 'text', {'text': "bad"})]))
+                self.assert_equal([None, "Cannot store bad.png"],
+                                  [result.error for result in results], "writer_batch_error",
+                                  "Failed write reported on its job")
+                self.assert_equal(["ok.png"], list(sink.files), "writer_batch_sink",
+                                  "Remote sinks receive whole files")
+                self.assert_raises(ValueError,
+                                   lambda: list(BatchRunner(config, writers=1).generate_many(
+                                       jobs, executor='process')),
+                                   "writer_batch_process", "Writer threads need threads")
+        except Exception as exc:
+            self.add_result("writer_batch_writers", False, f"Failed: {exc}")
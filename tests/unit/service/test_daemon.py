@@ -0,0 +1,186 @@
+"""
+Unit tests for the command daemon and its thin client.
+"""
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Setup paths
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+# pylint: disable=wrong-import-position
+from tests.unit.test_base import BaseUnitTest
+from src.service.client import forward, request, socket_path
+from src.service.daemon import CommandDaemon, daemon_pid, stop_daemon
+
+
+def _fake_command(argv):
+    """Echo the arguments and working directory like a CLI command would."""
+    if argv[-1] == 'fail':
+        raise ValueError("boom")
+    if argv[-1] == 'redirect':
+        # As main() does for image data on stdout
+        sys.stdout = sys.stderr
+        print("message")
+        return 0
+    if argv[-1] == 'env':
+        print(os.environ.get('QR_DAEMON_TEST', 'unset'))
+        return 0
+    if argv[-1] == 'slow':
+        time.sleep(0.5)
+        return 0
+    if argv[-1] == 'log':
+        # Created while serving: its handler must follow later requests too
+        logger = logging.getLogger('daemon_test')
+        if not logger.handlers:
+            logger.addHandler(logging.StreamHandler(sys.stdout))
+        logger.warning("logged")
+        return 0
+    print(f"{' '.join(argv)} in {os.path.basename(os.getcwd())}")
+    return 3
+
+
+class TestCommandDaemon(BaseUnitTest):
+    """Test forwarding commands to a daemon over its Unix socket."""
+
+    def run(self):
+        """Run all daemon tests."""
+        self.test_no_daemon()
+        self.test_forwarding()
+        self.test_environment()
+        self.test_busy_daemon()
+        self.test_stdout_commands()
+        return self.results
+
+    def test_no_daemon(self):
+        """Test commands run in-process when no daemon is listening."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                self.assert_is_none(forward(['--config-dir', tmpdir, 'text', '--text', 'x']),
+                                    "daemon_absent", "No socket: run locally")
+                Path(socket_path(tmpdir)).touch()
+                self.assert_is_none(forward(['--config-dir', tmpdir, 'text', '--text', 'x']),
+                                    "daemon_stale_socket", "Stale socket: run locally")
+                self.assert_is_none(daemon_pid(Path(tmpdir)), "daemon_status_absent",
+                                    "Status reports no daemon")
+        except Exception as exc:
+            self.add_result("daemon_absent", False, f"Failed: {exc}")
+
+    def test_forwarding(self):
+        """Test output, exit status and working directory travel through the daemon."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                daemon = CommandDaemon(Path(tmpdir), _fake_command)
+                thread = threading.Thread(target=daemon.serve_forever, daemon=True)
+                thread.start()
+                deadline = time.monotonic() + 5
+                while daemon_pid(Path(tmpdir)) is None and time.monotonic() < deadline:
+                    time.sleep(0.01)
+
+                echo = request(socket_path(tmpdir), {'argv': ['echo'], 'cwd': tmpdir})
+                logs = [request(socket_path(tmpdir), {'argv': ['log'], 'cwd': tmpdir})['stdout']
+                        for _ in range(2)]
+                replies = {name: forward(['--config-dir', tmpdir, name])
+                           for name in ('fail', 'pipe')}
+                stopped = stop_daemon(Path(tmpdir))
+                thread.join(timeout=5)
+        except Exception as exc:
+            self.add_result("daemon_forwarding", False, f"Failed: {exc}")
+            return
+
+        self.assert_equal(3, echo['status'], "daemon_status", "Exit status forwarded")
+        self.assert_equal(f"echo in {os.path.basename(tmpdir)}\n", echo['stdout'],
+                          "daemon_output", "Output captured in the client's directory")
+        self.assert_equal(1, replies['fail'], "daemon_error_status",
+                          "Failing command reports an error and the daemon keeps serving")
+        self.assert_equal(["logged\n"] * 2, logs, "daemon_logging",
+                          "Log handlers follow later requests")
+        self.assert_is_none(replies['pipe'], "daemon_local_commands",
+                            "Streaming commands are never forwarded")
+        self.assert_true(stopped and not thread.is_alive(), "daemon_stop", "Daemon stops")
+        self.assert_false(Path(socket_path(tmpdir)).exists(), "daemon_socket_removed",
+                          "Socket removed on exit")
+
+    def _start(self, tmpdir):
+        """Serve the fake commands from a daemon thread; return the thread."""
+        daemon = CommandDaemon(Path(tmpdir), _fake_command)
+        thread = threading.Thread(target=daemon.serve_forever, daemon=True)
+        thread.start()
+        deadline = time.monotonic() + 5
+        while daemon_pid(Path(tmpdir)) is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return thread
+
+    def test_environment(self):
+        """Test commands see the client's environment and the daemon's is restored."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                thread = self._start(tmpdir)
+                path = socket_path(tmpdir)
+                reply = request(path, {'argv': ['env'], 'cwd': tmpdir,
+                                       'env': {'QR_DAEMON_TEST': 'client'}})
+                self.assert_equal("client\n", reply['stdout'], "daemon_env",
+                                  "Client environment applied")
+                self.assert_equal("unset\n", request(path, {'argv': ['env'], 'cwd': tmpdir,
+                                                             'env': {}})['stdout'],
+                                  "daemon_env_per_request", "Environment not kept between requests")
+                self.assert_is_none(os.environ.get('QR_DAEMON_TEST'), "daemon_env_restored",
+                                    "Daemon environment restored")
+                self.assert_is_none(forward(['--config-dir', tmpdir, 'batch', '--input', 'x']),
+                                    "daemon_batch_local", "Batches run locally")
+                stop_daemon(Path(tmpdir))
+                thread.join(timeout=5)
+        except Exception as exc:
+            self.add_result("daemon_environment", False, f"Failed: {exc}")
+
+    def test_busy_daemon(self):
+        """Test requests a busy daemon doesn't start in time lapse."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                thread = self._start(tmpdir)
+                path = socket_path(tmpdir)
+                slow = threading.Thread(target=request,
+                                        args=(path, {'argv': ['slow'], 'cwd': tmpdir}))
+                slow.start()
+                time.sleep(0.1)
+                self.assert_raises(OSError, lambda: request(path, {'argv': ['slow'], 'cwd': tmpdir},
+                                                            accept_timeout=0.05),
+                                   "daemon_busy", "Request lapses while the daemon is busy")
+                slow.join()
+                reply = request(path, {'argv': ['echo'], 'cwd': tmpdir}, accept_timeout=1.0)
+                self.assert_equal(3, reply['status'], "daemon_idle_accepts",
+                                  "Idle daemon acknowledges and answers")
+                stop_daemon(Path(tmpdir))
+                thread.join(timeout=5)
+        except Exception as exc:
+            self.add_result("daemon_busy", False, f"Failed: {exc}")
+
+    def test_stdout_commands(self):
+        """Test image output to stdout runs locally and redirects don't outlive a request."""
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                thread = self._start(tmpdir)
+                path = socket_path(tmpdir)
+                for argv in (['--output=-'], ['-o-'], ['-o', '-'], ['--out=-'],
+                             ['batch', '--archive', '-'], ['--archive=-']):
+                    self.assert_is_none(forward(['--config-dir', tmpdir, 'text'] + argv),
+                                        f"daemon_stdout_local_{''.join(argv)}",
+                                        "Image data on stdout is written locally")
+                redirected = request(path, {'argv': ['redirect'], 'cwd': tmpdir})
+                echo = request(path, {'argv': ['echo'], 'cwd': tmpdir})
+                self.assert_equal(("", "message\n"),
+                                  (redirected['stdout'], redirected['stderr']),
+                                  "daemon_redirect", "Redirected output goes to stderr")
+                self.assert_equal((f"echo in {os.path.basename(tmpdir)}\n", ""),
+                                  (echo['stdout'], echo['stderr']), "daemon_redirect_reset",
+                                  "Next request's stdout reaches stdout again")
+                stop_daemon(Path(tmpdir))
+                thread.join(timeout=5)
+        except Exception as exc:
+            self.add_result("daemon_stdout_commands", False, f"Failed: {exc}")